@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark the IVF approximate index against exact in-memory search.
+
+Embeddings are synthetic: unit vectors scattered around random cluster centers, so
+neighbourhoods look like a real taxonomy's rather than uniform noise. Queries are
+perturbed category embeddings. For each size the script reports the IVF build time,
+then recall@k against exact search and p50/p99 query latency for exact search and
+for IVF at each nprobe.
+
+No OpenAI key is needed.
+
+Usage:
+    python scripts/benchmark_ann_index.py [--sizes 100000 1000000] [--dim 256] [--k 100] [--nprobe 4 8 16 32]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.classification.ann_index import IVFCategoryIndex, IVFIndex
+from src.classification.category_index import CategoryEmbeddingIndex, normalize_embeddings
+from src.data.models import Category
+
+CLUSTER_SIZE = 200  # Average categories per synthetic cluster
+CLUSTER_SPREAD = 1.0  # Noise added around each cluster center
+QUERY_NOISE = 0.5  # Norm of the noise added to a (unit) category embedding to make a query
+P99 = 99
+
+
+def _make_categories(n: int) -> list[Category]:
+    """Create n synthetic categories without per-field validation."""
+    return [
+        Category.model_construct(name=f"Category{i}", path=f"/Root/Category{i}", embedding_text="", llm_description="")
+        for i in range(n)
+    ]
+
+
+def _make_embeddings(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    """Create n clustered embeddings."""
+    centers = rng.standard_normal((max(1, n // CLUSTER_SIZE), dim), dtype=np.float32)
+    embeddings = rng.standard_normal((n, dim), dtype=np.float32)
+    embeddings *= CLUSTER_SPREAD
+    embeddings += centers[rng.integers(0, len(centers), size=n)]
+    return embeddings
+
+
+def _latencies_ms(search, queries: np.ndarray, k: int) -> tuple[list[np.ndarray], np.ndarray]:
+    """Run every query and return the result row numbers and per-query latencies."""
+    results, timings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        found = search(query, k)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append(found)
+    return results, np.asarray(timings)
+
+
+def run_benchmark(sizes: list[int], dim: int, k: int, nprobes: list[int], n_queries: int) -> None:
+    """Run the benchmark for each category count and print a results table."""
+    rng = np.random.default_rng(0)
+    print(f"Embedding dim: {dim}, top-k: {k}, queries: {n_queries}")
+    for n in sizes:
+        categories = _make_categories(n)
+        exact = CategoryEmbeddingIndex(categories, _make_embeddings(rng, n, dim))
+        rows = {id(category): row for row, category in enumerate(categories)}
+        sampled = exact.matrix[rng.choice(n, size=n_queries, replace=False)]
+        noise = rng.standard_normal(sampled.shape, dtype=np.float32) * (QUERY_NOISE / np.sqrt(dim))
+        queries = normalize_embeddings(sampled + noise)
+
+        build_start = time.perf_counter()
+        ivf = IVFIndex.build(exact.matrix)
+        build_s = time.perf_counter() - build_start
+        print(f"\n{n:,} categories: built {ivf.n_lists} IVF lists in {build_s:.1f}s")
+        print(f"{'search':>12} {'recall@k':>9} {'p50 ms':>9} {'p99 ms':>9} {'speedup':>9}")
+
+        exact_results, exact_ms = _latencies_ms(lambda q, kk: [rows[id(c)] for c in exact.search(q, kk)], queries, k)
+        exact_p50 = np.percentile(exact_ms, 50)
+        print(f"{'exact':>12} {1.0:>9.3f} {exact_p50:>9.2f} {np.percentile(exact_ms, P99):>9.2f} {1.0:>8.1f}x")
+
+        for nprobe in nprobes:
+            index = IVFCategoryIndex(exact, ivf, nprobe)
+            results, ivf_ms = _latencies_ms(lambda q, kk: [rows[id(c)] for c in index.search(q, kk)], queries, k)
+            hits = sum(len(set(found) & set(truth)) for found, truth in zip(results, exact_results))
+            recall = hits / sum(len(truth) for truth in exact_results)
+            p50 = np.percentile(ivf_ms, 50)
+            label = f"ivf/{nprobe}"
+            print(f"{label:>12} {recall:>9.3f} {p50:>9.2f} {np.percentile(ivf_ms, P99):>9.2f} {exact_p50 / p50:>8.1f}x")
+
+
+def main():
+    """Benchmark IVF approximate search against exact search."""
+    parser = argparse.ArgumentParser(description="Benchmark IVF approximate category search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="Category counts")
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimension")
+    parser.add_argument("--k", type=int, default=100, help="Number of results per query")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32], help="IVF lists scanned per query")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries per size")
+
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.dim, args.k, args.nprobe, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark the matrix-backed CategoryEmbeddingIndex against the per-category loop.
+
+The loop baseline reproduces the original in-memory narrowing: one cosine similarity
+(dot product plus two norms) per category followed by a full sort. The index answers
+the same query with a single matrix-vector product and an ``argpartition`` top-k.
+
+Embeddings are synthetic (random unit vectors), so no OpenAI key is needed.
+
+Usage:
+    python scripts/benchmark_category_index.py [--sizes 1000 10000 100000] [--dim 1536] [--k 100]
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from src.classification.category_index import CategoryEmbeddingIndex
+from src.data.models import Category
+
+
+def _make_categories(n: int) -> list[Category]:
+    """Create n synthetic categories."""
+    return [
+        Category(
+            name=f"Category{i}",
+            path=f"/Root/Group{i % 100}/Category{i}",
+            embedding_text=f"root group {i % 100} category {i}",
+            llm_description=f"Items in the Category{i} category under Root > Group{i % 100}",
+        )
+        for i in range(n)
+    ]
+
+
+def _loop_top_k(query: np.ndarray, categories: list[Category], embeddings: list[np.ndarray], k: int) -> list[Category]:
+    """Score every category one at a time, as the original in-memory narrowing did."""
+    scored = []
+    for category, embedding in zip(categories, embeddings):
+        similarity = np.dot(query, embedding) / (np.linalg.norm(query) * np.linalg.norm(embedding))
+        scored.append((category, similarity))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [category for category, _ in scored[:k]]
+
+
+def _time_ms(fn, repeats: int) -> float:
+    """Return the median wall-clock time of fn() in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run_benchmark(sizes: list[int], dim: int, k: int, repeats: int) -> None:
+    """Run the benchmark for each category count and print a results table."""
+    rng = np.random.default_rng(0)
+    print(f"Embedding dim: {dim}, top-k: {k}, repeats: {repeats}")
+    print(f"{'categories':>12} {'build ms':>10} {'loop ms':>10} {'index ms':>10} {'speedup':>9} {'match':>6}")
+    for n in sizes:
+        categories = _make_categories(n)
+        matrix = rng.standard_normal((n, dim), dtype=np.float32)
+        rows = list(matrix)
+        query = rng.standard_normal(dim, dtype=np.float32)
+
+        build_start = time.perf_counter()
+        index = CategoryEmbeddingIndex(categories, matrix)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        loop_ms = _time_ms(lambda: _loop_top_k(query, categories, rows, k), repeats)
+        index_ms = _time_ms(lambda: index.search(query, k), repeats)
+        match = _loop_top_k(query, categories, rows, k) == index.search(query, k)
+        print(f"{n:>12,} {build_ms:>10.1f} {loop_ms:>10.2f} {index_ms:>10.2f} {loop_ms / index_ms:>8.1f}x {match!s:>6}")
+
+
+def main():
+    """Benchmark CategoryEmbeddingIndex against the per-category loop."""
+    parser = argparse.ArgumentParser(description="Benchmark in-memory category similarity search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Category counts")
+    parser.add_argument("--dim", type=int, default=1536, help="Embedding dimension (text-embedding-3-small: 1536)")
+    parser.add_argument("--k", type=int, default=100, help="Number of results per query")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed repetitions per measurement")
+
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.dim, args.k, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark the memory and build time of CategoryTable against a list of Category objects.
+
+Builds a synthetic taxonomy (``--fanout`` children per category, breadth first
+under a few roots, every name unique) and measures, with ``tracemalloc``, the memory retained by
+the list of pydantic ``Category`` objects that ``CategoryLoader.load_categories``
+produces and by the columnar ``CategoryTable`` that ``CategoryLoader.load_table``
+produces for the same paths. No API key is needed.
+
+Usage:
+    python scripts/benchmark_category_memory.py [--sizes 10000 100000 1000000] [--fanout 20]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from src.data.category_table import CategoryTable
+
+ROOTS = 30
+ACCESS_SAMPLE = 10_000
+
+
+def _make_paths(n: int, fanout: int) -> list[str]:
+    """Create n synthetic category paths, breadth first, parents before children."""
+    paths = [f"/Department {i}" for i in range(min(n, ROOTS))]
+    parent = 0
+    while len(paths) < n:
+        for child in range(fanout):
+            if len(paths) >= n:
+                break
+            paths.append(f"{paths[parent]}/Node {child} of {paths[parent].rsplit('/', 1)[1]}")
+        parent += 1
+    return paths
+
+
+def _measure(build) -> tuple[object, float, float]:
+    """Return what build() returns, the MB it retains and its build time in seconds."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained / 1024 / 1024, elapsed
+
+
+def run_benchmark(sizes: list[int], fanout: int) -> None:
+    """Run the benchmark for each taxonomy size and print a results table."""
+    print(f"Fanout: {fanout}")
+    print(f"{'categories':>12} {'list MB':>9} {'table MB':>9} {'ratio':>7} {'list s':>8} {'table s':>8} {'row us':>7}")
+    for n in sizes:
+        paths = _make_paths(n, fanout)
+        source = CategoryTable.from_paths(paths)
+        categories, list_mb, list_s = _measure(source.to_categories)
+        del categories, source
+        table, table_mb, table_s = _measure(lambda: CategoryTable.from_paths(paths))
+
+        sample = range(0, len(table), max(1, len(table) // ACCESS_SAMPLE))
+        start = time.perf_counter()
+        for row in sample:
+            view = table[row]
+            _ = (view.path, view.embedding_text, view.llm_description)
+        row_us = (time.perf_counter() - start) * 1_000_000 / len(sample)
+        print(
+            f"{n:>12,} {list_mb:>9.1f} {table_mb:>9.1f} {list_mb / table_mb:>6.1f}x "
+            f"{list_s:>8.2f} {table_s:>8.2f} {row_us:>7.2f}"
+        )
+        del table
+
+
+def main():
+    """Benchmark CategoryTable memory against a list of Category objects."""
+    parser = argparse.ArgumentParser(description="Benchmark compact category storage")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Category counts")
+    parser.add_argument("--fanout", type=int, default=20, help="Children per category")
+
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.fanout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Benchmark classifier import time and taxonomy cold-start loading.
+
+Import time is measured in fresh interpreters: ``import src.classification.pipeline``
+as it is now (chromadb and openai are loaded lazily on first use) and with those
+dependencies imported eagerly first, as the pipeline used to. The script also lists
+which heavy modules the import really loaded.
+
+Taxonomy loading is measured on a synthetic categories file with random embeddings:
+parsing the text file into ``Category`` objects or into a ``CategoryTable``, against
+memory-mapping the binary taxonomy snapshot (table plus embedding matrix).
+
+No API key is needed and no API calls are made.
+
+Usage:
+    python scripts/benchmark_cold_start.py [--runs 5] [--sizes 1000 100000] [--dim 256]
+"""
+
+import argparse
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+PROJECT_ROOT = pathlib.Path(__file__).parents[1]
+HEAVY_MODULES = ["chromadb", "openai", "numpy", "src.baml_client"]
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+{preload}import src.classification.pipeline
+elapsed = (time.perf_counter() - start) * 1000
+loaded = [m for m in {heavy!r} if m in sys.modules and type(sys.modules[m]).__name__ != "_LazyModule"]
+print(f"{{elapsed}} {{','.join(loaded)}}")
+"""
+
+
+def _env() -> dict[str, str]:
+    """Environment for child interpreters: settings need a key, but nothing calls the API."""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    env.setdefault("OPENAI_API_KEY", "unused-by-benchmark")
+    return env
+
+
+def _import_ms(eager: bool, runs: int) -> tuple[float, str]:
+    """Return the median pipeline import time in ms and the heavy modules it loaded."""
+    preload = "import chromadb, openai\n" if eager else ""
+    code = IMPORT_SNIPPET.format(preload=preload, heavy=HEAVY_MODULES)
+    timings = []
+    loaded = ""
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=_env(), cwd=PROJECT_ROOT
+        ).stdout.split()
+        timings.append(float(output[0]))
+        loaded = output[1] if len(output) > 1 else "-"
+    return statistics.median(timings), loaded
+
+
+def _time_ms(fn, runs: int) -> float:
+    """Return the median wall-clock time of fn() in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run_import_benchmark(runs: int) -> None:
+    """Measure pipeline import time with lazy and eager heavy dependencies."""
+    print(f"Pipeline import time (median of {runs} fresh interpreters)")
+    print(f"{'mode':>8} {'ms':>8}  heavy modules loaded")
+    for label, eager in (("lazy", False), ("eager", True)):
+        ms, loaded = _import_ms(eager, runs)
+        print(f"{label:>8} {ms:>8.0f}  {loaded}")
+
+
+def run_taxonomy_benchmark(sizes: list[int], dim: int, runs: int) -> None:
+    """Measure parsing categories.txt against loading the taxonomy snapshot."""
+    os.environ.update(_env())
+    from src.data.category_loader import CategoryLoader
+    from src.data.category_table import CategoryTable
+    from src.data.taxonomy_snapshot import load_taxonomy_snapshot, write_taxonomy_snapshot
+
+    def _parse_table(source: pathlib.Path) -> CategoryTable:
+        return CategoryTable.from_paths(line for line in source.read_text(encoding="utf-8").splitlines())
+
+    rng = np.random.default_rng(0)
+    loader = CategoryLoader()
+    print(f"\nTaxonomy cold start (embedding dim {dim}, median of {runs} runs)")
+    print(f"{'categories':>12} {'list ms':>9} {'table ms':>9} {'snap ms':>9} {'speedup':>8} {'snap MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            source = pathlib.Path(tmp) / f"categories_{n}.txt"
+            snapshot_path = pathlib.Path(tmp) / f"taxonomy_{n}.bin"
+            source.write_text(
+                "\n".join(f"/Department {i % 30}/Group {i % 1000}/Category {i}" for i in range(n)) + "\n",
+                encoding="utf-8",
+            )
+            table = _parse_table(source)
+            embeddings = rng.standard_normal((len(table), dim), dtype=np.float32)
+            write_taxonomy_snapshot(snapshot_path, table, source, embeddings, "synthetic")
+            del table, embeddings
+
+            list_ms = _time_ms(lambda: loader._parse_category_file(source), runs)
+            table_ms = _time_ms(lambda: _parse_table(source), runs)
+            snapshot_ms = _time_ms(lambda: load_taxonomy_snapshot(snapshot_path, source), runs)
+            size_mb = snapshot_path.stat().st_size / 1024 / 1024
+            print(
+                f"{n:>12,} {list_ms:>9.1f} {table_ms:>9.1f} {snapshot_ms:>9.2f} "
+                f"{table_ms / snapshot_ms:>7.0f}x {size_mb:>8.1f}"
+            )
+
+
+def main():
+    """Benchmark import time and taxonomy cold start."""
+    parser = argparse.ArgumentParser(description="Benchmark classifier cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Repetitions per measurement")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000], help="Category counts")
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimension")
+
+    args = parser.parse_args()
+    run_import_benchmark(args.runs)
+    run_taxonomy_benchmark(args.sizes, args.dim, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Benchmark vectorized correctness scoring against the per-result evaluator loop.
+
+Builds a synthetic taxonomy (``--fanout`` children per category under a few roots)
+and a run of results whose predictions are a mix of exact matches, parents,
+children, siblings and unrelated categories. For each correctness definition the
+script times ``CorrectnessEvaluator.is_correct`` called once per result, as the UI
+analysis did, against one ``CorrectnessEvaluator.score_many`` call over the whole
+run, and checks both agree. No API key is needed.
+
+Usage:
+    python scripts/benchmark_correctness.py [--categories 100000] [--results 100000 1000000] [--fanout 20]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from src.data.models import Category
+from src.shared.correctness import CorrectnessDefinition, CorrectnessEvaluator
+
+ROOTS = 30
+# Cumulative shares of exact, parent, child and sibling predictions; the rest are unrelated
+EXACT_SHARE = 0.5
+PARENT_SHARE = 0.65
+CHILD_SHARE = 0.75
+SIBLING_SHARE = 0.85
+
+
+def _make_paths(n: int, fanout: int) -> list[str]:
+    """Create n synthetic category paths, breadth first, parents before children."""
+    paths = [f"/Department {i}" for i in range(min(n, ROOTS))]
+    parent = 0
+    while len(paths) < n:
+        for child in range(fanout):
+            if len(paths) >= n:
+                break
+            paths.append(f"{paths[parent]}/Node {child}")
+        parent += 1
+    return paths
+
+
+def _make_run(paths: list[str], n: int, rng: random.Random) -> tuple[list[str], list[str]]:
+    """Create n (predicted, ground truth) pairs with a realistic mix of near misses.
+
+    The pairs go through a JSON round trip, like a saved run loaded by the UI, so
+    their strings are not the taxonomy's own objects.
+    """
+    children: dict[str, list[str]] = {}
+    for path in paths:
+        children.setdefault(path.rsplit("/", 1)[0], []).append(path)
+    predicted, ground_truth = [], []
+    for _ in range(n):
+        truth = rng.choice(paths)
+        parent = truth.rsplit("/", 1)[0]
+        roll = rng.random()
+        if roll < EXACT_SHARE:
+            guess = truth
+        elif roll < PARENT_SHARE and parent:
+            guess = parent
+        elif roll < CHILD_SHARE and truth in children:
+            guess = rng.choice(children[truth])
+        elif roll < SIBLING_SHARE:
+            guess = rng.choice(children.get(parent, [truth]))
+        else:
+            guess = rng.choice(paths)
+        predicted.append(guess)
+        ground_truth.append(truth)
+    return tuple(json.loads(json.dumps([predicted, ground_truth])))
+
+
+def run_benchmark(n_categories: int, result_counts: list[int], fanout: int) -> None:
+    """Run the benchmark for each run size and print a results table."""
+    rng = random.Random(0)
+    paths = _make_paths(n_categories, fanout)
+    categories = [
+        Category(name=path.rsplit("/", 1)[1], path=path, embedding_text="", llm_description="") for path in paths
+    ]
+    start = time.perf_counter()
+    evaluator = CorrectnessEvaluator(categories)
+    print(f"Categories: {n_categories:,}, evaluator built in {time.perf_counter() - start:.2f}s")
+    header = f"{'results':>10} {'definition':>17} {'loop s':>8} {'vector s':>9} {'speedup':>8} {'correct':>8}"
+    print(f"{header} {'match':>6}")
+    for n in result_counts:
+        predicted, ground_truth = _make_run(paths, n, rng)
+        for definition in CorrectnessDefinition:
+            start = time.perf_counter()
+            looped = [evaluator.is_correct(p, g, definition) for p, g in zip(predicted, ground_truth)]
+            loop_s = time.perf_counter() - start
+            start = time.perf_counter()
+            scores = evaluator.score_many(predicted, ground_truth, definition)
+            vector_s = time.perf_counter() - start
+            match = scores.tolist() == looped
+            print(
+                f"{n:>10,} {definition.value:>17} {loop_s:>8.3f} {vector_s:>9.3f} {loop_s / vector_s:>7.1f}x "
+                f"{scores.mean():>8.1%} {match!s:>6}"
+            )
+
+
+def main():
+    """Benchmark vectorized correctness scoring against the per-result loop."""
+    parser = argparse.ArgumentParser(description="Benchmark hierarchy-aware correctness scoring")
+    parser.add_argument("--categories", type=int, default=100_000, help="Categories in the synthetic taxonomy")
+    parser.add_argument("--results", type=int, nargs="+", default=[100_000], help="Results per scored run")
+    parser.add_argument("--fanout", type=int, default=20, help="Children per category")
+
+    args = parser.parse_args()
+    run_benchmark(args.categories, args.results, args.fanout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark ClassificationPipeline startup and per-classify overhead.
+
+Measures pipeline initialization, first-classify and steady-state classify latency,
+how many times a CategoryVectorStore is opened, and the per-call cost of resolving
+the narrowing strategy.
+
+Pass ``--legacy`` to reproduce the previous behaviour, where every classify() built a
+fresh narrowing strategy and opened a new vector store, and compare the two runs.
+This makes real embedding and LLM calls, so OPENAI_API_KEY must be configured.
+
+Usage:
+    python scripts/benchmark_pipeline_startup.py [--runs 5] [--legacy] [--text "..."]
+"""
+
+import argparse
+import statistics
+import time
+
+from src.classification.pipeline import ClassificationPipeline
+from src.classification.vector_store import CategoryVectorStore
+
+STRATEGY_LOOKUPS = 1000
+LEGACY_STRATEGY_LOOKUPS = 10  # Each legacy lookup opens a vector store, so keep this small
+
+
+class StoreOpenCounter:
+    """Counts and times CategoryVectorStore constructions."""
+
+    def __init__(self) -> None:
+        """Wrap CategoryVectorStore.__init__ to record every store open."""
+        self.opens = 0
+        self.total_ms = 0.0
+        self._original_init = CategoryVectorStore.__init__
+        counter = self
+
+        def counting_init(store: CategoryVectorStore, *args, **kwargs) -> None:
+            start = time.perf_counter()
+            counter._original_init(store, *args, **kwargs)
+            counter.opens += 1
+            counter.total_ms += (time.perf_counter() - start) * 1000
+
+        CategoryVectorStore.__init__ = counting_init
+
+
+def _reset_per_call_state(pipeline: ClassificationPipeline) -> None:
+    """Drop shared state so the next classify rebuilds it, as the legacy pipeline did."""
+    CategoryVectorStore.reset_shared()
+    pipeline.narrower._strategies.clear()
+
+
+def _strategy_lookup_us(pipeline: ClassificationPipeline, legacy: bool) -> float:
+    """Return the mean cost of resolving the narrowing strategy, in microseconds."""
+    lookups = LEGACY_STRATEGY_LOOKUPS if legacy else STRATEGY_LOOKUPS
+    start = time.perf_counter()
+    for _ in range(lookups):
+        if legacy:
+            _reset_per_call_state(pipeline)
+        pipeline.narrower.get_strategy()
+    return (time.perf_counter() - start) * 1_000_000 / lookups
+
+
+def run_benchmark(text: str, runs: int, legacy: bool) -> None:
+    """Run the startup benchmark and print the results."""
+    counter = StoreOpenCounter()
+    CategoryVectorStore.reset_shared()
+
+    init_start = time.perf_counter()
+    pipeline = ClassificationPipeline()
+    init_ms = (time.perf_counter() - init_start) * 1000
+    init_opens = counter.opens
+
+    classify_ms = []
+    for _ in range(runs):
+        if legacy:
+            _reset_per_call_state(pipeline)
+        start = time.perf_counter()
+        pipeline.classify(text)
+        classify_ms.append((time.perf_counter() - start) * 1000)
+
+    lookup_us = _strategy_lookup_us(pipeline, legacy=False)
+    legacy_lookup_us = _strategy_lookup_us(pipeline, legacy=True) if legacy else None
+    mean_open_ms = counter.total_ms / counter.opens if counter.opens else 0.0
+
+    print(f"\n{'Legacy (per-call strategy + store)' if legacy else 'Shared store and strategies'}")
+    print(f"  Pipeline init:            {init_ms:10.1f} ms ({init_opens} vector store opens)")
+    print(f"  First classify:           {classify_ms[0]:10.1f} ms")
+    if len(classify_ms) > 1:
+        print(f"  Later classify (median):  {statistics.median(classify_ms[1:]):10.1f} ms")
+    print(f"  Vector store opens total: {counter.opens:10d} (mean {mean_open_ms:.1f} ms each)")
+    print(f"  Strategy lookup (shared): {lookup_us:10.2f} µs/call")
+    if legacy_lookup_us is not None:
+        print(f"  Strategy lookup (legacy): {legacy_lookup_us:10.2f} µs/call")
+
+
+def main():
+    """Benchmark pipeline startup and per-classify overhead."""
+    parser = argparse.ArgumentParser(description="Benchmark ClassificationPipeline startup latency")
+    parser.add_argument("--runs", type=int, default=5, help="Number of classify() calls to time")
+    parser.add_argument("--legacy", action="store_true", help="Rebuild strategy and vector store on every call")
+    parser.add_argument("--text", default="stainless steel french door refrigerator", help="Text to classify")
+
+    args = parser.parse_args()
+    run_benchmark(args.text, args.runs, args.legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark building the LLM's dynamic Category enum with and without the TypeBuilder cache.
+
+For each candidate count, measures the per-call cost of building a fresh TypeBuilder
+(``add_value``/``alias``/``description`` per candidate, as every narrowing and
+selection call did before the cache) and of fetching the prepared one from a warm
+``TypeBuilderCache``. A traffic simulation then draws candidate sets from a pool of
+``--distinct-sets`` recurring sets and reports the hit rate and mean cost per call
+through the cache. No API key is needed.
+
+Usage:
+    python scripts/benchmark_type_builder_cache.py [--sizes 3 10 50] [--calls 2000] [--distinct-sets 200]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from src.classification.type_builder_cache import TypeBuilderCache, build_category_enum
+from src.data.models import Category
+
+POOL_SIZE = 5_000
+
+
+def _make_categories(n: int) -> list[Category]:
+    """Create n synthetic categories."""
+    return [
+        Category(
+            name=f"Category{i}",
+            path=f"/Root/Group{i % 100}/Category{i}",
+            embedding_text=f"root group {i % 100} category {i}",
+            llm_description=f"Items in the Category{i} category under Root > Group{i % 100}",
+        )
+        for i in range(n)
+    ]
+
+
+def _per_call_us(fn, calls: int) -> float:
+    """Return the median wall-clock time of fn() in microseconds."""
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+def run_benchmark(sizes: list[int], calls: int, distinct_sets: int, cache_size: int) -> None:
+    """Run the benchmark for each candidate count and print a results table."""
+    rng = random.Random(0)
+    pool = _make_categories(POOL_SIZE)
+    print(f"Calls: {calls}, distinct candidate sets: {distinct_sets}, cache size: {cache_size}")
+    print(f"{'candidates':>10} {'build us':>10} {'cached us':>10} {'speedup':>9} {'hit rate':>9} {'traffic us':>11}")
+    for n in sizes:
+        candidates = pool[:n]
+        build_us = _per_call_us(lambda: build_category_enum(candidates), calls)
+        warm = TypeBuilderCache(cache_size)
+        warm.get(candidates)
+        cached_us = _per_call_us(lambda: warm.get(candidates), calls)
+
+        candidate_sets = [rng.sample(pool, n) for _ in range(distinct_sets)]
+        traffic = TypeBuilderCache(cache_size)
+        start = time.perf_counter()
+        for _ in range(calls):
+            traffic.get(rng.choice(candidate_sets))
+        traffic_us = (time.perf_counter() - start) * 1_000_000 / calls
+        print(
+            f"{n:>10} {build_us:>10.1f} {cached_us:>10.2f} {build_us / cached_us:>8.1f}x "
+            f"{traffic.stats.hit_rate:>9.1%} {traffic_us:>11.1f}"
+        )
+
+
+def main():
+    """Benchmark TypeBuilder construction against the TypeBuilder cache."""
+    parser = argparse.ArgumentParser(description="Benchmark the TypeBuilder cache")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 10, 50], help="Candidates per enum")
+    parser.add_argument("--calls", type=int, default=2_000, help="Timed calls per measurement")
+    parser.add_argument("--distinct-sets", type=int, default=200, help="Recurring candidate sets in the traffic mix")
+    parser.add_argument("--cache-size", type=int, default=256, help="TypeBuilder cache capacity")
+
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.calls, args.distinct_sets, args.cache_size)
+
+
+if __name__ == "__main__":
+    main()
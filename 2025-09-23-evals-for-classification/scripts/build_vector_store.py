@@ -3,10 +3,22 @@
 
 This script reads the categories.txt file, generates embeddings for each category
 using the configured OpenAI embedding model, and stores them in a ChromaDB vector
-database for fast similarity search.
+database for fast similarity search. It also writes a memory-mappable embedding
+snapshot that CategoryVectorStore loads at open instead of querying ChromaDB.
+With --sync it updates an existing collection in place, embedding only added or
+changed categories. With --ann it also builds the IVF index used by the ``ivf``
+search backend. With --snapshot it also writes the binary taxonomy snapshot
+(parsed categories plus their embeddings) that the classifier memory-maps at startup
+instead of parsing categories.txt.
+
+Embedding batches run concurrently within a requests/tokens-per-minute budget and
+are retried with backoff. Completed batches are checkpointed, so rerunning an
+interrupted build resumes it. Set OPENAI_BASE_URL to build against a local
+OpenAI-compatible embeddings server.
 
 Usage:
-    python scripts/build_vector_store.py [--force-rebuild]
+    python scripts/build_vector_store.py [--force-rebuild | --sync] [--ann] [--ann-lists N] [--snapshot]
+        [--workers N] [--rpm N] [--tpm N] [--max-retries N]
 """
 
 import argparse
@@ -14,52 +26,108 @@ import pathlib
 import time
 
 import chromadb
+import numpy as np
 import openai
 from chromadb.config import Settings as ChromaSettings
 
+from src.classification.ann_index import ANN_INDEX_PATH, IVFIndex, ann_index_key
+from src.classification.bulk_embedder import (
+    BULK_WORKERS,
+    MAX_RETRIES,
+    REQUESTS_PER_MINUTE,
+    TOKENS_PER_MINUTE,
+    BuildCheckpoint,
+    BulkEmbedder,
+)
+from src.classification.embeddings import EmbeddingService
+from src.classification.vector_store import (
+    CategoryVectorStore,
+    category_id,
+    category_metadata,
+)
 from src.config.settings import settings
 from src.data.category_loader import CategoryLoader
+from src.data.taxonomy_snapshot import write_taxonomy_snapshot
 from src.shared import constants as C
 
 # Vector store configuration
 COLLECTION_NAME = C.CATEGORIES
 VECTOR_STORE_PATH = pathlib.Path(__file__).parents[1] / C.DATA / C.VECTOR_STORE
+CHECKPOINT_PATH = VECTOR_STORE_PATH / C.BUILD_CHECKPOINT_JSON
 
 
 class VectorStoreBuilder:
     """Builds and manages the ChromaDB vector store for categories."""
 
-    def __init__(self, force_rebuild: bool = False):
+    def __init__(
+        self,
+        force_rebuild: bool = False,
+        workers: int = BULK_WORKERS,
+        requests_per_minute: float = REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = TOKENS_PER_MINUTE,
+        max_retries: int = MAX_RETRIES,
+    ):
         """Initialize the VectorStoreBuilder.
 
         Args:
             force_rebuild: Whether to force rebuild the vector store. Defaults to False.
+            workers: Embedding requests in flight at once.
+            requests_per_minute: Embedding request budget.
+            tokens_per_minute: Embedding token budget.
+            max_retries: Retries per embedding batch.
         """
         self.force_rebuild = force_rebuild
         self.client = chromadb.PersistentClient(
             path=str(VECTOR_STORE_PATH),
             settings=ChromaSettings(anonymized_telemetry=False, is_persistent=True),
         )
-        self.openai_client = openai.OpenAI(api_key=settings.openai_api_key)
+        # Retries are handled by BulkEmbedder, so it can count them and respect the budget
+        self.openai_client = openai.OpenAI(api_key=settings.openai_api_key, max_retries=0)
+        self.embedder = BulkEmbedder(
+            self.openai_client,
+            settings.embedding_model,
+            workers=workers,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            max_retries=max_retries,
+        )
 
     def build_vector_store(self) -> None:
-        """Build the vector store from categories.txt."""
+        """Build the vector store from categories.txt.
+
+        Batches are embedded concurrently and recorded in a checkpoint as they are
+        written, so rerunning after an interruption or failed batches only embeds
+        what is missing.
+        """
         print(f"Building vector store at: {VECTOR_STORE_PATH}")
 
-        # Check if collection already exists
-        existing_collections = [col.name for col in self.client.list_collections()]
+        print("Loading categories...")
+        # Documents are keyed by path, so keep one category per path
+        categories = list({cat.path: cat for cat in CategoryLoader().load_categories()}.values())
+        print(f"Loaded {len(categories)} categories")
+        texts = [cat.embedding_text for cat in categories]
+        checkpoint = BuildCheckpoint(
+            CHECKPOINT_PATH, BuildCheckpoint.build_key(settings.embedding_model, self.embedder.batch_size, texts)
+        )
 
+        existing_collections = [col.name for col in self.client.list_collections()]
         if COLLECTION_NAME in existing_collections:
-            if not self.force_rebuild:
-                print(f"Collection '{COLLECTION_NAME}' already exists. Use --force-rebuild to recreate.")
-                return
-            else:
+            if self.force_rebuild:
                 print(f"Deleting existing collection '{COLLECTION_NAME}'...")
                 self.client.delete_collection(COLLECTION_NAME)
+                checkpoint.clear()
+            elif not checkpoint.exists:
+                print(
+                    f"Collection '{COLLECTION_NAME}' already exists. "
+                    "Use --sync to apply category changes or --force-rebuild to recreate."
+                )
+                snapshot_path = CategoryVectorStore().save_embedding_snapshot()
+                print(f"📁 Embedding snapshot refreshed at: {snapshot_path}")
+                return
+            else:
+                print(f"Resuming interrupted build from {CHECKPOINT_PATH}")
 
-        # Create collection
-        print(f"Creating collection '{COLLECTION_NAME}'...")
-        collection = self.client.create_collection(
+        collection = self.client.get_or_create_collection(
             name=COLLECTION_NAME,
             metadata={
                 "description": "Product categories with OpenAI embeddings",
@@ -69,59 +137,88 @@ class VectorStoreBuilder:
             },
         )
 
-        # Load categories
-        print("Loading categories...")
-        category_loader = CategoryLoader()
-        categories = category_loader.load_categories()
-        print(f"Loaded {len(categories)} categories")
-
-        # Generate embeddings and add to collection in batches
-        batch_size = 100  # Process in batches to avoid rate limits
-        total_batches = (len(categories) + batch_size - 1) // batch_size
-
-        for batch_idx in range(0, len(categories), batch_size):
-            batch_end = min(batch_idx + batch_size, len(categories))
-            batch_categories = categories[batch_idx:batch_end]
-
-            print(
-                f"Processing batch {batch_idx // batch_size + 1}/{total_batches} "
-                f"({len(batch_categories)} categories)..."
+        def write_batch(start: int, end: int, embeddings: list[list[float]]) -> None:
+            batch = categories[start:end]
+            collection.upsert(
+                ids=[category_id(cat.path) for cat in batch],
+                embeddings=embeddings,
+                documents=[cat.embedding_text for cat in batch],
+                metadatas=[category_metadata(cat) for cat in batch],
             )
 
-            # Generate embeddings for this batch
-            embeddings = self._generate_embeddings([cat.embedding_text for cat in batch_categories])
-
-            # Prepare data for ChromaDB
-            ids = [f"cat_{i}" for i in range(batch_idx, batch_end)]
-            documents = [cat.embedding_text for cat in batch_categories]
-            metadatas = [
-                {
-                    "path": cat.path,
-                    "name": cat.name,
-                    "level": cat.level,
-                    "llm_description": cat.llm_description,
-                }
-                for cat in batch_categories
-            ]
-
-            # Add to collection
-            collection.add(embeddings=embeddings, documents=documents, metadatas=metadatas, ids=ids)
-
-            # Rate limiting - small delay between batches
-            if batch_idx + batch_size < len(categories):
-                time.sleep(0.5)
+        report = self.embedder.run(texts, write_batch, checkpoint)
+        print(
+            f"Embedded {report.embedded} categories in {report.elapsed_s:.1f}s "
+            f"({report.throughput:.1f} categories/sec, {report.resumed} resumed, {report.retries} retries, "
+            f"{report.rate_limit_wait_s:.1f}s waiting on the rate limit)"
+        )
+        if report.failed_batches:
+            failed = sum(end - start for start, end in report.failed_batches)
+            raise SystemExit(f"❌ {failed} categories failed to embed. Rerun the script to resume the build.")
+        checkpoint.clear()
 
         print(f"✅ Successfully built vector store with {len(categories)} categories")
         print(f"📁 Vector store saved to: {VECTOR_STORE_PATH}")
 
-    def _generate_embeddings(self, texts: list[str]) -> list[list[float]]:
-        """Generate embeddings for a batch of texts."""
-        try:
-            response = self.openai_client.embeddings.create(model=settings.embedding_model, input=texts)
-            return [data.embedding for data in response.data]
-        except Exception as e:
-            print(f"❌ Error generating embeddings: {e}")
-            raise
+        snapshot_path = CategoryVectorStore().save_embedding_snapshot()
+        print(f"📁 Embedding snapshot saved to: {snapshot_path}")
+
+    def sync_vector_store(self) -> None:
+        """Apply the differences between categories.txt and the collection.
+
+        Only added or changed categories are embedded, and removed ones are deleted.
+        Builds the collection from scratch if it doesn't exist yet.
+        """
+        existing_collections = [col.name for col in self.client.list_collections()]
+        if COLLECTION_NAME not in existing_collections:
+            print(f"Collection '{COLLECTION_NAME}' doesn't exist yet, building it")
+            self.build_vector_store()
+            return
+
+        print(f"Syncing vector store at: {VECTOR_STORE_PATH}")
+        categories = CategoryLoader().load_categories()
+        print(f"Loaded {len(categories)} categories")
+        report = CategoryVectorStore().sync_categories(categories, self.embedder.embed)
+        print(
+            f"✅ Synced in {report.elapsed_s:.1f}s: {report.added} added, {report.changed} changed, "
+            f"{report.updated} metadata updated, {report.rekeyed} re-keyed, {report.removed} removed, "
+            f"{report.unchanged} unchanged ({report.embedded} embedded)"
+        )
+
+    def build_ann_index(self, n_lists: int | None = None) -> None:
+        """Build the IVF index over the stored category embeddings and save it to disk.
+
+        Args:
+            n_lists: Number of IVF lists. Defaults to ``sqrt(categories)``.
+        """
+        categories = CategoryLoader().load_categories()
+        index = EmbeddingService().get_category_index(categories)
+        start = time.time()
+        ivf = IVFIndex.build(index.matrix, n_lists=n_lists)
+        key = ann_index_key(settings.embedding_model, [cat.path for cat in categories])
+        path = ivf.save(ANN_INDEX_PATH, key)
+        print(f"✅ Built ANN index with {ivf.n_lists} lists over {len(ivf)} categories in {time.time() - start:.1f}s")
+        print(f"📁 ANN index saved to: {path}")
+
+    def build_taxonomy_snapshot(self) -> None:
+        """Write the parsed categories and their stored embeddings to the taxonomy snapshot."""
+        start = time.time()
+        table = CategoryLoader().load_table()
+        paths = [row.path for row in table]
+        embeddings = CategoryVectorStore().get_cached_embeddings(paths)
+        missing = [path for path, embedding in zip(paths, embeddings) if embedding is None]
+        if missing:
+            raise SystemExit(f"❌ {len(missing)} categories are not in the vector store. Run with --sync first.")
+        path = write_taxonomy_snapshot(
+            settings.taxonomy_snapshot_path,
+            table,
+            settings.categories_file_path,
+            embeddings=np.stack(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32),
+            embedding_model=settings.embedding_model,
+            embeddings_key=ann_index_key(settings.embedding_model, paths),
+        )
+        print(f"✅ Wrote taxonomy snapshot with {len(table)} categories in {time.time() - start:.1f}s")
+        print(f"📁 Taxonomy snapshot saved to: {path}")
 
 
 def main():
@@ -132,11 +229,47 @@ def main():
         action="store_true",
         help="Force rebuild even if vector store already exists",
     )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Update an existing vector store in place, embedding only added or changed categories",
+    )
+    parser.add_argument(
+        "--ann",
+        action="store_true",
+        help="Also build the IVF index used by SEARCH_BACKEND=ivf",
+    )
+    parser.add_argument("--ann-lists", type=int, default=None, help="Number of IVF lists (default: sqrt(categories))")
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Also write the binary taxonomy snapshot loaded at classifier startup",
+    )
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS, help="Embedding requests in flight at once")
+    parser.add_argument("--rpm", type=float, default=REQUESTS_PER_MINUTE, help="Embedding requests per minute budget")
+    parser.add_argument("--tpm", type=float, default=TOKENS_PER_MINUTE, help="Embedding tokens per minute budget")
+    parser.add_argument("--max-retries", type=int, default=MAX_RETRIES, help="Retries per failed embedding batch")
 
     args = parser.parse_args()
 
-    builder = VectorStoreBuilder(force_rebuild=args.force_rebuild)
-    builder.build_vector_store()
+    if args.sync and args.force_rebuild:
+        parser.error("--sync and --force-rebuild are mutually exclusive")
+
+    builder = VectorStoreBuilder(
+        force_rebuild=args.force_rebuild,
+        workers=args.workers,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        max_retries=args.max_retries,
+    )
+    if args.sync:
+        builder.sync_vector_store()
+    else:
+        builder.build_vector_store()
+    if args.ann:
+        builder.build_ann_index(args.ann_lists)
+    if args.snapshot:
+        builder.build_taxonomy_snapshot()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,238 @@
+"""Approximate nearest-neighbour (IVF) index over category embeddings."""
+
+import hashlib
+import json
+import math
+import pathlib
+
+import numpy as np
+
+from src.classification.category_index import CategoryEmbeddingIndex, Embedding, normalize_embeddings
+from src.data.models import Category
+from src.shared import constants as C
+
+ANN_INDEX_PATH = pathlib.Path(__file__).parents[2] / C.DATA / C.ANN_INDEX
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_SIZE = 50_000  # Minimum rows used to train the centroids; all rows are assigned afterwards
+KMEANS_SAMPLES_PER_LIST = 128  # Training rows per list, so large indexes train on enough rows per centroid
+ASSIGN_CHUNK_SIZE = 16_384  # Rows assigned to lists per matrix product, to bound peak memory
+
+
+def ann_index_key(model: str, paths: list[str]) -> str:
+    """Compute the key that ties a persisted ANN index to an embedding model and category list.
+
+    Args:
+        model: The embedding model name.
+        paths: The category paths, in index order.
+
+    Returns:
+        The hex SHA-256 digest of the model and paths.
+    """
+    digest = hashlib.sha256(model.encode("utf-8"))
+    for path in paths:
+        digest.update(b"\0" + path.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Assign each row to its most similar centroid.
+
+    Args:
+        matrix: Normalized embeddings, one per row.
+        centroids: Normalized centroids, one per row.
+
+    Returns:
+        The centroid number of every row.
+    """
+    assignments = np.empty(matrix.shape[0], dtype=np.int32)
+    for start in range(0, matrix.shape[0], ASSIGN_CHUNK_SIZE):
+        chunk = matrix[start : start + ASSIGN_CHUNK_SIZE]
+        assignments[start : start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+class IVFIndex:
+    """Inverted-file index: a spherical k-means coarse quantizer with one row list per centroid.
+
+    A query scores the centroids, then scores exactly only the rows in the ``nprobe``
+    closest lists. The index stores row numbers, not embeddings, so it is used together
+    with the embedding matrix it was built from.
+    """
+
+    def __init__(self, centroids: np.ndarray, list_offsets: np.ndarray, list_rows: np.ndarray) -> None:
+        """Initialize the index.
+
+        Args:
+            centroids: Normalized centroids, one per list.
+            list_offsets: Start of each list in ``list_rows``, plus a final end offset.
+            list_rows: Matrix row numbers grouped by list.
+        """
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+
+    def __len__(self) -> int:
+        """Return the number of indexed rows."""
+        return len(self.list_rows)
+
+    @property
+    def n_lists(self) -> int:
+        """Number of inverted lists."""
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        n_lists: int | None = None,
+        iterations: int = KMEANS_ITERATIONS,
+        sample_size: int = KMEANS_SAMPLE_SIZE,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """Cluster normalized embeddings into inverted lists.
+
+        Args:
+            matrix: Normalized embeddings, one per row.
+            n_lists: Number of lists. Defaults to ``sqrt(rows)``.
+            iterations: Number of k-means iterations.
+            sample_size: Minimum number of rows the centroids are trained on.
+            seed: Random seed for sampling and initialization.
+
+        Returns:
+            The built index.
+        """
+        n_rows = matrix.shape[0]
+        n_lists = max(1, min(n_lists or round(math.sqrt(n_rows)), n_rows))
+        rng = np.random.default_rng(seed)
+        sample_size = min(max(sample_size, KMEANS_SAMPLES_PER_LIST * n_lists), n_rows)
+        sample = matrix[np.sort(rng.choice(n_rows, size=sample_size, replace=False))]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = _assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = np.bincount(assignments, minlength=n_lists) == 0
+            # Re-seed empty lists with random sample rows so every list stays in use
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = normalize_embeddings(sums)
+        assignments = _assign(matrix, centroids)
+        list_rows = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts = np.bincount(assignments, minlength=n_lists)
+        list_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        return cls(centroids, list_offsets, list_rows)
+
+    def candidate_rows(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Get the rows in the lists closest to a query.
+
+        Args:
+            query: The normalized query embedding.
+            nprobe: Number of lists to scan.
+
+        Returns:
+            The candidate row numbers.
+        """
+        nprobe = max(1, min(nprobe, self.n_lists))
+        centroid_scores = self.centroids @ query
+        if nprobe < self.n_lists:
+            probed = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probed = np.arange(self.n_lists)
+        return np.concatenate([self.list_rows[self.list_offsets[i] : self.list_offsets[i + 1]] for i in probed])
+
+    def save(self, path: pathlib.Path, key: str) -> pathlib.Path:
+        """Persist the index as memory-mappable ``.npy`` files.
+
+        Args:
+            path: Directory to write the index to.
+            key: The ``ann_index_key`` of the embeddings the index was built from.
+
+        Returns:
+            The index directory.
+        """
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / C.ANN_CENTROIDS_NPY, self.centroids)
+        np.save(path / C.ANN_LIST_OFFSETS_NPY, self.list_offsets)
+        np.save(path / C.ANN_LIST_ROWS_NPY, self.list_rows)
+        meta = {C.KEY: key, C.COUNT: len(self), C.N_LISTS: self.n_lists}
+        (path / C.ANN_INDEX_JSON).write_text(json.dumps(meta), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: pathlib.Path, key: str) -> "IVFIndex | None":
+        """Load a persisted index if it was built from the expected embeddings.
+
+        Args:
+            path: Directory the index was saved to.
+            key: The expected ``ann_index_key``.
+
+        Returns:
+            The index, or None if it is missing or was built from different embeddings.
+        """
+        meta_path = path / C.ANN_INDEX_JSON
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get(C.KEY) != key:
+            return None
+        return cls(
+            np.load(path / C.ANN_CENTROIDS_NPY),
+            np.load(path / C.ANN_LIST_OFFSETS_NPY),
+            np.load(path / C.ANN_LIST_ROWS_NPY, mmap_mode="r"),
+        )
+
+
+class IVFCategoryIndex:
+    """Approximate category search: an IVFIndex over a CategoryEmbeddingIndex's matrix."""
+
+    def __init__(self, exact_index: CategoryEmbeddingIndex, ivf: IVFIndex, nprobe: int) -> None:
+        """Initialize the index.
+
+        Args:
+            exact_index: The exact index holding the categories and normalized embeddings.
+            ivf: The IVF index built from ``exact_index.matrix``.
+            nprobe: Number of lists scanned per query.
+        """
+        if len(ivf) != len(exact_index):
+            raise ValueError(f"IVF index covers {len(ivf)} rows but the category index has {len(exact_index)}")
+        self.exact_index = exact_index
+        self.ivf = ivf
+        self.nprobe = nprobe
+
+    def __len__(self) -> int:
+        """Return the number of indexed categories."""
+        return len(self.exact_index)
+
+    def top_k(self, query_embedding: Embedding, k: int) -> list[tuple[Category, float]]:
+        """Find approximately the k categories most similar to a query.
+
+        Args:
+            query_embedding: The query embedding.
+            k: Maximum number of results to return.
+
+        Returns:
+            (category, similarity) pairs sorted by similarity (most similar first).
+        """
+        if k <= 0 or len(self) == 0:
+            return []
+        rows = self.ivf.candidate_rows(normalize_embeddings(query_embedding), self.nprobe)
+        scores = self.exact_index.scores(query_embedding, rows)
+        k = min(k, len(rows))
+        if k < len(rows):
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(rows))
+        order = best[np.lexsort((rows[best], -scores[best]))]
+        categories = self.exact_index.categories
+        return [(categories[rows[i]], float(scores[i])) for i in order]
+
+    def search(self, query_embedding: Embedding, k: int) -> list[Category]:
+        """Find approximately the k categories most similar to a query.
+
+        Args:
+            query_embedding: The query embedding.
+            k: Maximum number of results to return.
+
+        Returns:
+            Categories sorted by similarity (most similar first).
+        """
+        return [category for category, _ in self.top_k(query_embedding, k)]
@@ -0,0 +1,331 @@
+"""Parallel, rate-limited, resumable bulk embedding for building the vector store."""
+
+import hashlib
+import json
+import pathlib
+import random
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import openai
+
+from src.shared import constants as C
+from src.shared.logger import get_logger
+
+BULK_BATCH_SIZE = 100  # Texts per embeddings request
+BULK_WORKERS = 4  # Requests in flight at once
+REQUESTS_PER_MINUTE = 3_000  # OpenAI tier-1 limit for text-embedding-3-small
+TOKENS_PER_MINUTE = 1_000_000  # OpenAI tier-1 limit for text-embedding-3-small
+MAX_RETRIES = 5
+BACKOFF_BASE_S = 1.0  # First retry waits about this long, doubling on each further retry
+BACKOFF_MAX_S = 60.0
+CHARS_PER_TOKEN = 4  # Rough token estimate, so budgeting doesn't need a tokenizer
+SECONDS_PER_MINUTE = 60.0
+
+
+def estimate_tokens(texts: list[str]) -> int:
+    """Estimate how many tokens a batch of texts costs.
+
+    Args:
+        texts: The texts to embed.
+
+    Returns:
+        The estimated token count.
+    """
+    return sum(len(text) // CHARS_PER_TOKEN + 1 for text in texts)
+
+
+class RateLimiter:
+    """Token buckets for a requests-per-minute and a tokens-per-minute budget.
+
+    Both buckets start full and refill continuously, so short bursts up to the
+    per-minute budget go out immediately and sustained load is spread evenly.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request budget.
+            tokens_per_minute: Token budget.
+            clock: Monotonic clock, in seconds.
+            sleep: Sleeps for a number of seconds.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._requests = requests_per_minute
+        self._tokens = tokens_per_minute
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> float:
+        """Block until one request costing ``tokens`` fits in the budget, then spend it.
+
+        A request larger than the whole token budget waits for a full bucket instead
+        of waiting forever.
+
+        Args:
+            tokens: Estimated tokens of the request.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        waited = 0.0
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                now = self._clock()
+                elapsed = now - self._updated_at
+                self._updated_at = now
+                self._requests = min(
+                    self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / SECONDS_PER_MINUTE
+                )
+                self._tokens = min(
+                    self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / SECONDS_PER_MINUTE
+                )
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return waited
+                wait = max(
+                    (1 - self._requests) * SECONDS_PER_MINUTE / self.requests_per_minute,
+                    (tokens - self._tokens) * SECONDS_PER_MINUTE / self.tokens_per_minute,
+                )
+            self._sleep(wait)
+            waited += wait
+
+
+class BuildCheckpoint:
+    """JSON record of the batch ranges a build has already completed.
+
+    The checkpoint is keyed by the embedding model, batch size and input texts, so a
+    checkpoint from a different category list or model is ignored instead of
+    resumed.
+    """
+
+    def __init__(self, path: pathlib.Path, key: str) -> None:
+        """Load the checkpoint, discarding it if it belongs to a different build.
+
+        Args:
+            path: Location of the checkpoint file.
+            key: Identifies the build, see ``build_key``.
+        """
+        self.path = pathlib.Path(path)
+        self.key = key
+        self.completed: set[tuple[int, int]] = set()
+        self._lock = threading.Lock()
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get(C.KEY) == key:
+                    self.completed = {(start, end) for start, end in data[C.COMPLETED]}
+            except Exception as e:
+                get_logger(__name__).warning(f"Ignoring unreadable build checkpoint {self.path}: {e}")
+
+    @staticmethod
+    def build_key(model: str, batch_size: int, texts: list[str]) -> str:
+        """Compute the key of a build.
+
+        Args:
+            model: The embedding model.
+            batch_size: Texts per batch.
+            texts: The texts being embedded, in order.
+
+        Returns:
+            The hex SHA-256 digest of the build inputs.
+        """
+        digest = hashlib.sha256(f"{model}\0{batch_size}".encode("utf-8"))
+        for text in texts:
+            digest.update(b"\0" + text.encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def exists(self) -> bool:
+        """Whether a checkpoint for this build is on disk."""
+        return self.path.exists() and bool(self.completed)
+
+    def mark_done(self, start: int, end: int) -> None:
+        """Record a completed batch range and write the checkpoint atomically.
+
+        Args:
+            start: First text of the batch.
+            end: One past the last text of the batch.
+        """
+        with self._lock:
+            self.completed.add((start, end))
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            data = {C.KEY: self.key, C.COMPLETED: sorted(self.completed)}
+            tmp_path.write_text(json.dumps(data), encoding="utf-8")
+            tmp_path.replace(self.path)
+
+    def clear(self) -> None:
+        """Delete the checkpoint."""
+        with self._lock:
+            self.completed.clear()
+            self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class BulkEmbedReport:
+    """Outcome of a bulk embedding run."""
+
+    total: int = 0
+    embedded: int = 0
+    resumed: int = 0  # Texts in batches completed by an earlier run
+    retries: int = 0
+    rate_limit_wait_s: float = 0.0
+    elapsed_s: float = 0.0
+    failed_batches: list[tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Texts embedded per second in this run."""
+        return self.embedded / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+class BulkEmbedder:
+    """Embeds many texts with concurrent batched requests inside a rate-limit budget.
+
+    Each batch is retried with exponential backoff and jitter. A batch that still
+    fails is reported instead of aborting the run. With a checkpoint, completed
+    batches are recorded as they finish and skipped by the next run.
+    """
+
+    def __init__(
+        self,
+        client: openai.OpenAI,
+        model: str,
+        batch_size: int = BULK_BATCH_SIZE,
+        workers: int = BULK_WORKERS,
+        requests_per_minute: float = REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = TOKENS_PER_MINUTE,
+        max_retries: int = MAX_RETRIES,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize the embedder.
+
+        Args:
+            client: OpenAI-compatible client. Point its ``base_url`` at a local server
+                to build against a fake embeddings endpoint.
+            model: The embedding model.
+            batch_size: Texts per request.
+            workers: Requests in flight at once.
+            requests_per_minute: Request budget.
+            tokens_per_minute: Token budget.
+            max_retries: Retries per batch after the first attempt.
+            sleep: Sleeps for a number of seconds (between retries and for the budget).
+        """
+        self.client = client
+        self.model = model
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_retries = max_retries
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute, sleep=sleep)
+        self._sleep = sleep
+        self._stats_lock = threading.Lock()
+        self.logger = get_logger(__name__)
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed one batch of texts within the budget, retrying failures.
+
+        Args:
+            texts: The texts to embed.
+
+        Returns:
+            The embeddings, in the same order as ``texts``.
+        """
+        return self._embed_batch(texts, BulkEmbedReport())
+
+    def run(
+        self,
+        texts: list[str],
+        on_batch: Callable[[int, int, list[list[float]]], None],
+        checkpoint: BuildCheckpoint | None = None,
+    ) -> BulkEmbedReport:
+        """Embed every text, handing each finished batch to ``on_batch``.
+
+        Args:
+            texts: The texts to embed.
+            on_batch: Called with (start, end, embeddings) for each batch, one call
+                at a time, possibly out of order.
+            checkpoint: Records completed batches and lists the ones to skip.
+
+        Returns:
+            What was embedded, resumed, retried and failed, and the elapsed time.
+        """
+        start_time = time.time()
+        report = BulkEmbedReport(total=len(texts))
+        ranges = [(start, min(start + self.batch_size, len(texts))) for start in range(0, len(texts), self.batch_size)]
+        if checkpoint:
+            done = [batch for batch in ranges if batch in checkpoint.completed]
+            report.resumed = sum(end - start for start, end in done)
+            ranges = [batch for batch in ranges if batch not in checkpoint.completed]
+            if done:
+                self.logger.info(f"Resuming: {len(done)} batches ({report.resumed} texts) already done")
+
+        def process(batch: tuple[int, int]) -> None:
+            start, end = batch
+            embeddings = self._embed_batch(texts[start:end], report)
+            with self._stats_lock:
+                on_batch(start, end, embeddings)
+                if checkpoint:
+                    checkpoint.mark_done(start, end)
+                report.embedded += end - start
+                elapsed = time.time() - start_time
+                self.logger.info(
+                    f"Embedded {report.embedded + report.resumed}/{report.total} "
+                    f"({report.embedded / elapsed if elapsed else 0:.0f} texts/s)"
+                )
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-embed") as executor:
+            futures = {executor.submit(process, batch): batch for batch in ranges}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.warning(f"Batch {futures[future]} failed after retries: {e}")
+                    report.failed_batches.append(futures[future])
+        report.failed_batches.sort()
+        report.elapsed_s = time.time() - start_time
+        return report
+
+    def _embed_batch(self, texts: list[str], report: BulkEmbedReport) -> list[list[float]]:
+        """Embed one batch, retrying with exponential backoff and jitter.
+
+        Args:
+            texts: The texts to embed.
+            report: Accumulates retries and rate-limit waits.
+
+        Returns:
+            The embeddings, in the same order as ``texts``.
+        """
+        tokens = estimate_tokens(texts)
+        attempt = 0
+        while True:
+            waited = self.limiter.acquire(tokens)
+            with self._stats_lock:
+                report.rate_limit_wait_s += waited
+            try:
+                response = self.client.embeddings.create(model=self.model, input=texts)
+                return [data.embedding for data in sorted(response.data, key=lambda data: data.index)]
+            except (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2**attempt) * random.uniform(0.5, 1.5)
+                attempt += 1
+                with self._stats_lock:
+                    report.retries += 1
+                self.logger.warning(f"Embedding request failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+                self._sleep(delay)
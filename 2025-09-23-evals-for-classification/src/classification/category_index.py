@@ -0,0 +1,133 @@
+"""In-memory matrix index over category embeddings for fast similarity search."""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from src.data.models import Category
+
+MATRIX_NDIM = 2
+
+Embedding = Sequence[float] | np.ndarray
+
+
+def normalize_embeddings(
+    embeddings: Sequence[float] | Sequence[Sequence[float]] | np.ndarray, dtype: type = np.float32
+) -> np.ndarray:
+    """L2-normalize embeddings row-wise.
+
+    Zero-norm rows are left as zeros so that they score 0.0 against any query
+    instead of producing NaNs.
+
+    Args:
+        embeddings: A 1-D embedding or a 2-D matrix of embeddings (one per row).
+        dtype: The floating point type of the result.
+
+    Returns:
+        The normalized embeddings, with the same shape as the input.
+    """
+    matrix = np.asarray(embeddings, dtype=dtype)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    np.copyto(norms, 1.0, where=norms == 0)
+    return matrix / norms
+
+
+def cosine_similarity(embedding1: Embedding, embedding2: Embedding) -> float:
+    """Compute cosine similarity between two embeddings.
+
+    Args:
+        embedding1: The first embedding.
+        embedding2: The second embedding.
+
+    Returns:
+        The cosine similarity between the two embeddings (0.0 if either has zero norm).
+    """
+    vector1 = normalize_embeddings(embedding1, dtype=np.float64)
+    vector2 = normalize_embeddings(embedding2, dtype=np.float64)
+    return float(np.dot(vector1, vector2))
+
+
+class CategoryEmbeddingIndex:
+    """Holds all category embeddings as one pre-normalized float32 matrix.
+
+    Scoring a query against every category is a single matrix-vector product, and
+    top-k selection uses ``argpartition`` so only the k best rows are fully sorted.
+    """
+
+    def __init__(self, categories: list[Category], embeddings: Sequence[Embedding] | np.ndarray) -> None:
+        """Initialize the index.
+
+        Args:
+            categories: The indexed categories, in the same order as ``embeddings``.
+            embeddings: One embedding per category.
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.size == 0:
+            matrix = matrix.reshape(len(categories), 0)
+        if matrix.ndim != MATRIX_NDIM or matrix.shape[0] != len(categories):
+            raise ValueError(f"Expected a ({len(categories)}, dim) embedding matrix, got shape {matrix.shape}")
+        self.categories = list(categories)
+        self._matrix = normalize_embeddings(matrix)
+
+    def __len__(self) -> int:
+        """Return the number of indexed categories."""
+        return len(self.categories)
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension of the index."""
+        return self._matrix.shape[1]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """The normalized float32 embedding matrix, one row per category."""
+        return self._matrix
+
+    def scores(self, query_embedding: Embedding, rows: Sequence[int] | None = None) -> np.ndarray:
+        """Compute cosine similarity between a query and the indexed categories.
+
+        Args:
+            query_embedding: The query embedding.
+            rows: Positions of the categories to score. Defaults to every category.
+
+        Returns:
+            A float32 array of similarities, aligned with ``rows`` (or ``self.categories``).
+        """
+        matrix = self._matrix if rows is None else self._matrix[np.asarray(rows, dtype=np.intp)]
+        return matrix @ normalize_embeddings(query_embedding)
+
+    def top_k(self, query_embedding: Embedding, k: int) -> list[tuple[Category, float]]:
+        """Find the k categories most similar to a query.
+
+        Ties are broken by index order, matching a stable sort over the category list.
+
+        Args:
+            query_embedding: The query embedding.
+            k: Maximum number of results to return.
+
+        Returns:
+            (category, similarity) pairs sorted by similarity (most similar first).
+        """
+        n = len(self.categories)
+        k = min(k, n)
+        if k <= 0:
+            return []
+        scores = self.scores(query_embedding)
+        if k < n:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(n)
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(self.categories[i], float(scores[i])) for i in order]
+
+    def search(self, query_embedding: Embedding, k: int) -> list[Category]:
+        """Find the k categories most similar to a query.
+
+        Args:
+            query_embedding: The query embedding.
+            k: Maximum number of results to return.
+
+        Returns:
+            Categories sorted by similarity (most similar first).
+        """
+        return [category for category, _ in self.top_k(query_embedding, k)]
@@ -0,0 +1,101 @@
+"""Persistent content-addressed embedding cache backed by SQLite."""
+
+import hashlib
+import pathlib
+import sqlite3
+import threading
+
+import numpy as np
+
+from src.shared import constants as C
+
+EMBEDDING_CACHE_PATH = pathlib.Path(__file__).parents[2] / C.DATA / C.EMBEDDING_CACHE_DB
+# Stay well under SQLite's bound-parameter limit for IN (...) lookups
+LOOKUP_CHUNK_SIZE = 500
+
+
+class EmbeddingCache:
+    """On-disk embedding cache keyed by a hash of the embedding model and text.
+
+    Embeddings are stored as float32 blobs, so the cache survives process restarts
+    and is shared by every EmbeddingService using the same file.
+    """
+
+    def __init__(self, path: pathlib.Path = EMBEDDING_CACHE_PATH) -> None:
+        """Open (and create if needed) the cache database.
+
+        Args:
+            path: Location of the SQLite file. Defaults to ``data/embedding_cache.sqlite3``.
+        """
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL)"
+            " WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def content_key(model: str, text: str) -> bytes:
+        """Compute the cache key for a text embedded with a given model.
+
+        Args:
+            model: The embedding model name.
+            text: The embedded text.
+
+        Returns:
+            The SHA-256 digest of the model and text.
+        """
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()
+
+    def get_many(self, model: str, texts: list[str]) -> dict[str, list[float]]:
+        """Look up cached embeddings for several texts.
+
+        Args:
+            model: The embedding model name.
+            texts: The texts to look up.
+
+        Returns:
+            Mapping of text to embedding for every text found in the cache.
+        """
+        key_to_text = {self.content_key(model, text): text for text in texts}
+        keys = list(key_to_text)
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+                chunk = keys[start : start + LOOKUP_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, vector in rows:
+                    found[key_to_text[key]] = np.frombuffer(vector, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, embeddings: dict[str, list[float]]) -> None:
+        """Store embeddings for several texts.
+
+        Args:
+            model: The embedding model name.
+            embeddings: Mapping of text to embedding.
+        """
+        rows = [
+            (self.content_key(model, text), model, np.asarray(embedding, dtype=np.float32).tobytes())
+            for text, embedding in embeddings.items()
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        """Return the number of cached embeddings."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,34 +1,52 @@
 """OpenAI embedding service with caching and error handling."""
 
 import numpy as np
-import openai
 
+from src.classification.ann_index import ANN_INDEX_PATH, IVFCategoryIndex, IVFIndex, ann_index_key
+from src.classification.category_index import CategoryEmbeddingIndex, Embedding, cosine_similarity
+from src.classification.embedding_cache import EmbeddingCache
 from src.classification.vector_store import CategoryVectorStore
 from src.config.settings import settings
 from src.data.models import Category
+from src.data.taxonomy_snapshot import TaxonomySnapshot
+from src.shared.lazy import lazy_import
 from src.shared.logger import get_logger
 
+openai = lazy_import("openai")  # Loaded on first use, so importing the pipeline doesn't pay for it
+
+EMBEDDING_BATCH_SIZE = 100  # Inputs per embeddings request
+
 
 class EmbeddingService:
     """Handles OpenAI embedding operations with caching."""
 
-    def __init__(self, use_vector_store: bool = True) -> None:
+    def __init__(self, use_vector_store: bool = True, use_disk_cache: bool = True) -> None:
         """Initialize the EmbeddingService.
 
         Args:
             use_vector_store: Whether to use the vector store for caching. Defaults to True.
+            use_disk_cache: Whether to persist embeddings in the on-disk embedding cache. Defaults to True.
         """
         self.logger = get_logger(__name__)
         self.client = openai.OpenAI(api_key=settings.openai_api_key)
         self._cache: dict[str, list[float]] = {}
+        self._category_index: CategoryEmbeddingIndex | None = None
+        self._category_index_key: tuple[str, ...] = ()
+        self._ann_index: IVFCategoryIndex | None = None
         self.vector_store: CategoryVectorStore | None = None
         if use_vector_store:
             try:
-                self.vector_store = CategoryVectorStore(auto_create=True)
+                self.vector_store = CategoryVectorStore.shared(auto_create=True)
                 self.logger.success("EmbeddingService using vector store for caching")
             except Exception as e:
                 self.logger.warning(f"EmbeddingService failed to load vector store: {e}")
                 self.vector_store = None
+        self.disk_cache: EmbeddingCache | None = None
+        if use_disk_cache:
+            try:
+                self.disk_cache = EmbeddingCache()
+            except Exception as e:
+                self.logger.warning(f"EmbeddingService failed to open embedding cache: {e}")
 
     def embed_text(self, text: str) -> list[float]:
         """Embed a single text.
@@ -39,17 +57,43 @@ class EmbeddingService:
         Returns:
             The embedding of the text.
         """
-        if text in self._cache:
-            return self._cache[text]
-        response = self.client.embeddings.create(
-            model=settings.embedding_model,
-            input=text,
-        )
-        embedding = response.data[0].embedding
-        self._cache[text] = embedding
-        return embedding
-
-    def embed_category(self, category: Category) -> list[float]:
+        return self.embed_texts([text])[0]
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Embed several texts, only sending cache misses to the API.
+
+        Texts are deduplicated, then looked up in the in-memory cache and the on-disk
+        embedding cache. The remaining misses are embedded in batched requests and
+        written back to both caches.
+
+        Args:
+            texts: The texts to embed.
+
+        Returns:
+            The embeddings, in the same order as ``texts``.
+        """
+        misses = [text for text in dict.fromkeys(texts) if text not in self._cache]
+        if misses and self.disk_cache:
+            try:
+                from_disk = self.disk_cache.get_many(settings.embedding_model, misses)
+            except Exception as e:
+                self.logger.warning(f"Failed to read embedding cache: {e}")
+                from_disk = {}
+            self._cache.update(from_disk)
+            misses = [text for text in misses if text not in from_disk]
+        for start in range(0, len(misses), EMBEDDING_BATCH_SIZE):
+            batch = misses[start : start + EMBEDDING_BATCH_SIZE]
+            response = self.client.embeddings.create(model=settings.embedding_model, input=batch)
+            new_embeddings = {text: data.embedding for text, data in zip(batch, response.data)}
+            self._cache.update(new_embeddings)
+            if self.disk_cache:
+                try:
+                    self.disk_cache.put_many(settings.embedding_model, new_embeddings)
+                except Exception as e:
+                    self.logger.warning(f"Failed to write embedding cache: {e}")
+        return [self._cache[text] for text in texts]
+
+    def embed_category(self, category: Category) -> Embedding:
         """Embed a category with vector store.
 
         If the category is already in the vector store, return the cached embedding.
@@ -62,14 +106,35 @@ class EmbeddingService:
         Returns:
             The embedding of the category.
         """
-        if self.vector_store and self.vector_store.has_category(category.path):
-            embedding = self.vector_store.get_cached_embedding(category.path)
-            if embedding is not None:
-                return embedding
-        if category.embedding_text in self._cache:
-            embedding = self._cache[category.embedding_text]
-        else:
-            embedding = self.embed_text(category.embedding_text)
+        return self.embed_categories([category])[0]
+
+    def embed_categories(self, categories: list[Category]) -> list[Embedding]:
+        """Embed several categories, batching every vector store miss into one embed_texts call.
+
+        Args:
+            categories: The categories to embed.
+
+        Returns:
+            The embeddings, in the same order as ``categories``.
+        """
+        embeddings: list[Embedding | None] = [None] * len(categories)
+        if self.vector_store:
+            embeddings = list(self.vector_store.get_cached_embeddings([category.path for category in categories]))
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            new_embeddings = self.embed_texts([categories[i].embedding_text for i in missing])
+            for i, embedding in zip(missing, new_embeddings):
+                embeddings[i] = embedding
+                self._add_to_vector_store(categories[i], embedding)
+        return [embedding for embedding in embeddings if embedding is not None]
+
+    def _add_to_vector_store(self, category: Category, embedding: Embedding) -> None:
+        """Add a newly embedded category to the vector store if it isn't there yet.
+
+        Args:
+            category: The category to add.
+            embedding: The category's embedding.
+        """
         if self.vector_store and not self.vector_store.has_category(category.path):
             try:
                 self.vector_store.add_category(category, embedding)
@@ -77,7 +142,82 @@ class EmbeddingService:
             except Exception as e:
                 self.logger.warning(f"Failed to add category to vector store: {e}")
 
-        return embedding
+    def get_category_index(self, categories: list[Category]) -> CategoryEmbeddingIndex:
+        """Get a similarity index over the given categories.
+
+        The index is built once and reused for as long as the same category paths
+        are requested, so repeated queries over the loaded category list only pay
+        for a single matrix product. Embeddings come from the taxonomy snapshot when
+        it holds them for exactly these categories and the configured model.
+
+        Args:
+            categories: The categories to index.
+
+        Returns:
+            The category embedding index.
+        """
+        key = tuple(category.path for category in categories)
+        if self._category_index is None or key != self._category_index_key:
+            embeddings = self._snapshot_embeddings(categories)
+            if embeddings is None:
+                embeddings = self.embed_categories(categories)
+            self._category_index = CategoryEmbeddingIndex(categories, embeddings)
+            self._category_index_key = key
+            self.logger.info(f"Built in-memory category index with {len(categories)} categories")
+        return self._category_index
+
+    def _snapshot_embeddings(self, categories: list[Category]) -> np.ndarray | None:
+        """Get the category embeddings stored in the taxonomy snapshot.
+
+        Args:
+            categories: The categories to embed.
+
+        Returns:
+            One embedding per category, or None if the snapshot has no embeddings for
+            these categories and the configured model.
+        """
+        try:
+            snapshot = TaxonomySnapshot.shared(settings.taxonomy_snapshot_path, settings.categories_file_path)
+        except Exception as e:
+            self.logger.warning(f"Failed to load taxonomy snapshot: {e}")
+            return None
+        if snapshot is None or snapshot.embeddings is None or snapshot.embedding_model != settings.embedding_model:
+            return None
+        if snapshot.embeddings_key != ann_index_key(settings.embedding_model, [c.path for c in categories]):
+            return None
+        self.logger.info(f"Using {len(categories)} category embeddings from the taxonomy snapshot")
+        return snapshot.embeddings
+
+    def get_ann_index(self, categories: list[Category]) -> IVFCategoryIndex:
+        """Get an approximate (IVF) similarity index over the given categories.
+
+        The IVF lists are loaded from ``data/ann_index/`` when they were built for the
+        same embedding model and category paths, and are built in memory otherwise.
+
+        Args:
+            categories: The categories to index.
+
+        Returns:
+            The approximate category index.
+        """
+        index = self.get_category_index(categories)
+        if self._ann_index is None or self._ann_index.exact_index is not index:
+            key = ann_index_key(settings.embedding_model, [category.path for category in categories])
+            ivf = None
+            try:
+                ivf = IVFIndex.load(ANN_INDEX_PATH, key)
+            except Exception as e:
+                self.logger.warning(f"Failed to load ANN index: {e}")
+            if ivf is None:
+                self.logger.info(
+                    "No ANN index on disk for these categories, building one in memory "
+                    "(run scripts/build_vector_store.py --ann to persist it)"
+                )
+                ivf = IVFIndex.build(index.matrix)
+            self._ann_index = IVFCategoryIndex(index, ivf, settings.ann_nprobe)
+            self.logger.info(f"Using ANN index with {ivf.n_lists} lists over {len(categories)} categories")
+        self._ann_index.nprobe = settings.ann_nprobe
+        return self._ann_index
 
     def compute_similarity(self, embedding1: list[float], embedding2: list[float]) -> float:
         """Compute cosine similarity between embeddings.
@@ -89,4 +229,4 @@ class EmbeddingService:
         Returns:
             The cosine similarity between the two embeddings.
         """
-        return np.dot(embedding1, embedding2) / (np.linalg.norm(embedding1) * np.linalg.norm(embedding2))
+        return cosine_similarity(embedding1, embedding2)
@@ -1,6 +1,14 @@
 """Fleshes out the user's query using LLM."""
 
+import asyncio
+import contextvars
+import time
+from concurrent.futures import Executor
+
 from src.baml_client import b
+from src.baml_client.async_client import b as async_b
+from src.shared.enums import Stage
+from src.shared.tracing import tracer
 
 
 def expand_user_query(text: str) -> str:
@@ -14,3 +22,107 @@ def expand_user_query(text: str) -> str:
     """
     expanded_text = b.ExpandUserQuery(text)
     return expanded_text
+
+
+async def aexpand_user_query(text: str) -> str:
+    """Expand the user's query using the async BAML client.
+
+    Args:
+        text: The user's query to expand.
+
+    Returns:
+        The expanded user's query.
+    """
+    return await async_b.ExpandUserQuery(text)
+
+
+class BackgroundExpansion:
+    """Timing shared by query expansions that run alongside narrowing."""
+
+    def __init__(self) -> None:
+        """Initialize the expansion timings."""
+        self.time_ms = 0.0  # How long the ExpandUserQuery call itself took
+        self.wait_ms = 0.0  # How long the caller blocked waiting for it
+
+    @property
+    def overlap_ms(self) -> float:
+        """Expansion time hidden behind other work, i.e. saved from the critical path."""
+        return max(self.time_ms - self.wait_ms, 0.0)
+
+    def _record_time(self, start: float) -> None:
+        """Record the expansion duration, and trace it as the expansion stage.
+
+        Args:
+            start: When the expansion call started, from ``time.perf_counter``.
+        """
+        end = time.perf_counter()
+        self.time_ms = (end - start) * 1000
+        tracer.record(Stage.EXPANSION, start, end)
+
+
+class QueryExpansion(BackgroundExpansion):
+    """Query expansion running on a worker thread."""
+
+    def __init__(self, text: str, executor: Executor) -> None:
+        """Start expanding the query.
+
+        Args:
+            text: The user's query to expand.
+            executor: The executor to run the expansion on.
+        """
+        super().__init__()
+        # Run in a copy of this context so the expansion span joins the caller's trace
+        self._future = executor.submit(contextvars.copy_context().run, self._expand, text)
+
+    def _expand(self, text: str) -> str:
+        """Expand the query and record how long it took."""
+        start = time.perf_counter()
+        try:
+            return expand_user_query(text)
+        finally:
+            self._record_time(start)
+
+    def result(self) -> str:
+        """Wait for the expanded query.
+
+        Returns:
+            The expanded user's query.
+        """
+        wait_start = time.perf_counter()
+        try:
+            return self._future.result()
+        finally:
+            self.wait_ms += (time.perf_counter() - wait_start) * 1000
+
+
+class AsyncQueryExpansion(BackgroundExpansion):
+    """Query expansion running as an asyncio task."""
+
+    def __init__(self, text: str) -> None:
+        """Start expanding the query. Must be called from a running event loop.
+
+        Args:
+            text: The user's query to expand.
+        """
+        super().__init__()
+        self._task = asyncio.create_task(self._expand(text))
+
+    async def _expand(self, text: str) -> str:
+        """Expand the query and record how long it took."""
+        start = time.perf_counter()
+        try:
+            return await aexpand_user_query(text)
+        finally:
+            self._record_time(start)
+
+    async def result(self) -> str:
+        """Wait for the expanded query.
+
+        Returns:
+            The expanded user's query.
+        """
+        wait_start = time.perf_counter()
+        try:
+            return await self._task
+        finally:
+            self.wait_ms += (time.perf_counter() - wait_start) * 1000
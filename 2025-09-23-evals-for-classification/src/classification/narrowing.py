@@ -1,15 +1,25 @@
 """Different strategies for narrowing down the category set."""
 
+import asyncio
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+
+import numpy as np
 
 from src.baml_client import b
+from src.baml_client.async_client import b as async_b
 from src.baml_client.type_builder import TypeBuilder
+from src.classification.category_index import CategoryEmbeddingIndex, Embedding
 from src.classification.embeddings import EmbeddingService
+from src.classification.type_builder_cache import type_builder_cache
 from src.classification.vector_store import CategoryVectorStore
 from src.config.settings import settings
 from src.data.models import Category
-from src.shared.enums import NarrowingStrategy
+from src.shared.correctness import CategoryHierarchyHelper
+from src.shared.enums import NarrowingStrategy, SearchBackend, Stage
 from src.shared.logger import get_logger
+from src.shared.tracing import tracer
 
 NARROWED_CATEGORIES_BUFFER = 2
 
@@ -34,7 +44,7 @@ class NarrowingStrategyBase(ABC):
 
         if embedding_service and use_vector_store and CategoryVectorStore.is_available():
             try:
-                self._vector_store = CategoryVectorStore()
+                self._vector_store = CategoryVectorStore.shared()
                 self.logger.success(f"{self.__class__.__name__} using ChromaDB vector store")
             except Exception as e:
                 self.logger.warning(
@@ -56,6 +66,18 @@ class NarrowingStrategyBase(ABC):
         """
         pass
 
+    def _embed_query(self, text: str) -> Embedding:
+        """Embed the text being classified, traced as the query embedding stage.
+
+        Args:
+            text: The text to embed.
+
+        Returns:
+            The embedding of the text.
+        """
+        with tracer.span(Stage.QUERY_EMBEDDING):
+            return self.embedding_service.embed_text(text)
+
     def _narrow_with_embedding_similarity(
         self, text: str, categories: list[Category], max_results: int
     ) -> list[Category]:
@@ -71,7 +93,9 @@ class NarrowingStrategyBase(ABC):
         """
         if not categories or not self.embedding_service:
             return categories[:max_results] if categories else []
-        if self._vector_store is not None:
+        if settings.search_backend == SearchBackend.IVF:
+            return self._narrow_with_ann(text, categories, max_results)
+        if self._vector_store is not None and settings.search_backend == SearchBackend.CHROMA:
             return self._narrow_with_vector_store(text, max_results)
         return self._narrow_in_memory(text, categories, max_results)
 
@@ -88,11 +112,12 @@ class NarrowingStrategyBase(ABC):
         if self._vector_store is None or self.embedding_service is None:
             raise RuntimeError("Vector store or embedding service is not available")
 
-        text_embedding = self.embedding_service.embed_text(text)
-        similar_categories = self._vector_store.find_similar_categories(
-            query_embedding=text_embedding,
-            n_results=max_results * NARROWED_CATEGORIES_BUFFER,
-        )
+        text_embedding = self._embed_query(text)
+        with tracer.span(Stage.VECTOR_SEARCH):
+            similar_categories = self._vector_store.find_similar_categories(
+                query_embedding=text_embedding,
+                n_results=max_results * NARROWED_CATEGORIES_BUFFER,
+            )
         return similar_categories[:max_results]
 
     def _narrow_in_memory(self, text: str, categories: list[Category], max_results: int) -> list[Category]:
@@ -106,20 +131,32 @@ class NarrowingStrategyBase(ABC):
         Returns:
             The narrowed categories.
         """
-        category_embeddings: list[tuple[Category, list[float]]] = []
-        scored_categories: list[tuple[Category, float]] = []
         if not self.embedding_service:
             self.logger.warning("Embedding service is not available, returning all categories")
             return categories
-        for category in categories:
-            embedding = self.embedding_service.embed_category(category)
-            category_embeddings.append((category, embedding))
-        text_embedding = self.embedding_service.embed_text(text)
-        for category, embedding in category_embeddings:
-            similarity = self.embedding_service.compute_similarity(text_embedding, embedding)
-            scored_categories.append((category, similarity))
-        scored_categories.sort(key=lambda x: x[1], reverse=True)
-        return [category for category, _ in scored_categories[:max_results]]
+        index = self.embedding_service.get_category_index(categories)
+        text_embedding = self._embed_query(text)
+        with tracer.span(Stage.VECTOR_SEARCH):
+            return index.search(text_embedding, max_results)
+
+    def _narrow_with_ann(self, text: str, categories: list[Category], max_results: int) -> list[Category]:
+        """Approximate in-memory similarity search over an IVF index.
+
+        Args:
+            text: The text to narrow categories based on.
+            categories: The categories to narrow.
+            max_results: Maximum number of categories to return.
+
+        Returns:
+            The narrowed categories.
+        """
+        if not self.embedding_service:
+            self.logger.warning("Embedding service is not available, returning all categories")
+            return categories
+        index = self.embedding_service.get_ann_index(categories)
+        text_embedding = self._embed_query(text)
+        with tracer.span(Stage.VECTOR_SEARCH):
+            return index.search(text_embedding, max_results)
 
     def _narrow_with_llm(self, text: str, categories: list[Category], max_results: int) -> list[Category]:
         """Narrow categories with LLM.
@@ -136,30 +173,55 @@ class NarrowingStrategyBase(ABC):
             return []
         if len(categories) <= max_results:
             return categories
-        tb = TypeBuilder()
-        category_map: dict[str, Category] = {}
-        alias_to_category: dict[str, Category] = {}
-        for i, category in enumerate(categories):
-            alias = f"k{i}"
-            val = tb.Category.add_value(category.name)
-            val.alias(alias)
-            val.description(category.llm_description)
-            category_map[category.name] = category
-            alias_to_category[alias] = category
+        tb, lookup = self._build_llm_type_builder(categories)
+        try:
+            with tracer.span(Stage.LLM_NARROWING):
+                selected_items = b.PickBestCategories(text, count=max_results, baml_options={"tb": tb})
+            return [lookup[item] for item in selected_items if item in lookup]
+        except Exception as e:
+            self.logger.warning(f"LLM narrowing failed: {e}")
+            return categories[:max_results]
+
+    async def _anarrow_with_llm(self, text: str, categories: list[Category], max_results: int) -> list[Category]:
+        """Narrow categories with LLM using the async BAML client.
+
+        Args:
+            text: The text to narrow categories based on.
+            categories: The categories to narrow.
+            max_results: Maximum number of categories to return.
 
+        Returns:
+            The narrowed categories.
+        """
+        if not categories:
+            return []
+        if len(categories) <= max_results:
+            return categories
+        tb, lookup = self._build_llm_type_builder(categories)
         try:
-            selected_items = b.PickBestCategories(text, count=max_results, baml_options={"tb": tb})
-            selected_categories = []
-            for item in selected_items:
-                if item in category_map:
-                    selected_categories.append(category_map[item])
-                elif item in alias_to_category:
-                    selected_categories.append(alias_to_category[item])
-            return selected_categories
+            with tracer.span(Stage.LLM_NARROWING):
+                selected_items = await async_b.PickBestCategories(text, count=max_results, baml_options={"tb": tb})
+            return [lookup[item] for item in selected_items if item in lookup]
         except Exception as e:
             self.logger.warning(f"LLM narrowing failed: {e}")
             return categories[:max_results]
 
+    def _build_llm_type_builder(self, categories: list[Category]) -> tuple[TypeBuilder, dict[str, Category]]:
+        """Build the dynamic Category enum for LLM narrowing.
+
+        Args:
+            categories: The categories to offer to the LLM.
+
+        Returns:
+            The TypeBuilder and a lookup from category name or alias to category.
+            Names take precedence over aliases. The TypeBuilder is cached per ordered
+            candidate set and shared with the selector.
+        """
+        tb = type_builder_cache.get(categories)
+        alias_to_category = {f"k{i}": category for i, category in enumerate(categories)}
+        category_map = {category.name: category for category in categories}
+        return tb, {**alias_to_category, **category_map}
+
 
 class LLMBasedNarrowing(NarrowingStrategyBase):
     """Uses LLM for category narrowing."""
@@ -232,12 +294,16 @@ class HybridNarrowing(NarrowingStrategyBase):
         embedding_candidates = self._narrow_with_embedding(text, categories)
         return self._narrow_with_llm_stage(text, embedding_candidates)
 
-    def narrow_with_stages(self, text: str, categories: list[Category]) -> dict:
+    def narrow_with_stages(
+        self, text: str, categories: list[Category], llm_text: Callable[[], str] | None = None
+    ) -> dict:
         """Use embedding first to get candidates, then LLM to refine, returning stage info.
 
         Args:
             text: The text to narrow categories based on.
             categories: The categories to narrow.
+            llm_text: Called after the embedding stage to get the text for the LLM stage,
+                e.g. to wait for a query expansion running alongside. Defaults to ``text``.
 
         Returns:
             Dictionary containing stage results and final candidates.
@@ -258,7 +324,7 @@ class HybridNarrowing(NarrowingStrategyBase):
         embedding_candidates = self._narrow_with_embedding(text, categories)
 
         # Get LLM stage results
-        llm_candidates = self._narrow_with_llm_stage(text, embedding_candidates)
+        llm_candidates = self._narrow_with_llm_stage(llm_text() if llm_text else text, embedding_candidates)
 
         return {
             "embedding_candidates": embedding_candidates,
@@ -266,6 +332,36 @@ class HybridNarrowing(NarrowingStrategyBase):
             "final_candidates": llm_candidates,
         }
 
+    async def anarrow_with_stages(
+        self, text: str, categories: list[Category], llm_text: Callable[[], Awaitable[str]] | None = None
+    ) -> dict:
+        """Async variant of narrow_with_stages that awaits the LLM stage.
+
+        The embedding stage runs in a worker thread, since it may embed the query,
+        query Chroma or build the category index, and would otherwise block every
+        other task on the event loop.
+
+        Args:
+            text: The text to narrow categories based on.
+            categories: The categories to narrow.
+            llm_text: Awaited after the embedding stage to get the text for the LLM stage.
+                Defaults to ``text``.
+
+        Returns:
+            Dictionary containing stage results and final candidates.
+        """
+        if not categories or not self._use_hybrid:
+            return await asyncio.to_thread(self.narrow_with_stages, text, categories)
+        embedding_candidates = await asyncio.to_thread(self._narrow_with_embedding, text, categories)
+        llm_candidates = await self._anarrow_with_llm_stage(
+            await llm_text() if llm_text else text, embedding_candidates
+        )
+        return {
+            "embedding_candidates": embedding_candidates,
+            "llm_candidates": llm_candidates,
+            "final_candidates": llm_candidates,
+        }
+
     def _narrow_with_embedding_only(self, text: str, categories: list[Category]) -> list[Category]:
         """Use embedding-only strategy when hybrid settings are invalid.
 
@@ -306,6 +402,119 @@ class HybridNarrowing(NarrowingStrategyBase):
             self.logger.warning(f"LLM narrowing failed: {e}, returning top embedding candidates")
             return categories[: settings.max_final_categories]
 
+    async def _anarrow_with_llm_stage(self, text: str, categories: list[Category]) -> list[Category]:
+        """Use the async LLM client to narrow to final category count.
+
+        Args:
+            text: The text to narrow categories based on.
+            categories: The categories to narrow.
+
+        Returns:
+            The narrowed categories.
+        """
+        try:
+            return await self._anarrow_with_llm(text, categories, settings.max_final_categories)
+        except Exception as e:
+            self.logger.warning(f"LLM narrowing failed: {e}, returning top embedding candidates")
+            return categories[: settings.max_final_categories]
+
+
+class HierarchicalNarrowing(HybridNarrowing):
+    """Hybrid narrowing whose embedding stage beam-searches the category tree.
+
+    Instead of scoring every category, the embedding stage scores the root
+    categories, keeps the ``hierarchical_beam_width`` best, and scores only their
+    children, level by level. This cuts similarity work from O(N) to roughly
+    O(beam x branching x depth). Interior categories are valid classification
+    targets, so every scored category is a candidate, not just leaves.
+    The LLM stage is the same as HybridNarrowing.
+    """
+
+    def __init__(self, embedding_service: EmbeddingService, use_vector_store: bool = True):
+        """Initialize the hierarchical narrowing strategy.
+
+        Args:
+            embedding_service: The module's embedding service.
+            use_vector_store: Whether to use the ChromaDB vector store for cached category embeddings.
+        """
+        super().__init__(embedding_service, use_vector_store)
+        self._tree_key: tuple[str, ...] = ()
+        self._roots: list[int] = []
+        self._children: dict[int, list[int]] = {}
+        self._local = threading.local()
+
+    @property
+    def last_scored_count(self) -> int:
+        """Categories scored by this thread's most recent embedding stage."""
+        return getattr(self._local, "scored_count", 0)
+
+    @last_scored_count.setter
+    def last_scored_count(self, count: int) -> None:
+        self._local.scored_count = count
+
+    def _narrow_with_embedding_similarity(
+        self, text: str, categories: list[Category], max_results: int
+    ) -> list[Category]:
+        """Narrow categories by beam search over the category tree.
+
+        Args:
+            text: The text to narrow categories based on.
+            categories: The categories to narrow.
+            max_results: Maximum number of categories to return.
+
+        Returns:
+            The best-scoring categories visited by the search, most similar first.
+        """
+        if not categories or not self.embedding_service:
+            return categories[:max_results] if categories else []
+        index = self.embedding_service.get_category_index(categories)
+        self._build_tree(categories)
+        text_embedding = self._embed_query(text)
+        with tracer.span(Stage.VECTOR_SEARCH):
+            scored = self._beam_search(index, text_embedding)
+        self.last_scored_count = len(scored)
+        ranked = sorted(scored.items(), key=lambda item: (-item[1], item[0]))
+        return [categories[row] for row, _ in ranked[:max_results]]
+
+    def _build_tree(self, categories: list[Category]) -> None:
+        """Build the root and child lookups for the category list, once per list.
+
+        Args:
+            categories: The categories to arrange as a tree.
+        """
+        key = tuple(category.path for category in categories)
+        if key == self._tree_key:
+            return
+        hierarchy = CategoryHierarchyHelper(categories)
+        row_of = {category.path: row for row, category in enumerate(categories)}
+        # Categories whose parent isn't in the list are treated as roots
+        self._roots = [row for path, row in row_of.items() if hierarchy.get_parent_path(path) not in row_of]
+        self._children = {
+            row: [row_of[child] for child in hierarchy.get_child_paths(path)]
+            for path, row in row_of.items()
+            if hierarchy.get_child_paths(path)
+        }
+        self._tree_key = key
+
+    def _beam_search(self, index: CategoryEmbeddingIndex, text_embedding: Embedding) -> dict[int, float]:
+        """Score the tree level by level, descending only into the best subtrees.
+
+        Args:
+            index: The category embedding index.
+            text_embedding: The query embedding.
+
+        Returns:
+            Mapping of category row to similarity for every scored category.
+        """
+        scored: dict[int, float] = {}
+        frontier = self._roots
+        while frontier:
+            level_scores = index.scores(text_embedding, frontier)
+            scored.update(zip(frontier, level_scores.tolist()))
+            beam = np.argsort(-level_scores, kind="stable")[: settings.hierarchical_beam_width]
+            frontier = [child for i in beam for child in self._children.get(frontier[i], [])]
+        return scored
+
 
 class CategoryNarrower:
     """Main narrowing service that delegates to strategies."""
@@ -319,8 +528,26 @@ class CategoryNarrower:
         """
         self.embedding_service = embedding_service
         self._strategy_map = {
+            NarrowingStrategy.HIERARCHICAL: lambda: HierarchicalNarrowing(embedding_service, use_vector_store),
             NarrowingStrategy.HYBRID: lambda: HybridNarrowing(embedding_service, use_vector_store),
         }
+        self._strategies: dict[NarrowingStrategy, NarrowingStrategyBase] = {}
+
+    def get_strategy(self) -> NarrowingStrategyBase:
+        """Get the configured strategy, creating it on first use.
+
+        Strategies are created once per narrower and reused across calls, so their
+        vector store and validated settings are not rebuilt for every classification.
+
+        Returns:
+            The narrowing strategy for ``settings.narrowing_strategy``.
+        """
+        strategy_key = settings.narrowing_strategy
+        strategy = self._strategies.get(strategy_key)
+        if strategy is None:
+            strategy = self._strategy_map[strategy_key]()
+            self._strategies[strategy_key] = strategy
+        return strategy
 
     def narrow_categories(self, text: str, categories: list[Category]) -> list[Category]:
         """Narrow categories using the configured strategy.
@@ -332,26 +559,26 @@ class CategoryNarrower:
         Returns:
             The narrowed categories.
         """
-        strategy_class = self._strategy_map[settings.narrowing_strategy]
-        strategy = strategy_class()
-        return strategy.narrow(text, categories)
+        return self.get_strategy().narrow(text, categories)
 
-    def narrow_categories_with_stages(self, text: str, categories: list[Category]) -> dict:
+    def narrow_categories_with_stages(
+        self, text: str, categories: list[Category], llm_text: Callable[[], str] | None = None
+    ) -> dict:
         """Narrow categories using the configured strategy, returning stage information.
 
         Args:
             text: The text for which to narrow the categories.
             categories: The categories to narrow.
+            llm_text: Provides the text for the LLM stage of staged strategies. Defaults to ``text``.
 
         Returns:
             Dictionary containing stage results and final candidates.
         """
-        strategy_class = self._strategy_map[settings.narrowing_strategy]
-        strategy = strategy_class()
+        strategy = self.get_strategy()
 
         # Check if strategy supports stage information
         if hasattr(strategy, "narrow_with_stages"):
-            return strategy.narrow_with_stages(text, categories)
+            return strategy.narrow_with_stages(text, categories, llm_text=llm_text)
         else:
             # Fallback for strategies that don't support stages
             final_candidates = strategy.narrow(text, categories)
@@ -360,3 +587,24 @@ class CategoryNarrower:
                 "llm_candidates": [],  # No LLM stage
                 "final_candidates": final_candidates,
             }
+
+    async def anarrow_categories_with_stages(
+        self, text: str, categories: list[Category], llm_text: Callable[[], Awaitable[str]] | None = None
+    ) -> dict:
+        """Async variant of narrow_categories_with_stages.
+
+        Strategies without an async implementation run in a worker thread, using
+        ``text`` for every stage.
+
+        Args:
+            text: The text for which to narrow the categories.
+            categories: The categories to narrow.
+            llm_text: Provides the text for the LLM stage of staged strategies. Defaults to ``text``.
+
+        Returns:
+            Dictionary containing stage results and final candidates.
+        """
+        strategy = self.get_strategy()
+        if hasattr(strategy, "anarrow_with_stages"):
+            return await strategy.anarrow_with_stages(text, categories, llm_text=llm_text)
+        return await asyncio.to_thread(self.narrow_categories_with_stages, text, categories)
@@ -1,17 +1,25 @@
 """Orchestrates the full classification process."""
 
+import asyncio
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
 
-from src.classification import expander
 from src.classification.embeddings import EmbeddingService
+from src.classification.expander import AsyncQueryExpansion, BackgroundExpansion, QueryExpansion
 from src.classification.narrowing import CategoryNarrower
+from src.classification.result_cache import ResultCache
 from src.classification.selection import CategorySelector
-from src.classification.vector_store import CategoryVectorStore
+from src.classification.type_builder_cache import type_builder_cache
 from src.config.settings import settings
 from src.data.category_loader import CategoryLoader
 from src.data.models import Category, ClassificationResult
 from src.shared import constants as C
+from src.shared.enums import Stage
 from src.shared.logger import get_logger
+from src.shared.tracing import tracer
 
 
 class ClassificationPipeline:
@@ -31,10 +39,18 @@ class ClassificationPipeline:
         self.narrower = CategoryNarrower(self.embedding_service, use_vector_store=use_vector_store)
         self.selector = CategorySelector()
         self._categories_cache: list[Category] = []
+        self._expansion_executor = ThreadPoolExecutor(thread_name_prefix="query-expansion")
+        self.result_cache: ResultCache | None = None
+        if settings.result_cache_size > 0:
+            self.result_cache = ResultCache(
+                settings.result_cache_size,
+                settings.result_cache_ttl_seconds,
+                settings.result_cache_similarity_threshold,
+            )
 
-        if use_vector_store and CategoryVectorStore.is_available():
+        store = self.embedding_service.vector_store
+        if use_vector_store and store is not None and store.collection is not None:
             try:
-                store = CategoryVectorStore()
                 info = store.get_collection_info()
                 self.logger.info(f"Vector store loaded: {info['count']} categories cached")
             except Exception as e:
@@ -59,6 +75,41 @@ class ClassificationPipeline:
     def classify(self, text: str, max_candidates: int | None = None) -> ClassificationResult:
         """Full classification pipeline with detailed results.
 
+        Args:
+            text: The text to classify.
+            max_candidates: The maximum number of candidates to return.
+
+        Returns:
+            The classification result. Its metadata includes the time spent in each
+            traced stage.
+        """
+        with tracer.trace(Stage.CLASSIFY) as trace:
+            result = self._classify(text, max_candidates)
+        result.metadata[C.STAGE_TIMINGS_MS] = trace.stage_totals()
+        return result
+
+    async def aclassify(self, text: str, max_candidates: int | None = None) -> ClassificationResult:
+        """Async variant of classify that awaits the LLM stages with the BAML async client.
+
+        Blocking work (query embeddings, vector searches, building the category index)
+        runs in worker threads, so concurrent calls never stall the event loop.
+
+        Args:
+            text: The text to classify.
+            max_candidates: The maximum number of candidates to return.
+
+        Returns:
+            The classification result. Its metadata includes the time spent in each
+            traced stage.
+        """
+        with tracer.trace(Stage.CLASSIFY) as trace:
+            result = await self._aclassify(text, max_candidates)
+        result.metadata[C.STAGE_TIMINGS_MS] = trace.stage_totals()
+        return result
+
+    def _classify(self, text: str, max_candidates: int | None) -> ClassificationResult:
+        """Run the classification stages for a text.
+
         Args:
             text: The text to classify.
             max_candidates: The maximum number of candidates to return.
@@ -66,39 +117,311 @@ class ClassificationPipeline:
         Returns:
             The classification result.
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
+        cached = self._get_cached_result(text, max_candidates, start_time)
+        if cached:
+            return cached
         categories = self._get_categories()
         self.logger.info(f"Classifying text with {len(categories)} total categories")
-        narrowing_start = time.time()
-        narrowing_results = self.narrower.narrow_categories_with_stages(text, categories)
+        # Query expansion doesn't depend on narrowing, so it runs alongside it
+        expansion = QueryExpansion(text, self._expansion_executor) if settings.expand_user_query else None
+        llm_text = expansion.result if expansion and settings.expand_query_for_narrowing else None
+        narrowing_start = time.perf_counter()
+        with tracer.span(Stage.NARROWING):
+            narrowing_results = self.narrower.narrow_categories_with_stages(text, categories, llm_text=llm_text)
         narrowed_categories = narrowing_results["final_candidates"]
-        narrowing_time_ms = (time.time() - narrowing_start) * 1000
+        narrowing_time_ms = (time.perf_counter() - narrowing_start) * 1000
         if max_candidates and len(narrowed_categories) > max_candidates:
             narrowed_categories = narrowed_categories[:max_candidates]
         self.logger.info(f"Narrowed to {len(narrowed_categories)} categories in {narrowing_time_ms:.1f}ms")
-        if settings.expand_user_query:
-            expanding_text_start = time.time()
-            text = expander.expand_user_query(text)
-            expanding_text_time_ms = (time.time() - expanding_text_start) * 1000
-            self.logger.info(f"Expanded the user's query in {expanding_text_time_ms:.1f}ms")
-        selection_start = time.time()
-        selected_category = self.selector.select_best_category(text, narrowed_categories)
-        selection_time_ms = (time.time() - selection_start) * 1000
-        processing_time_ms = (time.time() - start_time) * 1000
+        selection_text = text
+        if expansion:
+            selection_text = expansion.result()
+            self.logger.info(
+                f"Expanded the user's query in {expansion.time_ms:.1f}ms "
+                f"({expansion.overlap_ms:.1f}ms overlapped with narrowing)"
+            )
+        selection_start = time.perf_counter()
+        with tracer.span(Stage.SELECTION):
+            selected_category = self.selector.select_best_category(selection_text, narrowed_categories)
+        selection_time_ms = (time.perf_counter() - selection_start) * 1000
+        result = self._build_result(
+            categories,
+            narrowing_results,
+            narrowed_categories,
+            selected_category,
+            start_time,
+            narrowing_time_ms,
+            selection_time_ms,
+            expansion,
+        )
+        self._cache_result(text, max_candidates, result)
+        return result
+
+    async def _aclassify(self, text: str, max_candidates: int | None) -> ClassificationResult:
+        """Run the classification stages for a text, awaiting the LLM stages.
+
+        Args:
+            text: The text to classify.
+            max_candidates: The maximum number of candidates to return.
+
+        Returns:
+            The classification result.
+        """
+        start_time = time.perf_counter()
+        cached = await self._run_cache_step(self._get_cached_result, text, max_candidates, start_time)
+        if cached:
+            return cached
+        categories = self._get_categories()
+        expansion = AsyncQueryExpansion(text) if settings.expand_user_query else None
+        llm_text = expansion.result if expansion and settings.expand_query_for_narrowing else None
+        narrowing_start = time.perf_counter()
+        with tracer.span(Stage.NARROWING):
+            narrowing_results = await self.narrower.anarrow_categories_with_stages(text, categories, llm_text=llm_text)
+        narrowed_categories = narrowing_results["final_candidates"]
+        narrowing_time_ms = (time.perf_counter() - narrowing_start) * 1000
+        if max_candidates and len(narrowed_categories) > max_candidates:
+            narrowed_categories = narrowed_categories[:max_candidates]
+        selection_text = text
+        if expansion:
+            selection_text = await expansion.result()
+        selection_start = time.perf_counter()
+        with tracer.span(Stage.SELECTION):
+            selected_category = await self.selector.aselect_best_category(selection_text, narrowed_categories)
+        selection_time_ms = (time.perf_counter() - selection_start) * 1000
+        result = self._build_result(
+            categories,
+            narrowing_results,
+            narrowed_categories,
+            selected_category,
+            start_time,
+            narrowing_time_ms,
+            selection_time_ms,
+            expansion,
+        )
+        await self._run_cache_step(self._cache_result, text, max_candidates, result)
+        return result
+
+    async def _run_cache_step(self, step: Callable[..., Any], *args: Any) -> Any:
+        """Run a result cache lookup or store from async code.
+
+        Semantic caching embeds the query, a blocking API request, so the step then
+        runs in a worker thread to keep the event loop free for other texts.
+
+        Args:
+            step: ``_get_cached_result`` or ``_cache_result``.
+            *args: The step's arguments.
+
+        Returns:
+            What the step returns.
+        """
+        if self.result_cache is not None and self.result_cache.semantic:
+            return await asyncio.to_thread(step, *args)
+        return step(*args)
+
+    async def aclassify_batch(
+        self,
+        texts: list[str],
+        max_concurrency: int | None = None,
+        max_candidates: int | None = None,
+        return_exceptions: bool = False,
+    ) -> list[ClassificationResult | BaseException]:
+        """Classify many texts concurrently.
+
+        All query embeddings are fetched up front in batched requests, then each text
+        runs through aclassify with at most ``max_concurrency`` in flight at once.
+
+        Args:
+            texts: The texts to classify.
+            max_concurrency: Maximum number of texts classified at once. Defaults to
+                ``settings.max_concurrency``.
+            max_candidates: The maximum number of candidates to return per text.
+            return_exceptions: Whether to return a failed text's exception in its slot
+                instead of raising it.
+
+        Returns:
+            The classification results, in the same order as ``texts``. Each result's
+            metadata also records how long the text waited for a concurrency slot.
+        """
+        if not texts:
+            return []
+        start_time = time.perf_counter()
+        semaphore = asyncio.Semaphore(max_concurrency or settings.max_concurrency)
+        # Warm the embedding cache so the narrowing stage never embeds a query on its own
+        with tracer.span(Stage.QUERY_EMBEDDING):
+            await asyncio.to_thread(self.embedding_service.embed_texts, list(texts))
+        embedding_time_ms = (time.perf_counter() - start_time) * 1000
+        self.logger.info(f"Embedded {len(texts)} queries in {embedding_time_ms:.1f}ms")
+
+        async def classify_one(text: str) -> ClassificationResult:
+            queued_at = time.perf_counter()
+            async with semaphore:
+                queue_time_ms = (time.perf_counter() - queued_at) * 1000
+                result = await self.aclassify(text, max_candidates)
+            result.metadata[C.QUEUE_TIME_MS] = queue_time_ms
+            return result
+
+        results = await asyncio.gather(*(classify_one(text) for text in texts), return_exceptions=return_exceptions)
+        total_time_ms = (time.perf_counter() - start_time) * 1000
+        self.logger.success(f"Classified {len(texts)} texts in {total_time_ms:.1f}ms")
+        return list(results)
+
+    def classify_batch(
+        self,
+        texts: list[str],
+        max_concurrency: int | None = None,
+        max_candidates: int | None = None,
+        return_exceptions: bool = False,
+    ) -> list[ClassificationResult | BaseException]:
+        """Classify many texts concurrently from synchronous code.
+
+        Runs aclassify_batch on a new event loop, so it must not be called from
+        inside a running loop; await aclassify_batch there instead.
+
+        Args:
+            texts: The texts to classify.
+            max_concurrency: Maximum number of texts classified at once. Defaults to
+                ``settings.max_concurrency``.
+            max_candidates: The maximum number of candidates to return per text.
+            return_exceptions: Whether to return a failed text's exception in its slot
+                instead of raising it.
+
+        Returns:
+            The classification results, in the same order as ``texts``.
+        """
+        return asyncio.run(self.aclassify_batch(texts, max_concurrency, max_candidates, return_exceptions))
+
+    def _embed_query(self, text: str) -> list[float]:
+        """Embed a query text, traced as the query embedding stage.
+
+        Args:
+            text: The text to embed.
+
+        Returns:
+            The embedding of the text.
+        """
+        with tracer.span(Stage.QUERY_EMBEDDING):
+            return self.embedding_service.embed_text(text)
+
+    def _get_cached_result(
+        self, text: str, max_candidates: int | None, start_time: float
+    ) -> ClassificationResult | None:
+        """Look up a cached result for a text.
+
+        The cache is emptied first if the categories file or embedding model changed
+        since it was filled, and the categories are reloaded on the next lookup.
+
+        Args:
+            text: The text to classify.
+            max_candidates: The maximum number of candidates to return.
+            start_time: When classification of this text started, from ``time.perf_counter``.
+
+        Returns:
+            A copy of the cached result with this call's timing and cache counters in
+            its metadata, or None on a miss or when the cache is disabled.
+        """
+        if self.result_cache is None:
+            return None
+        if self.result_cache.validate(self._cache_fingerprint()):
+            self.category_loader = CategoryLoader()
+            self._categories_cache = []
+        cached, status = self.result_cache.get(text, max_candidates, lambda: self._embed_query(text))
+        if cached is None:
+            return None
+        processing_time_ms = (time.perf_counter() - start_time) * 1000
+        self.logger.success(f"Selected: {cached.category.path} (result cache {status}, {processing_time_ms:.1f}ms)")
+        metadata = {
+            **cached.metadata,
+            C.RESULT_CACHE_STATUS: status,
+            C.RESULT_CACHE: self.result_cache.stats.as_dict(),
+        }
+        return cached.model_copy(update={"processing_time_ms": processing_time_ms, "metadata": metadata})
+
+    @staticmethod
+    def _cache_fingerprint() -> tuple:
+        """Get the values cached results depend on.
+
+        The categories file is identified by its path, modification time and size,
+        so rewriting it in place invalidates the cache.
+
+        Returns:
+            The categories file path and version, and the embedding model.
+        """
+        path = Path(settings.categories_file_path)
+        try:
+            stat = path.stat()
+            version = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            version = None
+        return (str(path), version, settings.embedding_model)
+
+    def _cache_result(self, text: str, max_candidates: int | None, result: ClassificationResult) -> None:
+        """Store a freshly computed result in the result cache.
+
+        Args:
+            text: The classified text.
+            max_candidates: The maximum number of candidates the result was limited to.
+            result: The classification result. Its metadata gains the cache counters.
+        """
+        if self.result_cache is None:
+            return
+        embedding = self._embed_query(text) if self.result_cache.semantic else None
+        # Cache a copy so later changes to this result's metadata don't leak into cache hits
+        cached = result.model_copy(update={"metadata": dict(result.metadata)})
+        self.result_cache.put(text, cached, max_candidates, embedding)
+        result.metadata[C.RESULT_CACHE_STATUS] = C.MISS
+        result.metadata[C.RESULT_CACHE] = self.result_cache.stats.as_dict()
+
+    def _build_result(
+        self,
+        categories: list[Category],
+        narrowing_results: dict,
+        narrowed_categories: list[Category],
+        selected_category: Category,
+        start_time: float,
+        narrowing_time_ms: float,
+        selection_time_ms: float,
+        expansion: BackgroundExpansion | None = None,
+    ) -> ClassificationResult:
+        """Assemble the classification result and its timing metadata.
+
+        Args:
+            categories: All categories considered.
+            narrowing_results: The stage results from the narrower.
+            narrowed_categories: The final candidates offered to the selector.
+            selected_category: The selected category.
+            start_time: When classification of this text started, from ``time.perf_counter``.
+            narrowing_time_ms: Time spent narrowing.
+            selection_time_ms: Time spent selecting.
+            expansion: The query expansion that ran alongside narrowing, if any. Its own
+                duration, the time spent blocked on it, and the time it overlapped with
+                other stages are added to the metadata.
+
+        Returns:
+            The classification result.
+        """
+        processing_time_ms = (time.perf_counter() - start_time) * 1000
         self.logger.success(f"Selected: {selected_category.path} (total: {processing_time_ms:.1f}ms)")
 
+        metadata = {
+            C.TOTAL_CATEGORIES: len(categories),
+            C.NARROWED_TO: len(narrowed_categories),
+            C.NARROWING_TIME_MS: narrowing_time_ms,
+            C.SELECTION_TIME_MS: selection_time_ms,
+            C.NARROWING_STRATEGY: settings.narrowing_strategy.value,
+            C.VECTOR_STORE_ENABLED: self.embedding_service.vector_store is not None,
+            C.TYPE_BUILDER_CACHE: type_builder_cache.stats.as_dict(),
+        }
+        if expansion:
+            metadata[C.EXPANSION_TIME_MS] = expansion.time_ms
+            metadata[C.EXPANSION_WAIT_MS] = expansion.wait_ms
+            metadata[C.EXPANSION_OVERLAP_MS] = expansion.overlap_ms
+
         return ClassificationResult(
             category=selected_category,
             candidates=narrowed_categories,
             processing_time_ms=processing_time_ms,
-            metadata={
-                C.TOTAL_CATEGORIES: len(categories),
-                C.NARROWED_TO: len(narrowed_categories),
-                C.NARROWING_TIME_MS: narrowing_time_ms,
-                C.SELECTION_TIME_MS: selection_time_ms,
-                C.NARROWING_STRATEGY: settings.narrowing_strategy.value,
-                C.VECTOR_STORE_ENABLED: self.embedding_service.vector_store is not None,
-            },
+            metadata=metadata,
             embedding_candidates=narrowing_results.get("embedding_candidates", []),
             llm_candidates=narrowing_results.get("llm_candidates", []),
         )
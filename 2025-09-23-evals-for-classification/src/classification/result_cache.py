@@ -0,0 +1,300 @@
+"""In-memory LRU/TTL cache of classification results."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.classification.category_index import Embedding, normalize_embeddings
+from src.data.models import ClassificationResult
+from src.shared import constants as C
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a query so trivially different phrasings share a cache entry.
+
+    Args:
+        text: The query text.
+
+    Returns:
+        The lower-cased text with runs of whitespace collapsed.
+    """
+    return " ".join(text.lower().split())
+
+
+# Candidate limit codes in the per-slot limit array
+_NO_LIMIT = -1
+_FREE_SLOT = -2
+
+
+def _limit_code(max_candidates: int | None) -> int:
+    """Encode a candidate limit for the per-slot limit array."""
+    return _NO_LIMIT if max_candidates is None else max_candidates
+
+
+@dataclass
+class _Entry:
+    """A cached result, when it was stored, and its row in the embedding matrix."""
+
+    result: ClassificationResult
+    created_at: float
+    slot: int | None = None
+
+
+@dataclass
+class ResultCacheStats:
+    """Counters describing how the result cache has been used."""
+
+    hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters keyed by their metadata names."""
+        return {
+            C.HITS: self.hits,
+            C.SEMANTIC_HITS: self.semantic_hits,
+            C.MISSES: self.misses,
+            C.EVICTIONS: self.evictions,
+            C.EXPIRATIONS: self.expirations,
+            C.INVALIDATIONS: self.invalidations,
+        }
+
+
+class ResultCache:
+    """LRU cache of classification results keyed by normalized query text.
+
+    Entries expire ``ttl_seconds`` after they were stored, and the least recently
+    used entry is evicted once ``max_size`` entries are held. With a
+    ``similarity_threshold``, a query that misses on text can still reuse the result
+    of a cached query whose embedding has at least that cosine similarity.
+
+    Query embeddings live in a preallocated matrix with one row per slot, so a
+    semantic lookup is a single matrix-vector product. Expired entries are dropped
+    from the least recently used end as lookups reach them.
+
+    The cache belongs to one configuration: ``validate`` drops every entry when the
+    fingerprint (categories file version and embedding model) it was filled under
+    changes.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, similarity_threshold: float | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached results.
+            ttl_seconds: How long a result stays valid. Zero or less disables expiry.
+            similarity_threshold: Minimum cosine similarity for a semantic hit. None
+                disables semantic hits.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.stats = ResultCacheStats()
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._fingerprint: tuple | None = None
+        self._lock = threading.Lock()
+        # Embedding slots: allocated on the first embedding, since its dimension is unknown until then
+        self._matrix: np.ndarray | None = None
+        self._slot_keys: list[tuple | None] = [None] * max_size
+        self._slot_limits = np.full(max_size, _FREE_SLOT, dtype=np.int64)
+        self._slot_created = np.zeros(max_size)
+        self._free_slots: list[int] = []
+        self._used_slots = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached results."""
+        return len(self._entries)
+
+    @property
+    def semantic(self) -> bool:
+        """Whether semantic hits are enabled."""
+        return self.similarity_threshold is not None
+
+    def validate(self, fingerprint: tuple) -> bool:
+        """Drop every entry if the configuration the cache was filled under has changed.
+
+        Args:
+            fingerprint: Values that cached results depend on.
+
+        Returns:
+            Whether a previously validated fingerprint changed.
+        """
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return False
+            if self._entries:
+                self._clear()
+                self.stats.invalidations += 1
+            changed = self._fingerprint is not None
+            self._fingerprint = fingerprint
+            return changed
+
+    def get(
+        self,
+        text: str,
+        max_candidates: int | None = None,
+        embed: Callable[[], Embedding] | None = None,
+    ) -> tuple[ClassificationResult | None, str]:
+        """Look up a cached result.
+
+        Args:
+            text: The query text.
+            max_candidates: The candidate limit the result must have been produced with.
+            embed: Returns the query embedding. Only called for semantic lookups after
+                the text itself misses, so exact hits never pay for an embedding.
+
+        Returns:
+            The cached result (or None) and the lookup status: ``hit``,
+            ``semantic_hit`` or ``miss``.
+        """
+        key = (normalize_query(text), max_candidates)
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry, now):
+                self._remove(key)
+                self.stats.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry.result, C.HIT
+            if not self.semantic or embed is None or not self._entries:
+                self.stats.misses += 1
+                return None, C.MISS
+        query = normalize_embeddings(embed())
+        with self._lock:
+            similar_key = self._most_similar(query, max_candidates, time.monotonic())
+            if similar_key is None:
+                self.stats.misses += 1
+                return None, C.MISS
+            self._entries.move_to_end(similar_key)
+            self.stats.semantic_hits += 1
+            return self._entries[similar_key].result, C.SEMANTIC_HIT
+
+    def put(
+        self,
+        text: str,
+        result: ClassificationResult,
+        max_candidates: int | None = None,
+        embedding: Embedding | None = None,
+    ) -> None:
+        """Store a result.
+
+        Args:
+            text: The query text.
+            result: The classification result.
+            max_candidates: The candidate limit the result was produced with.
+            embedding: The query embedding, kept for semantic hits.
+        """
+        key = (normalize_query(text), max_candidates)
+        vector = normalize_embeddings(embedding) if self.semantic and embedding is not None else None
+        with self._lock:
+            now = time.monotonic()
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and len(self._entries) >= self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+            slot = self._claim_slot(key, vector, now) if vector is not None else None
+            self._entries[key] = _Entry(result, now, slot)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        """Drop every entry and embedding slot. Must be called with the lock held."""
+        self._entries.clear()
+        self._matrix = None
+        self._slot_keys = [None] * self.max_size
+        self._slot_limits.fill(_FREE_SLOT)
+        self._free_slots.clear()
+        self._used_slots = 0
+
+    def _is_expired(self, entry: _Entry, now: float) -> bool:
+        """Whether an entry has outlived the TTL."""
+        return self.ttl_seconds > 0 and now - entry.created_at > self.ttl_seconds
+
+    def _expire(self, now: float) -> None:
+        """Drop expired entries from the least recently used end. Must be called with the lock held.
+
+        Stops at the first live entry, so a lookup costs nothing when nothing has expired.
+        Expired entries further along are dropped when a lookup reaches them or they
+        are evicted.
+
+        Args:
+            now: The current ``time.monotonic()`` reading.
+        """
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if not self._is_expired(entry, now):
+                return
+            self._remove(key)
+            self.stats.expirations += 1
+
+    def _remove(self, key: tuple) -> None:
+        """Drop an entry and free its embedding slot. Must be called with the lock held."""
+        entry = self._entries.pop(key)
+        if entry.slot is not None:
+            self._slot_keys[entry.slot] = None
+            self._slot_limits[entry.slot] = _FREE_SLOT
+            self._free_slots.append(entry.slot)
+
+    def _claim_slot(self, key: tuple, vector: np.ndarray, now: float) -> int:
+        """Store an embedding in a free row of the matrix. Must be called with the lock held.
+
+        Args:
+            key: The entry's key.
+            vector: The normalized query embedding.
+            now: When the entry was stored.
+
+        Returns:
+            The row the embedding was written to.
+        """
+        if self._matrix is None:
+            self._matrix = np.zeros((self.max_size, len(vector)), dtype=np.float32)
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = self._used_slots
+            self._used_slots += 1
+        self._matrix[slot] = vector
+        self._slot_keys[slot] = key
+        self._slot_limits[slot] = _limit_code(key[1])
+        self._slot_created[slot] = now
+        return slot
+
+    def _most_similar(self, query: np.ndarray, max_candidates: int | None, now: float) -> tuple | None:
+        """Find the cached query most similar to an embedding, if it clears the threshold.
+
+        Must be called with the lock held.
+
+        Args:
+            query: The normalized query embedding.
+            max_candidates: The candidate limit the result must have been produced with.
+            now: The current ``time.monotonic()`` reading. Expired entries never match.
+
+        Returns:
+            The key of the most similar entry, or None if none is similar enough.
+        """
+        if self._matrix is None:
+            return None
+        used = self._used_slots
+        usable = self._slot_limits[:used] == _limit_code(max_candidates)
+        if self.ttl_seconds > 0:
+            usable &= now - self._slot_created[:used] <= self.ttl_seconds
+        if not usable.any():
+            return None
+        scores = np.where(usable, self._matrix[:used] @ query, -np.inf)
+        best = int(np.argmax(scores))
+        return self._slot_keys[best] if scores[best] >= self.similarity_threshold else None
@@ -1,7 +1,9 @@
 """LLM-based final category selection using BAML."""
 
 from src.baml_client import b
+from src.baml_client.async_client import b as async_b
 from src.baml_client.type_builder import TypeBuilder
+from src.classification.type_builder_cache import type_builder_cache
 from src.data.models import Category
 
 
@@ -24,6 +26,36 @@ class CategorySelector:
             return candidates[0]
         tb = self._build_dynamic_enum(candidates)
         selected_name = b.PickBestCategory(text, baml_options={"tb": tb})
+        return self._match_selected_name(selected_name, candidates)
+
+    async def aselect_best_category(self, text: str, candidates: list[Category]) -> Category:
+        """Select the single best category from candidates using the async BAML client.
+
+        Args:
+            text: The text to classify.
+            candidates: The candidates to select from.
+
+        Returns:
+            The selected category.
+        """
+        if not candidates:
+            raise ValueError("No candidate categories provided")
+        if len(candidates) == 1:
+            return candidates[0]
+        tb = self._build_dynamic_enum(candidates)
+        selected_name = await async_b.PickBestCategory(text, baml_options={"tb": tb})
+        return self._match_selected_name(selected_name, candidates)
+
+    def _match_selected_name(self, selected_name: str, candidates: list[Category]) -> Category:
+        """Find the candidate the LLM selected.
+
+        Args:
+            selected_name: The category name returned by the LLM.
+            candidates: The candidates that were offered.
+
+        Returns:
+            The selected category.
+        """
         for category in candidates:
             if category.name == selected_name:
                 return category
@@ -33,17 +65,13 @@ class CategorySelector:
     def _build_dynamic_enum(self, categories: list[Category]) -> TypeBuilder:
         """Build BAML TypeBuilder for dynamic categories.
 
+        TypeBuilders are cached per ordered candidate set, so a recurring set is only
+        built once.
+
         Args:
             categories: The categories to build the TypeBuilder for.
 
         Returns:
             The TypeBuilder.
         """
-        tb = TypeBuilder()
-
-        for i, category in enumerate(categories):
-            val = tb.Category.add_value(category.name)
-            val.alias(f"k{i}")
-            val.description(category.llm_description)
-
-        return tb
+        return type_builder_cache.get(categories)
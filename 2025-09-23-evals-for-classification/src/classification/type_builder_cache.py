@@ -0,0 +1,120 @@
+"""Bounded cache of the dynamic Category enums offered to the LLM."""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.baml_client.type_builder import TypeBuilder
+from src.config.settings import settings
+from src.data.models import Category
+from src.shared import constants as C
+from src.shared.enums import Stage
+from src.shared.tracing import tracer
+
+
+def build_category_enum(categories: list[Category]) -> TypeBuilder:
+    """Build a TypeBuilder whose Category enum offers the given categories.
+
+    Each value is the category name, aliased ``k<position>`` and described by its
+    LLM description.
+
+    Args:
+        categories: The categories to offer, in order.
+
+    Returns:
+        The TypeBuilder.
+    """
+    tb = TypeBuilder()
+    for i, category in enumerate(categories):
+        val = tb.Category.add_value(category.name)
+        val.alias(f"k{i}")
+        val.description(category.llm_description)
+    return tb
+
+
+@dataclass
+class TypeBuilderCacheStats:
+    """Counters describing how the TypeBuilder cache has been used."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, int | float]:
+        """Return the counters keyed by their metadata names."""
+        return {
+            C.HITS: self.hits,
+            C.MISSES: self.misses,
+            C.EVICTIONS: self.evictions,
+            C.HIT_RATE: self.hit_rate,
+        }
+
+
+class TypeBuilderCache:
+    """LRU cache of prepared TypeBuilders keyed by the ordered candidate paths.
+
+    The same candidate sets recur across queries, so the enum offered to the LLM is
+    built once per distinct, ordered set and reused. A category's name and LLM
+    description are derived from its path, so the paths identify the enum. Cached
+    TypeBuilders are shared between calls and must not be modified.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached TypeBuilders. Zero or less disables the
+                cache, so every lookup builds a new TypeBuilder.
+        """
+        self.max_size = max_size
+        self.stats = TypeBuilderCacheStats()
+        self._entries: OrderedDict[tuple[str, ...], TypeBuilder] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached TypeBuilders."""
+        return len(self._entries)
+
+    def get(self, categories: list[Category]) -> TypeBuilder:
+        """Get the TypeBuilder offering the given categories, building it on a miss.
+
+        Args:
+            categories: The categories to offer, in order.
+
+        Returns:
+            The TypeBuilder.
+        """
+        key = tuple(category.path for category in categories)
+        with self._lock:
+            tb = self._entries.get(key)
+            if tb is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return tb
+            self.stats.misses += 1
+        # Build outside the lock so concurrent misses don't wait on each other
+        with tracer.span(Stage.TYPE_BUILDER):
+            tb = build_category_enum(categories)
+        if self.max_size <= 0:
+            return tb
+        with self._lock:
+            self._entries[key] = tb
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+        return tb
+
+    def clear(self) -> None:
+        """Drop every cached TypeBuilder."""
+        with self._lock:
+            self._entries.clear()
+
+
+type_builder_cache = TypeBuilderCache(settings.type_builder_cache_size)
@@ -1,25 +1,126 @@
 """ChromaDB vector store utilities for category similarity search."""
 
+import hashlib
+import json
 import pathlib
+import threading
 import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from typing import Any
 
-import chromadb
-import openai
-from chromadb.config import Settings as ChromaSettings
+import numpy as np
 
 from src.config.settings import settings
 from src.data.models import Category
 from src.shared import constants as C
+from src.shared.lazy import lazy_import
 from src.shared.logger import get_logger
 
+# Loaded on first use, so importing the pipeline doesn't pay for them
+chromadb = lazy_import("chromadb")
+openai = lazy_import("openai")
+
 VECTOR_STORE_PATH = pathlib.Path(__file__).parents[2] / C.DATA / C.VECTOR_STORE
 COLLECTION_NAME = C.CATEGORIES
+SYNC_BATCH_SIZE = 100  # Categories embedded (and written to the collection) per batch during sync
+
+
+def category_id(path: str) -> str:
+    """Get the stable collection document id for a category.
+
+    Args:
+        path: The category path.
+
+    Returns:
+        An id derived from the path, identical across runs and machines.
+    """
+    return f"cat_{hashlib.sha256(path.encode('utf-8')).hexdigest()[:16]}"
+
+
+def category_metadata(category: Category) -> dict[str, Any]:
+    """Get the collection metadata stored for a category.
+
+    Args:
+        category: The category.
+
+    Returns:
+        The metadata dict.
+    """
+    return {
+        C.PATH: category.path,
+        C.NAME: category.name,
+        C.LEVEL: category.level,
+        C.LLM_DESCRIPTION: category.llm_description,
+    }
+
+
+@dataclass
+class SyncReport:
+    """What a vector store sync changed."""
+
+    added: int = 0
+    changed: int = 0  # Embedding text changed, so the category was re-embedded
+    updated: int = 0  # Only name or description changed, so only metadata was rewritten
+    rekeyed: int = 0  # Stored under a legacy id, moved to the stable id without re-embedding
+    removed: int = 0
+    unchanged: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def embedded(self) -> int:
+        """Number of categories sent to the embeddings API."""
+        return self.added + self.changed
+
+
+def snapshot_fingerprint(ids: list[str], documents: list[str]) -> str:
+    """Get a fingerprint of a collection's contents for validating the embedding snapshot.
+
+    Args:
+        ids: Collection document ids.
+        documents: The documents (embedding texts), one per id.
+
+    Returns:
+        A hash of the (id, document) pairs, independent of their order.
+    """
+    digest = hashlib.sha256()
+    for doc_id, document in sorted(zip(ids, documents)):
+        digest.update(f"{doc_id}\0{document}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def write_embedding_snapshot(
+    ids: list[str], paths: list[str], embeddings: list[list[float]] | np.ndarray, fingerprint: str
+) -> pathlib.Path:
+    """Write category embeddings to the sidecar snapshot loaded by CategoryVectorStore.
+
+    The matrix is saved as a float32 ``.npy`` file so it can be memory-mapped, next to a
+    JSON index holding the document ids, category paths, embedding model and the
+    collection fingerprint the snapshot was taken from.
+
+    Args:
+        ids: Collection document ids, one per row.
+        paths: Category paths, one per row.
+        embeddings: The embedding matrix.
+        fingerprint: ``snapshot_fingerprint`` of the whole collection.
+
+    Returns:
+        The path of the written matrix file.
+    """
+    matrix_path = VECTOR_STORE_PATH / C.EMBEDDINGS_SNAPSHOT_NPY
+    np.save(matrix_path, np.asarray(embeddings, dtype=np.float32))
+    index = {C.EMBEDDING_MODEL: settings.embedding_model, C.IDS: ids, C.PATHS: paths, C.FINGERPRINT: fingerprint}
+    (VECTOR_STORE_PATH / C.EMBEDDINGS_SNAPSHOT_JSON).write_text(json.dumps(index), encoding="utf-8")
+    return matrix_path
 
 
 class CategoryVectorStore:
     """Interface to the ChromaDB vector store for category similarity search."""
 
+    _shared: "CategoryVectorStore | None" = None
+    _shared_path: pathlib.Path | None = None
+    _shared_lock = threading.Lock()
+
     def __init__(self, auto_create: bool = False) -> None:
         """Initialize the CategoryVectorStore.
 
@@ -30,14 +131,43 @@ class CategoryVectorStore:
         self.collection = None
         self.openai_client = openai.OpenAI(api_key=settings.openai_api_key)
         self._category_cache = {}  # Cache path -> id mapping
+        self._embeddings: dict[str, np.ndarray] = {}  # Cache path -> embedding (rows of one float32 matrix)
         self.logger = get_logger(__name__)
         self._load_vector_store(auto_create)
 
+    @classmethod
+    def shared(cls, auto_create: bool = False) -> "CategoryVectorStore":
+        """Get the process-wide vector store, opening it on first use.
+
+        Every component of the pipeline shares this instance, so the ChromaDB client and
+        the in-memory embedding cache are only built once per process (or again if
+        ``VECTOR_STORE_PATH`` changes).
+
+        Args:
+            auto_create: Whether to create the vector store if it doesn't exist.
+
+        Returns:
+            The shared CategoryVectorStore.
+        """
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared_path != VECTOR_STORE_PATH:
+                cls._shared = None
+                cls._shared = cls(auto_create=auto_create)
+                cls._shared_path = VECTOR_STORE_PATH
+            return cls._shared
+
+    @classmethod
+    def reset_shared(cls) -> None:
+        """Drop the process-wide vector store so the next ``shared()`` call reopens it."""
+        with cls._shared_lock:
+            cls._shared = None
+            cls._shared_path = None
+
     @staticmethod
     def is_available() -> bool:
         """Check if the vector store is available."""
         try:
-            store = CategoryVectorStore()
+            store = CategoryVectorStore.shared()
             return store.collection is not None
         except (FileNotFoundError, ValueError):
             return False
@@ -56,9 +186,11 @@ class CategoryVectorStore:
                     f"Vector store not found at {VECTOR_STORE_PATH}. "
                     "Please run 'python scripts/build_vector_store.py' first."
                 )
+        # Reach the settings through the package: ``from chromadb.config import ...`` on the
+        # not-yet-loaded package would execute chromadb.config twice and yield two Settings classes
         self.client = chromadb.PersistentClient(
             path=str(VECTOR_STORE_PATH),
-            settings=ChromaSettings(anonymized_telemetry=False, is_persistent=True),
+            settings=chromadb.config.Settings(anonymized_telemetry=False, is_persistent=True),
         )
         try:
             self.collection = self.client.get_collection(COLLECTION_NAME)
@@ -102,13 +234,94 @@ class CategoryVectorStore:
         )
 
     def _build_category_cache(self) -> None:
-        """Build cache of existing categories for fast lookup."""
+        """Build cache of existing categories and their embeddings for fast lookup.
+
+        Embeddings are loaded once into a memory-resident float32 matrix, memory-mapped from
+        the snapshot written by ``scripts/build_vector_store.py`` when it matches the
+        collection, or fetched with a single bulk ``collection.get`` otherwise.
+        """
         if self.collection is None:
             return
-        results = self.collection.get()
-        for doc_id, metadata in zip(results[C.IDS], results[C.METADATA]):
+        if self._load_embedding_snapshot():
+            return
+        results = self.collection.get(include=[C.METADATA, C.EMBEDDINGS])
+        paths: list[str] = []
+        rows: list[int] = []
+        for row, (doc_id, metadata) in enumerate(zip(results[C.IDS], results[C.METADATA])):
             if metadata and C.PATH in metadata:
                 self._category_cache[metadata[C.PATH]] = doc_id
+                paths.append(metadata[C.PATH])
+                rows.append(row)
+        embeddings = results.get(C.EMBEDDINGS)
+        if embeddings is not None and len(embeddings) == len(results[C.IDS]) and rows:
+            matrix = np.asarray(embeddings, dtype=np.float32)[rows]
+            self._embeddings = dict(zip(paths, matrix))
+
+    def _load_embedding_snapshot(self) -> bool:
+        """Memory-map the embedding snapshot if it is present and matches the collection.
+
+        The snapshot matches when it was taken with the current embedding model from a
+        collection with the same ids and documents (compared by fingerprint).
+
+        Returns:
+            True if the snapshot was loaded, False otherwise.
+        """
+        matrix_path = VECTOR_STORE_PATH / C.EMBEDDINGS_SNAPSHOT_NPY
+        index_path = VECTOR_STORE_PATH / C.EMBEDDINGS_SNAPSHOT_JSON
+        if self.collection is None or not matrix_path.exists() or not index_path.exists():
+            return False
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+            matrix = np.load(matrix_path, mmap_mode="r")
+            ids, paths = index[C.IDS], index[C.PATHS]
+            if (
+                index.get(C.EMBEDDING_MODEL) != settings.embedding_model
+                or len(paths) != len(ids)
+                or matrix.shape[0] != len(ids)
+                or index.get(C.FINGERPRINT) != self._fingerprint()
+            ):
+                self.logger.info("Embedding snapshot is stale, loading embeddings from the collection")
+                return False
+        except Exception as e:
+            self.logger.warning(f"Failed to load embedding snapshot: {e}")
+            return False
+        self._category_cache.update(zip(paths, ids))
+        self._embeddings = dict(zip(paths, matrix))
+        return True
+
+    def save_embedding_snapshot(self) -> pathlib.Path:
+        """Write all collection embeddings to a sidecar ``.npy`` file for memory-mapped loading.
+
+        Returns:
+            The path of the written matrix file.
+        """
+        if self.collection is None:
+            raise RuntimeError("Vector store not loaded")
+        results = self.collection.get(include=[C.METADATA, C.DOCUMENTS, C.EMBEDDINGS])
+        ids: list[str] = []
+        paths: list[str] = []
+        rows: list[int] = []
+        for row, (doc_id, metadata) in enumerate(zip(results[C.IDS], results[C.METADATA])):
+            if metadata and C.PATH in metadata:
+                ids.append(doc_id)
+                paths.append(metadata[C.PATH])
+                rows.append(row)
+        embeddings = np.asarray(results[C.EMBEDDINGS], dtype=np.float32)[rows]
+        return write_embedding_snapshot(
+            ids, paths, embeddings, snapshot_fingerprint(results[C.IDS], results[C.DOCUMENTS])
+        )
+
+    def _fingerprint(self) -> str:
+        """Get the collection's current ``snapshot_fingerprint`` (fetches ids and documents only)."""
+        if self.collection is None:
+            raise RuntimeError("Vector store not loaded")
+        results = self.collection.get(include=[C.DOCUMENTS])
+        return snapshot_fingerprint(results[C.IDS], results[C.DOCUMENTS])
+
+    def _discard_embedding_snapshot(self) -> None:
+        """Delete the embedding snapshot, so no later process loads embeddings it doesn't hold."""
+        for name in (C.EMBEDDINGS_SNAPSHOT_JSON, C.EMBEDDINGS_SNAPSHOT_NPY):
+            (VECTOR_STORE_PATH / name).unlink(missing_ok=True)
 
     def find_similar_categories(
         self,
@@ -152,12 +365,42 @@ class CategoryVectorStore:
         """
         if self.collection is None or category_path not in self._category_cache:
             return None
+        embedding = self._embeddings.get(category_path)
+        if embedding is not None:
+            return embedding.tolist()
         doc_id = self._category_cache[category_path]
         result = self.collection.get(ids=[doc_id], include=[C.EMBEDDINGS])
         if result[C.EMBEDDINGS] is not None and len(result[C.EMBEDDINGS]) > 0:
             return result[C.EMBEDDINGS][0]
         return None
 
+    def get_cached_embeddings(self, category_paths: list[str]) -> list[np.ndarray | None]:
+        """Get cached embeddings for several categories.
+
+        Embeddings loaded at open are served from memory; any other known categories are
+        fetched from the collection in a single request.
+
+        Args:
+            category_paths: The category paths to look up.
+
+        Returns:
+            One float32 embedding (or None if not cached) per path, in the same order.
+        """
+        if self.collection is None:
+            return [None] * len(category_paths)
+        embeddings = [self._embeddings.get(path) for path in category_paths]
+        missing_ids = {
+            self._category_cache[path]: i
+            for i, (path, embedding) in enumerate(zip(category_paths, embeddings))
+            if embedding is None and path in self._category_cache
+        }
+        if missing_ids:
+            result = self.collection.get(ids=list(missing_ids), include=[C.EMBEDDINGS])
+            fetched = result[C.EMBEDDINGS] if result[C.EMBEDDINGS] is not None else []
+            for doc_id, embedding in zip(result[C.IDS], fetched):
+                embeddings[missing_ids[doc_id]] = np.asarray(embedding, dtype=np.float32)
+        return embeddings
+
     def add_category(self, category: Category, embedding: list[float]) -> str:
         """Add a new category to the vector store.
 
@@ -170,24 +413,139 @@ class CategoryVectorStore:
         """
         if self.collection is None:
             raise RuntimeError("Vector store not loaded")
-        doc_id = f"cat_{int(time.time() * 1000)}_{hash(category.path) % 10000}"
-        self.collection.add(
+        doc_id = category_id(category.path)
+        self.collection.upsert(
             embeddings=[embedding],
             documents=[category.embedding_text],
-            metadatas=[
-                {
-                    C.PATH: category.path,
-                    C.NAME: category.name,
-                    C.LLM_DESCRIPTION: category.llm_description,
-                    C.CREATED_AT: time.strftime("%Y-%m-%d %H:%M:%S"),
-                }
-            ],
+            metadatas=[{**category_metadata(category), C.CREATED_AT: time.strftime("%Y-%m-%d %H:%M:%S")}],
             ids=[doc_id],
         )
         self._category_cache[category.path] = doc_id
+        self._embeddings[category.path] = np.asarray(embedding, dtype=np.float32)
+        # An upsert can replace an embedding without changing the ids or documents, which
+        # the snapshot fingerprint wouldn't notice
+        self._discard_embedding_snapshot()
 
         return doc_id
 
+    def sync_categories(
+        self,
+        categories: list[Category],
+        embed: Callable[[list[str]], list[list[float]]],
+        batch_size: int = SYNC_BATCH_SIZE,
+    ) -> SyncReport:
+        """Bring the collection in line with a category list, embedding as little as possible.
+
+        Categories are matched by path. Only categories that are new or whose embedding
+        text changed are embedded. Removed categories are deleted. Categories whose name
+        or description changed only get their metadata rewritten. Documents stored
+        under legacy (time-based or positional) ids are moved to the stable
+        ``category_id`` with their existing embedding. The embedding snapshot is
+        rewritten afterwards.
+
+        Args:
+            categories: The categories the collection should hold.
+            embed: Embeds a batch of texts.
+            batch_size: Number of categories embedded per ``embed`` call.
+
+        Returns:
+            Counts of what changed and the elapsed time.
+        """
+        if self.collection is None:
+            raise RuntimeError("Vector store not loaded")
+        start = time.time()
+        report = SyncReport()
+        stored, stale_ids = self._stored_documents()
+        wanted = {category.path: category for category in categories}
+        to_embed: list[Category] = []
+        to_rekey: dict[str, Category] = {}
+        to_update: list[Category] = []
+        for path, category in wanted.items():
+            if path not in stored:
+                report.added += 1
+                to_embed.append(category)
+                continue
+            doc_id, document, metadata = stored[path]
+            if document != category.embedding_text:
+                report.changed += 1
+                to_embed.append(category)
+            elif doc_id != category_id(path):
+                report.rekeyed += 1
+                to_rekey[doc_id] = category
+            elif any(metadata.get(key) != value for key, value in category_metadata(category).items()):
+                report.updated += 1
+                to_update.append(category)
+            else:
+                report.unchanged += 1
+            if doc_id != category_id(path):
+                stale_ids.append(doc_id)
+        removed = [stored[path][0] for path in stored.keys() - wanted.keys()]
+        report.removed = len(removed)
+
+        if to_rekey:
+            result = self.collection.get(ids=list(to_rekey), include=[C.EMBEDDINGS])
+            self._upsert([to_rekey[doc_id] for doc_id in result[C.IDS]], list(result[C.EMBEDDINGS]))
+        for batch_start in range(0, len(to_embed), batch_size):
+            batch = to_embed[batch_start : batch_start + batch_size]
+            self._upsert(batch, embed([category.embedding_text for category in batch]))
+            self.logger.info(f"Embedded {batch_start + len(batch)}/{len(to_embed)} categories")
+        if to_update:
+            self.collection.update(
+                ids=[category_id(category.path) for category in to_update],
+                metadatas=[category_metadata(category) for category in to_update],
+            )
+        if stale_ids or removed:
+            self.collection.delete(ids=stale_ids + removed)
+
+        self._category_cache.clear()
+        self._embeddings.clear()
+        self.save_embedding_snapshot()
+        self._build_category_cache()
+        report.elapsed_s = time.time() - start
+        return report
+
+    def _stored_documents(self) -> tuple[dict[str, tuple[str, str, dict]], list[str]]:
+        """Get the collection's documents keyed by category path.
+
+        Returns:
+            Mapping of path to (id, document, metadata), keeping one entry per path
+            (preferably the one under its stable id), and the ids of every other
+            entry, which should be deleted.
+        """
+        if self.collection is None:
+            raise RuntimeError("Vector store not loaded")
+        existing = self.collection.get(include=[C.METADATA, C.DOCUMENTS])
+        stored: dict[str, tuple[str, str, dict]] = {}
+        stale_ids: list[str] = []
+        for doc_id, document, metadata in zip(existing[C.IDS], existing[C.DOCUMENTS], existing[C.METADATA]):
+            path = (metadata or {}).get(C.PATH)
+            if path is None:
+                stale_ids.append(doc_id)
+                continue
+            if path in stored:
+                if doc_id != category_id(path):
+                    stale_ids.append(doc_id)
+                    continue
+                stale_ids.append(stored[path][0])
+            stored[path] = (doc_id, document, metadata)
+        return stored, stale_ids
+
+    def _upsert(self, categories: list[Category], embeddings: list[list[float]] | np.ndarray) -> None:
+        """Write categories and their embeddings under their stable ids.
+
+        Args:
+            categories: The categories to write.
+            embeddings: One embedding per category.
+        """
+        if self.collection is None or not categories:
+            return
+        self.collection.upsert(
+            ids=[category_id(category.path) for category in categories],
+            embeddings=[np.asarray(embedding, dtype=np.float32).tolist() for embedding in embeddings],
+            documents=[category.embedding_text for category in categories],
+            metadatas=[category_metadata(category) for category in categories],
+        )
+
     def has_category(self, category_path: str) -> bool:
         """Check if a category exists in the vector store.
 
@@ -5,7 +5,7 @@ import pathlib
 from pydantic_settings import BaseSettings
 
 from src.shared import constants as C
-from src.shared.enums import NarrowingStrategy
+from src.shared.enums import NarrowingStrategy, SearchBackend
 
 CWD = pathlib.Path(__file__).parent
 
@@ -22,10 +22,25 @@ class Settings(BaseSettings):
     # Hybrid narrowing specific settings
     max_embedding_candidates: int = 100  # How many categories embedding stage returns
     max_final_categories: int = 25  # How many categories LLM stage returns
+    # Hierarchical narrowing specific settings
+    hierarchical_beam_width: int = 8  # How many subtrees the embedding stage descends into per level
+    # Embedding search
+    search_backend: SearchBackend = SearchBackend.CHROMA
+    ann_nprobe: int = 16  # How many IVF lists an approximate search scans
+    # Result cache
+    result_cache_size: int = 0  # How many classification results to keep (0 disables the cache)
+    result_cache_ttl_seconds: float = 3600  # How long a cached result stays valid (0 never expires)
+    result_cache_similarity_threshold: float | None = None  # Cosine similarity for reusing a similar query's result
+    # TypeBuilder cache
+    type_builder_cache_size: int = 256  # How many candidate sets keep a prepared LLM enum (0 disables the cache)
+    # Batch classification
+    max_concurrency: int = 8  # How many texts classify_batch runs through the LLM stages at once
     # Data
     categories_file_path: pathlib.Path = CWD.parents[1] / C.DATA / C.CATEGORIES_TXT
+    taxonomy_snapshot_path: pathlib.Path = CWD.parents[1] / C.DATA / C.TAXONOMY_SNAPSHOT_BIN  # Used when fresh
     # Expanded text
     expand_user_query: bool = False
+    expand_query_for_narrowing: bool = False  # Also give the expanded query to the LLM narrowing stage
 
     # Config
     class Config:
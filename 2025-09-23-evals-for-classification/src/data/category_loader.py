@@ -3,7 +3,9 @@
 from pathlib import Path
 
 from src.config.settings import settings
+from src.data.category_table import CategoryTable
 from src.data.models import Category
+from src.data.taxonomy_snapshot import TaxonomySnapshot
 from src.shared.logger import get_logger
 
 
@@ -14,6 +16,7 @@ class CategoryLoader:
         """Initialize the category loader."""
         self._categories: list[Category] = []
         self._loaded = False
+        self._table: CategoryTable | None = None
         self.logger = get_logger(__name__)
 
     def load_categories(self) -> list[Category]:
@@ -29,6 +32,46 @@ class CategoryLoader:
         self._loaded = True
         return self._categories
 
+    def load_snapshot(self) -> TaxonomySnapshot | None:
+        """Load the binary taxonomy snapshot if it was built from the current categories file.
+
+        Build it with ``python scripts/build_vector_store.py --snapshot``.
+
+        Returns:
+            The snapshot, or None if it is missing or stale.
+        """
+        return TaxonomySnapshot.shared(Path(settings.taxonomy_snapshot_path), Path(settings.categories_file_path))
+
+    def load_table(self) -> CategoryTable:
+        """Load categories from configured source into a compact columnar table.
+
+        Use this instead of ``load_categories`` for very large taxonomies: rows are
+        views over interned path segments, and descriptions are formatted on access.
+        When the taxonomy snapshot is fresh, its memory-mapped table is returned.
+
+        Returns:
+            The category table.
+        """
+        if self._table is not None:
+            return self._table
+        snapshot = self.load_snapshot()
+        if snapshot is not None:
+            self._table = snapshot.table
+            return self._table
+        table = CategoryTable()
+        with open(Path(settings.categories_file_path), "r", encoding="utf-8") as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    table.append(line)
+                except Exception as e:
+                    self.logger.warning(f"Failed to parse line {line_num}: {line} - {e}")
+        table.freeze()
+        self._table = table
+        return self._table
+
     def _parse_category_file(self, file_path: Path) -> list[Category]:
         """Parse category.txt into Category objects.
 
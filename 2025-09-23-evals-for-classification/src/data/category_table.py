@@ -0,0 +1,309 @@
+"""Compact columnar category storage for large taxonomies."""
+
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+
+from src.data.models import Category
+
+NO_PARENT = -1
+
+
+class CategoryRow:
+    """Lightweight view of one row of a CategoryTable.
+
+    Exposes the same attributes as ``Category``. Strings are built from the table's
+    interned segments on access, so a view costs two slots instead of four strings.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "CategoryTable", row: int) -> None:
+        """Initialize the view.
+
+        Args:
+            table: The table holding the row.
+            row: The row index.
+        """
+        self._table = table
+        self._row = row
+
+    def __repr__(self) -> str:
+        """Return a debugging representation."""
+        return f"CategoryRow({self._row}, {self.path!r})"
+
+    def __eq__(self, other: object) -> bool:
+        """Rows are equal when they are the same row of the same table."""
+        return isinstance(other, CategoryRow) and self._table is other._table and self._row == other._row
+
+    def __hash__(self) -> int:
+        """Hash by table identity and row index."""
+        return hash((id(self._table), self._row))
+
+    @property
+    def row(self) -> int:
+        """Index of the row in its table."""
+        return self._row
+
+    @property
+    def name(self) -> str:
+        """Category display name (the last path segment)."""
+        return self._table.segments[self._table.segment_ids[self._table.offsets[self._row + 1] - 1]]
+
+    @property
+    def parts(self) -> list[str]:
+        """Path segments from the root down."""
+        return self._table.parts(self._row)
+
+    @property
+    def path(self) -> str:
+        """Full hierarchical path."""
+        return "/" + "/".join(self.parts)
+
+    @property
+    def level(self) -> int:
+        """Hierarchy level (0=root)."""
+        return self._table.offsets[self._row + 1] - self._table.offsets[self._row] - 1
+
+    @property
+    def parent_id(self) -> int:
+        """Row index of the parent category, or -1 for roots and parents missing from the table."""
+        return self._table.parent_ids[self._row]
+
+    @property
+    def parent(self) -> "CategoryRow | None":
+        """The parent row, if it is in the table."""
+        parent_id = self.parent_id
+        return None if parent_id == NO_PARENT else CategoryRow(self._table, parent_id)
+
+    @property
+    def parent_path(self) -> str:
+        """Parent category path, or the path itself for roots (as ``Category.parent_path``)."""
+        parts = self.parts
+        return "/" + "/".join(parts[:-1] if len(parts) > 1 else parts)
+
+    @property
+    def embedding_text(self) -> str:
+        """Text optimized for embedding, formatted on access."""
+        return " ".join(self.parts).lower().replace("_", " ")
+
+    @property
+    def llm_description(self) -> str:
+        """Description for the LLM, formatted on access."""
+        parts = self.parts
+        return f"Items in the {parts[-1]} category under {' > '.join(parts[:-1]) if parts[:-1] else 'root'}"
+
+    def to_category(self) -> Category:
+        """Materialize the row as a Category.
+
+        Returns:
+            The category.
+        """
+        return Category(
+            name=self.name,
+            path=self.path,
+            embedding_text=self.embedding_text,
+            llm_description=self.llm_description,
+        )
+
+
+class CategoryTable:
+    """Columnar, interned storage for category paths.
+
+    Each distinct path segment is stored once in ``segments``. A row is the run of
+    segment ids ``segment_ids[offsets[row]:offsets[row + 1]]`` plus the row index of
+    its parent in ``parent_ids``. All columns are ``array`` buffers of machine ints,
+    so a million categories take tens of megabytes instead of the gigabyte a list of
+    ``Category`` objects needs. Names, paths and descriptions are formatted lazily by
+    ``CategoryRow`` views.
+
+    Duplicate paths are kept as separate rows, matching ``CategoryLoader.load_categories``.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty table."""
+        self.segments: list[str] = []
+        self.segment_ids = array("I")
+        self.offsets = array("I", [0])
+        self.parent_ids = array("i")
+        self._segment_index: dict[str, int] = {}
+        self._row_index: dict[tuple[int, ...], int] | None = {}
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[str]) -> "CategoryTable":
+        """Build a table from category paths.
+
+        Args:
+            paths: Paths like ``/Appliances/Refrigerators``.
+
+        Returns:
+            The table.
+        """
+        table = cls()
+        for path in paths:
+            table.append(path)
+        table.freeze()
+        return table
+
+    @classmethod
+    def from_columns(
+        cls,
+        segments: list[str],
+        segment_ids: Sequence[int],
+        offsets: Sequence[int],
+        parent_ids: Sequence[int],
+    ) -> "CategoryTable":
+        """Wrap existing columns, such as memory-mapped ones from a taxonomy snapshot.
+
+        Tables over read-only buffers (for example ``memoryview`` columns) can't be
+        appended to.
+
+        Args:
+            segments: The interned path segments.
+            segment_ids: Segment ids of every row, concatenated.
+            offsets: Start of each row in ``segment_ids``, plus the total length.
+            parent_ids: Parent row of each row, or -1.
+
+        Returns:
+            The table.
+        """
+        if len(offsets) != len(parent_ids) + 1:
+            raise ValueError(f"Expected {len(parent_ids) + 1} offsets, got {len(offsets)}")
+        table = cls()
+        table.segments = segments
+        table.segment_ids = segment_ids
+        table.offsets = offsets
+        table.parent_ids = parent_ids
+        table.freeze()
+        return table
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.parent_ids)
+
+    def __getitem__(self, row: int) -> CategoryRow:
+        """Return a view of a row.
+
+        Args:
+            row: The row index. Negative indexes count from the end.
+
+        Returns:
+            The row view.
+        """
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(f"Row {row} out of range")
+        return CategoryRow(self, row)
+
+    def __iter__(self) -> Iterator[CategoryRow]:
+        """Iterate over row views."""
+        return (CategoryRow(self, row) for row in range(len(self)))
+
+    def append(self, path: str) -> int:
+        """Add a row for a path.
+
+        The parent is resolved when it was added earlier; taxonomy files list parents
+        before their children.
+
+        Args:
+            path: The category path.
+
+        Returns:
+            The new row index.
+        """
+        parts = path.strip("/").split("/")
+        if not all(parts):
+            raise ValueError(f"Invalid category path: {path!r}")
+        ids = tuple(self._intern(part) for part in parts)
+        row = len(self)
+        self.segment_ids.extend(ids)
+        self.offsets.append(len(self.segment_ids))
+        row_index = self._rows_by_segments()
+        self.parent_ids.append(row_index.get(ids[:-1], NO_PARENT))
+        row_index.setdefault(ids, row)
+        return row
+
+    def freeze(self) -> None:
+        """Drop the build-time lookup dicts to save memory.
+
+        ``append`` and ``find`` rebuild them on demand.
+        """
+        self._segment_index = {}
+        self._row_index = None
+
+    def parts(self, row: int) -> list[str]:
+        """Return the path segments of a row.
+
+        Args:
+            row: The row index.
+
+        Returns:
+            The segments from the root down.
+        """
+        segments = self.segments
+        return [segments[i] for i in self.segment_ids[self.offsets[row] : self.offsets[row + 1]]]
+
+    def find(self, path: str) -> CategoryRow | None:
+        """Look up the first row with a path.
+
+        Args:
+            path: The category path.
+
+        Returns:
+            The row view, or None if the path is not in the table.
+        """
+        if not self._segment_index and self.segments:
+            self._segment_index = {segment: i for i, segment in enumerate(self.segments)}
+        ids = []
+        for part in path.strip("/").split("/"):
+            segment_id = self._segment_index.get(part)
+            if segment_id is None:
+                return None
+            ids.append(segment_id)
+        row = self._rows_by_segments().get(tuple(ids))
+        return None if row is None else CategoryRow(self, row)
+
+    def children(self, row: int) -> list[CategoryRow]:
+        """Return the rows whose parent is a row.
+
+        Args:
+            row: The parent row index.
+
+        Returns:
+            The child rows, in table order.
+        """
+        return [CategoryRow(self, child) for child, parent in enumerate(self.parent_ids) if parent == row]
+
+    def to_categories(self) -> list[Category]:
+        """Materialize every row as a Category.
+
+        Returns:
+            The categories, in table order.
+        """
+        return [row.to_category() for row in self]
+
+    def nbytes(self) -> int:
+        """Return the approximate memory held by the table's columns and segment strings."""
+        columns = sum(column.itemsize * len(column) for column in (self.segment_ids, self.offsets, self.parent_ids))
+        return columns + sys.getsizeof(self.segments) + sum(sys.getsizeof(segment) for segment in self.segments)
+
+    def _intern(self, segment: str) -> int:
+        """Return the id of a segment, adding it to the pool if new."""
+        if not self._segment_index and self.segments:
+            self._segment_index = {segment: i for i, segment in enumerate(self.segments)}
+        segment_id = self._segment_index.get(segment)
+        if segment_id is None:
+            segment_id = len(self.segments)
+            self.segments.append(segment)
+            self._segment_index[segment] = segment_id
+        return segment_id
+
+    def _rows_by_segments(self) -> dict[tuple[int, ...], int]:
+        """Return the segment-ids-to-first-row lookup, rebuilding it after ``freeze``."""
+        if self._row_index is None:
+            self._row_index = {}
+            for row in range(len(self)):
+                ids = tuple(self.segment_ids[self.offsets[row] : self.offsets[row + 1]])
+                self._row_index.setdefault(ids, row)
+        return self._row_index
@@ -0,0 +1,263 @@
+"""Binary, memory-mappable snapshot of the parsed taxonomy and its embeddings.
+
+A snapshot is a single file: a magic number, a JSON header, and the
+``CategoryTable`` columns (plus an optional float32 embedding matrix) as raw
+native-endian buffers, each aligned to 64 bytes. Loading maps the file and wraps
+the buffers without copying or parsing the categories text file, so it takes
+milliseconds even for large taxonomies.
+
+The header records the SHA-256 of the categories file the snapshot was built from.
+A snapshot whose source hash doesn't match the current file is ignored. The file's
+size and modification time are recorded too, so the hash is only recomputed when
+those change.
+"""
+
+import hashlib
+import json
+import mmap
+import pathlib
+import struct
+import sys
+import threading
+from dataclasses import dataclass
+from typing import ClassVar
+
+import numpy as np
+
+from src.data.category_table import CategoryTable
+from src.shared import constants as C
+from src.shared.logger import get_logger
+
+MAGIC = b"TAXSNAP\x00"
+FORMAT_VERSION = 1
+HEADER_LENGTH = struct.Struct("<Q")
+ALIGNMENT = 64
+HASH_CHUNK_SIZE = 1 << 20
+SEGMENT_SEPARATOR = "\n"  # Lines are stripped when parsed, so no segment contains one
+EMBEDDING_MATRIX_NDIM = 2
+
+
+def source_hash(path: pathlib.Path) -> str:
+    """Hash a categories file.
+
+    Args:
+        path: The categories file.
+
+    Returns:
+        The hex SHA-256 digest of its contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class TaxonomySnapshot:
+    """A loaded taxonomy snapshot.
+
+    ``embeddings`` holds one row per table row (read-only, memory-mapped) or is None
+    when the snapshot was written without embeddings. ``embeddings_key`` identifies
+    the embedding model and category paths the rows were computed for.
+    """
+
+    table: CategoryTable
+    source_sha256: str
+    embeddings: np.ndarray | None = None
+    embedding_model: str | None = None
+    embeddings_key: str | None = None
+
+    _shared: ClassVar[dict[pathlib.Path, tuple[tuple[int, ...], "TaxonomySnapshot"]]] = {}
+    _shared_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def shared(cls, path: pathlib.Path, source_path: pathlib.Path) -> "TaxonomySnapshot | None":
+        """Get the process-wide snapshot at a path, loading it on first use.
+
+        The snapshot is reloaded if it or the categories file changes on disk. Stale,
+        missing or unreadable snapshots return None.
+
+        Args:
+            path: The snapshot file.
+            source_path: The categories file the snapshot must have been built from.
+
+        Returns:
+            The snapshot, or None if there is no usable snapshot.
+        """
+        path = pathlib.Path(path)
+        try:
+            stat, source_stat = path.stat(), pathlib.Path(source_path).stat()
+        except OSError:
+            return None
+        version = (stat.st_mtime_ns, stat.st_size, source_stat.st_mtime_ns, source_stat.st_size)
+        with cls._shared_lock:
+            cached = cls._shared.get(path)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            snapshot = load_taxonomy_snapshot(path, source_path)
+            if snapshot is not None:
+                cls._shared[path] = (version, snapshot)
+            return snapshot
+
+    @classmethod
+    def reset_shared(cls) -> None:
+        """Forget every process-wide snapshot."""
+        with cls._shared_lock:
+            cls._shared.clear()
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the section alignment."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _source_matches(header: dict, source_path: pathlib.Path) -> bool:
+    """Check whether a snapshot header was written for the current categories file.
+
+    Args:
+        header: The snapshot header.
+        source_path: The categories file.
+
+    Returns:
+        True if the file is unchanged since the snapshot was written.
+    """
+    stat = source_path.stat()
+    if stat.st_size != header[C.SOURCE_SIZE]:
+        return False
+    if stat.st_mtime_ns == header[C.SOURCE_MTIME_NS]:
+        return True
+    return source_hash(source_path) == header[C.SOURCE_SHA256]
+
+
+def write_taxonomy_snapshot(
+    path: pathlib.Path,
+    table: CategoryTable,
+    source_path: pathlib.Path,
+    embeddings: np.ndarray | None = None,
+    embedding_model: str | None = None,
+    embeddings_key: str | None = None,
+) -> pathlib.Path:
+    """Write a taxonomy snapshot atomically.
+
+    Args:
+        path: The snapshot file to write.
+        table: The parsed categories.
+        source_path: The categories file the table was parsed from.
+        embeddings: One embedding per table row.
+        embedding_model: The model that produced ``embeddings``.
+        embeddings_key: Identifies what ``embeddings`` were computed for.
+
+    Returns:
+        The path of the written snapshot.
+    """
+    matrix = None if embeddings is None else np.ascontiguousarray(embeddings, dtype=np.float32)
+    if matrix is not None and (matrix.ndim != EMBEDDING_MATRIX_NDIM or matrix.shape[0] != len(table)):
+        raise ValueError(f"Expected a ({len(table)}, dim) embedding matrix, got shape {matrix.shape}")
+    buffers = {
+        C.SEGMENTS: SEGMENT_SEPARATOR.join(table.segments).encode("utf-8"),
+        C.SEGMENT_IDS: np.asarray(table.segment_ids, dtype=np.uint32).tobytes(),
+        C.OFFSETS: np.asarray(table.offsets, dtype=np.uint32).tobytes(),
+        C.PARENT_IDS: np.asarray(table.parent_ids, dtype=np.int32).tobytes(),
+    }
+    if matrix is not None:
+        buffers[C.EMBEDDINGS] = matrix.tobytes()
+
+    source_stat = pathlib.Path(source_path).stat()
+    header = {
+        C.VERSION: FORMAT_VERSION,
+        C.BYTE_ORDER: sys.byteorder,
+        C.SOURCE_SHA256: source_hash(source_path),
+        C.SOURCE_SIZE: source_stat.st_size,
+        C.SOURCE_MTIME_NS: source_stat.st_mtime_ns,
+        C.ROWS: len(table),
+        C.SEGMENTS: len(table.segments),
+        C.DIMENSION: 0 if matrix is None else matrix.shape[1],
+        C.EMBEDDING_MODEL: embedding_model,
+        C.KEY: embeddings_key,
+        C.SECTIONS: {},
+    }
+    # Section offsets depend on the header length, so grow the space reserved for the
+    # header until the header describing those offsets fits in it
+    prefix_size = len(MAGIC) + HEADER_LENGTH.size
+    data_start = _align(prefix_size + len(json.dumps(header)))
+    while True:
+        offset = data_start
+        for name, data in buffers.items():
+            header[C.SECTIONS][name] = [offset, len(data)]
+            offset = _align(offset + len(data))
+        header_bytes = json.dumps(header).encode("utf-8")
+        if prefix_size + len(header_bytes) <= data_start:
+            break
+        data_start = _align(prefix_size + len(header_bytes))
+    header_bytes = header_bytes.ljust(data_start - prefix_size)
+
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + HEADER_LENGTH.pack(len(header_bytes)) + header_bytes)
+        for name, data in buffers.items():
+            f.seek(header[C.SECTIONS][name][0])
+            f.write(data)
+    tmp_path.replace(path)
+    return path
+
+
+def load_taxonomy_snapshot(path: pathlib.Path, source_path: pathlib.Path) -> TaxonomySnapshot | None:
+    """Memory-map a taxonomy snapshot if it matches the categories file.
+
+    Args:
+        path: The snapshot file.
+        source_path: The categories file the snapshot must have been built from.
+
+    Returns:
+        The snapshot, or None if it is missing, stale or unreadable.
+    """
+    logger = get_logger(__name__)
+    path = pathlib.Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+        if bytes(view[: len(MAGIC)]) != MAGIC:
+            raise ValueError("not a taxonomy snapshot")
+        (header_length,) = HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+        header_start = len(MAGIC) + HEADER_LENGTH.size
+        header = json.loads(bytes(view[header_start : header_start + header_length]))
+        if header[C.VERSION] != FORMAT_VERSION or header[C.BYTE_ORDER] != sys.byteorder:
+            logger.info(f"Taxonomy snapshot {path} has an incompatible format, ignoring it")
+            return None
+        if not _source_matches(header, pathlib.Path(source_path)):
+            logger.info(f"Taxonomy snapshot {path} is stale, parsing {source_path} instead")
+            return None
+
+        def section(name: str) -> memoryview:
+            start, length = header[C.SECTIONS][name]
+            return view[start : start + length]
+
+        segments_blob = bytes(section(C.SEGMENTS)).decode("utf-8")
+        table = CategoryTable.from_columns(
+            segments_blob.split(SEGMENT_SEPARATOR) if header[C.SEGMENTS] else [],
+            section(C.SEGMENT_IDS).cast("I"),
+            section(C.OFFSETS).cast("I"),
+            section(C.PARENT_IDS).cast("i"),
+        )
+        embeddings = None
+        if C.EMBEDDINGS in header[C.SECTIONS]:
+            shape = (header[C.ROWS], header[C.DIMENSION])
+            start = header[C.SECTIONS][C.EMBEDDINGS][0]
+            embeddings = np.frombuffer(buffer, dtype=np.float32, count=shape[0] * shape[1], offset=start)
+            embeddings = embeddings.reshape(shape)
+    except Exception as e:
+        logger.warning(f"Failed to load taxonomy snapshot {path}: {e}")
+        return None
+    return TaxonomySnapshot(
+        table=table,
+        source_sha256=header[C.SOURCE_SHA256],
+        embeddings=embeddings,
+        embedding_model=header[C.EMBEDDING_MODEL],
+        embeddings_key=header[C.KEY],
+    )
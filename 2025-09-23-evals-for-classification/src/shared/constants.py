@@ -1,27 +1,76 @@
 """Shared constants."""
 
+ANN_CENTROIDS_NPY = "centroids.npy"
+ANN_INDEX = "ann_index"
+ANN_INDEX_JSON = "ann_index.json"
+ANN_LIST_OFFSETS_NPY = "list_offsets.npy"
+ANN_LIST_ROWS_NPY = "list_rows.npy"
+BUILD_CHECKPOINT_JSON = "build_checkpoint.json"
+BYTE_ORDER = "byte_order"
 CATEGORIES = "categories"
 CATEGORIES_TXT = "categories_full.txt"
+COMPLETED = "completed"
 COUNT = "count"
 CREATED_AT = "created_at"
 DATA = "data"
 DESCRIPTION = "description"
+DIMENSION = "dimension"
 DOCUMENTS = "documents"
+EMBEDDING_CACHE_DB = "embedding_cache.sqlite3"
 EMBEDDING_MODEL = "embedding_model"
 EMBEDDINGS = "embeddings"
+EMBEDDINGS_SNAPSHOT_JSON = "category_embeddings.json"
+EMBEDDINGS_SNAPSHOT_NPY = "category_embeddings.npy"
+EVICTIONS = "evictions"
+EXPANSION_OVERLAP_MS = "expansion_overlap_ms"
+EXPANSION_TIME_MS = "expansion_time_ms"
+EXPANSION_WAIT_MS = "expansion_wait_ms"
+EXPIRATIONS = "expirations"
+FINGERPRINT = "fingerprint"
+HIT = "hit"
+HIT_RATE = "hit_rate"
+HITS = "hits"
 IDS = "ids"
+INVALIDATIONS = "invalidations"
+KEY = "key"
+LEVEL = "level"
 LLM_DESCRIPTION = "llm_description"
+MAX_MS = "max_ms"
 METADATA = "metadatas"
+MISS = "miss"
+MISSES = "misses"
+N_LISTS = "n_lists"
 NAME = "name"
 NARROWING = "narrowing"
 NARROWING_STRATEGY = "narrowing_strategy"
 NARROWING_TIME_MS = "narrowing_time_ms"
 NARROWED_TO = "narrowed_to"
+OFFSETS = "offsets"
+PARENT_IDS = "parent_ids"
 PATH = "path"
+PATHS = "paths"
+QUEUE_TIME_MS = "queue_time_ms"
+RESULT_CACHE = "result_cache"
+RESULT_CACHE_STATUS = "result_cache_status"
+ROWS = "rows"
+SECTIONS = "sections"
+SEGMENTS = "segments"
+SEGMENT_IDS = "segment_ids"
 SELECTION_TIME_MS = "selection_time_ms"
 RESULTS = "results"
 SELECTION = "selection"
+SEMANTIC_HIT = "semantic_hit"
+SEMANTIC_HITS = "semantic_hits"
+SOURCE_MTIME_NS = "source_mtime_ns"
+SOURCE_SHA256 = "source_sha256"
+SOURCE_SIZE = "source_size"
 SRC = "src"
+STAGE_LATENCY = "stage_latency"
+STAGE_TIMINGS_MS = "stage_timings_ms"
+SUM_MS = "sum_ms"
+TAXONOMY_SNAPSHOT_BIN = "taxonomy_snapshot.bin"
 TOTAL_CATEGORIES = "total_categories"
+TYPE_BUILDER_CACHE = "type_builder_cache"
 VECTOR_STORE = "vector_store"
 VECTOR_STORE_ENABLED = "vector_store_enabled"
+VERSION = "version"
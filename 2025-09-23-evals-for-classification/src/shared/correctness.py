@@ -4,11 +4,18 @@ This module provides different definitions of "correct" classification beyond ex
 including hierarchical relationships like parent/child categories and siblings.
 """
 
+from collections.abc import Iterable, Sequence
 from enum import Enum
+from itertools import repeat
+from operator import eq, itemgetter
 from typing import List
 
+import numpy as np
+
 from src.data.models import Category
 
+NO_NODE = -1
+
 
 class CorrectnessDefinition(str, Enum):
     """Different definitions of correctness for classification evaluation."""
@@ -124,6 +131,131 @@ class CategoryHierarchyHelper:
         return parent1 is not None and parent1 == parent2
 
 
+class AncestorTable:
+    """Integer-encoded category hierarchy for scoring many predictions at once.
+
+    Every category path, and every path prefix above it, is mapped to an integer id.
+    ``depth[id]`` is the number of segments below the root (0 for top-level
+    categories) and ``ancestors[id, d]`` is the id of the node's ancestor at depth
+    ``d`` (the node itself at its own depth, ``NO_NODE`` below it). ``parent[id]``
+    is the ancestor one level up. Only ``is_category`` nodes have a parent as far as
+    correctness is concerned, matching ``CategoryHierarchyHelper``.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        """Encode the hierarchy of the given category paths.
+
+        Args:
+            paths: Category paths like ``/Electronics/Computers/Laptops``
+        """
+        self.ids: dict[str, int] = {}
+        parents: list[int] = []
+        categories: list[int] = []
+        for path in paths:
+            segments = path.split("/")[1:]
+            parent = NO_NODE
+            for depth in range(len(segments)):
+                prefix = "/" + "/".join(segments[: depth + 1])
+                node = self.ids.get(prefix)
+                if node is None:
+                    node = self.ids[prefix] = len(parents)
+                    parents.append(parent)
+                parent = node
+            if parent != NO_NODE:
+                categories.append(parent)
+
+        # Parents are encoded before their children, so each row extends its parent's row
+        self.parent = np.array(parents, dtype=np.int32)
+        self.depth = np.zeros(len(parents), dtype=np.int32)
+        for node, parent in enumerate(parents):
+            if parent != NO_NODE:
+                self.depth[node] = self.depth[parent] + 1
+        self.ancestors = np.full((len(parents), int(self.depth.max(initial=-1)) + 1), NO_NODE, dtype=np.int32)
+        for node, parent in enumerate(parents):
+            depth = self.depth[node]
+            if parent != NO_NODE:
+                self.ancestors[node, :depth] = self.ancestors[parent, :depth]
+            self.ancestors[node, depth] = node
+        self.is_category = np.zeros(len(parents), dtype=bool)
+        self.is_category[categories] = True
+
+    def __len__(self) -> int:
+        """Return the number of encoded nodes (categories and their prefixes)."""
+        return len(self.depth)
+
+    def encode(self, paths: Sequence[str]) -> np.ndarray:
+        """Map paths to node ids.
+
+        Args:
+            paths: Category paths
+
+        Returns:
+            An int array of node ids, ``NO_NODE`` for paths outside the hierarchy
+        """
+        return np.fromiter(map(self.ids.get, paths, repeat(NO_NODE)), dtype=np.int64, count=len(paths))
+
+    def category_parents(self, nodes: np.ndarray) -> np.ndarray:
+        """Look up the parent of each node that is a category.
+
+        Args:
+            nodes: Node ids from ``encode``
+
+        Returns:
+            The parent ids, ``NO_NODE`` for top-level categories, prefixes that aren't
+            categories, and paths outside the hierarchy
+        """
+        known = nodes >= 0
+        parents = np.full(len(nodes), NO_NODE, dtype=np.int64)
+        parents[known] = np.where(self.is_category[nodes[known]], self.parent[nodes[known]], NO_NODE)
+        return parents
+
+    def score(
+        self, predicted_paths: Sequence[str], ground_truth_paths: Sequence[str], definition: "CorrectnessDefinition"
+    ) -> np.ndarray:
+        """Score every prediction against its ground truth under a correctness definition.
+
+        Gives the same answers as ``CorrectnessEvaluator.is_correct`` for each pair.
+
+        Args:
+            predicted_paths: The predicted category paths
+            ground_truth_paths: The ground truth category paths, one per prediction
+            definition: The correctness definition to use
+
+        Returns:
+            A bool array, True where the prediction is correct
+        """
+        if len(predicted_paths) != len(ground_truth_paths):
+            raise ValueError(f"Got {len(predicted_paths)} predictions for {len(ground_truth_paths)} ground truths")
+        if definition not in tuple(CorrectnessDefinition):
+            raise ValueError(f"Unknown correctness definition: {definition}")
+        correct = np.fromiter(map(eq, predicted_paths, ground_truth_paths), dtype=bool, count=len(predicted_paths))
+        if definition == CorrectnessDefinition.EXACT or correct.all():
+            return correct
+
+        # Only pairs that aren't exact matches need their hierarchy looked up
+        inexact = np.flatnonzero(~correct)
+        predicted = self.encode(_take(predicted_paths, inexact))
+        ground_truth = self.encode(_take(ground_truth_paths, inexact))
+        if definition == CorrectnessDefinition.LENIENT_GENERAL:
+            # Predicted is the ground truth's parent
+            related = (predicted >= 0) & (self.category_parents(ground_truth) == predicted)
+        else:
+            # Predicted is a child of the ground truth, or a sibling of it
+            predicted_parents = self.category_parents(predicted)
+            child = (ground_truth >= 0) & (predicted_parents == ground_truth)
+            sibling = (predicted_parents >= 0) & (predicted_parents == self.category_parents(ground_truth))
+            related = child | sibling
+        correct[inexact] = related
+        return correct
+
+
+def _take(paths: Sequence[str], rows: np.ndarray) -> Sequence[str]:
+    """Select the given rows of a sequence of paths."""
+    if len(rows) == 1:
+        return [paths[rows[0]]]
+    return itemgetter(*rows.tolist())(paths) if len(rows) else []
+
+
 class CorrectnessEvaluator:
     """Evaluates classification correctness using flexible definitions."""
 
@@ -134,6 +266,22 @@ class CorrectnessEvaluator:
             all_categories: Complete list of categories for hierarchy navigation
         """
         self.hierarchy = CategoryHierarchyHelper(all_categories)
+        self.ancestor_table = AncestorTable(self.hierarchy.categories_by_path)
+
+    def score_many(
+        self, predicted_paths: Sequence[str], ground_truth_paths: Sequence[str], definition: CorrectnessDefinition
+    ) -> np.ndarray:
+        """Evaluate a whole run of predictions at once.
+
+        Args:
+            predicted_paths: The predicted category paths
+            ground_truth_paths: The ground truth category paths, one per prediction
+            definition: The correctness definition to use
+
+        Returns:
+            A bool array, True where ``is_correct`` would return True
+        """
+        return self.ancestor_table.score(predicted_paths, ground_truth_paths, definition)
 
     def is_correct(self, predicted_path: str, ground_truth_path: str, definition: CorrectnessDefinition) -> bool:
         """Evaluate if a prediction is correct under the given definition.
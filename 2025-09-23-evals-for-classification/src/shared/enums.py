@@ -6,4 +6,26 @@ from enum import Enum
 class NarrowingStrategy(str, Enum):
     """Strategy for narrowing down categories before final classification."""
 
+    HIERARCHICAL = "hierarchical"
     HYBRID = "hybrid"
+
+
+class SearchBackend(str, Enum):
+    """Backend for the embedding similarity search in the narrowing stage."""
+
+    CHROMA = "chroma"  # ChromaDB vector store, falling back to exact in-memory search
+    EXACT = "exact"  # Exact in-memory search over every category
+    IVF = "ivf"  # Approximate in-memory search over an IVF index
+
+
+class Stage(str, Enum):
+    """Pipeline stage recorded by the tracer."""
+
+    CLASSIFY = "classify"  # The whole classify call
+    QUERY_EMBEDDING = "query_embedding"
+    VECTOR_SEARCH = "vector_search"
+    NARROWING = "narrowing"  # Embedding and LLM narrowing together
+    LLM_NARROWING = "llm_narrowing"
+    EXPANSION = "expansion"
+    SELECTION = "selection"
+    TYPE_BUILDER = "type_builder"  # Building the dynamic BAML Category enum
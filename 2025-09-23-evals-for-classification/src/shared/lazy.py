@@ -0,0 +1,42 @@
+"""Deferred imports for heavy optional-at-startup dependencies."""
+
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import a module on first attribute access instead of now.
+
+    The returned module is registered in ``sys.modules``, so later ``import name``
+    statements get the same object, and ``mock.patch("name.attr")`` still works.
+    Modules that were already imported are returned as they are.
+
+    Only use this for top-level packages whose attributes are not needed at
+    import time (for example in annotations), since any attribute access loads
+    the real module. Reach submodules through attributes (``chromadb.config``),
+    not ``from chromadb.config import ...``: importing a submodule of a package
+    that hasn't loaded yet executes the submodule twice.
+
+    Args:
+        name: The module name, for example ``"chromadb"``.
+
+    Returns:
+        The (possibly not yet executed) module.
+    """
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.loader is None:
+            raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
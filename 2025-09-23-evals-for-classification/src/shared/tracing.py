@@ -0,0 +1,279 @@
+"""Stage-level span tracing and latency histograms for the classification pipeline.
+
+``tracer.span(stage)`` times a block with the monotonic ``time.perf_counter`` clock.
+Every span is added to the per-stage latency histogram, and to the trace of the
+text being classified if one is open (see ``tracer.trace``). Traces live in a
+context variable, so concurrent ``aclassify`` tasks each get their own; work
+handed to a thread pool must be submitted with ``contextvars.copy_context().run``
+to stay attached to its trace.
+
+Histograms use fixed Prometheus-style buckets for export plus a bounded window of
+recent samples for exact p50/p90/p99.
+"""
+
+import bisect
+import json
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import Enum
+
+from src.shared import constants as C
+
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 30_000)
+PERCENTILES = (50, 90, 99)
+SAMPLE_WINDOW = 4096
+METRIC_NAME = "classification_stage_duration_seconds"
+MS_PER_SECOND = 1000
+
+
+@dataclass
+class Span:
+    """A timed stage within a trace."""
+
+    stage: str
+    start_ms: float  # Offset from the start of the trace
+    duration_ms: float
+
+
+@dataclass
+class Trace:
+    """The spans recorded while classifying one text."""
+
+    start: float = field(default_factory=time.perf_counter)
+    spans: list[Span] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, stage: str, start: float, end: float) -> None:
+        """Record a span.
+
+        Args:
+            stage: The stage name.
+            start: The ``perf_counter`` time the stage started.
+            end: The ``perf_counter`` time the stage ended.
+        """
+        span = Span(stage, (start - self.start) * MS_PER_SECOND, (end - start) * MS_PER_SECOND)
+        with self._lock:
+            self.spans.append(span)
+
+    def stage_totals(self) -> dict[str, float]:
+        """Total time per stage, in milliseconds.
+
+        Stages that ran more than once (e.g. query embedding for the result cache and
+        for narrowing) are summed. Nested stages are also counted in their parent.
+
+        Returns:
+            Mapping of stage name to milliseconds, in the order stages first started.
+        """
+        totals: dict[str, float] = {}
+        with self._lock:
+            for span in sorted(self.spans, key=lambda s: s.start_ms):
+                totals[span.stage] = totals.get(span.stage, 0.0) + span.duration_ms
+        return totals
+
+
+class LatencyHistogram:
+    """Latency distribution of one stage."""
+
+    def __init__(self, buckets_ms: tuple[float, ...] = BUCKETS_MS, sample_window: int = SAMPLE_WINDOW) -> None:
+        """Initialize an empty histogram.
+
+        Args:
+            buckets_ms: Upper bounds of the cumulative buckets, in milliseconds.
+            sample_window: How many recent samples to keep for percentiles.
+        """
+        self.buckets_ms = buckets_ms
+        self.bucket_counts = [0] * len(buckets_ms)  # Per bucket; cumulated on export
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self._samples: deque[float] = deque(maxlen=sample_window)
+
+    def observe(self, duration_ms: float) -> None:
+        """Add a sample.
+
+        Args:
+            duration_ms: The stage duration in milliseconds.
+        """
+        i = bisect.bisect_left(self.buckets_ms, duration_ms)
+        if i < len(self.bucket_counts):
+            self.bucket_counts[i] += 1
+        self.count += 1
+        self.sum_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self._samples.append(duration_ms)
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile over the sample window.
+
+        Args:
+            q: The percentile, from 0 to 100.
+
+        Returns:
+            The percentile in milliseconds, or 0.0 with no samples.
+        """
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        rank = max(math.ceil(q / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    def as_dict(self) -> dict[str, float]:
+        """Summarize the histogram.
+
+        Returns:
+            The count, total, percentiles and maximum, in milliseconds.
+        """
+        summary: dict[str, float] = {C.COUNT: self.count, C.SUM_MS: self.sum_ms}
+        for q in PERCENTILES:
+            summary[f"p{q}_ms"] = self.percentile(q)
+        summary[C.MAX_MS] = self.max_ms
+        return summary
+
+
+class Tracer:
+    """Records spans into per-stage histograms and the current trace."""
+
+    def __init__(self, sample_window: int = SAMPLE_WINDOW) -> None:
+        """Initialize the tracer.
+
+        Args:
+            sample_window: How many recent samples each stage keeps for percentiles.
+        """
+        self.enabled = True
+        self.sample_window = sample_window
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._current: ContextVar[Trace | None] = ContextVar("classification_trace", default=None)
+
+    @contextmanager
+    def trace(self, stage: str | None = None) -> Iterator[Trace]:
+        """Open a trace for the current context, e.g. one classify call.
+
+        Args:
+            stage: If given, the whole trace is also recorded as a span of this stage.
+
+        Yields:
+            The trace. Spans recorded in this context are added to it.
+        """
+        trace = Trace()
+        token = self._current.set(trace)
+        try:
+            if stage is None:
+                yield trace
+            else:
+                with self.span(stage):
+                    yield trace
+        finally:
+            self._current.reset(token)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time a block as a stage.
+
+        The span is recorded even if the block raises.
+
+        Args:
+            stage: The stage name.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, start, time.perf_counter())
+
+    def record(self, stage: str, start: float, end: float) -> None:
+        """Record a span timed elsewhere.
+
+        Args:
+            stage: The stage name, or a ``Stage`` member.
+            start: The ``perf_counter`` time the stage started.
+            end: The ``perf_counter`` time the stage ended.
+        """
+        if not self.enabled:
+            return
+        if isinstance(stage, Enum):
+            stage = stage.value
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram(sample_window=self.sample_window)
+            histogram.observe((end - start) * MS_PER_SECOND)
+        trace = self._current.get()
+        if trace is not None:
+            trace.add(stage, start, end)
+
+    def current_trace(self) -> Trace | None:
+        """Get the trace open in the current context, if any."""
+        return self._current.get()
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        """Summarize every stage's histogram.
+
+        Returns:
+            Mapping of stage name to its count, total, percentiles and maximum.
+        """
+        with self._lock:
+            return {stage: histogram.as_dict() for stage, histogram in sorted(self._histograms.items())}
+
+    def to_json(self, indent: int | None = 2) -> str:
+        """Dump every stage's histogram summary as JSON.
+
+        Args:
+            indent: The JSON indent.
+
+        Returns:
+            The JSON document.
+        """
+        return json.dumps(self.as_dict(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Dump every stage's histogram in the Prometheus text exposition format.
+
+        Buckets, sum and count are exported as a histogram in seconds. The sample
+        window percentiles are exported as a summary with a ``_window`` suffix.
+
+        Returns:
+            The metrics text.
+        """
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent in each classification pipeline stage.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        window = f"{METRIC_NAME}_window"
+        window_lines = [
+            f"# HELP {window} Percentiles of the most recent stage durations.",
+            f"# TYPE {window} summary",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for upper_ms, bucket_count in zip(histogram.buckets_ms, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    le = f"{upper_ms / MS_PER_SECOND:g}"
+                    lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {histogram.sum_ms / MS_PER_SECOND:.6f}')
+                lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {histogram.count}')
+                for q in PERCENTILES:
+                    value = histogram.percentile(q) / MS_PER_SECOND
+                    window_lines.append(f'{window}{{stage="{stage}",quantile="{q / 100:g}"}} {value:.6f}')
+                window_lines.append(f'{window}_sum{{stage="{stage}"}} {histogram.sum_ms / MS_PER_SECOND:.6f}')
+                window_lines.append(f'{window}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines + window_lines) + "\n"
+
+    def reset(self) -> None:
+        """Forget every recorded sample."""
+        with self._lock:
+            self._histograms.clear()
+
+
+tracer = Tracer()
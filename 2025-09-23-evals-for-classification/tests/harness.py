@@ -0,0 +1,272 @@
+"""Concurrency and record/replay support for the integration tests.
+
+``run_cases`` runs a function over the test cases on a bounded thread pool and
+returns the results in test case order, so a parallel run reports exactly what a
+serial run would, plus the wall-clock time and the speedup over running the cases
+one after another.
+
+``LLMRecorder`` intercepts the BAML functions and OpenAI embedding requests the
+classifier makes. In ``record`` mode, responses already on disk are replayed and
+the rest are fetched live and saved; in ``replay`` mode, a request with no saved
+response fails instead of reaching the network. BAML responses are stored one
+JSON file per request, named by a hash of the function, its arguments and the
+dynamic Category enum. Embeddings are stored per text in an ``EmbeddingCache``.
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+import openai
+
+from src.baml_client import b
+from src.baml_client.async_client import b as async_b
+from src.classification.embedding_cache import EmbeddingCache
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "llm"
+BAML_FUNCTIONS = ("ExpandUserQuery", "PickBestCategories", "PickBestCategory")
+
+
+class RecordMode(str, Enum):
+    """How LLMRecorder treats BAML and embedding requests."""
+
+    OFF = "off"  # Every request goes to the live API
+    RECORD = "record"  # Replay saved responses, fetch and save the rest
+    REPLAY = "replay"  # Replay saved responses, fail on anything else
+
+
+class MissingRecordingError(RuntimeError):
+    """A request has no saved response in replay mode."""
+
+
+@dataclass
+class CaseRun:
+    """Results of running a function over every test case."""
+
+    results: list[Any]  # One result or exception per case, in case order
+    wall_time_ms: float
+    case_time_ms: float  # Sum of the per-case durations, i.e. the serial running time
+    workers: int
+
+    @property
+    def speedup(self) -> float:
+        """How many times faster than running the cases one after another."""
+        return self.case_time_ms / self.wall_time_ms if self.wall_time_ms else 1.0
+
+    def summary(self) -> str:
+        """Describe the run's wall-clock time and speedup."""
+        return (
+            f"Ran {len(self.results)} cases on {self.workers} worker(s) in {self.wall_time_ms:.1f}ms wall-clock "
+            f"({self.case_time_ms:.1f}ms of case time, {self.speedup:.1f}x speedup over serial)"
+        )
+
+
+def run_cases(fn: Callable[[Any], Any], cases: Sequence[Any], workers: int = 1) -> CaseRun:
+    """Run a function over test cases with at most ``workers`` running at once.
+
+    Exceptions are returned in the failed case's slot rather than raised, so one
+    failing case doesn't stop the others.
+
+    Args:
+        fn: Called with each case.
+        cases: The test cases.
+        workers: Maximum number of cases running at once. 1 runs them serially on
+            the calling thread.
+
+    Returns:
+        The results in case order, with timings.
+    """
+    durations_ms = [0.0] * len(cases)
+
+    def run_one(i: int) -> Any:
+        start = time.perf_counter()
+        try:
+            return fn(cases[i])
+        except Exception as e:
+            return e
+        finally:
+            durations_ms[i] = (time.perf_counter() - start) * 1000
+
+    workers = max(1, workers)
+    start = time.perf_counter()
+    if workers == 1:
+        results = [run_one(i) for i in range(len(cases))]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="test-case") as executor:
+            results = list(executor.map(run_one, range(len(cases))))
+    wall_time_ms = (time.perf_counter() - start) * 1000
+    return CaseRun(results, wall_time_ms, sum(durations_ms), workers)
+
+
+def request_key(function: str, kwargs: dict[str, Any]) -> str:
+    """Hash a BAML request.
+
+    Args:
+        function: The BAML function name.
+        kwargs: Its arguments. A TypeBuilder in ``baml_options["tb"]`` is hashed by
+            its description, so requests offering different categories differ.
+
+    Returns:
+        The hex SHA-256 of the request.
+    """
+    options = kwargs.get("baml_options") or {}
+    tb = options.get("tb")
+    payload = {
+        "function": function,
+        "args": {name: value for name, value in kwargs.items() if name != "baml_options"},
+        "type_builder": str(tb._tb) if tb is not None else None,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class LLMRecorder:
+    """Records and replays BAML and embedding responses while active."""
+
+    def __init__(self, mode: RecordMode = RecordMode.RECORD, directory: Path = FIXTURES_DIR) -> None:
+        """Initialize the recorder.
+
+        Args:
+            mode: Whether to record, replay, or pass requests straight through.
+            directory: Where responses are saved.
+        """
+        self.mode = RecordMode(mode)
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # Guards the counters; requests arrive from many threads
+        self._embeddings: EmbeddingCache | None = None
+        self._patches: list[Any] = []
+
+    def __enter__(self) -> "LLMRecorder":
+        """Start intercepting requests."""
+        if self.mode == RecordMode.OFF:
+            return self
+        self._embeddings = EmbeddingCache(self.directory / "embeddings.sqlite3")
+        self._patches = [mock.patch.object(openai.resources.embeddings.Embeddings, "create", self._embeddings_create())]
+        for function in BAML_FUNCTIONS:
+            self._patches.append(mock.patch.object(b, function, self._baml_call(function, getattr(b, function))))
+            live = getattr(async_b, function)
+            self._patches.append(mock.patch.object(async_b, function, self._abaml_call(function, live)))
+        for patch in self._patches:
+            patch.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop intercepting requests."""
+        for patch in reversed(self._patches):
+            patch.stop()
+        self._patches = []
+        if self._embeddings is not None:
+            self._embeddings.close()
+            self._embeddings = None
+
+    def summary(self) -> str:
+        """Describe how many requests were replayed and fetched."""
+        return f"LLM fixtures ({self.mode.value}): {self.hits} replayed, {self.misses} fetched live"
+
+    def _path(self, function: str, key: str) -> Path:
+        """Where the response to a BAML request is saved."""
+        return self.directory / "baml" / function / f"{key}.json"
+
+    def _load(self, function: str, key: str) -> tuple[bool, Any]:
+        """Load a saved BAML response.
+
+        Returns:
+            Whether a response was found, and the response.
+        """
+        path = self._path(function, key)
+        if path.exists():
+            self._count(hits=1)
+            return True, json.loads(path.read_text(encoding="utf-8"))["response"]
+        if self.mode == RecordMode.REPLAY:
+            raise MissingRecordingError(f"No recorded {function} response for request {key}")
+        self._count(misses=1)
+        return False, None
+
+    def _count(self, hits: int = 0, misses: int = 0) -> None:
+        """Add to the replayed and fetched counters."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def _save(self, function: str, key: str, kwargs: dict[str, Any], response: Any) -> None:
+        """Save a BAML response atomically."""
+        path = self._path(function, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        args = {name: value for name, value in kwargs.items() if name != "baml_options"}
+        tmp_path = path.with_suffix(f".{time.perf_counter_ns()}.tmp")
+        tmp_path.write_text(
+            json.dumps({"function": function, "args": args, "response": response}, indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        tmp_path.replace(path)
+
+    def _baml_call(self, function: str, live: Callable) -> Callable:
+        """Wrap a sync BAML function."""
+
+        @functools.wraps(live)
+        def call(*args, **kwargs):
+            kwargs = self._bind(live, args, kwargs)
+            key = request_key(function, kwargs)
+            found, response = self._load(function, key)
+            if not found:
+                response = live(**kwargs)
+                self._save(function, key, kwargs, response)
+            return response
+
+        return call
+
+    def _abaml_call(self, function: str, live: Callable) -> Callable:
+        """Wrap an async BAML function."""
+
+        @functools.wraps(live)
+        async def call(*args, **kwargs):
+            kwargs = self._bind(live, args, kwargs)
+            key = request_key(function, kwargs)
+            found, response = self._load(function, key)
+            if not found:
+                response = await live(**kwargs)
+                await asyncio.to_thread(self._save, function, key, kwargs, response)
+            return response
+
+        return call
+
+    @staticmethod
+    def _bind(live: Callable, args: tuple, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Turn positional arguments into keywords, so both call styles hash the same."""
+        return dict(inspect.signature(live).bind(*args, **kwargs).arguments)
+
+    def _embeddings_create(self) -> Callable:
+        """Build a replacement for ``Embeddings.create`` that serves saved embeddings per text."""
+        recorder = self
+        live = openai.resources.embeddings.Embeddings.create
+
+        def create(client_self, *, model: str, input: list[str], **kwargs):
+            texts = [input] if isinstance(input, str) else list(input)
+            found = recorder._embeddings.get_many(model, texts)
+            missing = [text for text in dict.fromkeys(texts) if text not in found]
+            if missing and recorder.mode == RecordMode.REPLAY:
+                raise MissingRecordingError(f"No recorded {model} embedding for {len(missing)} text(s)")
+            recorder._count(hits=len(texts) - len(missing), misses=len(missing))
+            if missing:
+                response = live(client_self, model=model, input=missing, **kwargs)
+                fetched = {text: data.embedding for text, data in zip(missing, response.data)}
+                recorder._embeddings.put_many(model, fetched)
+                # Serve the float32 round trip, as a replay would
+                found.update(recorder._embeddings.get_many(model, missing))
+            data = [SimpleNamespace(embedding=found[text], index=i) for i, text in enumerate(texts)]
+            return SimpleNamespace(data=data, model=model)
+
+        return create
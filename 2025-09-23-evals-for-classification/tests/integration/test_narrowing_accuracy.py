@@ -1,8 +1,9 @@
 """Test script to evaluate the accuracy of category narrowing strategies.
 
 This script tests how often the correct category is included in the narrowed
-results for each narrowing strategy (hybrid). It provides detailed
-metrics and analysis to help optimize the narrowing process.
+results for each narrowing strategy (hybrid, hierarchical). It provides detailed
+metrics and analysis to help optimize the narrowing process, including the
+embedding-stage candidate recall of the hierarchical strategy against hybrid.
 """
 
 import json
@@ -15,6 +16,7 @@ from pathlib import Path
 
 from src.classification.embeddings import EmbeddingService
 from src.classification.narrowing import (
+    HierarchicalNarrowing,
     HybridNarrowing,
 )
 from src.config.settings import settings
@@ -22,11 +24,14 @@ from src.data.category_loader import CategoryLoader
 from src.data.models import Category
 from src.shared import constants as C
 from tests.data.test_cases import TestCase, tests
+from tests.harness import run_cases
 
 src_path = Path(__file__).parents[2] / C.SRC
 sys.path.insert(0, str(src_path))
 
 CATEGORIES_DISPLAY_CUTOFF = 3
+# Strategies that run an embedding stage followed by an LLM stage
+STAGED_STRATEGIES = ("Hybrid", "Hierarchical")
 
 
 @dataclass
@@ -43,6 +48,8 @@ class NarrowingResult:
     stage1_processing_time_ms: float = None  # Time for embedding stage
     stage2_processing_time_ms: float = None  # Time for LLM stage
     is_hybrid_result: bool = False
+    stage1_correct_found: bool = None  # Correct category among embedding stage candidates
+    scored_count: int = None  # Categories the embedding stage computed a similarity for
 
 
 @dataclass
@@ -56,13 +63,20 @@ class StrategyResults:
     avg_narrowed_count: float
     avg_processing_time_ms: float
     results: list[NarrowingResult]
+    stage1_recall_percent: float = None  # How often the embedding stage kept the correct category
+    avg_scored_count: float = None  # Similarities computed per query by the embedding stage
 
 
 class NarrowingAccuracyTester:
     """Test harness for evaluating narrowing strategy accuracy."""
 
-    def __init__(self):
-        """Initialize the tester with required components."""
+    def __init__(self, workers: int = 1):
+        """Initialize the tester with required components.
+
+        Args:
+            workers: How many test cases to narrow at once
+        """
+        self.workers = workers
         self.category_loader = CategoryLoader()
         self.embedding_service = EmbeddingService()
         self.categories = self.category_loader.load_categories()
@@ -84,79 +98,29 @@ class NarrowingAccuracyTester:
         Returns:
             Aggregated results for the strategy
         """
-        results = []
-
         print(f"\nTesting {strategy_name} Strategy")
         print("=" * 50)
 
-        for i, test_case in enumerate(tests, 1):
-            start_time = time.time()
-
-            # Check if this is a hybrid strategy to capture intermediate results
-            is_hybrid = strategy_name == "Hybrid" and hasattr(narrower, '_narrow_with_embedding')
-            stage1_categories = None
-            stage1_time_ms = None
-            stage2_time_ms = None
-
-            if is_hybrid:
-                # Capture Stage 1: Embedding narrowing
-                stage1_start = time.time()
-                stage1_categories = narrower._narrow_with_embedding(test_case["text"], self.categories)
-                stage1_time_ms = (time.time() - stage1_start) * 1000
-
-                # Capture Stage 2: LLM refinement
-                stage2_start = time.time()
-                narrowed_categories = narrower._narrow_with_llm_stage(test_case["text"], stage1_categories)
-                stage2_time_ms = (time.time() - stage2_start) * 1000
-                
-                processing_time_ms = stage1_time_ms + stage2_time_ms
-            else:
-                # Regular narrowing for non-hybrid strategies
-                narrowed_categories = narrower.narrow(test_case["text"], self.categories)
-                processing_time_ms = (time.time() - start_time) * 1000
-
-            # Check if correct category is in narrowed results
-            expected_category_path = test_case["category"]
-            correct_category_found = any(cat.path == expected_category_path for cat in narrowed_categories)
-
-            result = NarrowingResult(
-                test_case=test_case,
-                narrowed_categories=narrowed_categories,
-                correct_category_found=correct_category_found,
-                processing_time_ms=processing_time_ms,
-                narrowed_count=len(narrowed_categories),
-                stage1_categories=stage1_categories,
-                stage1_processing_time_ms=stage1_time_ms,
-                stage2_processing_time_ms=stage2_time_ms,
-                is_hybrid_result=is_hybrid,
-            )
+        run = run_cases(lambda test_case: self._run_case(strategy_name, narrower, test_case), tests, self.workers)
+        results = []
+        for i, result in enumerate(run.results, 1):
+            if isinstance(result, Exception):
+                raise result
             results.append(result)
-
-            # Print progress
-            status = "✅" if correct_category_found else "❌"
-            print(f"{i:2d}. {status} {test_case['text'][:CATEGORIES_DISPLAY_CUTOFF]}...")
-            print(f"    Expected: {expected_category_path}")
-            
-            if is_hybrid and stage1_categories:
-                print(f"    Stage 1 (Embedding): {len(stage1_categories)} categories ({stage1_time_ms:.1f}ms)")
-                print(f"    Stage 2 (LLM): {len(narrowed_categories)} categories ({stage2_time_ms:.1f}ms)")
-                print(f"    Total: {processing_time_ms:.1f}ms")
-            else:
-                print(f"    Narrowed to {len(narrowed_categories)} categories ({processing_time_ms:.1f}ms)")
-            
-            if not correct_category_found:
-                print("    ⚠️  Correct category NOT found in narrowed results!")
-                print(
-                    f"    Got: {[cat.path for cat in narrowed_categories[:CATEGORIES_DISPLAY_CUTOFF]]}"
-                    f"{'...' if len(narrowed_categories) > CATEGORIES_DISPLAY_CUTOFF else ''}"
-                )
-            print()
+            self._print_result(i, result)
+        print(run.summary())
 
         # Calculate aggregate metrics
         correct_found = sum(1 for r in results if r.correct_category_found)
         accuracy_percent = (correct_found / len(results)) * 100
         avg_narrowed_count = sum(r.narrowed_count for r in results) / len(results)
         avg_processing_time_ms = sum(r.processing_time_ms for r in results) / len(results)
+        staged = [r for r in results if r.stage1_correct_found is not None]
+        stage1_recall_percent = None
+        avg_scored_count = None
+        if staged:
+            stage1_recall_percent = sum(1 for r in staged if r.stage1_correct_found) / len(staged) * 100
+            avg_scored_count = sum(r.scored_count for r in staged) / len(staged)
 
         return StrategyResults(
             strategy_name=strategy_name,
@@ -166,8 +130,102 @@ class NarrowingAccuracyTester:
             avg_narrowed_count=avg_narrowed_count,
             avg_processing_time_ms=avg_processing_time_ms,
             results=results,
+            stage1_recall_percent=stage1_recall_percent,
+            avg_scored_count=avg_scored_count,
         )
 
+    def _run_case(self, strategy_name: str, narrower, test_case: TestCase) -> NarrowingResult:
+        """Narrow the categories for one test case.
+
+        Args:
+            strategy_name: Name of the strategy being tested
+            narrower: The narrowing strategy instance
+            test_case: The test case to narrow for
+
+        Returns:
+            The narrowing result
+        """
+        start_time = time.time()
+
+        # Check if this is a hybrid strategy to capture intermediate results
+        is_hybrid = strategy_name in STAGED_STRATEGIES and hasattr(narrower, '_narrow_with_embedding')
+        stage1_categories = None
+        stage1_time_ms = None
+        stage2_time_ms = None
+
+        if is_hybrid:
+            # Capture Stage 1: Embedding narrowing
+            stage1_start = time.time()
+            stage1_categories = narrower._narrow_with_embedding(test_case["text"], self.categories)
+            stage1_time_ms = (time.time() - stage1_start) * 1000
+
+            # Capture Stage 2: LLM refinement
+            stage2_start = time.time()
+            narrowed_categories = narrower._narrow_with_llm_stage(test_case["text"], stage1_categories)
+            stage2_time_ms = (time.time() - stage2_start) * 1000
+
+            processing_time_ms = stage1_time_ms + stage2_time_ms
+        else:
+            # Regular narrowing for non-hybrid strategies
+            narrowed_categories = narrower.narrow(test_case["text"], self.categories)
+            processing_time_ms = (time.time() - start_time) * 1000
+
+        # Check if correct category is in narrowed results
+        expected_category_path = test_case["category"]
+        correct_category_found = any(cat.path == expected_category_path for cat in narrowed_categories)
+        stage1_correct_found = None
+        if stage1_categories is not None:
+            stage1_correct_found = any(cat.path == expected_category_path for cat in stage1_categories)
+        # Flat strategies score every category; hierarchical records how many it visited
+        scored_count = getattr(narrower, "last_scored_count", len(self.categories)) if is_hybrid else None
+
+        return NarrowingResult(
+            test_case=test_case,
+            narrowed_categories=narrowed_categories,
+            correct_category_found=correct_category_found,
+            processing_time_ms=processing_time_ms,
+            narrowed_count=len(narrowed_categories),
+            stage1_categories=stage1_categories,
+            stage1_processing_time_ms=stage1_time_ms,
+            stage2_processing_time_ms=stage2_time_ms,
+            is_hybrid_result=is_hybrid,
+            stage1_correct_found=stage1_correct_found,
+            scored_count=scored_count,
+        )
+
+    def _print_result(self, i: int, result: NarrowingResult) -> None:
+        """Print the progress line for one test case.
+
+        Args:
+            i: The test case number
+            result: The test case's narrowing result
+        """
+        narrowed_categories = result.narrowed_categories
+        status = "✅" if result.correct_category_found else "❌"
+        print(f"{i:2d}. {status} {result.test_case['text'][:CATEGORIES_DISPLAY_CUTOFF]}...")
+        print(f"    Expected: {result.test_case['category']}")
+
+        if result.is_hybrid_result and result.stage1_categories:
+            print(
+                f"    Stage 1 (Embedding): {len(result.stage1_categories)} categories "
+                f"({result.stage1_processing_time_ms:.1f}ms, {result.scored_count} scored, "
+                f"correct {'kept' if result.stage1_correct_found else 'missed'})"
+            )
+            print(
+                f"    Stage 2 (LLM): {len(narrowed_categories)} categories ({result.stage2_processing_time_ms:.1f}ms)"
+            )
+            print(f"    Total: {result.processing_time_ms:.1f}ms")
+        else:
+            print(f"    Narrowed to {len(narrowed_categories)} categories ({result.processing_time_ms:.1f}ms)")
+
+        if not result.correct_category_found:
+            print("    ⚠️  Correct category NOT found in narrowed results!")
+            print(
+                f"    Got: {[cat.path for cat in narrowed_categories[:CATEGORIES_DISPLAY_CUTOFF]]}"
+                f"{'...' if len(narrowed_categories) > CATEGORIES_DISPLAY_CUTOFF else ''}"
+            )
+        print()
+
     def analyze_failures(self, strategy_results: StrategyResults) -> None:
         """Analyze and report on failed test cases.
 
@@ -213,15 +271,34 @@ class NarrowingAccuracyTester:
         print("=" * 60)
 
         # Print comparison table
-        print(f"{'Strategy':<15} {'Accuracy':<10} {'Avg Categories':<15} {'Avg Time (ms)':<15}")
-        print("-" * 60)
+        print(
+            f"{'Strategy':<15} {'Accuracy':<10} {'Avg Categories':<15} {'Avg Time (ms)':<15} "
+            f"{'Stage 1 Recall':<15} {'Avg Scored':<10}"
+        )
+        print("-" * 85)
 
         for results in results_list:
+            recall, scored = f"{'-':>13}", f"{'-':>10}"
+            if results.stage1_recall_percent is not None:
+                recall = f"{results.stage1_recall_percent:>12.1f}%"
+                scored = f"{results.avg_scored_count:>10.1f}"
             print(
                 f"{results.strategy_name:<15} "
                 f"{results.accuracy_percent:>7.1f}%   "
                 f"{results.avg_narrowed_count:>11.1f}     "
-                f"{results.avg_processing_time_ms:>11.1f}"
+                f"{results.avg_processing_time_ms:>11.1f}     "
+                f"{recall}   "
+                f"{scored}"
+            )
+
+        by_name = {results.strategy_name: results for results in results_list}
+        hybrid, hierarchical = by_name.get("Hybrid"), by_name.get("Hierarchical")
+        if hybrid and hierarchical and hybrid.stage1_recall_percent is not None:
+            print(
+                f"\nHierarchical vs Hybrid candidate recall: "
+                f"{hierarchical.stage1_recall_percent:.1f}% vs {hybrid.stage1_recall_percent:.1f}% "
+                f"({hierarchical.stage1_recall_percent - hybrid.stage1_recall_percent:+.1f} pts), "
+                f"scoring {hierarchical.avg_scored_count:.0f} of {hybrid.avg_scored_count:.0f} categories per query"
             )
 
         # Find best performing strategy
@@ -243,6 +320,7 @@ class NarrowingAccuracyTester:
         # Define strategy constructors (not instances) to create fresh services
         strategy_constructors = {
             "Hybrid": lambda: HybridNarrowing(EmbeddingService()),
+            "Hierarchical": lambda: HierarchicalNarrowing(EmbeddingService()),
         }
 
         results = {}
@@ -318,6 +396,8 @@ class NarrowingAccuracyTester:
                         "stage1_processing_time_ms": result.stage1_processing_time_ms,
                         "stage2_processing_time_ms": result.stage2_processing_time_ms,
                         "stage1_count": len(result.stage1_categories),
+                        "stage1_correct_found": result.stage1_correct_found,
+                        "scored_count": result.scored_count,
                     })
                 serializable_results.append(result_dict)
 
@@ -331,15 +411,19 @@ class NarrowingAccuracyTester:
         return filepath
 
 
-def main():
-    """Execute the test."""
+def main(workers: int = 1):
+    """Execute the test.
+
+    Args:
+        workers: How many test cases to narrow at once
+    """
     print("Category Narrowing Accuracy Test")
     print("=" * 60)
     print("This test evaluates how often the correct category is included")
     print("in the narrowed results for different narrowing strategies.")
     print()
 
-    tester = NarrowingAccuracyTester()
+    tester = NarrowingAccuracyTester(workers=workers)
     results = tester.run_all_tests()
 
     # Save results to JSON file
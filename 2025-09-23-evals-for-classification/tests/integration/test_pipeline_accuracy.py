@@ -1,11 +1,11 @@
 """Test script to evaluate the accuracy of the complete classification pipeline.
 
 This script tests the full end-to-end classification pipeline by running
-the complete classify() method on all test cases. It provides comprehensive
+all test cases concurrently through classify_batch(). It provides comprehensive
 metrics including accuracy, timing, and detailed failure analysis.
 
 Usage:
-    python test_pipeline_accuracy.py [--save-as RUN_NAME] [--description "Description"]
+    python test_pipeline_accuracy.py [--save-as RUN_NAME] [--description "Description"] [--max-concurrency N]
     
 Examples:
     python test_pipeline_accuracy.py --save-as v1 --description "Baseline hybrid strategy"
@@ -29,8 +29,10 @@ sys.path.insert(0, str(project_root))
 import dotenv
 
 from src.classification.pipeline import ClassificationPipeline
+from src.classification.type_builder_cache import type_builder_cache
 from src.data.models import ClassificationResult
 from src.shared import constants as C
+from src.shared.tracing import tracer
 from tests.data.test_cases import TestCase, tests
 
 dotenv.load_dotenv()
@@ -67,14 +69,16 @@ class PipelineResults:
 class PipelineAccuracyTester:
     """Test harness for evaluating complete pipeline accuracy."""
 
-    def __init__(self, use_vector_store: bool = True):
+    def __init__(self, use_vector_store: bool = True, max_concurrency: int | None = None):
         """Initialize the tester with required components.
         
         Args:
             use_vector_store: Whether to use vector store for caching embeddings
+            max_concurrency: How many test cases to classify at once (defaults to settings.max_concurrency)
         """
         self.pipeline = ClassificationPipeline(use_vector_store=use_vector_store)
         self.use_vector_store = use_vector_store
+        self.max_concurrency = max_concurrency
 
         print(f"Initialized Classification Pipeline (vector_store={'enabled' if use_vector_store else 'disabled'})")
         print(f"Running tests on {len(tests)} test cases")
@@ -91,11 +95,19 @@ class PipelineAccuracyTester:
         print("\n🚀 Testing Complete Classification Pipeline")
         print("=" * 60)
 
-        for i, test_case in enumerate(tests, 1):
+        batch_start = time.time()
+        classification_results = self.pipeline.classify_batch(
+            [test_case["text"] for test_case in tests],
+            max_concurrency=self.max_concurrency,
+            return_exceptions=True,
+        )
+        batch_time_ms = (time.time() - batch_start) * 1000
+
+        for i, (test_case, classification_result) in enumerate(zip(tests, classification_results), 1):
             try:
-                start_time = time.time()
-                classification_result = self.pipeline.classify(test_case["text"])
-                processing_time_ms = (time.time() - start_time) * 1000
+                if isinstance(classification_result, BaseException):
+                    raise classification_result
+                processing_time_ms = classification_result.processing_time_ms
 
                 # Extract metadata
                 metadata = classification_result.metadata
@@ -145,6 +157,12 @@ class PipelineAccuracyTester:
                 print(f"❌ Pipeline failed for test case {i}: {e}")
                 continue
 
+        case_time_ms = sum(r.processing_time_ms for r in results)
+        print(
+            f"Classified {len(tests)} test cases in {batch_time_ms:.1f}ms wall-clock "
+            f"({case_time_ms:.1f}ms of case time, {case_time_ms / batch_time_ms:.1f}x speedup over serial)"
+        )
+
         if not results:
             raise ValueError("No valid test results generated")
 
@@ -254,6 +272,13 @@ class PipelineAccuracyTester:
         print(f"    - Selection: {pipeline_results.avg_selection_time_ms:.1f}ms ({pipeline_results.avg_selection_time_ms/pipeline_results.avg_processing_time_ms*100:.1f}%)")
         print()
 
+        print("Stage Latency (p50 / p90 / p99):")
+        for stage, stats in tracer.as_dict().items():
+            print(f"  {stage:<16} {stats['p50_ms']:>8.1f} / {stats['p90_ms']:>8.1f} / {stats['p99_ms']:>8.1f}ms")
+        cache_stats = type_builder_cache.stats
+        print(f"TypeBuilder Cache: {cache_stats.hit_rate * 100:.1f}% hit rate ({cache_stats.hits} hits, {cache_stats.misses} misses)")
+        print()
+
         # Test type breakdown
         llm_generated = [r for r in pipeline_results.results if r.test_case["test_type"] == "llm_generated"]
         human_generated = [r for r in pipeline_results.results if r.test_case["test_type"] == "human_generated"]
@@ -324,6 +349,8 @@ class PipelineAccuracyTester:
                 "avg_processing_time_ms": results.avg_processing_time_ms,
                 "avg_narrowing_time_ms": results.avg_narrowing_time_ms,
                 "avg_selection_time_ms": results.avg_selection_time_ms,
+                C.STAGE_LATENCY: tracer.as_dict(),
+                C.TYPE_BUILDER_CACHE: type_builder_cache.stats.as_dict(),
                 "individual_results": [],
             },
         }
@@ -354,6 +381,7 @@ class PipelineAccuracyTester:
                 "narrowed_count": result.narrowed_count,
                 "narrowing_time_ms": result.narrowing_time_ms,
                 "selection_time_ms": result.selection_time_ms,
+                C.STAGE_TIMINGS_MS: result.classification_result.metadata.get(C.STAGE_TIMINGS_MS, {}),
                 "narrowing_strategy": result.narrowing_strategy,
                 "vector_store_enabled": result.vector_store_enabled,
             }
@@ -366,8 +394,12 @@ class PipelineAccuracyTester:
         return filepath
 
 
-def main():
-    """Execute the test."""
+def main(argv: list[str] | None = None):
+    """Execute the test.
+
+    Args:
+        argv: Command line arguments. Defaults to ``sys.argv[1:]``.
+    """
     # Parse command line arguments
     parser = argparse.ArgumentParser(
         description="Run pipeline accuracy test with optional saved run creation",
@@ -383,8 +415,13 @@ def main():
         type=str, 
         help="Description for the saved run"
     )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        help="How many test cases to classify at once (defaults to settings.max_concurrency)"
+    )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Also check environment variables for save parameters
     save_as = args.save_as or os.environ.get('SAVE_AS')
@@ -401,7 +438,7 @@ def main():
             print(f"Description: {description}")
     print()
 
-    tester = PipelineAccuracyTester()
+    tester = PipelineAccuracyTester(max_concurrency=args.max_concurrency)
     results = tester.run_test()
 
     # Save results to JSON file
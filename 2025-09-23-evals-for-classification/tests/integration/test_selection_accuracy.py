@@ -21,9 +21,25 @@ from src.data.category_loader import CategoryLoader
 from src.data.models import Category
 from src.shared import constants as C
 from tests.data.test_cases import TestCase, tests
+from tests.harness import run_cases
 
 dotenv.load_dotenv()
 
+class CaseFailedError(Exception):
+    """A test case's narrowing or selection step failed."""
+
+    def __init__(self, step: str, error: Exception | None = None):
+        """Initialize the error.
+
+        Args:
+            step: What went wrong, e.g. "Narrowing failed"
+            error: The underlying error, if any
+        """
+        super().__init__(f"{step}: {error}" if error else step)
+        self.step = step
+        self.error = error
+
+
 @dataclass
 class SelectionResult:
     """Result of a single selection test."""
@@ -51,8 +67,13 @@ class SelectionResults:
 class SelectionAccuracyTester:
     """Test harness for evaluating selection accuracy."""
 
-    def __init__(self):
-        """Initialize the tester with required components."""
+    def __init__(self, workers: int = 1):
+        """Initialize the tester with required components.
+
+        Args:
+            workers: How many test cases to classify at once
+        """
+        self.workers = workers
         self.category_loader = CategoryLoader()
         self.selector = CategorySelector()
         self.categories = self.category_loader.load_categories()
@@ -74,60 +95,21 @@ class SelectionAccuracyTester:
         Returns:
             Aggregated results for selection testing
         """
-        results = []
-
         print("\n🎯 Testing Category Selection Accuracy")
         print("=" * 50)
 
-        for i, test_case in enumerate(tests, 1):
-            # First, use narrowing to generate candidate categories
-            try:
-                narrowing_start_time = time.time()
-                candidate_categories = self.narrower.narrow(test_case["text"], self.categories)
-                narrowing_time_ms = (time.time() - narrowing_start_time) * 1000
-            except Exception as e:
-                print(f"❌ Narrowing failed for test case {i}: {e}")
-                continue
-
-            if not candidate_categories:
-                print(f"❌ No candidate categories found for test case {i}")
-                continue
-
-            # Run selection on the narrowed candidates
-            try:
-                selection_start_time = time.time()
-                selected_category = self.selector.select_best_category(test_case["text"], candidate_categories)
-                selection_time_ms = (time.time() - selection_start_time) * 1000
-                processing_time_ms = narrowing_time_ms + selection_time_ms
-            except Exception as e:
-                print(f"❌ Selection failed for test case {i}: {e}")
+        run = run_cases(self._run_case, tests, self.workers)
+        results = []
+        for i, result in enumerate(run.results, 1):
+            if isinstance(result, CaseFailedError):
+                detail = f": {result.error}" if result.error else ""
+                print(f"❌ {result.step} for test case {i}{detail}")
                 continue
-
-            # Check if correct category was selected
-            expected_category_path = test_case["category"]
-            correct_selection = selected_category.path == expected_category_path
-
-            result = SelectionResult(
-                test_case=test_case,
-                candidate_categories=candidate_categories,
-                selected_category=selected_category,
-                correct_selection=correct_selection,
-                processing_time_ms=processing_time_ms,
-                candidate_count=len(candidate_categories),
-            )
+            if isinstance(result, Exception):
+                raise result
             results.append(result)
-
-            # Print progress
-            status = "✅" if correct_selection else "❌"
-            print(f"{i:2d}. {status} {test_case['text'][:60]}...")
-            print(f"    Expected: {expected_category_path}")
-            print(f"    Selected: {selected_category.path}")
-            print(f"    Candidates: {len(candidate_categories)} ({processing_time_ms:.1f}ms)")
-            if not correct_selection:
-                print("    ⚠️  Incorrect selection!")
-                candidate_paths = [cat.path for cat in candidate_categories]
-                print(f"    Available: {candidate_paths}")
-            print()
+            self._print_result(i, result)
+        print(run.summary())
 
         if not results:
             raise ValueError("No valid test results generated")
@@ -147,6 +129,65 @@ class SelectionAccuracyTester:
             results=results,
         )
 
+    def _run_case(self, test_case: TestCase) -> SelectionResult:
+        """Narrow and then select the category for one test case.
+
+        Args:
+            test_case: The test case to classify
+
+        Returns:
+            The selection result
+
+        Raises:
+            CaseFailedError: If narrowing or selection failed
+        """
+        # First, use narrowing to generate candidate categories
+        try:
+            narrowing_start_time = time.time()
+            candidate_categories = self.narrower.narrow(test_case["text"], self.categories)
+            narrowing_time_ms = (time.time() - narrowing_start_time) * 1000
+        except Exception as e:
+            raise CaseFailedError("Narrowing failed", e) from e
+
+        if not candidate_categories:
+            raise CaseFailedError("No candidate categories found")
+
+        # Run selection on the narrowed candidates
+        try:
+            selection_start_time = time.time()
+            selected_category = self.selector.select_best_category(test_case["text"], candidate_categories)
+            selection_time_ms = (time.time() - selection_start_time) * 1000
+            processing_time_ms = narrowing_time_ms + selection_time_ms
+        except Exception as e:
+            raise CaseFailedError("Selection failed", e) from e
+
+        return SelectionResult(
+            test_case=test_case,
+            candidate_categories=candidate_categories,
+            selected_category=selected_category,
+            correct_selection=selected_category.path == test_case["category"],
+            processing_time_ms=processing_time_ms,
+            candidate_count=len(candidate_categories),
+        )
+
+    def _print_result(self, i: int, result: SelectionResult) -> None:
+        """Print the progress line for one test case.
+
+        Args:
+            i: The test case number
+            result: The test case's selection result
+        """
+        status = "✅" if result.correct_selection else "❌"
+        print(f"{i:2d}. {status} {result.test_case['text'][:60]}...")
+        print(f"    Expected: {result.test_case['category']}")
+        print(f"    Selected: {result.selected_category.path}")
+        print(f"    Candidates: {result.candidate_count} ({result.processing_time_ms:.1f}ms)")
+        if not result.correct_selection:
+            print("    ⚠️  Incorrect selection!")
+            candidate_paths = [cat.path for cat in result.candidate_categories]
+            print(f"    Available: {candidate_paths}")
+        print()
+
     def analyze_failures(self, selection_results: SelectionResults) -> None:
         """Analyze and report on failed selections.
 
@@ -276,15 +317,19 @@ class SelectionAccuracyTester:
         return filepath
 
 
-def main():
-    """Execute the test."""
+def main(workers: int = 1):
+    """Execute the test.
+
+    Args:
+        workers: How many test cases to classify at once
+    """
     print("Category Selection Accuracy Test")
     print("=" * 60)
     print("This test evaluates how often the correct category is selected")
     print("by the LLM from the narrowed candidate categories.")
     print()
 
-    tester = SelectionAccuracyTester()
+    tester = SelectionAccuracyTester(workers=workers)
     results = tester.run_test()
 
     # Save results to JSON file
@@ -5,11 +5,16 @@ This script provides an easy way to run different types of tests:
 - Unit tests (individual components)
 - Performance benchmarks
 
+Integration tests can classify several test cases at once (``--workers``) and
+record LLM and embedding responses to disk for offline, instant re-runs
+(``--llm-fixtures record`` once, then ``--llm-fixtures replay``).
+
 Usage:
     python tests/run_tests.py --narrowing-accuracy
     python tests/run_tests.py --selection-accuracy
     python tests/run_tests.py --unit
     python tests/run_tests.py --all
+    python tests/run_tests.py --pipeline-accuracy --workers 8 --llm-fixtures replay
 """
 
 import argparse
@@ -30,28 +35,28 @@ dotenv.load_dotenv(project_root / ".env")
 
 
 
-def run_narrowing_accuracy_test():
+def run_narrowing_accuracy_test(workers: int = 1):
     """Run the narrowing accuracy integration test."""
     print("Running Narrowing Accuracy Test...")
     from tests.integration.test_narrowing_accuracy import main as narrowing_test_main
 
-    narrowing_test_main()
+    narrowing_test_main(workers=workers)
 
 
-def run_selection_accuracy_test():
+def run_selection_accuracy_test(workers: int = 1):
     """Run the selection accuracy integration test."""
     print("Running Selection Accuracy Test...")
     from tests.integration.test_selection_accuracy import main as selection_test_main
 
-    selection_test_main()
+    selection_test_main(workers=workers)
 
 
-def run_pipeline_accuracy_test():
+def run_pipeline_accuracy_test(workers: int = 1):
     """Run the complete pipeline accuracy integration test."""
     print("Running Pipeline Accuracy Test...")
     from tests.integration.test_pipeline_accuracy import main as pipeline_test_main
 
-    pipeline_test_main()
+    pipeline_test_main(["--max-concurrency", str(workers)])
 
 
 def run_unit_tests():
@@ -126,7 +131,7 @@ def run_unit_tests():
         os.chdir(original_dir)
 
 
-def run_all_tests():
+def run_all_tests(workers: int = 1):
     """Run all available tests."""
     print("Running All Tests")
     print("=" * 60)
@@ -137,17 +142,17 @@ def run_all_tests():
     print("\n" + "=" * 60)
 
     # Run narrowing accuracy test
-    run_narrowing_accuracy_test()
+    run_narrowing_accuracy_test(workers)
 
     print("\n" + "=" * 60)
 
     # Run selection accuracy test
-    run_selection_accuracy_test()
+    run_selection_accuracy_test(workers)
 
     print("\n" + "=" * 60)
 
     # Run pipeline accuracy test
-    run_pipeline_accuracy_test()
+    run_pipeline_accuracy_test(workers)
 
     print("\n" + "=" * 60)
     print("All test results have been saved to JSON files in tests/results/")
@@ -175,22 +180,41 @@ def main():
 
     parser.add_argument("--all", action="store_true", help="Run all available tests")
 
+    parser.add_argument(
+        "--workers", type=int, default=1, help="How many integration test cases to run at once (default: 1, serial)"
+    )
+
+    parser.add_argument(
+        "--llm-fixtures",
+        choices=["off", "record", "replay"],
+        default="off",
+        help="Serve BAML and embedding responses from disk: record new ones, or replay only (runs offline)",
+    )
+
+    parser.add_argument("--fixtures-dir", type=Path, help="Where LLM fixtures are stored (default: tests/fixtures/llm)")
+
     args = parser.parse_args()
 
-    if args.narrowing_accuracy:
-        run_narrowing_accuracy_test()
-    elif args.selection_accuracy:
-        run_selection_accuracy_test()
-    elif args.pipeline_accuracy:
-        run_pipeline_accuracy_test()
-    elif args.unit:
-        run_unit_tests()
-    elif args.all:
-        run_all_tests()
-    else:
-        # Default: run all tests
-        print("No specific test specified. Running all tests...")
-        run_all_tests()
+    from tests.harness import FIXTURES_DIR, LLMRecorder
+
+    with LLMRecorder(args.llm_fixtures, args.fixtures_dir or FIXTURES_DIR) as recorder:
+        if args.narrowing_accuracy:
+            run_narrowing_accuracy_test(args.workers)
+        elif args.selection_accuracy:
+            run_selection_accuracy_test(args.workers)
+        elif args.pipeline_accuracy:
+            run_pipeline_accuracy_test(args.workers)
+        elif args.unit:
+            run_unit_tests()
+        elif args.all:
+            run_all_tests(args.workers)
+        else:
+            # Default: run all tests
+            print("No specific test specified. Running all tests...")
+            run_all_tests(args.workers)
+
+    if args.llm_fixtures != "off":
+        print(recorder.summary())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+"""Test the ann_index module."""
+
+import numpy as np
+import pytest
+
+from src.classification.ann_index import IVFCategoryIndex, IVFIndex, ann_index_key
+from src.classification.category_index import CategoryEmbeddingIndex
+from src.data.models import Category
+
+
+@pytest.fixture
+def mock_categories():
+    """Fixture that provides 200 test Category instances."""
+    return [
+        Category(
+            name=f"Category{i}",
+            path=f"/Root/Category{i}",
+            embedding_text=f"root category {i}",
+            llm_description=f"Items in the Category{i} category under Root",
+        )
+        for i in range(200)
+    ]
+
+
+@pytest.fixture
+def exact_index(mock_categories):
+    """Fixture that provides an exact index over clustered random embeddings."""
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(8, 32))
+    embeddings = centers[rng.integers(0, 8, size=len(mock_categories))] + 0.3 * rng.normal(size=(200, 32))
+    return CategoryEmbeddingIndex(mock_categories, embeddings)
+
+
+def test_ann_index_key_depends_on_model_and_paths():
+    """Test ann_index_key changes with the embedding model and with the category paths."""
+    ###########
+    # ARRANGE #
+    ###########
+    paths = ["/A", "/B"]
+
+    #######
+    # ACT #
+    #######
+    key = ann_index_key("model-a", paths)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert key == ann_index_key("model-a", list(paths))
+    assert key != ann_index_key("model-b", paths)
+    assert key != ann_index_key("model-a", ["/B", "/A"])
+
+
+def test_build_covers_every_row_once(exact_index):
+    """Test IVFIndex.build puts every row in exactly one list."""
+    #######
+    # ACT #
+    #######
+    ivf = IVFIndex.build(exact_index.matrix, n_lists=10)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert ivf.n_lists == 10
+    assert len(ivf) == len(exact_index)
+    assert sorted(ivf.list_rows.tolist()) == list(range(len(exact_index)))
+    assert ivf.list_offsets[0] == 0
+    assert ivf.list_offsets[-1] == len(exact_index)
+
+
+def test_search_scanning_all_lists_matches_exact(exact_index):
+    """Test probing every list returns exactly the exact index's results."""
+    ###########
+    # ARRANGE #
+    ###########
+    ivf = IVFIndex.build(exact_index.matrix, n_lists=10)
+    index = IVFCategoryIndex(exact_index, ivf, nprobe=10)
+    query = np.random.default_rng(1).normal(size=32)
+
+    #######
+    # ACT #
+    #######
+    result = index.top_k(query, 15)
+
+    ##########
+    # ASSERT #
+    ##########
+    expected = exact_index.top_k(query, 15)
+    assert [category.path for category, _ in result] == [category.path for category, _ in expected]
+    np.testing.assert_allclose([score for _, score in result], [score for _, score in expected], rtol=1e-5)
+
+
+def test_search_with_few_probes_has_high_recall(exact_index):
+    """Test probing a subset of lists still finds a category's own neighbours."""
+    ###########
+    # ARRANGE #
+    ###########
+    ivf = IVFIndex.build(exact_index.matrix, n_lists=10)
+    index = IVFCategoryIndex(exact_index, ivf, nprobe=3)
+    queries = exact_index.matrix[:20]
+
+    #######
+    # ACT #
+    #######
+    hits = sum(
+        len({c.path for c in index.search(q, 10)} & {c.path for c in exact_index.search(q, 10)}) for q in queries
+    )
+
+    ##########
+    # ASSERT #
+    ##########
+    assert hits / (len(queries) * 10) >= 0.9
+
+
+def test_save_and_load_round_trip(tmp_path, exact_index):
+    """Test a saved index loads back with the same key and not with a different one."""
+    ###########
+    # ARRANGE #
+    ###########
+    ivf = IVFIndex.build(exact_index.matrix, n_lists=10)
+
+    #######
+    # ACT #
+    #######
+    ivf.save(tmp_path, "key-1")
+    loaded = IVFIndex.load(tmp_path, "key-1")
+
+    ##########
+    # ASSERT #
+    ##########
+    assert loaded is not None
+    np.testing.assert_array_equal(loaded.centroids, ivf.centroids)
+    np.testing.assert_array_equal(loaded.list_offsets, ivf.list_offsets)
+    np.testing.assert_array_equal(loaded.list_rows, ivf.list_rows)
+    assert IVFIndex.load(tmp_path, "key-2") is None
+    assert IVFIndex.load(tmp_path / "missing", "key-1") is None
+
+
+def test_category_index_rejects_mismatched_ivf(exact_index):
+    """Test IVFCategoryIndex refuses an IVF index built over a different number of rows."""
+    ###########
+    # ARRANGE #
+    ###########
+    ivf = IVFIndex.build(exact_index.matrix[:50], n_lists=5)
+
+    #######
+    # ACT #
+    #######
+    with pytest.raises(ValueError):
+        IVFCategoryIndex(exact_index, ivf, nprobe=2)
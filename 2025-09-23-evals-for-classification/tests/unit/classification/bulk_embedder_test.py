@@ -0,0 +1,228 @@
+"""Test the bulk_embedder module."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+import pytest
+
+from src.classification.bulk_embedder import BuildCheckpoint, BulkEmbedder, RateLimiter, estimate_tokens
+
+
+class FakeEmbeddingsServer:
+    """Local OpenAI-compatible embeddings endpoint.
+
+    Each text embeds to ``[len(text), 1.0]``. The first ``fail_first`` requests get
+    an HTTP 429, and requests containing a text in ``always_fail`` get an HTTP 500.
+    """
+
+    def __init__(self) -> None:
+        """Start the server on a free port."""
+        self.requests: list[list[str]] = []
+        self.fail_first = 0
+        self.always_fail: set[str] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to point an OpenAI client at."""
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def close(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                texts = body["input"]
+                with fake._lock:
+                    fake.requests.append(texts)
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    status = 200
+                    if fake.fail_first > 0:
+                        fake.fail_first -= 1
+                        status = 429
+                    elif fake.always_fail & set(texts):
+                        status = 500
+                threading.Event().wait(0.01)
+                if status == 200:
+                    payload = {
+                        "object": "list",
+                        "model": body["model"],
+                        "data": [
+                            {"object": "embedding", "index": i, "embedding": [float(len(text)), 1.0]}
+                            for i, text in enumerate(texts)
+                        ],
+                        "usage": {"prompt_tokens": 1, "total_tokens": 1},
+                    }
+                else:
+                    payload = {"error": {"message": "fake failure", "type": "fake"}}
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                with fake._lock:
+                    fake.in_flight -= 1
+
+        return Handler
+
+
+@pytest.fixture
+def fake_server():
+    """Fixture that provides a running fake embeddings endpoint."""
+    server = FakeEmbeddingsServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def texts():
+    """Fixture that provides 25 texts of distinct lengths."""
+    return ["x" * (i + 1) for i in range(25)]
+
+
+def _embedder(server: FakeEmbeddingsServer, **kwargs) -> BulkEmbedder:
+    """Create a BulkEmbedder against the fake server that never really sleeps."""
+    client = openai.OpenAI(api_key="test", base_url=server.base_url, max_retries=0)
+    return BulkEmbedder(client, "fake-model", batch_size=4, sleep=lambda _: None, **kwargs)
+
+
+def test_run_embeds_every_batch_concurrently(fake_server: FakeEmbeddingsServer, texts: list[str]):
+    """Test run embeds every text exactly once, hands back aligned batches, and overlaps requests."""
+    ###########
+    # ARRANGE #
+    ###########
+    embedder = _embedder(fake_server, workers=4)
+    results: dict[int, list[float]] = {}
+
+    def on_batch(start, end, embeddings):
+        for i, embedding in zip(range(start, end), embeddings):
+            results[i] = embedding
+
+    #######
+    # ACT #
+    #######
+    report = embedder.run(texts, on_batch)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert report.embedded == len(texts)
+    assert report.failed_batches == []
+    assert [results[i] for i in range(len(texts))] == [[float(len(text)), 1.0] for text in texts]
+    assert len(fake_server.requests) == 7  # ceil(25 / 4)
+    assert fake_server.max_in_flight > 1
+    assert report.throughput > 0
+
+
+def test_run_retries_rate_limited_requests(fake_server: FakeEmbeddingsServer, texts: list[str]):
+    """Test HTTP 429 responses are retried and counted."""
+    ###########
+    # ARRANGE #
+    ###########
+    fake_server.fail_first = 3
+    embedder = _embedder(fake_server, workers=1)
+
+    #######
+    # ACT #
+    #######
+    report = embedder.run(texts, lambda start, end, embeddings: None)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert report.retries == 3
+    assert report.embedded == len(texts)
+    assert report.failed_batches == []
+
+
+def test_run_reports_failed_batch_and_resumes(tmp_path, fake_server: FakeEmbeddingsServer, texts: list[str]):
+    """Test a batch that keeps failing is reported, and a rerun embeds only that batch."""
+    ###########
+    # ARRANGE #
+    ###########
+    fake_server.always_fail = {texts[9]}  # In batch (8, 12)
+    key = BuildCheckpoint.build_key("fake-model", 4, texts)
+    checkpoint_path = tmp_path / "checkpoint.json"
+
+    #######
+    # ACT #
+    #######
+    first = _embedder(fake_server, max_retries=1).run(texts, lambda *_: None, BuildCheckpoint(checkpoint_path, key))
+    fake_server.always_fail = set()
+    fake_server.requests.clear()
+    second = _embedder(fake_server).run(texts, lambda *_: None, BuildCheckpoint(checkpoint_path, key))
+
+    ##########
+    # ASSERT #
+    ##########
+    assert first.failed_batches == [(8, 12)]
+    assert first.embedded == len(texts) - 4
+    assert second.resumed == len(texts) - 4
+    assert second.embedded == 4
+    assert fake_server.requests == [texts[8:12]]
+
+
+def test_checkpoint_ignored_for_different_build(tmp_path):
+    """Test a checkpoint written for other inputs is not resumed."""
+    ###########
+    # ARRANGE #
+    ###########
+    path = tmp_path / "checkpoint.json"
+    BuildCheckpoint(path, BuildCheckpoint.build_key("model-a", 4, ["a"])).mark_done(0, 1)
+
+    #######
+    # ACT #
+    #######
+    checkpoint = BuildCheckpoint(path, BuildCheckpoint.build_key("model-b", 4, ["a"]))
+
+    ##########
+    # ASSERT #
+    ##########
+    assert checkpoint.completed == set()
+    assert not checkpoint.exists
+
+
+def test_rate_limiter_waits_for_token_budget():
+    """Test acquire waits until the token bucket has refilled enough for the request."""
+    ###########
+    # ARRANGE #
+    ###########
+    now = [0.0]
+
+    def sleep(seconds: float) -> None:
+        now[0] += seconds
+
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=600, clock=lambda: now[0], sleep=sleep)
+
+    #######
+    # ACT #
+    #######
+    first_wait = limiter.acquire(600)
+    second_wait = limiter.acquire(300)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert first_wait == 0
+    assert second_wait == pytest.approx(30.0)  # 300 tokens at 10 tokens/s
+
+
+def test_estimate_tokens():
+    """Test estimate_tokens charges about one token per four characters plus one per text."""
+    assert estimate_tokens(["abcdefgh", ""]) == 4
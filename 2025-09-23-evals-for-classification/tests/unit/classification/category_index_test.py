@@ -0,0 +1,193 @@
+"""Test the category_index module."""
+
+import numpy as np
+import pytest
+
+from src.classification.category_index import CategoryEmbeddingIndex, cosine_similarity, normalize_embeddings
+from src.data.models import Category
+
+
+@pytest.fixture
+def mock_categories():
+    """Fixture that provides test Category instances."""
+    return [
+        Category(
+            name=f"Category{i}",
+            path=f"/Root/Category{i}",
+            embedding_text=f"root category {i}",
+            llm_description=f"Items in the Category{i} category under Root",
+        )
+        for i in range(6)
+    ]
+
+
+@pytest.fixture
+def random_embeddings():
+    """Fixture that provides reproducible random embeddings for 6 categories."""
+    return np.random.default_rng(42).normal(size=(6, 16))
+
+
+def test_normalize_embeddings_unit_rows():
+    """Test normalize_embeddings produces unit-length rows."""
+    ###########
+    # ARRANGE #
+    ###########
+    embeddings = [[3.0, 4.0], [1.0, 0.0]]
+
+    #######
+    # ACT #
+    #######
+    result = normalize_embeddings(embeddings)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, [[0.6, 0.8], [1.0, 0.0]], rtol=1e-6)
+
+
+def test_normalize_embeddings_zero_row():
+    """Test normalize_embeddings leaves zero rows as zeros instead of NaN."""
+    ###########
+    # ARRANGE #
+    ###########
+    embeddings = [[0.0, 0.0], [2.0, 0.0]]
+
+    #######
+    # ACT #
+    #######
+    result = normalize_embeddings(embeddings)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert not np.isnan(result).any()
+    np.testing.assert_array_equal(result[0], [0.0, 0.0])
+
+
+def test_cosine_similarity_matches_formula():
+    """Test cosine_similarity agrees with the textbook formula."""
+    ###########
+    # ARRANGE #
+    ###########
+    embedding1 = [0.1, 0.2, 0.3, 0.4]
+    embedding2 = [0.4, 0.1, 0.0, 0.2]
+    expected = np.dot(embedding1, embedding2) / (np.linalg.norm(embedding1) * np.linalg.norm(embedding2))
+
+    #######
+    # ACT #
+    #######
+    result = cosine_similarity(embedding1, embedding2)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert abs(result - expected) < 1e-12
+
+
+def test_init_rejects_mismatched_shapes(mock_categories: list[Category]):
+    """Test the index rejects embedding matrices that don't match the category list."""
+    ##########
+    # ASSERT #
+    ##########
+    with pytest.raises(ValueError, match="embedding matrix"):
+        CategoryEmbeddingIndex(mock_categories, np.zeros((3, 4)))
+
+
+def test_top_k_matches_brute_force(mock_categories: list[Category], random_embeddings: np.ndarray):
+    """Test top_k returns the same ranking as a per-category similarity loop."""
+    ###########
+    # ARRANGE #
+    ###########
+    index = CategoryEmbeddingIndex(mock_categories, random_embeddings)
+    query = np.random.default_rng(7).normal(size=16)
+    scored = [(category, cosine_similarity(query, emb)) for category, emb in zip(mock_categories, random_embeddings)]
+    scored.sort(key=lambda x: x[1], reverse=True)
+
+    #######
+    # ACT #
+    #######
+    result = index.top_k(query, 3)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert [category for category, _ in result] == [category for category, _ in scored[:3]]
+    for (_, score), (_, expected) in zip(result, scored[:3]):
+        assert abs(score - expected) < 1e-5
+
+
+def test_scores_subset_of_rows(mock_categories: list[Category], random_embeddings: np.ndarray):
+    """Test scores can be restricted to selected rows without scoring the rest."""
+    ###########
+    # ARRANGE #
+    ###########
+    index = CategoryEmbeddingIndex(mock_categories, random_embeddings)
+    query = np.random.default_rng(3).normal(size=16)
+
+    #######
+    # ACT #
+    #######
+    result = index.scores(query, [4, 1])
+
+    ##########
+    # ASSERT #
+    ##########
+    np.testing.assert_allclose(result, index.scores(query)[[4, 1]], rtol=1e-6)
+
+
+def test_top_k_breaks_ties_by_index_order(mock_categories: list[Category]):
+    """Test top_k keeps the original category order for equal scores."""
+    ###########
+    # ARRANGE #
+    ###########
+    embeddings = np.ones((6, 4))
+    index = CategoryEmbeddingIndex(mock_categories, embeddings)
+
+    #######
+    # ACT #
+    #######
+    result = index.search([1.0, 1.0, 1.0, 1.0], 4)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result == mock_categories[:4]
+
+
+def test_top_k_k_larger_than_index(mock_categories: list[Category], random_embeddings: np.ndarray):
+    """Test top_k returns every category when k exceeds the index size."""
+    ###########
+    # ARRANGE #
+    ###########
+    index = CategoryEmbeddingIndex(mock_categories, random_embeddings)
+
+    #######
+    # ACT #
+    #######
+    result = index.search(random_embeddings[2], 100)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert len(result) == len(mock_categories)
+    assert result[0] == mock_categories[2]
+
+
+def test_empty_index_returns_no_results():
+    """Test an empty index answers queries with no results."""
+    ###########
+    # ARRANGE #
+    ###########
+    index = CategoryEmbeddingIndex([], [])
+
+    #######
+    # ACT #
+    #######
+    result = index.search([1.0, 0.0], 5)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert len(index) == 0
+    assert result == []
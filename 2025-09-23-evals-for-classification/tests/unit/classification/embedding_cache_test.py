@@ -0,0 +1,94 @@
+"""Test the embedding_cache module."""
+
+import pathlib
+
+import pytest
+
+from src.classification.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def embedding_cache(tmp_path: pathlib.Path):
+    """Fixture that provides an EmbeddingCache in a temporary directory."""
+    cache = EmbeddingCache(tmp_path / "cache" / "embeddings.sqlite3")
+    yield cache
+    cache.close()
+
+
+def test_put_and_get_roundtrip(embedding_cache: EmbeddingCache):
+    """Test stored embeddings are returned for the same model and text."""
+    ###########
+    # ARRANGE #
+    ###########
+    embedding_cache.put_many("model-a", {"hello": [0.5, -0.25], "world": [1.0, 2.0]})
+
+    #######
+    # ACT #
+    #######
+    result = embedding_cache.get_many("model-a", ["hello", "world", "missing"])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result == {"hello": [0.5, -0.25], "world": [1.0, 2.0]}
+    assert len(embedding_cache) == 2
+
+
+def test_keys_include_model(embedding_cache: EmbeddingCache):
+    """Test embeddings cached for one model are not returned for another."""
+    ###########
+    # ARRANGE #
+    ###########
+    embedding_cache.put_many("model-a", {"hello": [0.5]})
+
+    #######
+    # ACT #
+    #######
+    result = embedding_cache.get_many("model-b", ["hello"])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result == {}
+
+
+def test_cache_persists_across_instances(tmp_path: pathlib.Path):
+    """Test embeddings written by one cache instance are visible to a new one on the same file."""
+    ###########
+    # ARRANGE #
+    ###########
+    path = tmp_path / "embeddings.sqlite3"
+    first = EmbeddingCache(path)
+    first.put_many("model-a", {"hello": [0.5]})
+    first.close()
+
+    #######
+    # ACT #
+    #######
+    second = EmbeddingCache(path)
+    result = second.get_many("model-a", ["hello"])
+    second.close()
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result == {"hello": [0.5]}
+
+
+def test_get_many_handles_large_lookups(embedding_cache: EmbeddingCache):
+    """Test lookups larger than one SQL chunk return every hit."""
+    ###########
+    # ARRANGE #
+    ###########
+    embeddings = {f"text {i}": [float(i)] for i in range(1200)}
+    embedding_cache.put_many("model-a", embeddings)
+
+    #######
+    # ACT #
+    #######
+    result = embedding_cache.get_many("model-a", list(embeddings))
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result == embeddings
@@ -1,11 +1,15 @@
 """Test the embeddings module."""
+import sqlite3
 from unittest import mock
 
 import numpy as np
 import pytest
 
+from src.classification.ann_index import IVFIndex, ann_index_key
 from src.classification.embeddings import EmbeddingService
+from src.data.category_table import CategoryTable
 from src.data.models import Category
+from src.data.taxonomy_snapshot import TaxonomySnapshot, write_taxonomy_snapshot
 
 
 
@@ -48,7 +52,7 @@ def embedding_service_no_vector_store():
         mock.patch("src.classification.embeddings.get_logger"),
     ):
         mock_settings.openai_api_key = "test-api-key"
-        return EmbeddingService(use_vector_store=False)
+        return EmbeddingService(use_vector_store=False, use_disk_cache=False)
 
 
 @pytest.fixture
@@ -61,8 +65,10 @@ def embedding_service_with_vector_store():
         mock.patch("src.classification.embeddings.get_logger"),
     ):
         mock_settings.openai_api_key = "test-api-key"
-        mock_vector_store.return_value = mock.MagicMock()
-        return EmbeddingService(use_vector_store=True)
+        mock_vector_store.shared.return_value = mock.MagicMock()
+        # Nothing is cached in the vector store unless a test says otherwise
+        mock_vector_store.shared.return_value.get_cached_embeddings.side_effect = lambda paths: [None] * len(paths)
+        return EmbeddingService(use_vector_store=True, use_disk_cache=False)
 
 
 @mock.patch("src.classification.embeddings.openai.OpenAI")
@@ -83,14 +89,14 @@ def test_init_with_vector_store_success(
     mock_openai_client = mock.MagicMock()
     mock_openai.return_value = mock_openai_client
     mock_vector_store = mock.MagicMock()
-    mock_vector_store_class.return_value = mock_vector_store
+    mock_vector_store_class.shared.return_value = mock_vector_store
     mock_logger = mock.MagicMock()
     mock_get_logger.return_value = mock_logger
 
     #######
     # ACT #
     #######
-    service = EmbeddingService(use_vector_store=True)
+    service = EmbeddingService(use_vector_store=True, use_disk_cache=False)
 
     ##########
     # ASSERT #
@@ -99,7 +105,7 @@ def test_init_with_vector_store_success(
     assert service.client == mock_openai_client
     assert service._cache == {}
     assert service.vector_store == mock_vector_store
-    mock_vector_store_class.assert_called_once_with(auto_create=True)
+    mock_vector_store_class.shared.assert_called_once_with(auto_create=True)
     # Verify logger.success was called
     mock_logger.success.assert_called_once_with("EmbeddingService using vector store for caching")
 
@@ -121,14 +127,14 @@ def test_init_with_vector_store_failure(
     mock_settings.openai_api_key = "test-api-key"
     mock_openai_client = mock.MagicMock()
     mock_openai.return_value = mock_openai_client
-    mock_vector_store_class.side_effect = Exception("Vector store initialization failed")
+    mock_vector_store_class.shared.side_effect = Exception("Vector store initialization failed")
     mock_logger = mock.MagicMock()
     mock_get_logger.return_value = mock_logger
 
     #######
     # ACT #
     #######
-    service = EmbeddingService(use_vector_store=True)
+    service = EmbeddingService(use_vector_store=True, use_disk_cache=False)
 
     ##########
     # ASSERT #
@@ -137,7 +143,7 @@ def test_init_with_vector_store_failure(
     assert service.client == mock_openai_client
     assert service._cache == {}
     assert service.vector_store is None
-    mock_vector_store_class.assert_called_once_with(auto_create=True)
+    mock_vector_store_class.shared.assert_called_once_with(auto_create=True)
     mock_logger.warning.assert_called_once_with(
         "EmbeddingService failed to load vector store: Vector store initialization failed"
     )
@@ -157,7 +163,7 @@ def test_init_without_vector_store(mock_openai: mock.MagicMock, mock_settings: m
     #######
     # ACT #
     #######
-    service = EmbeddingService(use_vector_store=False)
+    service = EmbeddingService(use_vector_store=False, use_disk_cache=False)
 
     ##########
     # ASSERT #
@@ -215,7 +221,7 @@ def test_embed_text_cache_miss(
     ##########
     assert result == expected_embedding
     embedding_service_no_vector_store.client.embeddings.create.assert_called_once_with(
-        model="text-embedding-3-small", input=test_text
+        model="text-embedding-3-small", input=[test_text]
     )
     # Verify embedding was cached
     assert embedding_service_no_vector_store._cache[test_text] == expected_embedding
@@ -229,8 +235,8 @@ def test_embed_category_vector_store_cache_hit(
     # ARRANGE #
     ###########
     cached_embedding = [0.7, 0.8, 0.9]
-    embedding_service_with_vector_store.vector_store.has_category.return_value = True
-    embedding_service_with_vector_store.vector_store.get_cached_embedding.return_value = cached_embedding
+    embedding_service_with_vector_store.vector_store.get_cached_embeddings.side_effect = None
+    embedding_service_with_vector_store.vector_store.get_cached_embeddings.return_value = [cached_embedding]
 
     #######
     # ACT #
@@ -241,8 +247,11 @@ def test_embed_category_vector_store_cache_hit(
     # ASSERT #
     ##########
     assert result == cached_embedding
-    embedding_service_with_vector_store.vector_store.has_category.assert_called_once_with(mock_category.path)
-    embedding_service_with_vector_store.vector_store.get_cached_embedding.assert_called_once_with(mock_category.path)
+    embedding_service_with_vector_store.vector_store.get_cached_embeddings.assert_called_once_with(
+        [mock_category.path]
+    )
+    embedding_service_with_vector_store.vector_store.add_category.assert_not_called()
+    embedding_service_with_vector_store.client.embeddings.create.assert_not_called()
 
 
 def test_embed_category_memory_cache_hit(
@@ -266,10 +275,8 @@ def test_embed_category_memory_cache_hit(
     # ASSERT #
     ##########
     assert result == cached_embedding
-    # has_category should be called twice - once for cache check, once before adding
-    assert embedding_service_with_vector_store.vector_store.has_category.call_count == 2
-    # get_cached_embedding should not be called since has_category returned False
-    embedding_service_with_vector_store.vector_store.get_cached_embedding.assert_not_called()
+    # has_category should be checked once before adding
+    embedding_service_with_vector_store.vector_store.has_category.assert_called_once_with(mock_category.path)
     embedding_service_with_vector_store.vector_store.add_category.assert_called_once_with(
         mock_category, cached_embedding
     )
@@ -279,9 +286,9 @@ def test_embed_category_memory_cache_hit(
     )
 
 
-@mock.patch("src.classification.embeddings.EmbeddingService.embed_text")
+@mock.patch("src.classification.embeddings.EmbeddingService.embed_texts")
 def test_embed_category_generate_new_embedding(
-    mock_embed_text: mock.MagicMock,
+    mock_embed_texts: mock.MagicMock,
     embedding_service_with_vector_store: EmbeddingService,
     mock_category: Category,
 ):
@@ -292,7 +299,7 @@ def test_embed_category_generate_new_embedding(
     new_embedding = [0.1, 0.2, 0.3, 0.4, 0.5]
     embedding_service_with_vector_store.vector_store.has_category.return_value = False
     embedding_service_with_vector_store.vector_store.get_cached_embedding.return_value = None
-    mock_embed_text.return_value = new_embedding
+    mock_embed_texts.return_value = [new_embedding]
     embedding_service_with_vector_store.vector_store.add_category = mock.MagicMock()
 
     #######
@@ -304,7 +311,7 @@ def test_embed_category_generate_new_embedding(
     # ASSERT #
     ##########
     assert result == new_embedding
-    mock_embed_text.assert_called_once_with(mock_category.embedding_text)
+    mock_embed_texts.assert_called_once_with([mock_category.embedding_text])
     embedding_service_with_vector_store.vector_store.add_category.assert_called_once_with(mock_category, new_embedding)
     # Verify logger.info was called
     embedding_service_with_vector_store.logger.info.assert_called_once_with(
@@ -361,9 +368,9 @@ def test_embed_category_no_vector_store(embedding_service_no_vector_store: Embed
     assert result == cached_embedding
 
 
-@mock.patch("src.classification.embeddings.EmbeddingService.embed_text")
+@mock.patch("src.classification.embeddings.EmbeddingService.embed_texts")
 def test_embed_category_no_vector_store_generate_new(
-    mock_embed_text: mock.MagicMock,
+    mock_embed_texts: mock.MagicMock,
     embedding_service_no_vector_store: EmbeddingService,
     mock_category: Category,
 ):
@@ -372,7 +379,7 @@ def test_embed_category_no_vector_store_generate_new(
     # ARRANGE #
     ###########
     new_embedding = [0.1, 0.2, 0.3, 0.4, 0.5]
-    mock_embed_text.return_value = new_embedding
+    mock_embed_texts.return_value = [new_embedding]
 
     ###########
     #   ACT   #
@@ -383,7 +390,7 @@ def test_embed_category_no_vector_store_generate_new(
     # ASSERT #
     ##########
     assert result == new_embedding
-    mock_embed_text.assert_called_once_with(mock_category.embedding_text)
+    mock_embed_texts.assert_called_once_with([mock_category.embedding_text])
 
 
 def test_embed_category_vector_store_has_category_already(
@@ -394,11 +401,8 @@ def test_embed_category_vector_store_has_category_already(
     # ARRANGE #
     ###########
     cached_embedding = [0.4, 0.5, 0.6]
-    # First call returns False (not in vector store), second call returns True (already added)
-    embedding_service_with_vector_store.vector_store.has_category.side_effect = [
-        False,
-        True,
-    ]
+    # Not returned by the cache lookup, but added by someone else before this service could add it
+    embedding_service_with_vector_store.vector_store.has_category.return_value = True
     embedding_service_with_vector_store._cache[mock_category.embedding_text] = cached_embedding
 
     #######
@@ -410,26 +414,19 @@ def test_embed_category_vector_store_has_category_already(
     # ASSERT #
     ##########
     assert result == cached_embedding
-    # has_category should be called twice - once for cache check, once before adding
-    assert embedding_service_with_vector_store.vector_store.has_category.call_count == 2
+    embedding_service_with_vector_store.vector_store.has_category.assert_called_once_with(mock_category.path)
     embedding_service_with_vector_store.vector_store.add_category.assert_not_called()
 
 
-@mock.patch("src.classification.embeddings.np.linalg.norm")
-@mock.patch("src.classification.embeddings.np.dot")
 def test_compute_similarity(
-    mock_dot: mock.MagicMock,
-    mock_norm: mock.MagicMock,
     embedding_service_no_vector_store: EmbeddingService,
 ):
     """Test compute_similarity calculates cosine similarity correctly."""
     ###########
     # ARRANGE #
     ###########
-    embedding1 = [1.0, 0.0, 0.0]
-    embedding2 = [0.0, 1.0, 0.0]
-    mock_dot.return_value = 0.0
-    mock_norm.side_effect = [1.0, 1.0]  # Norms of the two embeddings
+    embedding1 = [3.0, 4.0, 0.0]
+    embedding2 = [4.0, 3.0, 0.0]
 
     #######
     # ACT #
@@ -439,11 +436,8 @@ def test_compute_similarity(
     ##########
     # ASSERT #
     ##########
-    assert result == 0.0
-    mock_dot.assert_called_once_with(embedding1, embedding2)
-    assert mock_norm.call_count == 2
-    mock_norm.assert_any_call(embedding1)
-    mock_norm.assert_any_call(embedding2)
+    # (3*4 + 4*3) / (5 * 5)
+    assert abs(result - 0.96) < 1e-10
 
 
 def test_compute_similarity_identical_embeddings(
@@ -534,39 +528,26 @@ def test_compute_similarity_real_embeddings(
     assert 0.9 < result < 1.0
 
 
-@mock.patch("src.classification.embeddings.np.linalg.norm")
-@mock.patch("src.classification.embeddings.np.dot")
 def test_compute_similarity_zero_norm_handling(
-    mock_dot: mock.MagicMock,
-    mock_norm: mock.MagicMock,
     embedding_service_no_vector_store: EmbeddingService,
 ):
-    """Test compute_similarity handles zero norm embeddings (edge case)."""
+    """Test compute_similarity returns 0.0 for zero norm embeddings (edge case)."""
     ###########
     # ARRANGE #
     ###########
     embedding1 = [0.0, 0.0, 0.0]
     embedding2 = [1.0, 0.0, 0.0]
-    mock_dot.return_value = 0.0
-    mock_norm.side_effect = [0.0, 1.0]  # First embedding has zero norm
 
     #######
     # ACT #
     #######
-    # This should raise a ZeroDivisionError or return inf/nan
-    try:
-        result = embedding_service_no_vector_store.compute_similarity(embedding1, embedding2)
-        # If no exception, check if result is inf or nan
-        assert np.isinf(result) or np.isnan(result)
-    except ZeroDivisionError:
-        # This is also acceptable behavior
-        pass
+    result = embedding_service_no_vector_store.compute_similarity(embedding1, embedding2)
 
     ##########
     # ASSERT #
     ##########
-    mock_dot.assert_called_once_with(embedding1, embedding2)
-    assert mock_norm.call_count == 2
+    assert result == 0.0
+    assert not np.isnan(result)
 
 
 def test_cache_persistence_across_calls(
@@ -600,3 +581,245 @@ def test_cache_persistence_across_calls(
     # Verify cache contains the embedding
     assert test_text in embedding_service_no_vector_store._cache
     assert embedding_service_no_vector_store._cache[test_text] == [0.1, 0.2, 0.3]
+
+
+def test_get_category_index_builds_once(embedding_service_no_vector_store: EmbeddingService, mock_category: Category):
+    """Test get_category_index embeds categories once and reuses the index for the same category list."""
+    ###########
+    # ARRANGE #
+    ###########
+    other_category = Category(
+        name="Phones",
+        path="/Electronics/Phones",
+        embedding_text="Electronics Phones",
+        llm_description="Phones",
+    )
+    categories = [mock_category, other_category]
+    embedding_service_no_vector_store._cache[mock_category.embedding_text] = [1.0, 0.0]
+    embedding_service_no_vector_store._cache[other_category.embedding_text] = [0.0, 1.0]
+
+    #######
+    # ACT #
+    #######
+    with mock.patch.object(
+        embedding_service_no_vector_store,
+        "embed_categories",
+        wraps=embedding_service_no_vector_store.embed_categories,
+    ) as mock_embed_categories:
+        index1 = embedding_service_no_vector_store.get_category_index(categories)
+        index2 = embedding_service_no_vector_store.get_category_index(list(categories))
+
+    ##########
+    # ASSERT #
+    ##########
+    assert index1 is index2
+    assert len(index1) == 2
+    mock_embed_categories.assert_called_once_with(categories)
+    assert index1.search([0.1, 0.9], 1) == [other_category]
+
+
+def test_get_category_index_uses_taxonomy_snapshot(tmp_path, embedding_service_no_vector_store: EmbeddingService):
+    """Test get_category_index takes embeddings from a matching taxonomy snapshot without embedding anything."""
+    ###########
+    # ARRANGE #
+    ###########
+    paths = ["/Electronics", "/Electronics/Phones"]
+    source = tmp_path / "categories.txt"
+    source.write_text("\n".join(paths) + "\n", encoding="utf-8")
+    table = CategoryTable.from_paths(paths)
+    snapshot_path = write_taxonomy_snapshot(
+        tmp_path / "taxonomy.bin",
+        table,
+        source,
+        np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32),
+        "text-embedding-3-small",
+        ann_index_key("text-embedding-3-small", paths),
+    )
+    categories = table.to_categories()
+    TaxonomySnapshot.reset_shared()
+
+    #######
+    # ACT #
+    #######
+    with (
+        mock.patch("src.classification.embeddings.settings") as mock_settings,
+        mock.patch.object(embedding_service_no_vector_store, "embed_categories") as mock_embed_categories,
+    ):
+        mock_settings.embedding_model = "text-embedding-3-small"
+        mock_settings.taxonomy_snapshot_path = snapshot_path
+        mock_settings.categories_file_path = source
+        index = embedding_service_no_vector_store.get_category_index(categories)
+        mock_settings.embedding_model = "other-model"
+        embedding_service_no_vector_store.get_category_index(categories[:1])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert index.search([0.1, 0.9], 1) == [categories[1]]
+    mock_embed_categories.assert_called_once_with(categories[:1])
+    TaxonomySnapshot.reset_shared()
+
+
+def test_get_category_index_rebuilds_for_new_categories(
+    embedding_service_no_vector_store: EmbeddingService, mock_category: Category
+):
+    """Test get_category_index rebuilds the index when the category list changes."""
+    ###########
+    # ARRANGE #
+    ###########
+    embedding_service_no_vector_store._cache[mock_category.embedding_text] = [1.0, 0.0]
+
+    #######
+    # ACT #
+    #######
+    index1 = embedding_service_no_vector_store.get_category_index([mock_category])
+    index2 = embedding_service_no_vector_store.get_category_index([])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert index1 is not index2
+    assert len(index2) == 0
+
+
+def test_embed_texts_dedupes_and_batches(embedding_service_no_vector_store: EmbeddingService):
+    """Test embed_texts sends each unique uncached text once, in batched requests."""
+    ###########
+    # ARRANGE #
+    ###########
+    texts = [f"text {i}" for i in range(150)]
+
+    def fake_create(model: str, input: list[str]):
+        response = mock.MagicMock()
+        response.data = [mock.MagicMock(embedding=[float(text.split()[1])]) for text in input]
+        return response
+
+    embedding_service_no_vector_store.client.embeddings.create.side_effect = fake_create
+
+    #######
+    # ACT #
+    #######
+    result = embedding_service_no_vector_store.embed_texts(texts + texts[:10])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert len(result) == 160
+    assert result[3] == [3.0]
+    assert result[150] == [0.0]
+    calls = embedding_service_no_vector_store.client.embeddings.create.call_args_list
+    assert [len(call.kwargs["input"]) for call in calls] == [100, 50]
+
+
+def test_embed_texts_only_requests_misses(embedding_service_no_vector_store: EmbeddingService):
+    """Test embed_texts skips texts already in the memory or disk cache."""
+    ###########
+    # ARRANGE #
+    ###########
+    embedding_service_no_vector_store._cache["memory"] = [1.0]
+    embedding_service_no_vector_store.disk_cache = mock.MagicMock()
+    embedding_service_no_vector_store.disk_cache.get_many.return_value = {"disk": [2.0]}
+    response = mock.MagicMock()
+    response.data = [mock.MagicMock(embedding=[3.0])]
+    embedding_service_no_vector_store.client.embeddings.create.return_value = response
+
+    #######
+    # ACT #
+    #######
+    result = embedding_service_no_vector_store.embed_texts(["memory", "disk", "api"])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result == [[1.0], [2.0], [3.0]]
+    embedding_service_no_vector_store.disk_cache.get_many.assert_called_once()
+    assert embedding_service_no_vector_store.disk_cache.get_many.call_args.args[1] == ["disk", "api"]
+    assert embedding_service_no_vector_store.client.embeddings.create.call_args.kwargs["input"] == ["api"]
+    assert embedding_service_no_vector_store.disk_cache.put_many.call_args.args[1] == {"api": [3.0]}
+
+
+def test_embed_texts_falls_back_to_api_when_disk_cache_fails(embedding_service_no_vector_store: EmbeddingService):
+    """Test embed_texts treats an unreadable disk cache as all misses instead of failing."""
+    ###########
+    # ARRANGE #
+    ###########
+    embedding_service_no_vector_store.disk_cache = mock.MagicMock()
+    embedding_service_no_vector_store.disk_cache.get_many.side_effect = sqlite3.DatabaseError("file is not a database")
+    response = mock.MagicMock()
+    response.data = [mock.MagicMock(embedding=[3.0])]
+    embedding_service_no_vector_store.client.embeddings.create.return_value = response
+
+    #######
+    # ACT #
+    #######
+    result = embedding_service_no_vector_store.embed_texts(["api"])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result == [[3.0]]
+    assert embedding_service_no_vector_store.client.embeddings.create.call_args.kwargs["input"] == ["api"]
+
+
+def test_embed_categories_batches_vector_store_misses(embedding_service_with_vector_store: EmbeddingService):
+    """Test embed_categories embeds every vector store miss in a single embed_texts call."""
+    ###########
+    # ARRANGE #
+    ###########
+    categories = [
+        Category(name=f"C{i}", path=f"/Root/C{i}", embedding_text=f"root c{i}", llm_description=f"C{i}")
+        for i in range(3)
+    ]
+    vector_store = embedding_service_with_vector_store.vector_store
+    vector_store.get_cached_embeddings.side_effect = None
+    vector_store.get_cached_embeddings.return_value = [None, [9.0], None]
+    vector_store.has_category.return_value = False
+
+    #######
+    # ACT #
+    #######
+    with mock.patch.object(
+        embedding_service_with_vector_store, "embed_texts", return_value=[[0.0], [2.0]]
+    ) as mock_embed_texts:
+        result = embedding_service_with_vector_store.embed_categories(categories)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result == [[0.0], [9.0], [2.0]]
+    vector_store.get_cached_embeddings.assert_called_once_with(["/Root/C0", "/Root/C1", "/Root/C2"])
+    mock_embed_texts.assert_called_once_with(["root c0", "root c2"])
+    assert vector_store.add_category.call_count == 2
+
+
+def test_get_ann_index_loads_persisted_index(
+    tmp_path, embedding_service_no_vector_store: EmbeddingService, mock_category: Category
+):
+    """Test get_ann_index loads an index saved for the same categories and reuses it."""
+    ###########
+    # ARRANGE #
+    ###########
+    embedding_service_no_vector_store._cache[mock_category.embedding_text] = [1.0, 0.0]
+    categories = [mock_category]
+    exact_index = embedding_service_no_vector_store.get_category_index(categories)
+    IVFIndex.build(exact_index.matrix).save(tmp_path, ann_index_key("test-model", [mock_category.path]))
+
+    #######
+    # ACT #
+    #######
+    with (
+        mock.patch("src.classification.embeddings.ANN_INDEX_PATH", tmp_path),
+        mock.patch("src.classification.embeddings.IVFIndex.build") as mock_build,
+        mock.patch("src.classification.embeddings.settings") as mock_settings,
+    ):
+        mock_settings.embedding_model = "test-model"
+        mock_settings.ann_nprobe = 4
+        index1 = embedding_service_no_vector_store.get_ann_index(categories)
+        index2 = embedding_service_no_vector_store.get_ann_index(categories)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert index1 is index2
+    mock_build.assert_not_called()
+    assert index1.search([0.9, 0.1], 1) == [mock_category]
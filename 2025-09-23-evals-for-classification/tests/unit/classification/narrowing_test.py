@@ -1,12 +1,16 @@
 """Test the narrowing module."""
 
+import asyncio
+import threading
 from unittest import mock
 
+import numpy as np
 import pytest
 
+from src.classification.category_index import CategoryEmbeddingIndex
 from src.classification.embeddings import EmbeddingService
 from src.data.models import Category
-from src.shared.enums import NarrowingStrategy
+from src.shared.enums import NarrowingStrategy, SearchBackend
 
 # Mock BAML imports before importing narrowing module to avoid version conflicts
 with mock.patch.dict(
@@ -18,6 +22,7 @@ with mock.patch.dict(
 ):
     from src.classification.narrowing import (
         CategoryNarrower,
+        HierarchicalNarrowing,
         HybridNarrowing,
         LLMBasedNarrowing,
         NarrowingStrategyBase,
@@ -316,6 +321,102 @@ class TestHybridNarrowing:
             mock_embedding.assert_called_once_with(test_text, mock_categories)
             mock_llm.assert_called_once_with(test_text, embedding_candidates, 25)
 
+    def test_narrow_with_stages_uses_llm_text_for_llm_stage(
+        self, mock_embedding_service: EmbeddingService, mock_categories: list[Category]
+    ):
+        """Test narrow_with_stages embeds the original text but gives llm_text to the LLM stage."""
+        ###########
+        # ARRANGE #
+        ###########
+        narrowing = HybridNarrowing(mock_embedding_service, use_vector_store=False)
+        narrowing._use_hybrid = True
+        embedding_candidates = mock_categories[:4]
+        llm_text = mock.MagicMock(return_value="expanded text")
+
+        with (
+            mock.patch.object(narrowing, "_narrow_with_embedding", return_value=embedding_candidates) as mock_embedding,
+            mock.patch.object(narrowing, "_narrow_with_llm_stage", return_value=mock_categories[:2]) as mock_llm,
+        ):
+            #######
+            # ACT #
+            #######
+            result = narrowing.narrow_with_stages("test text", mock_categories, llm_text=llm_text)
+
+        ##########
+        # ASSERT #
+        ##########
+        assert result["final_candidates"] == mock_categories[:2]
+        mock_embedding.assert_called_once_with("test text", mock_categories)
+        mock_llm.assert_called_once_with("expanded text", embedding_candidates)
+        llm_text.assert_called_once_with()
+
+    def test_anarrow_with_stages_awaits_async_llm(
+        self, mock_embedding_service: EmbeddingService, mock_categories: list[Category]
+    ):
+        """Test anarrow_with_stages runs the embedding stage then awaits the async LLM client."""
+        ###########
+        # ARRANGE #
+        ###########
+        narrowing = HybridNarrowing(mock_embedding_service, use_vector_store=False)
+        narrowing._use_hybrid = True
+        embedding_candidates = mock_categories[:4]
+        mock_async_b = mock.MagicMock()
+        mock_async_b.PickBestCategories = mock.AsyncMock(return_value=["Smartphones", "k0"])
+
+        with (
+            mock.patch.object(narrowing, "_narrow_with_embedding", return_value=embedding_candidates),
+            mock.patch("src.classification.narrowing.TypeBuilder"),
+            mock.patch("src.classification.narrowing.async_b", mock_async_b),
+            mock.patch("src.classification.narrowing.settings") as mock_settings,
+        ):
+            mock_settings.max_final_categories = 2
+
+            #######
+            # ACT #
+            #######
+            result = asyncio.run(narrowing.anarrow_with_stages("test text", mock_categories))
+
+        ##########
+        # ASSERT #
+        ##########
+        assert result["embedding_candidates"] == embedding_candidates
+        assert result["final_candidates"] == [mock_categories[1], mock_categories[0]]
+        mock_async_b.PickBestCategories.assert_awaited_once()
+
+    def test_anarrow_with_stages_embeds_off_the_event_loop(
+        self, mock_embedding_service: EmbeddingService, mock_categories: list[Category]
+    ):
+        """Test anarrow_with_stages runs the blocking embedding stage in a worker thread."""
+        ###########
+        # ARRANGE #
+        ###########
+        narrowing = HybridNarrowing(mock_embedding_service, use_vector_store=False)
+        narrowing._use_hybrid = True
+        embedding_threads = []
+
+        def narrow_with_embedding(text: str, categories: list[Category]) -> list[Category]:
+            embedding_threads.append(threading.get_ident())
+            return categories[:4]
+
+        async def run() -> int:
+            await narrowing.anarrow_with_stages("test text", mock_categories)
+            return threading.get_ident()
+
+        with (
+            mock.patch.object(narrowing, "_narrow_with_embedding", side_effect=narrow_with_embedding),
+            mock.patch.object(narrowing, "_anarrow_with_llm_stage", mock.AsyncMock(return_value=mock_categories[:2])),
+        ):
+            #######
+            # ACT #
+            #######
+            loop_thread = asyncio.run(run())
+
+        ##########
+        # ASSERT #
+        ##########
+        assert len(embedding_threads) == 1
+        assert embedding_threads[0] != loop_thread
+
     def test_narrow_falls_back_when_invalid_settings(
         self, mock_embedding_service: EmbeddingService, mock_categories: list[Category]
     ):
@@ -373,6 +474,36 @@ class TestHybridNarrowing:
         # Note: Can't easily test exact n_results without mocking settings, but we can verify the method was called
         mock_vector_store.find_similar_categories.assert_called_once()
 
+    def test_narrow_with_embedding_only_uses_ann_backend(
+        self, mock_embedding_service: EmbeddingService, mock_categories: list[Category]
+    ):
+        """Test the IVF search backend takes precedence over the vector store."""
+        ###########
+        # ARRANGE #
+        ###########
+        mock_vector_store = mock.MagicMock()
+        narrowing = HybridNarrowing(mock_embedding_service, use_vector_store=False)
+        narrowing._vector_store = mock_vector_store
+        mock_embedding_service.get_ann_index.return_value.search.return_value = mock_categories[:2]
+        mock_embedding_service.embed_text.return_value = [0.1, 0.2]
+
+        with mock.patch("src.classification.narrowing.settings") as mock_settings:
+            mock_settings.search_backend = SearchBackend.IVF
+            mock_settings.max_final_categories = 2
+
+            #######
+            # ACT #
+            #######
+            result = narrowing._narrow_with_embedding_only("test text", mock_categories)
+
+        ##########
+        # ASSERT #
+        ##########
+        assert result == mock_categories[:2]
+        mock_embedding_service.get_ann_index.assert_called_once_with(mock_categories)
+        mock_embedding_service.get_ann_index.return_value.search.assert_called_once_with([0.1, 0.2], 2)
+        mock_vector_store.find_similar_categories.assert_not_called()
+
     def test_narrow_with_embedding_only_falls_back_to_in_memory(
         self, mock_embedding_service: EmbeddingService, mock_categories: list[Category]
     ):
@@ -385,14 +516,10 @@ class TestHybridNarrowing:
 
         test_text = "test text"
 
-        # Mock different similarities for different categories
-        mock_embedding_service.compute_similarity.side_effect = [
-            0.9,
-            0.7,
-            0.5,
-            0.3,
-            0.1,
-        ]
+        # Category i points mostly along axis i, so the query [5, 4, 3, 2, 1] ranks them in order
+        embeddings = np.eye(5) + 0.01
+        mock_embedding_service.embed_text.return_value = [5.0, 4.0, 3.0, 2.0, 1.0]
+        mock_embedding_service.get_category_index.return_value = CategoryEmbeddingIndex(mock_categories, embeddings)
 
         #######
         # ACT #
@@ -405,12 +532,128 @@ class TestHybridNarrowing:
         # The method should return categories sorted by similarity
         # (exact count depends on settings, but we can verify sorting)
         assert len(result) > 0  # Should return some categories
-        assert result[0] == mock_categories[0]  # Highest similarity (0.9)
-        assert result[1] == mock_categories[1]  # Second highest (0.7)
+        assert result[0] == mock_categories[0]  # Highest similarity
+        assert result[1] == mock_categories[1]  # Second highest
 
         mock_embedding_service.embed_text.assert_called_once_with(test_text)
-        assert mock_embedding_service.embed_category.call_count == 5
-        assert mock_embedding_service.compute_similarity.call_count == 5
+        # Categories are scored through the shared index, not one similarity call per category
+        mock_embedding_service.get_category_index.assert_called_once_with(mock_categories)
+        mock_embedding_service.compute_similarity.assert_not_called()
+
+
+class TestHierarchicalNarrowing:
+    """Test cases for HierarchicalNarrowing class."""
+
+    @pytest.fixture
+    def tree_categories(self) -> list[Category]:
+        """Fixture that provides a two-level category tree."""
+        paths = ["/Electronics", "/Electronics/Laptops", "/Electronics/Phones", "/Media", "/Media/Books"]
+        return [
+            Category(
+                name=path.rsplit("/", 1)[-1],
+                path=path,
+                embedding_text=path.replace("/", " ").strip().lower(),
+                llm_description=f"Items in {path}",
+            )
+            for path in paths
+        ]
+
+    @pytest.fixture
+    def tree_embeddings(self) -> np.ndarray:
+        """Fixture that provides embeddings aligned with tree_categories."""
+        return np.array(
+            [
+                [1.0, 0.2, 0.0],  # /Electronics
+                [0.9, 0.5, 0.0],  # /Electronics/Laptops
+                [0.9, -0.5, 0.0],  # /Electronics/Phones
+                [0.0, 0.1, 1.0],  # /Media
+                [0.8, 0.6, 0.1],  # /Media/Books: close to the query, but under a pruned root
+            ]
+        )
+
+    def test_beam_search_only_descends_into_best_subtrees(
+        self,
+        mock_embedding_service: EmbeddingService,
+        tree_categories: list[Category],
+        tree_embeddings: np.ndarray,
+    ):
+        """Test the embedding stage scores roots, then only the children of the kept roots."""
+        ###########
+        # ARRANGE #
+        ###########
+        narrowing = HierarchicalNarrowing(mock_embedding_service, use_vector_store=False)
+        index = CategoryEmbeddingIndex(tree_categories, tree_embeddings)
+        mock_embedding_service.get_category_index.return_value = index
+        mock_embedding_service.embed_text.return_value = [1.0, 0.6, 0.0]
+
+        #######
+        # ACT #
+        #######
+        with mock.patch("src.classification.narrowing.settings") as mock_settings:
+            mock_settings.hierarchical_beam_width = 1
+            result = narrowing._narrow_with_embedding_similarity("gaming laptop", tree_categories, 3)
+
+        ##########
+        # ASSERT #
+        ##########
+        assert [category.path for category in result] == [
+            "/Electronics/Laptops",
+            "/Electronics",
+            "/Electronics/Phones",
+        ]
+        # Both roots plus the two children of /Electronics; /Media/Books is never scored
+        assert narrowing.last_scored_count == 4
+
+    def test_wide_beam_matches_flat_search(
+        self,
+        mock_embedding_service: EmbeddingService,
+        tree_categories: list[Category],
+        tree_embeddings: np.ndarray,
+    ):
+        """Test a beam as wide as the tree finds the same candidates as scoring the flat list."""
+        ###########
+        # ARRANGE #
+        ###########
+        narrowing = HierarchicalNarrowing(mock_embedding_service, use_vector_store=False)
+        index = CategoryEmbeddingIndex(tree_categories, tree_embeddings)
+        mock_embedding_service.get_category_index.return_value = index
+        query = [1.0, 0.6, 0.0]
+        mock_embedding_service.embed_text.return_value = query
+
+        #######
+        # ACT #
+        #######
+        with mock.patch("src.classification.narrowing.settings") as mock_settings:
+            mock_settings.hierarchical_beam_width = len(tree_categories)
+            result = narrowing._narrow_with_embedding_similarity("gaming laptop", tree_categories, 3)
+
+        ##########
+        # ASSERT #
+        ##########
+        assert result == index.search(query, 3)
+        assert narrowing.last_scored_count == len(tree_categories)
+
+    def test_orphans_are_treated_as_roots(self, mock_embedding_service: EmbeddingService):
+        """Test categories whose parent is missing from the list are still reachable."""
+        ###########
+        # ARRANGE #
+        ###########
+        narrowing = HierarchicalNarrowing(mock_embedding_service, use_vector_store=False)
+        categories = [
+            Category(name="Laptops", path="/Electronics/Laptops", embedding_text="laptops", llm_description="x"),
+            Category(name="Books", path="/Media/Books", embedding_text="books", llm_description="y"),
+        ]
+
+        #######
+        # ACT #
+        #######
+        narrowing._build_tree(categories)
+
+        ##########
+        # ASSERT #
+        ##########
+        assert narrowing._roots == [0, 1]
+        assert narrowing._children == {}
 
 
 class TestCategoryNarrower:
@@ -432,6 +675,50 @@ class TestCategoryNarrower:
         ##########
         assert narrower.embedding_service == mock_embedding_service
         assert NarrowingStrategy.HYBRID in narrower._strategy_map
+        assert NarrowingStrategy.HIERARCHICAL in narrower._strategy_map
+
+    def test_get_strategy_reuses_instance(self, mock_embedding_service: EmbeddingService):
+        """Test get_strategy builds the configured strategy once and reuses it across calls."""
+        ###########
+        # ARRANGE #
+        ###########
+        narrower = CategoryNarrower(mock_embedding_service, use_vector_store=False)
+        factory = mock.MagicMock(return_value=mock.MagicMock(spec=HybridNarrowing))
+        narrower._strategy_map[NarrowingStrategy.HYBRID] = factory
+
+        #######
+        # ACT #
+        #######
+        first = narrower.get_strategy()
+        narrower.narrow_categories("text one", [])
+        narrower.narrow_categories_with_stages("text two", [])
+
+        ##########
+        # ASSERT #
+        ##########
+        assert narrower.get_strategy() is first
+        factory.assert_called_once_with()
+
+    def test_anarrow_categories_with_stages_falls_back_to_thread(self, mock_embedding_service: EmbeddingService):
+        """Test anarrow_categories_with_stages runs sync-only strategies through narrow_with_stages."""
+        ###########
+        # ARRANGE #
+        ###########
+        narrower = CategoryNarrower(mock_embedding_service, use_vector_store=False)
+        strategy = mock.MagicMock(spec=["narrow", "narrow_with_stages"])
+        strategy.narrow_with_stages.return_value = {"final_candidates": []}
+        narrower._strategy_map[NarrowingStrategy.HYBRID] = lambda: strategy
+
+        #######
+        # ACT #
+        #######
+        result = asyncio.run(narrower.anarrow_categories_with_stages("test text", []))
+
+        ##########
+        # ASSERT #
+        ##########
+        assert result == {"final_candidates": []}
+        strategy.narrow_with_stages.assert_called_once_with("test text", [], llm_text=None)
 
     def test_narrow_categories_with_hybrid_strategy(
         self, mock_embedding_service: EmbeddingService, mock_categories: list[Category]
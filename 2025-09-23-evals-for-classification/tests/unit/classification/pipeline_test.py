@@ -1,7 +1,12 @@
 """Test the pipeline module."""
 
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
+import numpy as np
 import pytest
 
 
@@ -14,7 +19,9 @@ with mock.patch.dict(
         "baml_client.type_builder": mock.MagicMock(),
     },
 ):
+    from src.classification import expander, pipeline as pipeline_module
     from src.classification.pipeline import ClassificationPipeline
+    from src.classification.result_cache import ResultCache
     from src.data.models import Category, ClassificationResult
 
 
@@ -110,6 +117,7 @@ class TestClassificationPipeline:
         # Create pipeline instance and mock its components
         pipeline = ClassificationPipeline.__new__(ClassificationPipeline)
         pipeline._categories_cache = mock_categories
+        pipeline.result_cache = None
 
         pipeline.narrower = mock.MagicMock()
         pipeline.narrower.narrow_categories.return_value = narrowed_categories
@@ -169,6 +177,7 @@ class TestClassificationPipeline:
         # Create pipeline instance and mock its components
         pipeline = ClassificationPipeline.__new__(ClassificationPipeline)
         pipeline._categories_cache = mock_categories
+        pipeline.result_cache = None
 
         #######
         # ACT #
@@ -197,6 +206,7 @@ class TestClassificationPipeline:
         ###########
         pipeline = ClassificationPipeline.__new__(ClassificationPipeline)
         pipeline._categories_cache = mock_categories
+        pipeline.result_cache = None
 
         # Mock all components
         pipeline.narrower = mock.MagicMock()
@@ -557,3 +567,392 @@ class TestClassificationPipelineIntegration:
         assert isinstance(metadata["selection_time_ms"], float)
         assert isinstance(metadata["narrowing_strategy"], str)
         assert isinstance(metadata["vector_store_enabled"], bool)
+
+
+class TestClassificationPipelineAsync:
+    """Test cases for aclassify and batch classification."""
+
+    @pytest.fixture
+    def async_pipeline(self, mock_categories: list[Category]) -> ClassificationPipeline:
+        """Fixture that provides a pipeline whose narrowing and selection are async mocks."""
+        pipeline = ClassificationPipeline.__new__(ClassificationPipeline)
+        pipeline.logger = mock.MagicMock()
+        pipeline._categories_cache = mock_categories
+        pipeline.result_cache = None
+        pipeline.embedding_service = mock.MagicMock()
+        pipeline.embedding_service.vector_store = None
+        pipeline.narrower = mock.MagicMock()
+        pipeline.narrower.anarrow_categories_with_stages = mock.AsyncMock(
+            return_value={
+                "embedding_candidates": mock_categories,
+                "llm_candidates": mock_categories[:2],
+                "final_candidates": mock_categories[:2],
+            }
+        )
+        pipeline.selector = mock.MagicMock()
+        return pipeline
+
+    def test_aclassify_builds_result(self, async_pipeline: ClassificationPipeline, mock_categories: list[Category]):
+        """Test aclassify awaits narrowing and selection and fills the usual metadata."""
+        ###########
+        # ARRANGE #
+        ###########
+        async_pipeline.selector.aselect_best_category = mock.AsyncMock(return_value=mock_categories[0])
+
+        #######
+        # ACT #
+        #######
+        result = asyncio.run(async_pipeline.aclassify("I need a laptop for work", max_candidates=1))
+
+        ##########
+        # ASSERT #
+        ##########
+        assert result.category == mock_categories[0]
+        assert result.candidates == mock_categories[:1]
+        assert result.llm_candidates == mock_categories[:2]
+        assert result.metadata["narrowed_to"] == 1
+        async_pipeline.selector.aselect_best_category.assert_awaited_once_with(
+            "I need a laptop for work", mock_categories[:1]
+        )
+
+    def test_aclassify_embeds_for_semantic_cache_off_the_event_loop(
+        self, async_pipeline: ClassificationPipeline, mock_categories: list[Category]
+    ):
+        """Test the query embeddings for semantic cache lookups and stores run in worker threads."""
+        ###########
+        # ARRANGE #
+        ###########
+        async_pipeline.result_cache = ResultCache(max_size=10, ttl_seconds=60, similarity_threshold=0.95)
+        async_pipeline.selector.aselect_best_category = mock.AsyncMock(return_value=mock_categories[0])
+        embedding_threads = []
+
+        def embed_query(text: str) -> np.ndarray:
+            embedding_threads.append(threading.get_ident())
+            return np.array([1.0, 0.0])
+
+        async def run() -> int:
+            await async_pipeline.aclassify("laptop")
+            await async_pipeline.aclassify("laptop computer")
+            return threading.get_ident()
+
+        #######
+        # ACT #
+        #######
+        with mock.patch.object(async_pipeline, "_embed_query", side_effect=embed_query):
+            loop_thread = asyncio.run(run())
+
+        ##########
+        # ASSERT #
+        ##########
+        # Stored after the first text, looked up for the second
+        assert len(embedding_threads) == 2
+        assert loop_thread not in embedding_threads
+        assert async_pipeline.result_cache.stats.semantic_hits == 1
+
+    def test_classify_batch_preserves_order_and_limits_concurrency(
+        self, async_pipeline: ClassificationPipeline, mock_categories: list[Category]
+    ):
+        """Test classify_batch embeds all queries in one call, caps concurrency, and keeps input order."""
+        ###########
+        # ARRANGE #
+        ###########
+        texts = ["laptop", "phone", "novel", "laptop bag", "phone case"]
+        by_text = {text: mock_categories[i % len(mock_categories)] for i, text in enumerate(texts)}
+        in_flight = 0
+        peak_in_flight = 0
+
+        async def select(text: str, candidates: list[Category]) -> Category:
+            nonlocal in_flight, peak_in_flight
+            in_flight += 1
+            peak_in_flight = max(peak_in_flight, in_flight)
+            # Finish in reverse order so ordering can't come from completion order
+            await asyncio.sleep(0.01 * (len(texts) - texts.index(text)))
+            in_flight -= 1
+            return by_text[text]
+
+        async_pipeline.selector.aselect_best_category = select
+
+        #######
+        # ACT #
+        #######
+        results = async_pipeline.classify_batch(texts, max_concurrency=2)
+
+        ##########
+        # ASSERT #
+        ##########
+        assert [result.category for result in results] == [by_text[text] for text in texts]
+        assert peak_in_flight == 2
+        async_pipeline.embedding_service.embed_texts.assert_called_once_with(texts)
+        assert all("queue_time_ms" in result.metadata for result in results)
+        assert results[-1].metadata["queue_time_ms"] > results[0].metadata["queue_time_ms"]
+
+    def test_classify_batch_return_exceptions(
+        self, async_pipeline: ClassificationPipeline, mock_categories: list[Category]
+    ):
+        """Test classify_batch returns a failed text's exception in its slot when asked to."""
+        ###########
+        # ARRANGE #
+        ###########
+        error = ValueError("No candidate categories provided")
+        async_pipeline.selector.aselect_best_category = mock.AsyncMock(side_effect=[mock_categories[0], error])
+
+        #######
+        # ACT #
+        #######
+        results = async_pipeline.classify_batch(["laptop", "???"], max_concurrency=1, return_exceptions=True)
+
+        ##########
+        # ASSERT #
+        ##########
+        assert results[0].category == mock_categories[0]
+        assert results[1] is error
+
+    def test_classify_batch_empty(self, async_pipeline: ClassificationPipeline):
+        """Test classify_batch returns no results and makes no embedding request for no texts."""
+        #######
+        # ACT #
+        #######
+        results = async_pipeline.classify_batch([])
+
+        ##########
+        # ASSERT #
+        ##########
+        assert results == []
+        async_pipeline.embedding_service.embed_texts.assert_not_called()
+
+
+class TestQueryExpansionOverlap:
+    """Test cases for running query expansion alongside narrowing."""
+
+    STAGE_SECONDS = 0.1
+
+    @pytest.fixture
+    def expanding_pipeline(self, mock_categories: list[Category]) -> ClassificationPipeline:
+        """Fixture that provides a pipeline whose narrowing takes STAGE_SECONDS."""
+
+        def narrow(text, categories, llm_text=None):
+            time.sleep(self.STAGE_SECONDS)
+            return {"final_candidates": mock_categories[:2], "llm_text": llm_text() if llm_text else text}
+
+        pipeline = ClassificationPipeline.__new__(ClassificationPipeline)
+        pipeline.logger = mock.MagicMock()
+        pipeline._categories_cache = mock_categories
+        pipeline.result_cache = None
+        pipeline._expansion_executor = ThreadPoolExecutor()
+        pipeline.embedding_service = mock.MagicMock()
+        pipeline.embedding_service.vector_store = None
+        pipeline.narrower = mock.MagicMock()
+        pipeline.narrower.narrow_categories_with_stages.side_effect = narrow
+        pipeline.selector = mock.MagicMock()
+        pipeline.selector.select_best_category.return_value = mock_categories[0]
+        return pipeline
+
+    def _slow_expand(self, text: str) -> str:
+        """Stand-in for the ExpandUserQuery call."""
+        time.sleep(self.STAGE_SECONDS)
+        return f"{text} (expanded)"
+
+    def test_classify_overlaps_expansion_with_narrowing(self, expanding_pipeline: ClassificationPipeline):
+        """Test classify runs expansion alongside narrowing and reports the overlapped time."""
+        ###########
+        # ARRANGE #
+        ###########
+        with (
+            mock.patch.object(expander, "expand_user_query", side_effect=self._slow_expand),
+            mock.patch.object(pipeline_module, "settings") as mock_settings,
+        ):
+            mock_settings.expand_user_query = True
+            mock_settings.expand_query_for_narrowing = False
+
+            #######
+            # ACT #
+            #######
+            start = time.time()
+            result = expanding_pipeline.classify("laptop")
+            elapsed = time.time() - start
+
+        ##########
+        # ASSERT #
+        ##########
+        assert elapsed < 2 * self.STAGE_SECONDS
+        expanding_pipeline.selector.select_best_category.assert_called_once_with("laptop (expanded)", mock.ANY)
+        metadata = result.metadata
+        assert metadata["expansion_time_ms"] >= self.STAGE_SECONDS * 1000 * 0.9
+        assert metadata["expansion_overlap_ms"] > metadata["expansion_wait_ms"]
+        assert metadata["expansion_overlap_ms"] + metadata["expansion_wait_ms"] == pytest.approx(
+            metadata["expansion_time_ms"]
+        )
+
+    def test_classify_traces_stages(self, expanding_pipeline: ClassificationPipeline):
+        """Test classify reports per-stage timings, including the expansion run on a worker thread."""
+        ###########
+        # ARRANGE #
+        ###########
+        with (
+            mock.patch.object(expander, "expand_user_query", side_effect=self._slow_expand),
+            mock.patch.object(pipeline_module, "settings") as mock_settings,
+        ):
+            mock_settings.expand_user_query = True
+            mock_settings.expand_query_for_narrowing = False
+
+            #######
+            # ACT #
+            #######
+            result = expanding_pipeline.classify("laptop")
+
+        ##########
+        # ASSERT #
+        ##########
+        timings = result.metadata["stage_timings_ms"]
+        assert set(timings) == {"classify", "narrowing", "expansion", "selection"}
+        assert timings["expansion"] == pytest.approx(result.metadata["expansion_time_ms"])
+        assert timings["narrowing"] >= self.STAGE_SECONDS * 1000 * 0.9
+        assert timings["classify"] >= timings["narrowing"]
+
+    def test_classify_feeds_expansion_to_llm_narrowing(self, expanding_pipeline: ClassificationPipeline):
+        """Test classify hands the expanded query to the LLM narrowing stage when configured."""
+        ###########
+        # ARRANGE #
+        ###########
+        with (
+            mock.patch.object(expander, "expand_user_query", side_effect=self._slow_expand),
+            mock.patch.object(pipeline_module, "settings") as mock_settings,
+        ):
+            mock_settings.expand_user_query = True
+            mock_settings.expand_query_for_narrowing = True
+
+            #######
+            # ACT #
+            #######
+            result = expanding_pipeline.classify("laptop")
+
+        ##########
+        # ASSERT #
+        ##########
+        call = expanding_pipeline.narrower.narrow_categories_with_stages.call_args
+        assert call.args[0] == "laptop"
+        assert call.kwargs["llm_text"]() == "laptop (expanded)"
+        assert "expansion_time_ms" in result.metadata
+
+    def test_classify_without_expansion_has_no_expansion_metadata(self, expanding_pipeline: ClassificationPipeline):
+        """Test classify leaves expansion timings out when expansion is disabled."""
+        #######
+        # ACT #
+        #######
+        with mock.patch.object(pipeline_module, "settings") as mock_settings:
+            mock_settings.expand_user_query = False
+            result = expanding_pipeline.classify("laptop")
+
+        ##########
+        # ASSERT #
+        ##########
+        assert "expansion_time_ms" not in result.metadata
+        expanding_pipeline.narrower.narrow_categories_with_stages.assert_called_once_with(
+            "laptop", expanding_pipeline._categories_cache, llm_text=None
+        )
+
+
+class TestClassificationPipelineResultCache:
+    """Test cases for the classification result cache."""
+
+    @pytest.fixture
+    def categories_file(self, tmp_path) -> str:
+        """Fixture that provides a categories file on disk."""
+        path = tmp_path / "categories.txt"
+        path.write_text("/Electronics/Computers/Laptops\n", encoding="utf-8")
+        return str(path)
+
+    @pytest.fixture
+    def cached_pipeline(self, mock_categories: list[Category]) -> ClassificationPipeline:
+        """Fixture that provides a pipeline with a result cache and mocked stages."""
+        pipeline = ClassificationPipeline.__new__(ClassificationPipeline)
+        pipeline.logger = mock.MagicMock()
+        pipeline._categories_cache = mock_categories
+        pipeline.result_cache = ResultCache(max_size=10, ttl_seconds=60)
+        pipeline.embedding_service = mock.MagicMock()
+        pipeline.embedding_service.vector_store = None
+        pipeline.narrower = mock.MagicMock()
+        pipeline.narrower.narrow_categories_with_stages.return_value = {"final_candidates": mock_categories[:2]}
+        pipeline.selector = mock.MagicMock()
+        pipeline.selector.select_best_category.return_value = mock_categories[0]
+        return pipeline
+
+    def test_classify_reuses_cached_result(self, cached_pipeline: ClassificationPipeline, categories_file: str):
+        """Test a repeated query is answered from the cache without narrowing or selection."""
+        #######
+        # ACT #
+        #######
+        with mock.patch.object(pipeline_module, "settings") as mock_settings:
+            mock_settings.expand_user_query = False
+            mock_settings.categories_file_path = categories_file
+            first = cached_pipeline.classify("Laptop for work")
+            second = cached_pipeline.classify("laptop  for WORK")
+
+        ##########
+        # ASSERT #
+        ##########
+        assert second.category == first.category
+        assert first.metadata["result_cache_status"] == "miss"
+        assert second.metadata["result_cache_status"] == "hit"
+        assert second.metadata["result_cache"]["hits"] == 1
+        assert second.metadata["result_cache"]["misses"] == 1
+        cached_pipeline.narrower.narrow_categories_with_stages.assert_called_once()
+        cached_pipeline.selector.select_best_category.assert_called_once()
+
+    def test_classify_invalidates_on_embedding_model_change(
+        self, cached_pipeline: ClassificationPipeline, categories_file: str
+    ):
+        """Test changing the embedding model empties the cache."""
+        #######
+        # ACT #
+        #######
+        with mock.patch.object(pipeline_module, "settings") as mock_settings:
+            mock_settings.expand_user_query = False
+            mock_settings.categories_file_path = categories_file
+            mock_settings.embedding_model = "model-a"
+            cached_pipeline.classify("laptop")
+            mock_settings.embedding_model = "model-b"
+            result = cached_pipeline.classify("laptop")
+
+        ##########
+        # ASSERT #
+        ##########
+        assert result.metadata["result_cache_status"] == "miss"
+        assert result.metadata["result_cache"]["invalidations"] == 1
+        assert cached_pipeline.narrower.narrow_categories_with_stages.call_count == 2
+
+    def test_classify_invalidates_on_categories_file_change(
+        self,
+        cached_pipeline: ClassificationPipeline,
+        categories_file: str,
+        mock_categories: list[Category],
+    ):
+        """Test rewriting the categories file in place empties the cache and reloads the categories."""
+        ###########
+        # ARRANGE #
+        ###########
+        new_loader = mock.MagicMock()
+        new_loader.load_categories.return_value = mock_categories[:1]
+
+        #######
+        # ACT #
+        #######
+        with (
+            mock.patch.object(pipeline_module, "settings") as mock_settings,
+            mock.patch.object(pipeline_module, "CategoryLoader", return_value=new_loader),
+        ):
+            mock_settings.expand_user_query = False
+            mock_settings.categories_file_path = categories_file
+            cached_pipeline.classify("laptop")
+            with open(categories_file, "a", encoding="utf-8") as f:
+                f.write("/Electronics/Computers/Desktops\n")
+            result = cached_pipeline.classify("laptop")
+
+        ##########
+        # ASSERT #
+        ##########
+        assert result.metadata["result_cache_status"] == "miss"
+        assert result.metadata["result_cache"]["invalidations"] == 1
+        assert cached_pipeline.narrower.narrow_categories_with_stages.call_count == 2
+        new_loader.load_categories.assert_called_once()
+        assert cached_pipeline._categories_cache == mock_categories[:1]
@@ -0,0 +1,227 @@
+"""Test the result_cache module."""
+
+from unittest import mock
+
+import pytest
+
+from src.classification.result_cache import ResultCache, normalize_query
+from src.data.models import Category, ClassificationResult
+
+
+@pytest.fixture
+def mock_result():
+    """Fixture that provides a test ClassificationResult."""
+    category = Category(
+        name="Laptops",
+        path="/Electronics/Computers/Laptops",
+        embedding_text="Electronics Computers Laptops",
+        llm_description="Portable computers",
+    )
+    return ClassificationResult(category=category, processing_time_ms=100.0)
+
+
+def test_normalize_query():
+    """Test normalize_query lower-cases and collapses whitespace."""
+    #######
+    # ACT #
+    #######
+    result = normalize_query("  Gaming   LAPTOP\t15 inch ")
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result == "gaming laptop 15 inch"
+
+
+def test_get_hit_after_put(mock_result: ClassificationResult):
+    """Test a stored result is returned for the same normalized text and candidate limit only."""
+    ###########
+    # ARRANGE #
+    ###########
+    cache = ResultCache(max_size=10, ttl_seconds=60)
+    cache.put("Gaming laptop", mock_result, max_candidates=5)
+
+    #######
+    # ACT #
+    #######
+    hit = cache.get("gaming  LAPTOP", max_candidates=5)
+    other_limit = cache.get("gaming laptop", max_candidates=3)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert hit == (mock_result, "hit")
+    assert other_limit == (None, "miss")
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_put_evicts_least_recently_used(mock_result: ClassificationResult):
+    """Test the least recently used entry is evicted when the cache is full."""
+    ###########
+    # ARRANGE #
+    ###########
+    cache = ResultCache(max_size=2, ttl_seconds=60)
+    cache.put("a", mock_result)
+    cache.put("b", mock_result)
+    cache.get("a")
+
+    #######
+    # ACT #
+    #######
+    cache.put("c", mock_result)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert len(cache) == 2
+    assert cache.get("b")[0] is None
+    assert cache.get("a")[0] is mock_result
+    assert cache.stats.evictions == 1
+
+
+def test_get_expires_old_entries(mock_result: ClassificationResult):
+    """Test entries older than the TTL are dropped and counted as expirations."""
+    ###########
+    # ARRANGE #
+    ###########
+    cache = ResultCache(max_size=10, ttl_seconds=60)
+    with mock.patch("src.classification.result_cache.time.monotonic", return_value=1000.0):
+        cache.put("a", mock_result)
+
+    #######
+    # ACT #
+    #######
+    with mock.patch("src.classification.result_cache.time.monotonic", return_value=1061.0):
+        result = cache.get("a")
+
+    ##########
+    # ASSERT #
+    ##########
+    assert result == (None, "miss")
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0
+
+
+def test_semantic_hit_above_threshold(mock_result: ClassificationResult):
+    """Test a different text with a similar enough embedding reuses the cached result."""
+    ###########
+    # ARRANGE #
+    ###########
+    cache = ResultCache(max_size=10, ttl_seconds=60, similarity_threshold=0.95)
+    cache.put("gaming laptop", mock_result, embedding=[1.0, 0.0])
+
+    #######
+    # ACT #
+    #######
+    similar = cache.get("laptop for gaming", embed=lambda: [0.99, 0.05])
+    dissimilar = cache.get("paperback novel", embed=lambda: [0.0, 1.0])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert similar == (mock_result, "semantic_hit")
+    assert dissimilar == (None, "miss")
+    assert cache.stats.semantic_hits == 1
+
+
+def test_semantic_lookup_reuses_evicted_slots(mock_result: ClassificationResult):
+    """Test an evicted entry's embedding slot is freed and reused for semantic lookups."""
+    ###########
+    # ARRANGE #
+    ###########
+    other_result = mock_result.model_copy(update={"processing_time_ms": 1.0})
+    cache = ResultCache(max_size=2, ttl_seconds=60, similarity_threshold=0.95)
+    cache.put("gaming laptop", mock_result, embedding=[1.0, 0.0, 0.0])
+    cache.put("paperback novel", mock_result, embedding=[0.0, 1.0, 0.0])
+
+    #######
+    # ACT #
+    #######
+    cache.put("garden hose", other_result, embedding=[0.0, 0.0, 1.0])
+    evicted = cache.get("laptop for gaming", embed=lambda: [1.0, 0.0, 0.0])
+    reused = cache.get("hose for the garden", embed=lambda: [0.0, 0.0, 1.0])
+    other_limit = cache.get("hose for the garden", max_candidates=5, embed=lambda: [0.0, 0.0, 1.0])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert evicted == (None, "miss")
+    assert reused == (other_result, "semantic_hit")
+    assert other_limit == (None, "miss")
+    assert cache.stats.evictions == 1
+
+
+def test_expired_entries_behind_live_ones_never_hit(mock_result: ClassificationResult):
+    """Test an expired entry is not returned even when a live entry precedes it in LRU order."""
+    ###########
+    # ARRANGE #
+    ###########
+    cache = ResultCache(max_size=10, ttl_seconds=60, similarity_threshold=0.95)
+    with mock.patch("src.classification.result_cache.time.monotonic", return_value=1000.0):
+        cache.put("gaming laptop", mock_result, embedding=[1.0, 0.0])
+        cache.put("paperback novel", mock_result, embedding=[0.0, 1.0])
+    with mock.patch("src.classification.result_cache.time.monotonic", return_value=1030.0):
+        cache.put("garden hose", mock_result, embedding=[0.7, 0.7])
+        cache.get("gaming laptop")
+
+    #######
+    # ACT #
+    #######
+    with mock.patch("src.classification.result_cache.time.monotonic", return_value=1061.0):
+        semantic = cache.get("laptop for gaming", embed=lambda: [1.0, 0.0])
+        exact = cache.get("gaming laptop")
+
+    ##########
+    # ASSERT #
+    ##########
+    assert semantic == (None, "miss")
+    assert exact == (None, "miss")
+    assert cache.stats.expirations == 2
+    assert len(cache) == 1
+
+
+def test_exact_hit_does_not_embed(mock_result: ClassificationResult):
+    """Test an exact text hit never calls the embedding function."""
+    ###########
+    # ARRANGE #
+    ###########
+    cache = ResultCache(max_size=10, ttl_seconds=60, similarity_threshold=0.95)
+    cache.put("gaming laptop", mock_result, embedding=[1.0, 0.0])
+    embed = mock.MagicMock(return_value=[1.0, 0.0])
+
+    #######
+    # ACT #
+    #######
+    result, status = cache.get("gaming laptop", embed=embed)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert status == "hit"
+    embed.assert_not_called()
+
+
+def test_validate_clears_on_fingerprint_change(mock_result: ClassificationResult):
+    """Test entries are dropped when the fingerprint changes, and kept while it stays the same."""
+    ###########
+    # ARRANGE #
+    ###########
+    cache = ResultCache(max_size=10, ttl_seconds=60)
+    first = cache.validate(("categories.txt", "model-a"))
+    cache.put("a", mock_result)
+
+    #######
+    # ACT #
+    #######
+    same = cache.validate(("categories.txt", "model-a"))
+    kept = len(cache)
+    changed = cache.validate(("categories.txt", "model-b"))
+
+    ##########
+    # ASSERT #
+    ##########
+    assert (first, same, changed) == (False, False, True)
+    assert kept == 1
+    assert len(cache) == 0
+    assert cache.stats.invalidations == 1
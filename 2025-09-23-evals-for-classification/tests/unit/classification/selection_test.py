@@ -1,5 +1,6 @@
 """Test the selection module."""
 
+import asyncio
 from unittest import mock
 
 import pytest
@@ -14,6 +15,7 @@ with mock.patch.dict(
         "baml_client.type_builder": mock.MagicMock(),
     },
 ):
+    from src.classification import selection
     from src.classification.selection import CategorySelector
 
 from src.data.models import Category
@@ -66,6 +68,30 @@ class TestCategorySelector:
         ##########
         assert isinstance(selector, CategorySelector)
 
+    def test_aselect_best_category_awaits_async_client(self, mock_categories: list[Category]):
+        """Test aselect_best_category awaits the async BAML client and matches the returned name."""
+        ###########
+        # ARRANGE #
+        ###########
+        selector = CategorySelector()
+        mock_async_b = mock.MagicMock()
+        mock_async_b.PickBestCategory = mock.AsyncMock(return_value="Smartphones")
+
+        #######
+        # ACT #
+        #######
+        with (
+            mock.patch.object(selector, "_build_dynamic_enum"),
+            mock.patch.object(selection, "async_b", mock_async_b),
+        ):
+            result = asyncio.run(selector.aselect_best_category("a new phone", mock_categories))
+
+        ##########
+        # ASSERT #
+        ##########
+        assert result == mock_categories[1]
+        mock_async_b.PickBestCategory.assert_awaited_once()
+
     def test_select_best_category_single_candidate_logic(self, mock_categories: list[Category]):
         """Test the logic for single candidate selection."""
         ###########
@@ -0,0 +1,101 @@
+"""Test the type_builder_cache module."""
+
+from unittest import mock
+
+import pytest
+
+from src.classification import narrowing, selection
+from src.classification.narrowing import LLMBasedNarrowing
+from src.classification.selection import CategorySelector
+from src.classification.type_builder_cache import TypeBuilderCache
+from src.data.models import Category
+
+
+@pytest.fixture
+def categories() -> list[Category]:
+    """Fixture that provides four test categories."""
+    return [
+        Category(
+            name=name,
+            path=f"/Electronics/{name}",
+            embedding_text=f"electronics {name.lower()}",
+            llm_description=f"Items in the {name} category under Electronics",
+        )
+        for name in ("Laptops", "Tablets", "Phones", "Cameras")
+    ]
+
+
+def test_cache_reuses_type_builders_per_ordered_candidate_set(categories: list[Category]):
+    """Test a recurring candidate set gets the same TypeBuilder, and the least recently used set is evicted."""
+    ###########
+    # ARRANGE #
+    ###########
+    cache = TypeBuilderCache(max_size=2)
+
+    #######
+    # ACT #
+    #######
+    first = cache.get(categories[:3])
+    again = cache.get(categories[:3])
+    reordered = cache.get(list(reversed(categories[:3])))
+    cache.get(categories)  # Evicts categories[:3], the least recently used
+    rebuilt = cache.get(categories[:3])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert again is first
+    assert reordered is not first
+    assert rebuilt is not first
+    description = str(first._tb)
+    assert "Laptops" in description and "k2" in description
+    assert "Items in the Phones category under Electronics" in description
+    assert len(cache) == cache.max_size
+    assert cache.stats.as_dict() == {"hits": 1, "misses": 4, "evictions": 2, "hit_rate": 0.2}
+
+
+def test_disabled_cache_builds_every_time(categories: list[Category]):
+    """Test a cache with no capacity builds a new TypeBuilder per lookup and keeps nothing."""
+    ###########
+    # ARRANGE #
+    ###########
+    cache = TypeBuilderCache(max_size=0)
+
+    #######
+    # ACT #
+    #######
+    first = cache.get(categories)
+    second = cache.get(categories)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert second is not first
+    assert len(cache) == 0
+    assert cache.stats.hit_rate == 0.0
+
+
+def test_narrowing_and_selection_share_the_cache(categories: list[Category]):
+    """Test the narrowing and selection stages reuse each other's TypeBuilder for the same candidates."""
+    ###########
+    # ARRANGE #
+    ###########
+    cache = TypeBuilderCache(max_size=8)
+
+    with (
+        mock.patch.object(narrowing, "type_builder_cache", cache),
+        mock.patch.object(selection, "type_builder_cache", cache),
+    ):
+        #######
+        # ACT #
+        #######
+        narrowing_tb, lookup = LLMBasedNarrowing()._build_llm_type_builder(categories)
+        selection_tb = CategorySelector()._build_dynamic_enum(categories)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert selection_tb is narrowing_tb
+    assert lookup["k1"] is categories[1]
+    assert lookup["Cameras"] is categories[3]
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
@@ -6,6 +6,7 @@ from unittest import mock
 
 import pytest
 
+from src.classification.vector_store import category_id
 from src.data.models import Category
 
 @pytest.fixture
@@ -654,11 +655,12 @@ class TestCategoryVectorStore:
                 # ASSERT #
                 ##########
                 # Verify the ID format
-                assert result_id.startswith("cat_1234567890123_")
+                # Verify the ID is derived from the path alone
+                assert result_id == category_id(mock_category.path)
 
-                # Verify collection.add was called with correct parameters
-                mock_collection.add.assert_called_once()
-                call_args = mock_collection.add.call_args
+                # Verify collection.upsert was called with correct parameters
+                mock_collection.upsert.assert_called_once()
+                call_args = mock_collection.upsert.call_args
 
                 assert call_args[1]["embeddings"] == [mock_embedding]
                 assert call_args[1]["documents"] == [mock_category.embedding_text]
@@ -1260,10 +1262,10 @@ class TestCategoryVectorStoreEdgeCases:
                 ##########
                 # ASSERT #
                 ##########
-                assert result_id.startswith("cat_1234567890123_")
+                assert result_id == category_id(special_category.path)
 
                 # Verify the category was added correctly
-                call_args = mock_collection.add.call_args
+                call_args = mock_collection.upsert.call_args
                 assert call_args[1]["metadatas"][0]["name"] == "TV & Audio Equipment"
                 assert call_args[1]["metadatas"][0]["path"] == "/Electronics/TV & Audio/Special-Characters_Test"
 
@@ -1325,7 +1327,7 @@ class TestCategoryVectorStoreIntegration:
                 store = CategoryVectorStore(auto_create=False)
 
                 # Step 2: Add category
-                category_id = store.add_category(mock_category, mock_embedding)
+                doc_id = store.add_category(mock_category, mock_embedding)
 
                 # Step 3: Check if category exists
                 exists = store.has_category(mock_category.path)
@@ -1340,7 +1342,7 @@ class TestCategoryVectorStoreIntegration:
                 # ASSERT #
                 ##########
                 # Verify all steps worked
-                assert category_id.startswith("cat_1234567890123_")
+                assert doc_id == category_id(mock_category.path)
                 assert exists is True
                 assert len(similar) == 1
                 assert similar[0].name == mock_category.name
@@ -1418,3 +1420,361 @@ class TestCategoryVectorStoreIntegration:
                 # Cache should be consistent across multiple checks
                 assert store.has_category(category_path) is True
                 assert store.has_category("/NonExistent/Path") is False
+
+    def test_build_category_cache_bulk_loads_embeddings(self):
+        """Test embeddings are loaded once at open and served from memory afterwards."""
+        ###########
+        # ARRANGE #
+        ###########
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_path = Path(temp_dir) / "test_vector_store"
+            test_path.mkdir()
+
+            #######
+            # ACT #
+            #######
+            with (
+                mock.patch("src.classification.vector_store.VECTOR_STORE_PATH", test_path),
+                mock.patch("chromadb.PersistentClient") as mock_client,
+                mock.patch("openai.OpenAI"),
+            ):
+                mock_collection = mock.MagicMock()
+                mock_collection.metadata = {"embedding_model": "text-embedding-3-small"}
+                mock_collection.get.return_value = {
+                    "ids": ["cat_1", "cat_2"],
+                    "metadatas": [{"path": "/Electronics/Laptops"}, {"path": "/Electronics/Phones"}],
+                    "embeddings": [[1.0, 0.0], [0.0, 1.0]],
+                }
+
+                mock_client_instance = mock.MagicMock()
+                mock_client_instance.get_collection.return_value = mock_collection
+                mock_client.return_value = mock_client_instance
+
+                from src.classification.vector_store import CategoryVectorStore
+
+                store = CategoryVectorStore(auto_create=False)
+                single = store.get_cached_embedding("/Electronics/Phones")
+                batch = store.get_cached_embeddings(["/Electronics/Laptops", "/Unknown", "/Electronics/Phones"])
+
+                ##########
+                # ASSERT #
+                ##########
+                assert single == [0.0, 1.0]
+                assert batch[0].tolist() == [1.0, 0.0]
+                assert batch[1] is None
+                assert batch[2].tolist() == [0.0, 1.0]
+                # Only the bulk load at open touched the collection
+                mock_collection.get.assert_called_once_with(include=["metadatas", "embeddings"])
+
+    def test_get_cached_embeddings_fetches_unloaded_in_one_request(self):
+        """Test known categories without a loaded embedding are fetched in a single collection.get."""
+        ###########
+        # ARRANGE #
+        ###########
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_path = Path(temp_dir) / "test_vector_store"
+            test_path.mkdir()
+
+            #######
+            # ACT #
+            #######
+            with (
+                mock.patch("src.classification.vector_store.VECTOR_STORE_PATH", test_path),
+                mock.patch("chromadb.PersistentClient") as mock_client,
+                mock.patch("openai.OpenAI"),
+            ):
+                mock_collection = mock.MagicMock()
+                mock_collection.metadata = {"embedding_model": "text-embedding-3-small"}
+                mock_collection.get.side_effect = [
+                    {
+                        "ids": ["cat_1", "cat_2"],
+                        "metadatas": [{"path": "/A"}, {"path": "/B"}],
+                    },  # For cache building, without embeddings
+                    {"ids": ["cat_2", "cat_1"], "embeddings": [[0.0, 2.0], [2.0, 0.0]]},
+                ]
+
+                mock_client_instance = mock.MagicMock()
+                mock_client_instance.get_collection.return_value = mock_collection
+                mock_client.return_value = mock_client_instance
+
+                from src.classification.vector_store import CategoryVectorStore
+
+                store = CategoryVectorStore(auto_create=False)
+                result = store.get_cached_embeddings(["/A", "/B"])
+
+                ##########
+                # ASSERT #
+                ##########
+                assert result[0].tolist() == [2.0, 0.0]
+                assert result[1].tolist() == [0.0, 2.0]
+                assert mock_collection.get.call_count == 2
+                mock_collection.get.assert_called_with(ids=["cat_1", "cat_2"], include=["embeddings"])
+
+    def test_embedding_snapshot_roundtrip(self):
+        """Test a saved embedding snapshot is memory-mapped on the next open instead of fetching embeddings."""
+        ###########
+        # ARRANGE #
+        ###########
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_path = Path(temp_dir) / "test_vector_store"
+            test_path.mkdir()
+
+            #######
+            # ACT #
+            #######
+            with (
+                mock.patch("src.classification.vector_store.VECTOR_STORE_PATH", test_path),
+                mock.patch("chromadb.PersistentClient") as mock_client,
+                mock.patch("openai.OpenAI"),
+            ):
+                mock_collection = mock.MagicMock()
+                mock_collection.metadata = {"embedding_model": "text-embedding-3-small"}
+                mock_collection.count.return_value = 2
+                mock_collection.get.return_value = {
+                    "ids": ["cat_1", "cat_2"],
+                    "metadatas": [{"path": "/A"}, {"path": "/B"}],
+                    "documents": ["A", "B"],
+                    "embeddings": [[1.0, 0.0], [0.0, 1.0]],
+                }
+
+                mock_client_instance = mock.MagicMock()
+                mock_client_instance.get_collection.return_value = mock_collection
+                mock_client.return_value = mock_client_instance
+
+                from src.classification.vector_store import CategoryVectorStore
+
+                CategoryVectorStore(auto_create=False).save_embedding_snapshot()
+                mock_collection.get.reset_mock()
+                store = CategoryVectorStore(auto_create=False)
+
+                ##########
+                # ASSERT #
+                ##########
+                assert (test_path / "category_embeddings.npy").exists()
+                mock_collection.get.assert_called_once_with(include=["documents"])
+                assert store.has_category("/B") is True
+                assert store._category_cache["/B"] == "cat_2"
+                assert store.get_cached_embedding("/A") == [1.0, 0.0]
+
+    def test_embedding_snapshot_ignored_when_stale(self):
+        """Test a snapshot whose fingerprint doesn't match the collection falls back to a bulk collection load."""
+        ###########
+        # ARRANGE #
+        ###########
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_path = Path(temp_dir) / "test_vector_store"
+            test_path.mkdir()
+
+            #######
+            # ACT #
+            #######
+            with (
+                mock.patch("src.classification.vector_store.VECTOR_STORE_PATH", test_path),
+                mock.patch("chromadb.PersistentClient") as mock_client,
+                mock.patch("openai.OpenAI"),
+            ):
+                mock_collection = mock.MagicMock()
+                mock_collection.metadata = {"embedding_model": "text-embedding-3-small"}
+                mock_collection.count.return_value = 2
+                mock_collection.get.return_value = {
+                    "ids": ["cat_1", "cat_2"],
+                    "metadatas": [{"path": "/A"}, {"path": "/B"}],
+                    "documents": ["A", "B"],
+                    "embeddings": [[1.0, 0.0], [0.0, 1.0]],
+                }
+
+                mock_client_instance = mock.MagicMock()
+                mock_client_instance.get_collection.return_value = mock_collection
+                mock_client.return_value = mock_client_instance
+
+                from src.classification.vector_store import CategoryVectorStore
+
+                CategoryVectorStore(auto_create=False).save_embedding_snapshot()
+                # Same ids and row count, but one category was re-embedded with new text
+                mock_collection.get.return_value = {
+                    **mock_collection.get.return_value,
+                    "documents": ["A", "B (edited)"],
+                    "embeddings": [[1.0, 0.0], [0.5, 0.5]],
+                }
+                mock_collection.get.reset_mock()
+                store = CategoryVectorStore(auto_create=False)
+
+                ##########
+                # ASSERT #
+                ##########
+                mock_collection.get.assert_called_with(include=["metadatas", "embeddings"])
+                assert store.get_cached_embedding("/B") == [0.5, 0.5]
+
+    def test_add_category_discards_embedding_snapshot(self, mock_category):
+        """Test add_category deletes the snapshot, so the next open doesn't load the replaced embedding."""
+        ###########
+        # ARRANGE #
+        ###########
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_path = Path(temp_dir) / "test_vector_store"
+            test_path.mkdir()
+
+            #######
+            # ACT #
+            #######
+            with (
+                mock.patch("src.classification.vector_store.VECTOR_STORE_PATH", test_path),
+                mock.patch("chromadb.PersistentClient") as mock_client,
+                mock.patch("openai.OpenAI"),
+            ):
+                mock_collection = mock.MagicMock()
+                mock_collection.metadata = {"embedding_model": "text-embedding-3-small"}
+                mock_collection.get.return_value = {
+                    "ids": [category_id(mock_category.path)],
+                    "metadatas": [{"path": mock_category.path}],
+                    "documents": [mock_category.embedding_text],
+                    "embeddings": [[1.0, 0.0]],
+                }
+
+                mock_client_instance = mock.MagicMock()
+                mock_client_instance.get_collection.return_value = mock_collection
+                mock_client.return_value = mock_client_instance
+
+                from src.classification.vector_store import CategoryVectorStore
+
+                store = CategoryVectorStore(auto_create=False)
+                store.save_embedding_snapshot()
+                snapshot_written = (test_path / "category_embeddings.npy").exists()
+                store.add_category(mock_category, [0.0, 1.0])
+
+                ##########
+                # ASSERT #
+                ##########
+                assert snapshot_written is True
+                assert not (test_path / "category_embeddings.npy").exists()
+                assert not (test_path / "category_embeddings.json").exists()
+                assert store.get_cached_embedding(mock_category.path) == [0.0, 1.0]
+
+    def test_shared_returns_single_instance(self):
+        """Test shared() opens the store once per path and reset_shared() forces a reopen."""
+        ###########
+        # ARRANGE #
+        ###########
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_path = Path(temp_dir) / "test_vector_store"
+            test_path.mkdir()
+
+            #######
+            # ACT #
+            #######
+            with (
+                mock.patch("src.classification.vector_store.VECTOR_STORE_PATH", test_path),
+                mock.patch("chromadb.PersistentClient") as mock_client,
+                mock.patch("openai.OpenAI"),
+            ):
+                mock_collection = mock.MagicMock()
+                mock_collection.metadata = {"embedding_model": "text-embedding-3-small"}
+                mock_collection.get.return_value = {"ids": [], "metadatas": []}
+
+                mock_client_instance = mock.MagicMock()
+                mock_client_instance.get_collection.return_value = mock_collection
+                mock_client.return_value = mock_client_instance
+
+                from src.classification.vector_store import CategoryVectorStore
+
+                CategoryVectorStore.reset_shared()
+                first = CategoryVectorStore.shared()
+                second = CategoryVectorStore.shared(auto_create=True)
+                available = CategoryVectorStore.is_available()
+                CategoryVectorStore.reset_shared()
+                third = CategoryVectorStore.shared()
+                CategoryVectorStore.reset_shared()
+
+                ##########
+                # ASSERT #
+                ##########
+                assert first is second
+                assert available is True
+                assert third is not first
+                assert mock_client.call_count == 2
+
+
+class TestCategoryVectorStoreSync:
+    """Test sync_categories against a real on-disk ChromaDB collection."""
+
+    @staticmethod
+    def _fake_embed(texts: list[str]) -> list[list[float]]:
+        """Embed texts as (length, vowels, 1) vectors."""
+        return [[float(len(text)), float(sum(c in "aeiou" for c in text)), 1.0] for text in texts]
+
+    @pytest.fixture
+    def store_factory(self, tmp_path):
+        """Fixture that opens CategoryVectorStores over a fresh collection in a temp dir."""
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+
+        from src.classification.vector_store import CategoryVectorStore
+
+        with mock.patch("src.classification.vector_store.VECTOR_STORE_PATH", tmp_path):
+            client = chromadb.PersistentClient(
+                path=str(tmp_path), settings=ChromaSettings(anonymized_telemetry=False, is_persistent=True)
+            )
+            client.create_collection("categories", metadata={"embedding_model": "text-embedding-3-small"})
+            yield lambda: CategoryVectorStore(auto_create=False)
+
+    def test_sync_embeds_only_added_and_changed(self, store_factory, mock_categories):
+        """Test a second sync embeds only the changed and added categories and deletes removed ones."""
+        ###########
+        # ARRANGE #
+        ###########
+        store = store_factory()
+        store.sync_categories(mock_categories, self._fake_embed)
+        changed = mock_categories[0].model_copy(update={"embedding_text": "Gaming laptops with RGB keyboards"})
+        renamed = mock_categories[1].model_copy(update={"llm_description": "Laptops for the office"})
+        added = Category(
+            name="Tablets",
+            path="/Electronics/Mobile/Tablets",
+            embedding_text="Mobile tablets",
+            llm_description="Tablets",
+        )
+        embed = mock.MagicMock(side_effect=self._fake_embed)
+
+        #######
+        # ACT #
+        #######
+        report = store_factory().sync_categories([changed, renamed, added], embed)
+
+        ##########
+        # ASSERT #
+        ##########
+        assert (report.added, report.changed, report.updated, report.removed, report.unchanged) == (1, 1, 1, 1, 0)
+        embed.assert_called_once_with(["Gaming laptops with RGB keyboards", "Mobile tablets"])
+        reopened = store_factory()
+        assert reopened.collection.count() == 3
+        assert not reopened.has_category(mock_categories[2].path)
+        assert reopened.get_cached_embedding(changed.path) == self._fake_embed([changed.embedding_text])[0]
+        stored = reopened.collection.get(ids=[category_id(renamed.path)])
+        assert stored["metadatas"][0]["llm_description"] == "Laptops for the office"
+
+    def test_sync_rekeys_legacy_ids_without_embedding(self, store_factory, mock_categories):
+        """Test entries under legacy ids move to stable ids without calling the embedder."""
+        ###########
+        # ARRANGE #
+        ###########
+        store = store_factory()
+        store.collection.add(
+            ids=[f"cat_{i}" for i in range(len(mock_categories))],
+            embeddings=self._fake_embed([category.embedding_text for category in mock_categories]),
+            documents=[category.embedding_text for category in mock_categories],
+            metadatas=[{"path": category.path, "name": category.name} for category in mock_categories],
+        )
+        embed = mock.MagicMock(side_effect=self._fake_embed)
+
+        #######
+        # ACT #
+        #######
+        report = store_factory().sync_categories(mock_categories, embed)
+
+        ##########
+        # ASSERT #
+        ##########
+        assert report.rekeyed == len(mock_categories)
+        assert report.embedded == 0
+        embed.assert_not_called()
+        ids = store_factory().collection.get()["ids"]
+        assert sorted(ids) == sorted(category_id(category.path) for category in mock_categories)
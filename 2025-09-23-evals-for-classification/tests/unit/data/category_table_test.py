@@ -0,0 +1,109 @@
+"""Test the category_table module."""
+
+from unittest import mock
+
+import pytest
+
+from src.data import category_loader as category_loader_module
+from src.data.category_loader import CategoryLoader
+from src.data.category_table import NO_PARENT, CategoryTable
+
+PATHS = [
+    "/Appliances",
+    "/Appliances/Refrigerators",
+    "/Appliances/Refrigerators/French Door Refrigerators",
+    "/Electronics/Home_Audio",
+    "/Appliances/Refrigerators",
+]
+
+
+@pytest.fixture
+def table():
+    """Fixture that provides a CategoryTable built from PATHS."""
+    return CategoryTable.from_paths(PATHS)
+
+
+def test_rows_match_loader_categories(table: CategoryTable):
+    """Test every row view and materialized category matches what CategoryLoader parses."""
+    ###########
+    # ARRANGE #
+    ###########
+    loader = CategoryLoader()
+    expected = [loader._parse_category_line(path) for path in PATHS]
+
+    #######
+    # ACT #
+    #######
+    categories = table.to_categories()
+
+    ##########
+    # ASSERT #
+    ##########
+    assert categories == expected
+    for row, category in zip(table, expected):
+        assert row.name == category.name
+        assert row.path == category.path
+        assert row.level == category.level
+        assert row.parent_path == category.parent_path
+        assert row.embedding_text == category.embedding_text
+        assert row.llm_description == category.llm_description
+
+
+def test_segments_are_interned_and_parents_resolved(table: CategoryTable):
+    """Test repeated segments are stored once and parent ids point at the first parent row."""
+    ##########
+    # ASSERT #
+    ##########
+    assert table.segments == ["Appliances", "Refrigerators", "French Door Refrigerators", "Electronics", "Home_Audio"]
+    assert list(table.parent_ids) == [NO_PARENT, 0, 1, NO_PARENT, 0]
+    assert table[2].parent.path == "/Appliances/Refrigerators"
+    assert table[3].parent is None
+    assert [row.row for row in table.children(1)] == [2]
+
+
+def test_find_and_append_after_freeze(table: CategoryTable):
+    """Test lookups and appends still work after the build-time indexes were dropped."""
+    #######
+    # ACT #
+    #######
+    found = table.find("/Appliances/Refrigerators")
+    missing = table.find("/Appliances/Freezers")
+    row = table.append("/Electronics/Home_Audio/Speakers")
+
+    ##########
+    # ASSERT #
+    ##########
+    assert found.row == 1
+    assert missing is None
+    assert table[row].parent_id == 3
+    assert table[-1].name == "Speakers"
+    with pytest.raises(IndexError):
+        table[len(table)]
+    with pytest.raises(ValueError):
+        table.append("/Appliances//Broken")
+
+
+def test_loader_load_table(tmp_path):
+    """Test CategoryLoader.load_table parses the configured file once and skips blank lines."""
+    ###########
+    # ARRANGE #
+    ###########
+    categories_file = tmp_path / "categories.txt"
+    categories_file.write_text("\n".join(PATHS[:3]) + "\n\n", encoding="utf-8")
+    loader = CategoryLoader()
+
+    #######
+    # ACT #
+    #######
+    with mock.patch.object(category_loader_module, "settings") as mock_settings:
+        mock_settings.categories_file_path = categories_file
+        mock_settings.taxonomy_snapshot_path = tmp_path / "taxonomy_snapshot.bin"
+        table = loader.load_table()
+        again = loader.load_table()
+
+    ##########
+    # ASSERT #
+    ##########
+    assert again is table
+    assert len(table) == 3
+    assert table[2].path == PATHS[2]
@@ -0,0 +1,110 @@
+"""Test the taxonomy_snapshot module."""
+
+import numpy as np
+import pytest
+
+from src.data.category_table import CategoryTable
+from src.data.taxonomy_snapshot import TaxonomySnapshot, load_taxonomy_snapshot, write_taxonomy_snapshot
+
+PATHS = ["/Appliances", "/Appliances/Refrigerators", "/Appliances/Refrigerators/French Door Refrigerators"]
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Fixture that provides a categories file."""
+    path = tmp_path / "categories.txt"
+    path.write_text("\n".join(PATHS) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture(autouse=True)
+def reset_shared():
+    """Fixture that forgets process-wide snapshots between tests."""
+    TaxonomySnapshot.reset_shared()
+    yield
+    TaxonomySnapshot.reset_shared()
+
+
+def test_round_trip_with_embeddings(tmp_path, source):
+    """Test a written snapshot loads back the same categories and embeddings, memory-mapped."""
+    ###########
+    # ARRANGE #
+    ###########
+    table = CategoryTable.from_paths(PATHS)
+    embeddings = np.arange(len(PATHS) * 4, dtype=np.float32).reshape(len(PATHS), 4)
+    path = write_taxonomy_snapshot(tmp_path / "taxonomy.bin", table, source, embeddings, "model-a", "key-a")
+
+    #######
+    # ACT #
+    #######
+    snapshot = load_taxonomy_snapshot(path, source)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert snapshot.table.to_categories() == table.to_categories()
+    assert list(snapshot.table.parent_ids) == [-1, 0, 1]
+    assert snapshot.table.find("/Appliances/Refrigerators").row == 1
+    np.testing.assert_array_equal(snapshot.embeddings, embeddings)
+    assert not snapshot.embeddings.flags.writeable
+    assert (snapshot.embedding_model, snapshot.embeddings_key) == ("model-a", "key-a")
+
+
+def test_stale_snapshot_is_ignored(tmp_path, source):
+    """Test a snapshot is ignored once the categories file content changes, but not when only touched."""
+    ###########
+    # ARRANGE #
+    ###########
+    path = write_taxonomy_snapshot(tmp_path / "taxonomy.bin", CategoryTable.from_paths(PATHS), source)
+
+    #######
+    # ACT #
+    #######
+    source.write_text(source.read_text(encoding="utf-8"), encoding="utf-8")  # New mtime, same content
+    touched = load_taxonomy_snapshot(path, source)
+    source.write_text("\n".join(PATHS[:2]) + "\n", encoding="utf-8")
+    changed = load_taxonomy_snapshot(path, source)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert touched is not None
+    assert touched.embeddings is None
+    assert changed is None
+
+
+def test_corrupt_or_missing_snapshot_returns_none(tmp_path, source):
+    """Test unreadable and missing snapshots are treated as absent."""
+    ###########
+    # ARRANGE #
+    ###########
+    corrupt = tmp_path / "corrupt.bin"
+    corrupt.write_bytes(b"not a snapshot")
+
+    ##########
+    # ASSERT #
+    ##########
+    assert load_taxonomy_snapshot(corrupt, source) is None
+    assert load_taxonomy_snapshot(tmp_path / "missing.bin", source) is None
+
+
+def test_shared_reuses_until_file_changes(tmp_path, source):
+    """Test shared returns the same snapshot until the snapshot file is rewritten."""
+    ###########
+    # ARRANGE #
+    ###########
+    path = write_taxonomy_snapshot(tmp_path / "taxonomy.bin", CategoryTable.from_paths(PATHS), source)
+
+    #######
+    # ACT #
+    #######
+    first = TaxonomySnapshot.shared(path, source)
+    second = TaxonomySnapshot.shared(path, source)
+    write_taxonomy_snapshot(path, CategoryTable.from_paths(PATHS[:1]), source)
+    third = TaxonomySnapshot.shared(path, source)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert first is second
+    assert len(third.table) == 1
@@ -0,0 +1,135 @@
+"""Test the harness module."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import openai
+import pytest
+
+from src.baml_client import b
+from src.baml_client.async_client import b as async_b
+from src.baml_client.type_builder import TypeBuilder
+from tests.harness import LLMRecorder, MissingRecordingError, RecordMode, request_key, run_cases
+
+
+def _type_builder(*names: str) -> TypeBuilder:
+    """Build a Category enum offering the given names."""
+    tb = TypeBuilder()
+    for i, name in enumerate(names):
+        tb.Category.add_value(name).alias(f"k{i}")
+    return tb
+
+
+def test_run_cases_keeps_case_order_and_reports_speedup():
+    """Test a parallel run returns the same results, in the same order, as a serial run, only faster."""
+
+    ###########
+    # ARRANGE #
+    ###########
+    def classify(case: int) -> int:
+        time.sleep(0.02 * (case % 3))
+        if case == 4:
+            raise ValueError("case 4 failed")
+        return case * 10
+
+    cases = list(range(8))
+
+    #######
+    # ACT #
+    #######
+    serial = run_cases(classify, cases, workers=1)
+    parallel = run_cases(classify, cases, workers=8)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert [repr(r) for r in parallel.results] == [repr(r) for r in serial.results]
+    assert isinstance(parallel.results[4], ValueError)
+    assert parallel.results[:4] == [0, 10, 20, 30]
+    assert parallel.speedup > 2
+    assert serial.speedup == pytest.approx(1.0, rel=0.1)
+    assert "8 worker(s)" in parallel.summary()
+
+
+def test_request_key_covers_arguments_and_categories():
+    """Test the request hash changes with the arguments and the offered categories, not the call style."""
+    ##########
+    # ASSERT #
+    ##########
+    key = request_key("PickBestCategory", {"text": "laptop", "baml_options": {"tb": _type_builder("A", "B")}})
+    assert key == request_key("PickBestCategory", {"text": "laptop", "baml_options": {"tb": _type_builder("A", "B")}})
+    assert key != request_key("PickBestCategory", {"text": "laptop", "baml_options": {"tb": _type_builder("A", "C")}})
+    assert key != request_key("PickBestCategory", {"text": "phone", "baml_options": {"tb": _type_builder("A", "B")}})
+
+
+def test_baml_record_then_replay(tmp_path):
+    """Test recorded sync and async BAML responses replay offline, and unrecorded requests fail in replay mode."""
+    ###########
+    # ARRANGE #
+    ###########
+    tb = _type_builder("Laptops", "Tablets")
+    live_calls = []
+
+    def live_pick(text: str, baml_options: dict = {}) -> str:
+        live_calls.append(text)
+        return "Laptops"
+
+    async def live_expand(text: str, baml_options: dict = {}) -> str:
+        return f"{text} (expanded)"
+
+    #######
+    # ACT #
+    #######
+    with (
+        mock.patch.object(b, "PickBestCategory", live_pick),
+        mock.patch.object(async_b, "ExpandUserQuery", live_expand),
+        LLMRecorder(RecordMode.RECORD, tmp_path) as recorder,
+    ):
+        recorded = b.PickBestCategory("laptop", baml_options={"tb": tb})
+        b.PickBestCategory("laptop", {"tb": tb})  # Positional options hash the same
+        expanded = asyncio.run(async_b.ExpandUserQuery("laptop"))
+    with LLMRecorder(RecordMode.REPLAY, tmp_path) as replay:
+        replayed = b.PickBestCategory("laptop", baml_options={"tb": tb})
+        replayed_expansion = asyncio.run(async_b.ExpandUserQuery("laptop"))
+        with pytest.raises(MissingRecordingError):
+            b.PickBestCategory("tablet", baml_options={"tb": tb})
+
+    ##########
+    # ASSERT #
+    ##########
+    assert live_calls == ["laptop"]
+    assert (recorded, expanded) == ("Laptops", "laptop (expanded)")
+    assert (replayed, replayed_expansion) == (recorded, expanded)
+    assert (recorder.hits, recorder.misses) == (1, 2)
+    assert (replay.hits, replay.misses) == (2, 0)
+
+
+def test_embeddings_record_then_replay(tmp_path):
+    """Test embeddings are recorded per text, so replay serves them whatever the batching."""
+
+    ###########
+    # ARRANGE #
+    ###########
+    def live_create(client_self, *, model: str, input: list[str], **kwargs):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text)), 0.5]) for text in input])
+
+    client = openai.OpenAI(api_key="unused")
+
+    #######
+    # ACT #
+    #######
+    with mock.patch.object(openai.resources.embeddings.Embeddings, "create", live_create):
+        with LLMRecorder(RecordMode.RECORD, tmp_path):
+            recorded = client.embeddings.create(model="m", input=["a", "bb"])
+    with LLMRecorder(RecordMode.REPLAY, tmp_path):
+        replayed = client.embeddings.create(model="m", input=["bb", "a", "bb"])
+        with pytest.raises(MissingRecordingError):
+            client.embeddings.create(model="m", input=["ccc"])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert [d.embedding for d in recorded.data] == [[1.0, 0.5], [2.0, 0.5]]
+    assert [d.embedding for d in replayed.data] == [[2.0, 0.5], [1.0, 0.5], [2.0, 0.5]]
@@ -0,0 +1,85 @@
+"""Test the correctness module."""
+
+import itertools
+
+import pytest
+
+from src.data.models import Category
+from src.shared.correctness import NO_NODE, AncestorTable, CorrectnessDefinition, CorrectnessEvaluator
+
+PATHS = [
+    "/Electronics",
+    "/Electronics/Computers/Laptops",
+    "/Electronics/Computers/Tablets",
+    "/Electronics/Computers/Laptops/Gaming Laptops",
+    "/Electronics/Mobile/Smartphones",
+    "/Home",
+    "/Home/Kitchen",
+]
+
+
+@pytest.fixture
+def evaluator() -> CorrectnessEvaluator:
+    """Fixture that provides an evaluator over a small taxonomy with a prefix that isn't a category."""
+    categories = [
+        Category(name=path.rsplit("/", 1)[1], path=path, embedding_text=path, llm_description=path) for path in PATHS
+    ]
+    return CorrectnessEvaluator(categories)
+
+
+def test_ancestor_table_encodes_categories_and_prefixes():
+    """Test every path prefix gets an id, with its depth, parent and ancestor row."""
+    #######
+    # ACT #
+    #######
+    table = AncestorTable(PATHS)
+
+    ##########
+    # ASSERT #
+    ##########
+    gaming = table.ids["/Electronics/Computers/Laptops/Gaming Laptops"]
+    computers = table.ids["/Electronics/Computers"]
+    assert len(table) == len(PATHS) + 2  # Plus the /Electronics/Computers and /Electronics/Mobile prefixes
+    assert table.depth[gaming] == 3
+    assert table.parent[gaming] == table.ids["/Electronics/Computers/Laptops"]
+    assert table.ancestors[gaming].tolist() == [
+        table.ids["/Electronics"],
+        computers,
+        table.ids["/Electronics/Computers/Laptops"],
+        gaming,
+    ]
+    assert table.ancestors[table.ids["/Home"]].tolist() == [table.ids["/Home"], NO_NODE, NO_NODE, NO_NODE]
+    assert not table.is_category[computers]
+    assert table.is_category[gaming]
+
+
+@pytest.mark.parametrize("definition", list(CorrectnessDefinition))
+def test_score_many_matches_is_correct(evaluator: CorrectnessEvaluator, definition: CorrectnessDefinition):
+    """Test vectorized scoring agrees with is_correct on every pair, including prefixes and unknown paths."""
+    ###########
+    # ARRANGE #
+    ###########
+    paths = [*PATHS, "/Electronics/Computers", "/Electronics/Mobile", "/Unknown", "/Unknown/Child", ""]
+    pairs = list(itertools.product(paths, repeat=2))
+    predicted = [p for p, _ in pairs]
+    ground_truth = [g for _, g in pairs]
+
+    #######
+    # ACT #
+    #######
+    scores = evaluator.score_many(predicted, ground_truth, definition)
+
+    ##########
+    # ASSERT #
+    ##########
+    expected = [evaluator.is_correct(p, g, definition) for p, g in pairs]
+    assert scores.tolist() == expected
+
+
+def test_score_many_rejects_mismatched_lengths(evaluator: CorrectnessEvaluator):
+    """Test scoring fails when predictions and ground truths don't pair up."""
+    ##########
+    # ASSERT #
+    ##########
+    with pytest.raises(ValueError, match="2 predictions for 1 ground truths"):
+        evaluator.score_many(["/Home", "/Home"], ["/Home"], CorrectnessDefinition.EXACT)
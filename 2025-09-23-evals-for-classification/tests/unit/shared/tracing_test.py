@@ -0,0 +1,116 @@
+"""Test the tracing module."""
+
+import asyncio
+
+import pytest
+
+from src.shared.enums import Stage
+from src.shared.tracing import LatencyHistogram, Tracer
+
+
+@pytest.fixture
+def tracer() -> Tracer:
+    """Fixture that provides a fresh tracer."""
+    return Tracer()
+
+
+def test_histogram_percentiles_and_buckets():
+    """Test percentiles come from the samples and buckets count each sample once."""
+    ###########
+    # ARRANGE #
+    ###########
+    histogram = LatencyHistogram(buckets_ms=(10, 100))
+
+    #######
+    # ACT #
+    #######
+    for duration_ms in range(1, 101):
+        histogram.observe(float(duration_ms))
+    histogram.observe(500.0)
+
+    ##########
+    # ASSERT #
+    ##########
+    summary = histogram.as_dict()
+    assert summary["count"] == 101
+    assert summary["p50_ms"] == 51.0
+    assert summary["p90_ms"] == 91.0
+    assert summary["p99_ms"] == 100.0
+    assert summary["max_ms"] == 500.0
+    assert histogram.bucket_counts == [10, 90]  # 500ms only lands in +Inf
+
+
+def test_spans_join_the_open_trace(tracer: Tracer):
+    """Test spans are added to the open trace, even when the block raises, and never outside it."""
+    #######
+    # ACT #
+    #######
+    with tracer.span(Stage.QUERY_EMBEDDING):
+        pass
+    with tracer.trace(Stage.CLASSIFY) as trace:
+        with tracer.span(Stage.QUERY_EMBEDDING):
+            pass
+        with pytest.raises(RuntimeError), tracer.span(Stage.SELECTION):
+            raise RuntimeError("LLM call failed")
+    totals = trace.stage_totals()
+
+    ##########
+    # ASSERT #
+    ##########
+    assert list(totals) == ["classify", "query_embedding", "selection"]
+    assert totals["classify"] >= totals["query_embedding"] + totals["selection"]
+    assert tracer.as_dict()["query_embedding"]["count"] == 2
+    assert tracer.current_trace() is None
+
+
+def test_concurrent_tasks_get_their_own_traces(tracer: Tracer):
+    """Test concurrent asyncio tasks each record into their own trace."""
+
+    ###########
+    # ARRANGE #
+    ###########
+    async def classify(stage: Stage) -> dict[str, float]:
+        with tracer.trace() as trace:
+            with tracer.span(stage):
+                await asyncio.sleep(0.01)
+        return trace.stage_totals()
+
+    async def classify_both() -> list[dict[str, float]]:
+        return await asyncio.gather(classify(Stage.LLM_NARROWING), classify(Stage.SELECTION))
+
+    #######
+    # ACT #
+    #######
+    narrowing, selection = asyncio.run(classify_both())
+
+    ##########
+    # ASSERT #
+    ##########
+    assert list(narrowing) == ["llm_narrowing"]
+    assert list(selection) == ["selection"]
+
+
+def test_prometheus_export(tracer: Tracer):
+    """Test the Prometheus text has cumulative buckets, sum, count and window quantiles per stage."""
+    ###########
+    # ARRANGE #
+    ###########
+    tracer.record(Stage.VECTOR_SEARCH, 0.0, 0.002)
+    tracer.record(Stage.VECTOR_SEARCH, 0.0, 0.2)
+
+    #######
+    # ACT #
+    #######
+    text = tracer.to_prometheus()
+
+    ##########
+    # ASSERT #
+    ##########
+    lines = text.splitlines()
+    assert "# TYPE classification_stage_duration_seconds histogram" in lines
+    assert 'classification_stage_duration_seconds_bucket{stage="vector_search",le="0.0025"} 1' in lines
+    assert 'classification_stage_duration_seconds_bucket{stage="vector_search",le="0.25"} 2' in lines
+    assert 'classification_stage_duration_seconds_bucket{stage="vector_search",le="+Inf"} 2' in lines
+    assert 'classification_stage_duration_seconds_count{stage="vector_search"} 2' in lines
+    assert 'classification_stage_duration_seconds_window{stage="vector_search",quantile="0.99"} 0.200000' in lines
+    assert text.endswith("\n")
@@ -0,0 +1,160 @@
+"""Test the run_store module."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from ui.run_store import RunStore
+
+
+@pytest.fixture
+def pipeline_data() -> dict:
+    """Fixture that provides pipeline test results in the format the pipeline accuracy test saves."""
+    return {
+        "test_info": {"narrowing_strategy": "hybrid", "vector_store_enabled": True, "total_test_cases": 2},
+        "results": {
+            "total_tests": 2,
+            "correct_classifications": 1,
+            "accuracy_percent": 50.0,
+            "stage_latency": {"selection": {"count": 2}},
+            "individual_results": [
+                {
+                    "test_case": {"text": "gaming laptop", "category": "/Electronics/Laptops"},
+                    "selected_category": {"path": "/Electronics/Laptops", "name": "Laptops"},
+                    "correct_classification": True,
+                    "processing_time_ms": 120.0,
+                },
+                {
+                    "test_case": {"text": "fridge", "category": "/Appliances/Refrigerators"},
+                    "selected_category": {"path": "/Appliances/Freezers", "name": "Freezers"},
+                    "correct_classification": False,
+                    "processing_time_ms": 80.0,
+                    "stage_timings_ms": {"selection": 40.0},
+                },
+            ],
+        },
+    }
+
+
+def test_save_then_load_columns(tmp_path: Path, pipeline_data: dict):
+    """Test a saved run is catalogued and loads whole or column by column."""
+    ###########
+    # ARRANGE #
+    ###########
+    store = RunStore(tmp_path)
+    signature = store.signature()
+
+    #######
+    # ACT #
+    #######
+    store.save_run("v1", "baseline", pipeline_data)
+    full = store.load_run("v1")
+    partial = store.load_run("v1", ["correct_classification", "missing"])
+    columns = store.load_columns("v1", ["processing_time_ms"])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert store.signature() != signature
+    [run] = store.catalog()
+    assert run["run_name"] == "v1"
+    assert run["results_summary"]["accuracy_percent"] == 50.0
+    assert run["columns"] == [
+        "test_case",
+        "selected_category",
+        "correct_classification",
+        "processing_time_ms",
+        "stage_timings_ms",
+    ]
+    individual_results = pipeline_data["results"]["individual_results"]
+    assert full["pipeline_data"]["results"]["individual_results"] == [
+        {**individual_results[0], "stage_timings_ms": None},
+        individual_results[1],
+    ]
+    assert full["pipeline_data"]["results"]["stage_latency"] == {"selection": {"count": 2}}
+    assert full["pipeline_data"]["test_info"] == pipeline_data["test_info"]
+    assert partial["pipeline_data"]["results"]["individual_results"] == [
+        {"correct_classification": True},
+        {"correct_classification": False},
+    ]
+    assert columns == {"processing_time_ms": [120.0, 80.0]}
+    assert store.load_run("v2") is None
+
+
+def test_saving_a_run_again_replaces_it(tmp_path: Path, pipeline_data: dict):
+    """Test saving under an existing name replaces the run and its catalogue entry."""
+    ###########
+    # ARRANGE #
+    ###########
+    store = RunStore(tmp_path)
+    store.save_run("v1", "first", pipeline_data)
+    pipeline_data["results"]["individual_results"] = pipeline_data["results"]["individual_results"][:1]
+
+    #######
+    # ACT #
+    #######
+    store.save_run("v1", "second", pipeline_data)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert [run["description"] for run in store.catalog()] == ["second"]
+    assert store.load_columns("v1", ["correct_classification"]) == {"correct_classification": [True]}
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_legacy_runs_are_listed_and_loaded(tmp_path: Path, pipeline_data: dict):
+    """Test runs saved as a metadata file plus a pipeline JSON are still listed and loaded."""
+    ###########
+    # ARRANGE #
+    ###########
+    pipeline_file = tmp_path / "pipeline_v0_20250101_000000.json"
+    pipeline_file.write_text(json.dumps(pipeline_data, indent=2), encoding="utf-8")
+    legacy_metadata = {"run_name": "v0", "timestamp": "2025-01-01T00:00:00", "pipeline_results_path": str(pipeline_file)}
+    (tmp_path / "v0_metadata.json").write_text(json.dumps(legacy_metadata), encoding="utf-8")
+    store = RunStore(tmp_path)
+    store.save_run("v1", "columnar", pipeline_data)
+
+    #######
+    # ACT #
+    #######
+    run_names = [run["run_name"] for run in store.catalog()]
+    legacy = store.load_run("v0", ["correct_classification"])
+    columns = store.load_columns("v0", ["processing_time_ms"])
+
+    ##########
+    # ASSERT #
+    ##########
+    assert run_names == ["v1", "v0"]
+    assert legacy["metadata"] == legacy_metadata
+    assert legacy["pipeline_data"]["results"]["individual_results"] == [
+        {"correct_classification": True},
+        {"correct_classification": False},
+    ]
+    assert columns == {"processing_time_ms": [120.0, 80.0]}
+
+
+@pytest.mark.parametrize("run_name", ["", ".", "..", "../outside", "nested/run"])
+def test_save_run_rejects_names_outside_the_store(tmp_path: Path, pipeline_data: dict, run_name: str):
+    """Test names that would resolve outside the store directory are rejected before anything is written."""
+    ###########
+    # ARRANGE #
+    ###########
+    store = RunStore(tmp_path / "saved_runs")
+    store.save_run("v1", "first", pipeline_data)
+    (tmp_path / "keep.txt").write_text("keep", encoding="utf-8")
+
+    #######
+    # ACT #
+    #######
+    with pytest.raises(ValueError, match="Invalid run name"):
+        store.save_run(run_name, "bad", pipeline_data)
+
+    ##########
+    # ASSERT #
+    ##########
+    assert (tmp_path / "keep.txt").read_text(encoding="utf-8") == "keep"
+    assert [run["run_name"] for run in store.catalog()] == ["v1"]
+    assert store.load_run("v1") is not None
+
@@ -24,6 +24,12 @@ from src.shared.correctness import CorrectnessDefinition, CorrectnessEvaluator
 TEST_CASE_DESCRIPTION_DISPLAY_LENGTH = 100
 
 
+def _final_path(test_case: Dict[str, Any]) -> str:
+    """Get the path of a test case's final selection, or an empty string if nothing was selected."""
+    final_selection = test_case["stages"]["selection"]["final_choice"]
+    return final_selection.get("path", "") if final_selection else ""
+
+
 def analyze_pipeline_errors(
     ui_data: List[Dict[str, Any]],
     correctness_definition: CorrectnessDefinition = CorrectnessDefinition.EXACT,
@@ -55,7 +61,14 @@ def analyze_pipeline_errors(
     if correctness_definition != CorrectnessDefinition.EXACT and all_categories:
         evaluator = CorrectnessEvaluator(all_categories)
 
-    for test_case in ui_data:
+    # Score the whole run at once rather than one case at a time
+    flexible_scores = None
+    if evaluator:
+        final_paths = [_final_path(test_case) for test_case in ui_data]
+        ground_truths = [test_case["ground_truth"] for test_case in ui_data]
+        flexible_scores = evaluator.score_many(final_paths, ground_truths, correctness_definition)
+
+    for case_index, test_case in enumerate(ui_data):
         analysis["total_cases"] += 1
 
         ground_truth = test_case["ground_truth"]
@@ -63,12 +76,11 @@ def analyze_pipeline_errors(
         # Get candidates from each stage
         embedding_candidates = test_case["stages"]["embedding"]["candidates"]
         llm_candidates = test_case["stages"]["llm"]["candidates"]
-        final_selection = test_case["stages"]["selection"]["final_choice"]
 
         # Get category paths for easier comparison
         embedding_paths = [cat["path"] for cat in embedding_candidates]
         llm_paths = [cat["path"] for cat in llm_candidates]
-        final_path = final_selection.get("path", "") if final_selection else ""
+        final_path = _final_path(test_case)
 
         # Determine failure point
         failure_info = {
@@ -82,8 +94,8 @@ def analyze_pipeline_errors(
 
         # Determine correctness using flexible definition
         is_correct = False
-        if evaluator and correctness_definition != CorrectnessDefinition.EXACT:
-            is_correct = evaluator.is_correct(final_path, ground_truth, correctness_definition)
+        if flexible_scores is not None:
+            is_correct = bool(flexible_scores[case_index])
         else:
             is_correct = ground_truth == final_path
 
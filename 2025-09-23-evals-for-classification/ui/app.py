@@ -20,7 +20,13 @@ if env_file.exists():
     load_dotenv(env_file)
 # Import UI modules
 from src.shared.correctness import CorrectnessDefinition
-from ui.components import render_custom_testing, render_error_analysis, render_test_case_analysis
+from ui.components import (
+    render_custom_testing,
+    render_error_analysis,
+    render_latency_analysis,
+    render_run_comparison,
+    render_test_case_analysis,
+)
 from ui.data_operations import (
     get_available_saved_runs,
     load_saved_run,
@@ -188,17 +194,14 @@ def render_main_content(current_data):
                 all_categories = category_loader.load_categories()
                 evaluator = CorrectnessEvaluator(all_categories)
 
-                # Count exact vs flexible correctness
+                # Count exact vs flexible correctness, scoring the whole run at once
                 exact_correct = sum(1 for case in current_data if case["is_correct"])
-                flexible_correct = 0
-
+                final_paths = []
                 for case in current_data:
                     final_selection = case["stages"]["selection"]["final_choice"]
-                    final_path = final_selection.get("path", "") if final_selection else ""
-                    ground_truth = case["ground_truth"]
-
-                    if evaluator.is_correct(final_path, ground_truth, selected_correctness):
-                        flexible_correct += 1
+                    final_paths.append(final_selection.get("path", "") if final_selection else "")
+                ground_truths = [case["ground_truth"] for case in current_data]
+                flexible_correct = int(evaluator.score_many(final_paths, ground_truths, selected_correctness).sum())
 
                 exact_accuracy = (exact_correct / len(current_data)) * 100
                 flexible_accuracy = (flexible_correct / len(current_data)) * 100
@@ -217,7 +220,9 @@ def render_main_content(current_data):
             except Exception as e:
                 st.sidebar.warning(f"Could not calculate accuracy improvement: {e}")
 
-        tab1, tab2, tab3 = st.tabs(["🔍 Error Analysis", "📊 Test Case Analysis", "🧪 Custom Test Case"])
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(
+            ["🔍 Error Analysis", "📊 Test Case Analysis", "🧪 Custom Test Case", "⏱️ Latency", "📈 Run Comparison"]
+        )
 
         with tab1:
             render_error_analysis(current_data, selected_correctness)
@@ -239,6 +244,12 @@ def render_main_content(current_data):
 
         with tab3:
             render_custom_testing()
+
+        with tab4:
+            render_latency_analysis(current_data)
+
+        with tab5:
+            render_run_comparison()
     else:
         st.warning("⚠️ No test results available. Please load a saved run or run a pipeline test.")
 
@@ -20,7 +20,9 @@ sys.path.insert(0, str(src_path))
 from src.classification.pipeline import ClassificationPipeline
 from src.data.category_loader import CategoryLoader
 from src.shared.correctness import CorrectnessDefinition
+from src.shared.tracing import LatencyHistogram, tracer
 from ui.analysis import analyze_pipeline_errors, create_waffle_chart
+from ui.data_operations import compare_saved_runs, get_available_saved_runs
 
 
 def render_error_overview(analysis):
@@ -452,6 +454,15 @@ def render_custom_testing():
                         st.metric("Total Time", f"{metadata.get('total_time_ms', 0):.1f}ms")
                         st.metric("Narrowing Strategy", metadata.get("narrowing_strategy", "Unknown"))
 
+                    # Show where the time went
+                    stage_timings = result.metadata.get("stage_timings_ms", {})
+                    if stage_timings:
+                        st.markdown("#### ⏱️ Stage Timings")
+                        timing_data = [
+                            {"Stage": stage, "Time (ms)": round(ms, 1)} for stage, ms in stage_timings.items()
+                        ]
+                        st.dataframe(pd.DataFrame(timing_data), width="stretch", hide_index=True)
+
                     # Show all candidates
                     st.markdown("#### 🔍 All Candidates")
                     if result.candidates:
@@ -499,3 +510,73 @@ def render_custom_testing():
                         """)
                     else:
                         st.error(f"**Classification Error:** {error_str}")
+
+
+def _latency_table(summary: dict[str, dict[str, float]]) -> pd.DataFrame:
+    """Build the per-stage latency table from histogram summaries."""
+    rows = [
+        {
+            "Stage": stage,
+            "Count": int(stats["count"]),
+            "p50 (ms)": round(stats["p50_ms"], 1),
+            "p90 (ms)": round(stats["p90_ms"], 1),
+            "p99 (ms)": round(stats["p99_ms"], 1),
+            "Max (ms)": round(stats["max_ms"], 1),
+        }
+        for stage, stats in summary.items()
+    ]
+    return pd.DataFrame(rows)
+
+
+def render_latency_analysis(ui_data):
+    """Render per-stage latency percentiles for the saved run and for this session."""
+    st.markdown("### ⏱️ Stage Latency")
+
+    histograms: dict[str, LatencyHistogram] = {}
+    for case in ui_data or []:
+        for stage, duration_ms in case.get("stage_timings_ms", {}).items():
+            histograms.setdefault(stage, LatencyHistogram()).observe(duration_ms)
+
+    if histograms:
+        st.markdown(f"**Saved run:** per-stage latency over {len(ui_data)} test cases")
+        table = _latency_table({stage: histogram.as_dict() for stage, histogram in histograms.items()})
+        st.dataframe(table, width="stretch", hide_index=True)
+        st.bar_chart(table.set_index("Stage")[["p50 (ms)", "p90 (ms)", "p99 (ms)"]])
+    else:
+        st.info("This run has no stage timings. Re-run the pipeline accuracy test to record them.")
+
+    st.markdown("---")
+    st.markdown("**This session:** every classification run from this app, e.g. custom test cases")
+    live = tracer.as_dict()
+    if not live:
+        st.info("No classifications have run in this session yet.")
+        return
+    st.dataframe(_latency_table(live), width="stretch", hide_index=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download JSON", tracer.to_json(), "stage_latency.json", "application/json")
+    with col2:
+        st.download_button("Download Prometheus", tracer.to_prometheus(), "stage_latency.prom", "text/plain")
+
+
+def render_run_comparison():
+    """Render accuracy and latency side by side for several saved runs."""
+    st.markdown("### 📈 Run Comparison")
+
+    run_names = [run["run_name"] for run in get_available_saved_runs()]
+    if not run_names:
+        st.info("No saved runs to compare yet.")
+        return
+
+    selected_runs = st.multiselect(
+        "Select runs to compare:", run_names, default=run_names[: min(5, len(run_names))], key="compared_runs"
+    )
+    if not selected_runs:
+        return
+
+    # Only the correctness and timing columns of each run are read
+    table = pd.DataFrame(compare_saved_runs(selected_runs))
+    if table.empty:
+        return
+    st.dataframe(table, width="stretch", hide_index=True)
+    st.bar_chart(table.set_index("Run")[["Accuracy (%)"]])
@@ -4,82 +4,111 @@ This module handles all data operations including loading pipeline results,
 managing saved runs, and transforming data for UI display.
 """
 
-import json
-from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+import statistics
+from typing import Any, Dict, Iterable, List, Optional
 
 import streamlit as st
 
+from ui.run_store import RunStore
 
-def get_available_saved_runs() -> List[Dict[str, Any]]:
-    """Get metadata for all available saved test runs.
+# Result columns the run views read; candidate descriptions and the rest stay on disk
+UI_COLUMNS = (
+    "test_case",
+    "selected_category",
+    "candidate_categories",
+    "embedding_candidates",
+    "llm_candidates",
+    "correct_classification",
+    "processing_time_ms",
+    "narrowing_time_ms",
+    "selection_time_ms",
+    "stage_timings_ms",
+    "narrowing_strategy",
+)
+# Columns needed to compare runs side by side
+COMPARISON_COLUMNS = ("correct_classification", "processing_time_ms")
 
-    Returns:
-        List of dictionaries containing saved run metadata
-    """
-    project_root = Path(__file__).parent.parent
-    saved_runs_dir = project_root / "tests" / "results" / "saved_runs"
+run_store = RunStore()
 
-    if not saved_runs_dir.exists():
-        return []
 
-    saved_runs = []
+@st.cache_data(show_spinner=False)
+def _cached_catalog(signature: tuple) -> List[Dict[str, Any]]:
+    """Read the run catalogue. ``signature`` changes whenever a run is saved."""
+    return run_store.catalog()
 
-    for metadata_file in saved_runs_dir.glob("*_metadata.json"):
-        try:
-            with open(metadata_file, "r", encoding="utf-8") as f:
-                metadata = json.load(f)
-                saved_runs.append(metadata)
-        except Exception as e:
-            st.warning(f"Error loading saved run metadata from {metadata_file.name}: {e}")
 
-    # Sort by timestamp, most recent first
-    saved_runs.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_run(run_name: str, columns: Optional[tuple], signature: tuple) -> Optional[Dict[str, Any]]:
+    """Load a saved run's columns. ``signature`` changes whenever a run is saved."""
+    return run_store.load_run(run_name, columns)
 
-    return saved_runs
 
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_columns(run_name: str, columns: tuple, signature: tuple) -> Dict[str, List[Any]]:
+    """Load some result columns of a saved run. ``signature`` changes whenever a run is saved."""
+    return run_store.load_columns(run_name, columns)
 
-def load_saved_run(run_name: str) -> Optional[Dict[str, Any]]:
-    """Load a specific saved test run by name.
 
-    Args:
-        run_name: Name of the saved run to load
+def get_available_saved_runs() -> List[Dict[str, Any]]:
+    """Get metadata for all available saved test runs.
+
+    The catalogue is cached until a run is saved, so Streamlit reruns don't re-read it.
 
     Returns:
-        Dictionary containing the saved run data, or None if not found
+        List of dictionaries containing saved run metadata, most recent first
     """
-    project_root = Path(__file__).parent.parent
-    saved_runs_dir = project_root / "tests" / "results" / "saved_runs"
+    return _cached_catalog(run_store.signature())
 
-    if not saved_runs_dir.exists():
-        return None
 
-    # Find the metadata file for this run
-    metadata_file = saved_runs_dir / f"{run_name}_metadata.json"
+def load_saved_run(run_name: str, columns: Optional[Iterable[str]] = UI_COLUMNS) -> Optional[Dict[str, Any]]:
+    """Load a specific saved test run by name.
 
-    if not metadata_file.exists():
-        return None
+    Args:
+        run_name: Name of the saved run to load
+        columns: Result columns to load. None loads every column.
 
+    Returns:
+        Dictionary containing the saved run data, or None if not found
+    """
     try:
-        with open(metadata_file, "r", encoding="utf-8") as f:
-            metadata = json.load(f)
-
-        # Load the actual pipeline results
-        pipeline_file = Path(metadata["pipeline_results_path"])
+        return _cached_run(run_name, None if columns is None else tuple(columns), run_store.signature())
+    except Exception as e:
+        st.error(f"Error loading saved run '{run_name}': {e}")
+        return None
 
-        if not pipeline_file.exists():
-            st.error(f"Pipeline results file not found: {pipeline_file}")
-            return None
 
-        with open(pipeline_file, "r", encoding="utf-8") as f:
-            pipeline_data = json.load(f)
+def compare_saved_runs(run_names: List[str]) -> List[Dict[str, Any]]:
+    """Summarize several saved runs side by side, loading only the columns needed.
 
-        return {"metadata": metadata, "pipeline_data": pipeline_data}
+    Args:
+        run_names: Names of the runs to compare
 
-    except Exception as e:
-        st.error(f"Error loading saved run '{run_name}': {e}")
-        return None
+    Returns:
+        One row per run with its accuracy and processing time percentiles
+    """
+    signature = run_store.signature()
+    catalog = {run["run_name"]: run for run in _cached_catalog(signature)}
+    rows = []
+    for run_name in run_names:
+        try:
+            values = _cached_columns(run_name, COMPARISON_COLUMNS, signature)
+        except Exception as e:
+            st.warning(f"Error loading saved run '{run_name}': {e}")
+            continue
+        times = sorted(values.get("processing_time_ms", []))
+        correct = values.get("correct_classification", [])
+        metadata = catalog.get(run_name, {})
+        rows.append(
+            {
+                "Run": run_name,
+                "Strategy": metadata.get("config", {}).get("narrowing_strategy", "unknown"),
+                "Test Cases": len(correct),
+                "Accuracy (%)": round(100 * sum(correct) / len(correct), 1) if correct else 0.0,
+                "p50 (ms)": round(statistics.median(times), 1) if times else 0.0,
+                "p90 (ms)": round(times[int(0.9 * (len(times) - 1))], 1) if times else 0.0,
+            }
+        )
+    return rows
 
 
 def save_current_results_as_run(run_name: str, description: str, pipeline_data: Dict[str, Any]) -> bool:
@@ -93,44 +122,8 @@ def save_current_results_as_run(run_name: str, description: str, pipeline_data:
     Returns:
         True if successful, False otherwise
     """
-    project_root = Path(__file__).parent.parent
-    saved_runs_dir = project_root / "tests" / "results" / "saved_runs"
-    saved_runs_dir.mkdir(parents=True, exist_ok=True)
-
     try:
-        # Save the pipeline results with a timestamped filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        pipeline_filename = f"pipeline_{run_name}_{timestamp}.json"
-        pipeline_filepath = saved_runs_dir / pipeline_filename
-
-        with open(pipeline_filepath, "w", encoding="utf-8") as f:
-            json.dump(pipeline_data, f, indent=2, ensure_ascii=False)
-
-        # Create metadata for this saved run
-        metadata = {
-            "run_name": run_name,
-            "description": description,
-            "timestamp": datetime.now().isoformat(),
-            "pipeline_results_path": str(pipeline_filepath),
-            "config": {
-                "narrowing_strategy": pipeline_data.get("test_info", {}).get("narrowing_strategy", "unknown"),
-                "vector_store_enabled": pipeline_data.get("test_info", {}).get("vector_store_enabled", False),
-                "total_test_cases": pipeline_data.get("test_info", {}).get("total_test_cases", 0),
-            },
-            "results_summary": {
-                "total_tests": pipeline_data.get("results", {}).get("total_tests", 0),
-                "correct_classifications": pipeline_data.get("results", {}).get("correct_classifications", 0),
-                "accuracy_percent": pipeline_data.get("results", {}).get("accuracy_percent", 0.0),
-            },
-        }
-
-        # Save metadata
-        metadata_filename = f"{run_name}_metadata.json"
-        metadata_filepath = saved_runs_dir / metadata_filename
-
-        with open(metadata_filepath, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
-
+        run_store.save_run(run_name, description, pipeline_data)
         return True
 
     except Exception as e:
@@ -199,6 +192,7 @@ def transform_pipeline_results_for_ui(pipeline_data: Dict[str, Any]) -> List[Dic
             "processing_time_ms": result.get("processing_time_ms", 0),
             "narrowing_time_ms": result.get("narrowing_time_ms", 0),
             "selection_time_ms": result.get("selection_time_ms", 0),
+            "stage_timings_ms": result.get("stage_timings_ms", {}),
         }
 
         ui_data.append(test_case_data)
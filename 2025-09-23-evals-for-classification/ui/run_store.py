@@ -0,0 +1,252 @@
+"""Columnar on-disk storage for saved classification runs.
+
+Each run is a directory holding ``run.json`` (the run's metadata, test info and
+run-level results) and one compact JSONL file per result column
+(``columns/<name>.jsonl``, one line per test case), so a view that needs a few
+columns of a large run reads only those files. ``catalog.json`` holds every run's
+metadata, so listing runs reads one small file.
+
+Runs saved before this format, a ``<name>_metadata.json`` file pointing at a
+pretty-printed pipeline JSON, are still listed and loaded.
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.shared.logger import get_logger
+
+SAVED_RUNS_DIR = Path(__file__).parent.parent / "tests" / "results" / "saved_runs"
+CATALOG_JSON = "catalog.json"
+RUN_JSON = "run.json"
+COLUMNS_DIR = "columns"
+FORMAT_VERSION = 1
+INDIVIDUAL_RESULTS = "individual_results"
+
+logger = get_logger(__name__)
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """Write compact JSON atomically, so readers never see a partial file."""
+    tmp_path = path.with_suffix(f"{path.suffix}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _column_names(rows: List[Dict[str, Any]]) -> List[str]:
+    """Get the keys used by any row, in first-seen order."""
+    return list(dict.fromkeys(key for row in rows for key in row))
+
+
+class RunStore:
+    """Saves, lists and loads classification runs under one directory."""
+
+    def __init__(self, directory: Path = SAVED_RUNS_DIR):
+        """Initialize the store.
+
+        Args:
+            directory: Where runs are saved
+        """
+        self.directory = Path(directory)
+
+    @property
+    def catalog_path(self) -> Path:
+        """Path of the run catalogue."""
+        return self.directory / CATALOG_JSON
+
+    def signature(self) -> tuple:
+        """Describe the store's current state for use as a cache key.
+
+        Saving a run adds or replaces entries in the directory and rewrites the
+        catalogue, so both modification times change.
+
+        Returns:
+            The directory and catalogue modification times, zero when missing
+        """
+        return tuple(path.stat().st_mtime_ns if path.exists() else 0 for path in (self.directory, self.catalog_path))
+
+    def run_dir(self, run_name: str) -> Path:
+        """Get the directory a run is stored in.
+
+        Args:
+            run_name: Name of the saved run
+
+        Returns:
+            The run's directory, directly inside the store directory
+
+        Raises:
+            ValueError: If the name is empty, ``.`` or ``..``, or contains a path separator
+        """
+        separators = {"/", os.sep, os.altsep} - {None}
+        if run_name in ("", ".", "..") or any(sep in run_name for sep in separators):
+            raise ValueError(f"Invalid run name {run_name!r}: use a plain name without path separators")
+        run_dir = self.directory / run_name
+        if run_dir.resolve().parent != self.directory.resolve():
+            raise ValueError(f"Invalid run name {run_name!r}: it resolves outside {self.directory}")
+        return run_dir
+
+    def catalog(self) -> List[Dict[str, Any]]:
+        """Get the metadata of every saved run.
+
+        Returns:
+            Run metadata, most recent first
+        """
+        if not self.directory.exists():
+            return []
+        runs = {run["run_name"]: run for run in self._read_catalog()}
+        for metadata_file in self.directory.glob("*_metadata.json"):
+            run_name = metadata_file.name.removesuffix("_metadata.json")
+            if run_name in runs:
+                continue
+            try:
+                with open(metadata_file, "r", encoding="utf-8") as f:
+                    runs[run_name] = json.load(f)
+            except Exception as e:
+                logger.warning(f"Error loading saved run metadata from {metadata_file.name}: {e}")
+        return sorted(runs.values(), key=lambda run: run.get("timestamp", ""), reverse=True)
+
+    def save_run(self, run_name: str, description: str, pipeline_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Save pipeline test results as a named run, replacing any run with that name.
+
+        Args:
+            run_name: Name for the saved run
+            description: Description of the run
+            pipeline_data: Pipeline test results to save
+
+        Returns:
+            The saved run's metadata
+
+        Raises:
+            ValueError: If the run name isn't a plain directory name inside the store
+        """
+        run_dir = self.run_dir(run_name)
+        test_info = pipeline_data.get("test_info", {})
+        results = dict(pipeline_data.get("results", {}))
+        rows = results.pop(INDIVIDUAL_RESULTS, [])
+        columns = _column_names(rows)
+        metadata = {
+            "run_name": run_name,
+            "description": description,
+            "timestamp": datetime.now().isoformat(),
+            "format_version": FORMAT_VERSION,
+            "run_path": str(run_dir),
+            "columns": columns,
+            "config": {
+                "narrowing_strategy": test_info.get("narrowing_strategy", "unknown"),
+                "vector_store_enabled": test_info.get("vector_store_enabled", False),
+                "total_test_cases": test_info.get("total_test_cases", 0),
+            },
+            "results_summary": {
+                "total_tests": results.get("total_tests", 0),
+                "correct_classifications": results.get("correct_classifications", 0),
+                "accuracy_percent": results.get("accuracy_percent", 0.0),
+            },
+        }
+
+        # Write the run next to its final location, then swap it in
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_dir = self.directory / f".{run_name}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        (tmp_dir / COLUMNS_DIR).mkdir(parents=True)
+        for column in columns:
+            with open(tmp_dir / COLUMNS_DIR / f"{column}.jsonl", "w", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row.get(column), ensure_ascii=False, separators=(",", ":")))
+                    f.write("\n")
+        _write_json(tmp_dir / RUN_JSON, {"metadata": metadata, "test_info": test_info, "results": results})
+        shutil.rmtree(run_dir, ignore_errors=True)
+        os.replace(tmp_dir, run_dir)
+
+        runs = [run for run in self._read_catalog() if run["run_name"] != run_name]
+        _write_json(self.catalog_path, {"format_version": FORMAT_VERSION, "runs": [*runs, metadata]})
+        return metadata
+
+    def load_run(self, run_name: str, columns: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """Load a saved run.
+
+        Args:
+            run_name: Name of the saved run
+            columns: Result columns to load, for example ``["test_case", "correct_classification"]``.
+                None loads every column.
+
+        Returns:
+            The run's ``metadata`` and its ``pipeline_data`` in the format the pipeline
+            test writes, with only the requested columns in each individual result, or
+            None if there is no such run
+        """
+        run_json = self.run_dir(run_name) / RUN_JSON
+        if run_json.exists():
+            with open(run_json, "r", encoding="utf-8") as f:
+                run = json.load(f)
+            values = self.load_columns(run_name, run["metadata"]["columns"] if columns is None else columns)
+            rows = [dict(zip(values, row)) for row in zip(*values.values())]
+            pipeline_data = {"test_info": run["test_info"], "results": {**run["results"], INDIVIDUAL_RESULTS: rows}}
+            return {"metadata": run["metadata"], "pipeline_data": pipeline_data}
+        return self._load_legacy_run(run_name, columns)
+
+    def load_columns(self, run_name: str, columns: Iterable[str]) -> Dict[str, List[Any]]:
+        """Load some result columns of a saved run.
+
+        Args:
+            run_name: Name of the saved run
+            columns: Result columns to load. Columns the run doesn't have are skipped.
+
+        Returns:
+            Each loaded column's values, one per test case
+        """
+        run_dir = self.run_dir(run_name)
+        if not (run_dir / RUN_JSON).exists():
+            legacy = self._load_legacy_run(run_name, columns)
+            rows = legacy["pipeline_data"]["results"].get(INDIVIDUAL_RESULTS, []) if legacy else []
+            return {column: [row.get(column) for row in rows] for column in _column_names(rows)}
+        values = {}
+        for column in columns:
+            column_file = run_dir / COLUMNS_DIR / f"{column}.jsonl"
+            if column_file.exists():
+                with open(column_file, "r", encoding="utf-8") as f:
+                    values[column] = [json.loads(line) for line in f]
+        return values
+
+    def _read_catalog(self) -> List[Dict[str, Any]]:
+        """Read the run catalogue, or nothing if it doesn't exist yet."""
+        if not self.catalog_path.exists():
+            return []
+        try:
+            with open(self.catalog_path, "r", encoding="utf-8") as f:
+                return json.load(f)["runs"]
+        except Exception as e:
+            logger.warning(f"Error loading saved run catalogue {self.catalog_path}: {e}")
+            return []
+
+    def _load_legacy_run(self, run_name: str, columns: Optional[Iterable[str]]) -> Optional[Dict[str, Any]]:
+        """Load a run saved as a metadata file plus a pretty-printed pipeline JSON.
+
+        Args:
+            run_name: Name of the saved run
+            columns: Result columns to keep. None keeps every column.
+
+        Returns:
+            The run's metadata and pipeline data, or None if there is no such run
+        """
+        metadata_file = self.directory / f"{run_name}_metadata.json"
+        if not metadata_file.exists():
+            return None
+        with open(metadata_file, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        pipeline_file = Path(metadata["pipeline_results_path"])
+        if not pipeline_file.exists():
+            raise FileNotFoundError(f"Pipeline results file not found: {pipeline_file}")
+        with open(pipeline_file, "r", encoding="utf-8") as f:
+            pipeline_data = json.load(f)
+        if columns is not None:
+            columns = list(columns)
+            results = pipeline_data.get("results", {})
+            results[INDIVIDUAL_RESULTS] = [
+                {column: row[column] for column in columns if column in row}
+                for row in results.get(INDIVIDUAL_RESULTS, [])
+            ]
+        return {"metadata": metadata, "pipeline_data": pipeline_data}
@@ -1,6 +1,8 @@
 """
 Shared agent runtime and state management
 """
+import asyncio
+import time
 from typing import Optional, Callable, Awaitable
 from dataclasses import dataclass, field
 
@@ -11,6 +13,28 @@ from baml_client.tracing import trace
 
 # Import tool handlers from main
 from main import execute_tool as _execute_tool
+from compaction import ContextCompactor
+from tool_cache import ToolResultCache
+
+# How often a running tool checks for an interrupt request (seconds)
+INTERRUPT_POLL_INTERVAL = 0.1
+
+# Tools that only read, so consecutive calls in one response can run concurrently
+READ_ONLY_TOOLS = frozenset({"Glob", "Grep", "LS", "Read", "NotebookRead", "WebFetch", "WebSearch", "TodoRead"})
+
+
+@dataclass
+class RunStats:
+    """Round-trips and timings for one run_loop call"""
+    iterations: int = 0  # LLM round-trips
+    tool_calls: int = 0
+    llm_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    prompt_tokens: int = 0  # Estimated message history size sent on the last iteration
+    compacted_messages: int = 0
+    cache_hits: int = 0  # Tool calls answered from the session's tool cache
+    cache_misses: int = 0
 
 
 @dataclass
@@ -22,6 +46,8 @@ class AgentState:
     current_iteration: int = 0
     current_depth: int = 0
     working_dir: str = "."
+    last_run: RunStats = field(default_factory=RunStats)
+    tool_cache: ToolResultCache = field(default_factory=ToolResultCache)
 
 
 @dataclass
@@ -29,27 +55,106 @@ class AgentCallbacks:
     """Callbacks for UI updates during agent execution"""
     on_iteration: Optional[Callable[[int, int], Awaitable[None]]] = None  # (iteration, depth)
     on_tool_start: Optional[Callable[[str, dict, int, int, int], Awaitable[None]]] = None  # (tool_name, params, tool_idx, total_tools, depth)
-    on_tool_result: Optional[Callable[[str, int], Awaitable[None]]] = None  # (result, depth)
+    on_tool_result: Optional[Callable[[str, int, bool], Awaitable[None]]] = None  # (result, depth, partial) - partial while a tool streams output
     on_agent_reply: Optional[Callable[[str], Awaitable[None]]] = None
     on_status_update: Optional[Callable[[str, int], Awaitable[None]]] = None  # (status, iteration)
     on_sub_agent_start: Optional[Callable[[str, str, int], Awaitable[None]]] = None  # (description, prompt, depth)
     on_sub_agent_complete: Optional[Callable[[str, int], Awaitable[None]]] = None  # (result, depth)
+    on_run_complete: Optional[Callable[[RunStats], Awaitable[None]]] = None
 
 
 class AgentRuntime:
     """Core agent runtime - shared between CLI and TUI"""
     
-    def __init__(self, state: AgentState, callbacks: Optional[AgentCallbacks] = None):
+    def __init__(
+        self,
+        state: AgentState,
+        callbacks: Optional[AgentCallbacks] = None,
+        compactor: Optional[ContextCompactor] = None
+    ):
         self.state = state
         self.callbacks = callbacks or AgentCallbacks()
+        self.compactor = compactor or ContextCompactor()
     
     # @trace
     async def execute_tool(self, tool: types.AgentTools, depth: int = 0) -> str:
         """Execute a tool, handling sub-agents specially"""
         if tool.action == "Agent":
             return await self.execute_sub_agent(tool, depth)
-        else:
-            return await _execute_tool(tool, self.state.working_dir)
+        
+        async def on_output(chunk: str) -> None:
+            if self.callbacks.on_tool_result:
+                await self.callbacks.on_tool_result(chunk, depth, True)
+        
+        # Run the tool as a task so an interrupt can stop it mid-execution
+        task = asyncio.create_task(_execute_tool(tool, self.state.working_dir, on_output, self.state.tool_cache))
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=INTERRUPT_POLL_INTERVAL)
+                if self.state.interrupt_requested and not task.done():
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    return f"Tool {tool.action} interrupted by user"
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        return task.result()
+    
+    # @trace
+    async def execute_tool_calls(self, tools: list[types.AgentTools], depth: int = 0) -> list[str]:
+        """
+        Execute the tool calls from one agent response.
+        
+        Consecutive read-only tools run concurrently; every other tool runs on its own,
+        in the order the agent listed it. Results are returned in call order, and stop
+        short if an interrupt is requested between tools.
+        """
+        results: list[str] = []
+        start = 0
+        while start < len(tools):
+            if self.state.interrupt_requested:
+                break
+            
+            end = start + 1
+            if tools[start].action in READ_ONLY_TOOLS:
+                while end < len(tools) and tools[end].action in READ_ONLY_TOOLS:
+                    end += 1
+            batch = tools[start:end]
+            
+            # Notify UI
+            if self.callbacks.on_tool_start:
+                for idx, tool in enumerate(batch, start=start + 1):
+                    await self.callbacks.on_tool_start(
+                        tool.action,
+                        tool.model_dump(exclude={'action'}),
+                        idx,
+                        len(tools),
+                        depth
+                    )
+            
+            batch_results = await asyncio.gather(*(self.execute_tool(tool, depth) for tool in batch))
+            
+            if self.callbacks.on_tool_result:
+                for result in batch_results:
+                    await self.callbacks.on_tool_result(result, depth, False)
+            
+            results.extend(batch_results)
+            start = end
+        return results
+    
+    @staticmethod
+    def tool_call_messages(tools: list[types.AgentTools], results: list[str]) -> list[types.Message]:
+        """Record each executed tool call (with full parameters) and its result as assistant messages"""
+        messages = []
+        for tool, result in zip(tools, results):
+            tool_params = tool.model_dump()
+            tool_call_str = f"Tool: {tool.action}\n"
+            for key, value in tool_params.items():
+                if key != 'action' and value is not None:
+                    tool_call_str += f"  {key}: {value}\n"
+            messages.append(types.Message(role="assistant", message=tool_call_str))
+            messages.append(types.Message(role="assistant", message=result))
+        return messages
     
     # @trace
     async def execute_sub_agent(self, tool: types.AgentTool, parent_depth: int) -> str:
@@ -65,6 +170,7 @@ class AgentRuntime:
         
         # Create isolated message context for sub-agent
         sub_messages: list[types.Message] = []
+        sub_compactor = self.compactor.clone()
         
         # Run sub-agent loop (up to 50 iterations)
         for sub_iteration in range(50):
@@ -76,6 +182,7 @@ class AgentRuntime:
                 await self.callbacks.on_iteration(sub_iteration + 1, parent_depth + 1)
             
             # Call BAML SubAgentLoop with retry logic for parsing failures
+            sub_compactor.compact(sub_messages)
             response = None
             temp_sub_messages = sub_messages.copy()
             max_retries = 3
@@ -109,36 +216,13 @@ class AgentRuntime:
                     await self.callbacks.on_sub_agent_complete(response.message, parent_depth + 1)
                 return f"Sub-agent completed:\nTask: {tool.description}\nResult: {response.message}"
             
-            # Execute single tool
-            if hasattr(response, 'action'):  # It's a tool object
+            # Execute tool calls (sub-agents can't spawn more sub-agents)
+            if isinstance(response, list):
                 if self.state.interrupt_requested:
                     return "Sub-agent interrupted by user"
                 
-                if self.callbacks.on_tool_start:
-                    await self.callbacks.on_tool_start(
-                        response.action,
-                        response.model_dump(exclude={'action'}),
-                        1,
-                        1,
-                        parent_depth + 1
-                    )
-                
-                # Execute tool (sub-agents can't spawn more sub-agents)
-                result = await self.execute_tool(response, parent_depth + 1)
-                
-                if self.callbacks.on_tool_result:
-                    await self.callbacks.on_tool_result(result, parent_depth + 1)
-                
-                # Add tool call with full parameters as assistant message
-                tool_params = response.model_dump()
-                tool_call_str = f"Tool: {response.action}\n"
-                for key, value in tool_params.items():
-                    if key != 'action' and value is not None:
-                        tool_call_str += f"  {key}: {value}\n"
-                sub_messages.append(types.Message(role="assistant", message=tool_call_str))
-                
-                # Add tool result as assistant message
-                sub_messages.append(types.Message(role="assistant", message=result))
+                results = await self.execute_tool_calls(response, parent_depth + 1)
+                sub_messages.extend(self.tool_call_messages(response, results))
         
         return "Sub-agent reached max iterations"
     
@@ -159,6 +243,17 @@ class AgentRuntime:
         if self.callbacks.on_iteration:
             await self.callbacks.on_iteration(self.state.current_iteration, depth)
         
+        # Keep the history under the prompt budget before sending it
+        compaction = self.compactor.compact(self.state.messages)
+        if compaction:
+            self.state.last_run.compacted_messages += compaction.compacted_messages
+            if self.callbacks.on_status_update:
+                await self.callbacks.on_status_update(
+                    f"Compacted context ~{compaction.tokens_before:,} → ~{compaction.tokens_after:,} tokens",
+                    self.state.current_iteration
+                )
+        self.state.last_run.prompt_tokens = self.compactor.total_tokens(self.state.messages)
+        
         # Call BAML agent with retry logic for parsing failures
         if self.callbacks.on_status_update:
             await self.callbacks.on_status_update("Thinking...", self.state.current_iteration)
@@ -167,10 +262,15 @@ class AgentRuntime:
         temp_messages = self.state.messages.copy()
         max_retries = 3
         
+        llm_start = time.perf_counter()
         for retry in range(max_retries):
             try:
                 response = await b.AgentLoop(state=temp_messages, working_dir=self.state.working_dir)
-                if isinstance(response, types.ReplyToUser):
+                if isinstance(response, list) and not response:
+                    temp_messages.append(types.Message(role="assistant", message="Returned no tool calls.\n Must call at least one tool or reply to the user."))
+                    if retry == max_retries - 1:
+                        return (True, f"Agent failed to return valid response after {max_retries} attempts")
+                elif isinstance(response, types.ReplyToUser):
                     if response.message.startswith("Tool:"):
                         temp_messages.append(types.Message(role="assistant", message=f"Returned an invalid response: {response.message}.\n Must be one of the types specified."))
                         if retry == max_retries - 1:
@@ -194,6 +294,7 @@ class AgentRuntime:
                         return (True, f"Agent failed to return valid response after {max_retries} attempts")
             except Exception as e:
                 return (True, f"Error calling agent: {str(e)}")
+        self.state.last_run.llm_seconds += time.perf_counter() - llm_start
         
         if response is None:
             return (True, "Agent failed to return a response")
@@ -208,44 +309,24 @@ class AgentRuntime:
                 await self.callbacks.on_agent_reply(response.message)
             return (True, response.message)
         
-        # Execute single tool
-        if hasattr(response, 'action'):  # It's a tool object
+        # Execute tool calls
+        if isinstance(response, list):
             if self.state.interrupt_requested:
                 return (True, "Agent execution interrupted by user")
             
-            # Notify UI
-            if self.callbacks.on_tool_start:
-                await self.callbacks.on_tool_start(
-                    response.action,
-                    response.model_dump(exclude={'action'}),
-                    1,
-                    1,
-                    depth
-                )
-            
             if self.callbacks.on_status_update:
+                actions = ", ".join(tool.action for tool in response)
                 await self.callbacks.on_status_update(
-                    f"Executing {response.action}...",
+                    f"Executing {actions}...",
                     self.state.current_iteration
                 )
             
-            # Execute tool
-            result = await self.execute_tool(response, depth)
-            
-            # Notify UI
-            if self.callbacks.on_tool_result:
-                await self.callbacks.on_tool_result(result, depth)
-            
-            # Add tool call with full parameters as assistant message
-            tool_params = response.model_dump()
-            tool_call_str = f"Tool: {response.action}\n"
-            for key, value in tool_params.items():
-                if key != 'action' and value is not None:
-                    tool_call_str += f"  {key}: {value}\n"
-            self.state.messages.append(types.Message(role="assistant", message=tool_call_str))
+            tool_start = time.perf_counter()
+            results = await self.execute_tool_calls(response, depth)
+            self.state.last_run.tool_seconds += time.perf_counter() - tool_start
+            self.state.last_run.tool_calls += len(results)
             
-            # Add tool result as assistant message
-            self.state.messages.append(types.Message(role="assistant", message=result))
+            self.state.messages.extend(self.tool_call_messages(response, results))
             
             return (False, None)  # Continue iterating
         
@@ -259,11 +340,23 @@ class AgentRuntime:
         if depth == 0:
             self.state.messages.append(types.Message(role="user", message=user_message))
         
+        stats = self.state.last_run = RunStats()
+        cache_stats = self.state.tool_cache.stats
+        hits_before, misses_before = cache_stats.hits, cache_stats.misses
+        loop_start = time.perf_counter()
+        result = "Agent reached maximum iterations without completing the task"
         for _ in range(max_iterations):
-            is_complete, result = await self.run_iteration(depth)
+            stats.iterations += 1
+            is_complete, iteration_result = await self.run_iteration(depth)
             
             if is_complete:
-                return result or "Agent completed"
+                result = iteration_result or "Agent completed"
+                break
         
-        return "Agent reached maximum iterations without completing the task"
+        stats.wall_seconds = time.perf_counter() - loop_start
+        stats.cache_hits = cache_stats.hits - hits_before
+        stats.cache_misses = cache_stats.misses - misses_before
+        if self.callbacks.on_run_complete:
+            await self.callbacks.on_run_complete(stats)
+        return result
 
@@ -0,0 +1,109 @@
+"""
+Benchmark context compaction over a simulated long agent session
+
+Replays a session of tool calls (Read, LS, Glob and Grep-style outputs produced by the
+real tool handlers on this directory) and, at every step, renders the exact AgentLoop
+request BAML would send, with and without compaction. Prints the prompt size and the
+per-iteration cost of compacting and rendering the history. No API calls are made.
+
+Usage:
+    python benchmark_compaction.py [--steps 100] [--budget 60000] [--dir .]
+"""
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+from baml_client import types
+from baml_client.async_client import b
+
+from agent_runtime import AgentRuntime
+from compaction import CHARS_PER_TOKEN, DEFAULT_TOKEN_BUDGET, ContextCompactor
+from main import execute_glob, execute_ls, execute_read
+
+
+def session_tool_calls(working_dir: str, steps: int) -> list[types.AgentTools]:
+    """A repeating exploration session: list, glob, then read every source file"""
+    files = sorted(
+        str(path.relative_to(working_dir))
+        for pattern in ("*.py", "*.md", "baml_src/*")
+        for path in Path(working_dir).glob(pattern)
+    )
+    cycle: list[types.AgentTools] = [
+        types.LSTool(action="LS", path=working_dir),
+        types.GlobTool(action="Glob", pattern="**/*.py", path=working_dir),
+        *(types.ReadTool(action="Read", file_path=file) for file in files),
+    ]
+    return [cycle[step % len(cycle)] for step in range(steps)]
+
+
+def run_tool(tool: types.AgentTools, working_dir: str) -> str:
+    """Run a read-only tool with the real handler"""
+    match tool.action:
+        case "LS":
+            return execute_ls(tool, working_dir)
+        case "Glob":
+            return execute_glob(tool, working_dir)
+        case _:
+            return execute_read(tool, working_dir)
+
+
+async def render_prompt_tokens(messages: list[types.Message], working_dir: str) -> tuple[int, float]:
+    """Render the AgentLoop request for a history; returns (estimated tokens, seconds)"""
+    start = time.perf_counter()
+    request = await b.request.AgentLoop(state=messages, working_dir=working_dir)
+    seconds = time.perf_counter() - start
+    return len(request.body.text()) // CHARS_PER_TOKEN, seconds
+
+
+async def run_benchmark(steps: int, budget: int, working_dir: str) -> None:
+    """Replay the session with and without compaction and print a results table"""
+    user = types.Message(role="user", message="Explore this project and explain how the agent loop works.")
+    full_history = [user]
+    compacted_history = [user]
+    compactor = ContextCompactor(token_budget=budget)
+
+    totals = {"full": 0, "compacted": 0}
+    print(f"Steps: {steps}, budget: ~{budget:,} tokens, keep recent: {compactor.keep_recent} messages")
+    print(f"{'step':>5} {'full tok':>10} {'render ms':>10} {'compact tok':>12} {'render ms':>10} {'compact ms':>11}")
+    for step, tool in enumerate(session_tool_calls(working_dir, steps), start=1):
+        result = run_tool(tool, working_dir)
+        new_messages = AgentRuntime.tool_call_messages([tool], [result])
+        full_history.extend(new_messages)
+        compacted_history.extend(new_messages)
+
+        start = time.perf_counter()
+        compactor.compact(compacted_history)
+        compact_ms = (time.perf_counter() - start) * 1000
+
+        full_tokens, full_s = await render_prompt_tokens(full_history, working_dir)
+        compacted_tokens, compacted_s = await render_prompt_tokens(compacted_history, working_dir)
+        totals["full"] += full_tokens
+        totals["compacted"] += compacted_tokens
+        if step % 10 == 0 or step == 1:
+            print(
+                f"{step:>5} {full_tokens:>10,} {full_s * 1000:>10.1f} "
+                f"{compacted_tokens:>12,} {compacted_s * 1000:>10.1f} {compact_ms:>11.2f}"
+            )
+
+    saved = 1 - totals["compacted"] / totals["full"]
+    print(
+        f"\nPrompt tokens sent over the session: {totals['full']:,} without compaction, "
+        f"{totals['compacted']:,} with ({saved:.0%} fewer)"
+    )
+
+
+def main():
+    """Benchmark context compaction over a simulated session"""
+    parser = argparse.ArgumentParser(description="Benchmark context compaction over a long agent session")
+    parser.add_argument("--steps", type=int, default=100, help="Tool calls in the simulated session")
+    parser.add_argument("--budget", type=int, default=DEFAULT_TOKEN_BUDGET, help="Compaction token budget")
+    parser.add_argument("--dir", type=str, default=os.path.dirname(os.path.abspath(__file__)), help="Directory the session explores")
+
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.steps, args.budget, args.dir))
+
+
+if __name__ == "__main__":
+    main()
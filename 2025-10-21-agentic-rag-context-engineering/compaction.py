@@ -0,0 +1,121 @@
+"""
+Context compaction for long-running agent message histories
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from baml_client import types
+
+# Rough tokens-per-character ratio for English text and code
+CHARS_PER_TOKEN = 4
+
+# Default prompt budget for the message history (estimated tokens)
+DEFAULT_TOKEN_BUDGET = 60_000
+
+COMPACTED_MARKER = "[compacted"
+
+
+def estimate_tokens(message: types.Message) -> int:
+    """Estimate how many prompt tokens a message costs"""
+    return len(str(message.message)) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class CompactionResult:
+    """What one compaction pass did"""
+    compacted_messages: int
+    tokens_before: int
+    tokens_after: int
+
+
+class ContextCompactor:
+    """
+    Keeps a message history under a token budget by compacting old tool output.
+
+    The newest `keep_recent` messages and every user message are kept verbatim.
+    Once the history's estimated size exceeds `token_budget`, older tool results are
+    replaced, oldest first, with their first few lines and a note pointing back at the
+    tool call above them, until the history fits in `target_ratio` of the budget. The
+    tool call itself stays, so the agent can re-run it if it needs the full output.
+
+    Token estimates are tracked per message and only computed for new messages.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        keep_recent: int = 12,
+        summary_lines: int = 3,
+        target_ratio: float = 0.75
+    ):
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.summary_lines = summary_lines
+        self.target_ratio = target_ratio
+        self.token_counts: list[int] = []
+        self._messages: Optional[list[types.Message]] = None
+
+    def clone(self) -> "ContextCompactor":
+        """A compactor with the same settings for a separate history (e.g. a sub-agent's)"""
+        return ContextCompactor(self.token_budget, self.keep_recent, self.summary_lines, self.target_ratio)
+
+    def total_tokens(self, messages: list[types.Message]) -> int:
+        """Estimated size of the message history, updating per-message estimates"""
+        # The history was replaced or rewritten elsewhere (e.g. reset), so start over
+        if messages is not self._messages or len(messages) < len(self.token_counts):
+            self._messages = messages
+            self.token_counts = []
+        for message in messages[len(self.token_counts):]:
+            self.token_counts.append(estimate_tokens(message))
+        return sum(self.token_counts)
+
+    def compact(self, messages: list[types.Message]) -> Optional[CompactionResult]:
+        """
+        Compact the message history in place if it is over budget.
+
+        Returns: what was compacted, or None if the history was within budget
+        """
+        total = self.total_tokens(messages)
+        if not self.token_budget or total <= self.token_budget:
+            return None
+
+        target = int(self.token_budget * self.target_ratio)
+        tokens_before = total
+        compacted = 0
+        for idx in range(1, max(len(messages) - self.keep_recent, 0)):
+            if total <= target:
+                break
+            message = messages[idx]
+            if not self._is_tool_result(messages, idx) or str(message.message).startswith(COMPACTED_MARKER):
+                continue
+            summary = types.Message(role=message.role, message=self.summarize(messages[idx - 1], message))
+            summary_tokens = estimate_tokens(summary)
+            if summary_tokens >= self.token_counts[idx]:
+                continue
+            messages[idx] = summary
+            total += summary_tokens - self.token_counts[idx]
+            self.token_counts[idx] = summary_tokens
+            compacted += 1
+
+        return CompactionResult(compacted_messages=compacted, tokens_before=tokens_before, tokens_after=total)
+
+    def summarize(self, tool_call: types.Message, result: types.Message) -> str:
+        """Replace a tool result with its first lines and a reference to the call that produced it"""
+        text = str(result.message)
+        lines = text.split("\n")
+        tool_name = str(tool_call.message).split("\n", 1)[0].removeprefix("Tool: ")
+        head = "\n".join(line[:200] for line in lines[:self.summary_lines])
+        return (
+            f"{COMPACTED_MARKER}: {tool_name} output, {len(lines)} lines, "
+            f"~{len(text) // CHARS_PER_TOKEN} tokens. Re-run the tool call above to see it again]\n{head}"
+        )
+
+    @staticmethod
+    def _is_tool_result(messages: list[types.Message], idx: int) -> bool:
+        """Tool results are assistant messages that follow a `Tool:` call message"""
+        previous = messages[idx - 1]
+        return (
+            messages[idx].role == "assistant"
+            and previous.role == "assistant"
+            and str(previous.message).startswith("Tool: ")
+        )
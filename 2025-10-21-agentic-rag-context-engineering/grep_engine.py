@@ -0,0 +1,378 @@
+"""
+Content search that returns matching lines with context, capped by output size
+"""
+import fnmatch
+import mmap
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import workspace_index
+
+# Output is cut off (at a line boundary) once it reaches this many bytes
+DEFAULT_MAX_BYTES = 20_000
+
+# Longer lines are shortened, so one minified file can't fill the output
+MAX_LINE_CHARS = 300
+
+# Files with a NUL byte in their first block are treated as binary and skipped
+BINARY_SNIFF_BYTES = 8192
+
+RG_PATH = shutil.which("rg")
+
+# Python scanner threads: opening and paging in files overlaps across threads
+SCAN_THREADS = min(8, (os.cpu_count() or 1) + 4)
+_scan_pool = ThreadPoolExecutor(max_workers=SCAN_THREADS, thread_name_prefix="grep")
+
+BlockCallback = Callable[[str], None]
+
+
+@dataclass
+class GrepResult:
+    """Search output and what it covers"""
+    output: str
+    files: int  # Files with matches in the output
+    matches: int  # Matching lines in the output
+    truncated: bool  # Output hit the byte cap (or the timeout), so later matches are missing
+    backend: str  # "rg" or "python"
+
+
+class _Output:
+    """Collects output blocks up to a byte cap, passing each to a callback as it is added"""
+
+    def __init__(self, max_bytes: int, on_block: Optional[BlockCallback], separator: str):
+        self.max_bytes = max_bytes
+        self.on_block = on_block
+        self.separator = separator
+        self.blocks: list[str] = []
+        self.size = 0
+        self.files = 0
+        self.matches = 0
+        self.truncated = False
+
+    def add(self, block: str, matches: int) -> bool:
+        """Add one file's block; returns False once the cap is reached"""
+        if self.blocks:
+            block = self.separator + block
+        remaining = self.max_bytes - self.size
+        if len(block.encode("utf-8")) > remaining:
+            # Keep the whole lines that fit
+            block = block.encode("utf-8")[:remaining].decode("utf-8", errors="ignore").rpartition("\n")[0]
+            matches = sum(1 for line in block.split("\n") if re.match(r"\d+:", line))
+            self.truncated = True
+        if block.strip():
+            self.blocks.append(block)
+            self.size += len(block.encode("utf-8"))
+            self.files += 1
+            self.matches += matches
+            if self.on_block:
+                self.on_block(block)
+        return not self.truncated
+
+    def text(self) -> str:
+        return "".join(self.blocks)
+
+
+def _expand_braces(pattern: str) -> list[str]:
+    """Expand one level of {a,b} alternatives, like rg globs: "*.{ts,tsx}" -> ["*.ts", "*.tsx"]"""
+    match = re.search(r"\{([^{}]*)\}", pattern)
+    if not match:
+        return [pattern]
+    return [
+        expanded
+        for option in match.group(1).split(",")
+        for expanded in _expand_braces(pattern[:match.start()] + option + pattern[match.end():])
+    ]
+
+
+def _include_filter(include: Optional[str]) -> Callable[[str], bool]:
+    """Filter for "/"-separated relative paths; patterns without "/" match the file name"""
+    if not include:
+        return lambda rel_path: True
+    patterns = _expand_braces(include)
+
+    def accept(rel_path: str) -> bool:
+        name = rel_path.rpartition("/")[2]
+        return any(fnmatch.fnmatchcase(rel_path if "/" in pattern else name, pattern) for pattern in patterns)
+    return accept
+
+
+def candidate_files(search_path: str, include: Optional[str]) -> list[str]:
+    """Files to search, newest first, from the workspace index (or a walk if not indexed)"""
+    if os.path.isfile(search_path):
+        return [search_path]
+    accept = _include_filter(include)
+    indexed = workspace_index.get_index(search_path)
+    entries = indexed[0].files(indexed[1]) if indexed else None
+    if entries is not None:
+        offset = len(indexed[1]) + 1 if indexed[1] else 0
+        # Hidden files are skipped, as rg skips them
+        entries = [
+            entry for entry in entries
+            if accept(entry.path[offset:]) and not any(part.startswith(".") for part in entry.path[offset:].split("/"))
+        ]
+        entries.sort(key=lambda entry: entry.mtime_ns, reverse=True)
+        return [os.path.join(search_path, entry.path[offset:]) for entry in entries]
+
+    # Not indexed (e.g. inside an ignored directory)
+    files = []
+    for root, dirs, names in os.walk(search_path):
+        dirs[:] = [name for name in dirs if not name.startswith(".")]
+        for name in names:
+            path = os.path.join(root, name)
+            if not name.startswith(".") and accept(os.path.relpath(path, search_path).replace(os.sep, "/")):
+                files.append(path)
+    return files
+
+
+def _line_text(data: mmap.mmap, start: int, end: int) -> str:
+    text = data[start:end].decode("utf-8", errors="replace").rstrip("\r")
+    return text if len(text) <= MAX_LINE_CHARS else text[:MAX_LINE_CHARS] + " [...]"
+
+
+def _scan_file(path: str, regex: re.Pattern, context: int, files_only: bool, max_bytes: int) -> Optional[tuple[list[str], int]]:
+    """
+    Search one file through mmap.
+
+    Returns: (output lines as "12:match" / "13-context" / "--", number of matching lines),
+    or None if the file has no match, is binary or can't be read
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if b"\0" in data[:BINARY_SNIFF_BYTES]:
+                    return None
+                match = regex.search(data)
+                if match is None:
+                    return None
+                if files_only:
+                    return [], 1
+                return _match_lines(data, regex, match, context, max_bytes)
+    except (OSError, ValueError):
+        return None
+
+
+def _match_lines(data: mmap.mmap, regex: re.Pattern, match: re.Match, context: int, max_bytes: int) -> tuple[list[str], int]:
+    """Format every matching line (and its context) from the first match onwards"""
+    lines: list[str] = []
+    size = 0
+    count = 0
+    last_shown = 0  # Line number of the last line in the output
+    line_start = data.rfind(b"\n", 0, match.start()) + 1
+    line_number = data[:line_start].count(b"\n") + 1
+    while size < max_bytes:
+        # Context before, not overlapping lines already shown
+        before = []
+        start = line_start
+        while len(before) < context and start > 0 and line_number - len(before) - 1 > last_shown:
+            previous = data.rfind(b"\n", 0, start - 1) + 1
+            before.append((previous, start - 1))
+            start = previous
+        if context and last_shown and line_number - len(before) > last_shown + 1:
+            lines.append("--")
+        for offset, (start, end) in enumerate(reversed(before)):
+            lines.append(f"{line_number - len(before) + offset}-{_line_text(data, start, end)}")
+
+        line_end = data.find(b"\n", match.start())
+        line_end = len(data) if line_end == -1 else line_end
+        lines.append(f"{line_number}:{_line_text(data, line_start, line_end)}")
+        count += 1
+        last_shown = line_number
+        size += sum(len(line) + 1 for line in lines[-len(before) - 1:])
+
+        # Continue on the next line, so a line with several matches appears once
+        match = regex.search(data, line_end + 1) if line_end < len(data) else None
+        if match is not None:
+            next_start = data.rfind(b"\n", 0, match.start()) + 1
+            next_number = line_number + data[line_start:next_start].count(b"\n")
+
+        # Context after, up to the next match's line
+        start = line_end + 1
+        shown = 0
+        while shown < context and start < len(data) and (match is None or last_shown + 1 < next_number):
+            end = data.find(b"\n", start)
+            end = len(data) if end == -1 else end
+            lines.append(f"{last_shown + 1}-{_line_text(data, start, end)}")
+            size += len(lines[-1]) + 1
+            last_shown += 1
+            shown += 1
+            start = end + 1
+
+        if match is None:
+            break
+        line_start, line_number = next_start, next_number
+    return lines, count
+
+
+def _search_python(
+    regex: re.Pattern,
+    search_path: str,
+    include: Optional[str],
+    context: int,
+    files_only: bool,
+    display: Callable[[str], str],
+    output: _Output,
+    deadline: float,
+    cancel: Optional[threading.Event]
+) -> None:
+    """Scan candidate files on the thread pool, adding results to the output in file order"""
+    files = iter(candidate_files(search_path, include))
+    window = SCAN_THREADS * 4
+    pending: deque = deque()
+
+    def submit() -> None:
+        while len(pending) < window and (path := next(files, None)) is not None:
+            pending.append((path, _scan_pool.submit(_scan_file, path, regex, context, files_only, output.max_bytes)))
+
+    submit()
+    try:
+        while pending:
+            if (cancel and cancel.is_set()) or time.monotonic() > deadline:
+                output.truncated = True
+                return
+            path, future = pending.popleft()
+            result = future.result()
+            submit()
+            if result is None:
+                continue
+            lines, matches = result
+            if not output.add("\n".join([display(path), *lines]) + "\n", matches):
+                return
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def _search_rg(
+    pattern: str,
+    search_path: str,
+    include: Optional[str],
+    context: int,
+    files_only: bool,
+    cwd: Optional[str],
+    output: _Output,
+    timeout: float,
+    cancel: Optional[threading.Event]
+) -> Optional[str]:
+    """
+    Stream ripgrep's output into the output, stopping it at the byte cap.
+
+    Returns: an error message, or None
+    """
+    # --with-filename: rg omits the path when searching a single file, but every block starts with one
+    cmd = [
+        RG_PATH, "--color", "never", "--heading", "--with-filename", "--line-number",
+        "--max-columns", str(MAX_LINE_CHARS), "--max-columns-preview"
+    ]
+    if files_only:
+        cmd.append("--files-with-matches")
+    elif context:
+        cmd.extend(["--context", str(context)])
+    if include:
+        cmd.extend(["--glob", include])
+    cmd.extend(["--regexp", pattern])
+    if search_path != ".":
+        # Without a path rg searches its working directory and prints paths without "./"
+        cmd.extend(["--", search_path])
+
+    process = subprocess.Popen(
+        cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd, text=True, errors="replace"
+    )
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        block: list[str] = []
+        for line in process.stdout:
+            if cancel and cancel.is_set():
+                output.truncated = True
+                break
+            if files_only:
+                if not output.add(line, 1):
+                    break
+            elif line == "\n":
+                # A blank line ends a file's block
+                if not output.add("".join(block), sum(1 for text in block[1:] if re.match(r"\d+:", text))):
+                    block = []
+                    break
+                block = []
+            else:
+                block.append(line)
+        if block:
+            output.add("".join(block), sum(1 for text in block[1:] if re.match(r"\d+:", text)))
+        timed_out = not timer.is_alive()
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+        stderr = process.stderr.read()
+        process.wait()
+    if timed_out:
+        output.truncated = True
+    # Exit code 2 with output means some files couldn't be read, which isn't worth reporting
+    if process.returncode == 2 and not output.blocks and not timed_out:
+        return stderr.strip()
+    return None
+
+
+def grep(
+    pattern: str,
+    path: str,
+    include: Optional[str] = None,
+    context: int = 0,
+    files_only: bool = False,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    display_root: Optional[str] = None,
+    on_block: Optional[BlockCallback] = None,
+    timeout: float = 30,
+    cancel: Optional[threading.Event] = None,
+    use_rg: Optional[bool] = None
+) -> GrepResult:
+    """
+    Search file contents for a regex.
+
+    Each file with matches becomes a block: its path, then `12:line` for matching
+    lines and `13-line` for `context` lines around them (`--` between gaps), or just
+    the path with `files_only`. Blocks are passed to `on_block` as they are found,
+    and the search stops once the output reaches `max_bytes`. Paths are shown
+    relative to `display_root` when they are inside it.
+
+    Uses ripgrep when it is installed (`use_rg` forces either way). Otherwise files
+    come from the workspace index, newest first, and are scanned through mmap on a
+    thread pool. Setting `cancel` stops the search early.
+
+    Raises: re.error for an invalid pattern, OSError if ripgrep can't be started
+    """
+    search_path = os.path.abspath(path)
+    root = os.path.abspath(display_root) if display_root else None
+    # Blank lines between files' blocks, like rg --heading
+    output = _Output(max_bytes, on_block, "" if files_only else "\n")
+    use_rg = RG_PATH is not None if use_rg is None else use_rg
+
+    if use_rg:
+        # rg prints paths as given, so give it one relative to the display root
+        inside = root is not None and (search_path + os.sep).startswith(root.rstrip(os.sep) + os.sep)
+        target = os.path.relpath(search_path, root) if inside else (search_path if root else path)
+        error = _search_rg(pattern, target, include, context, files_only, root if inside else None, output, timeout, cancel)
+        if error:
+            raise OSError(error)
+        return GrepResult(output.text(), output.files, output.matches, output.truncated, "rg")
+
+    regex = re.compile(pattern.encode("utf-8"), re.MULTILINE)
+
+    def display(file_path: str) -> str:
+        if root is None:
+            return file_path if os.path.isabs(path) else os.path.relpath(file_path)
+        relative = os.path.relpath(file_path, root)
+        return file_path if relative.startswith("..") else relative
+
+    _search_python(regex, search_path, include, context, files_only, display, output, time.monotonic() + timeout, cancel)
+    return GrepResult(output.text(), output.files, output.matches, output.truncated, "python")
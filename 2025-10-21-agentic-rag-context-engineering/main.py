@@ -1,58 +1,140 @@
 import asyncio
-import subprocess
+import codecs
 import os
 import glob as glob_module
 import fnmatch
 import argparse
+import functools
+import signal
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Awaitable, Callable, Optional
 from dotenv import load_dotenv
 
 from baml_client import types
+from compaction import DEFAULT_TOKEN_BUDGET, ContextCompactor
+import grep_engine
+from tool_cache import CACHEABLE_TOOLS, TREE_TOOLS, ToolResultCache
+import workspace_index
 
 # In-memory storage for todos
 _todo_store: list[types.TodoItem] = []
 
+# Blocking tool handlers run here so the event loop (and the TUI) stays responsive
+_tool_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tool")
 
-def execute_bash(tool: types.BashTool, working_dir: str = ".") -> str:
-    """Execute a bash command and return the output"""
+# Streamed output is flushed to the callback at most this often (seconds)
+STREAM_FLUSH_INTERVAL = 0.2
+
+# Subprocess pipes are read this many bytes at a time
+STREAM_READ_SIZE = 65536
+
+OutputCallback = Callable[[str], Awaitable[None]]
+
+
+async def _stream_output(stream: asyncio.StreamReader, chunks: list[str], pending: list[str]) -> None:
+    """Read a subprocess pipe in fixed-size chunks (lines can be any length), keeping and queueing the text"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while data := await stream.read(STREAM_READ_SIZE):
+        if text := decoder.decode(data):
+            chunks.append(text)
+            pending.append(text)
+    if text := decoder.decode(b"", final=True):
+        chunks.append(text)
+        pending.append(text)
+
+
+async def execute_bash(tool: types.BashTool, working_dir: str = ".", on_output: Optional[OutputCallback] = None) -> str:
+    """Execute a bash command, streaming its output as it runs"""
+    timeout = tool.timeout / 1000 if tool.timeout else 120  # Convert ms to seconds
     try:
-        result = subprocess.run(
+        # Own process group, so a timeout or interrupt also stops the command's children
+        process = await asyncio.create_subprocess_shell(
             tool.command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=tool.timeout / 1000 if tool.timeout else 120,  # Convert ms to seconds
-            cwd=working_dir
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=working_dir,
+            start_new_session=True
         )
-        
-        output = result.stdout
-        if result.stderr:
-            output += f"\nSTDERR: {result.stderr}"
-        if result.returncode != 0:
-            output += f"\nExit code: {result.returncode}"
-            
-        return output if output else "Command executed successfully (no output)"
-    except subprocess.TimeoutExpired:
+    except Exception as e:
+        return f"Error executing command: {str(e)}"
+
+    stdout_chunks: list[str] = []
+    stderr_chunks: list[str] = []
+    pending: list[str] = []
+    readers = asyncio.gather(
+        _stream_output(process.stdout, stdout_chunks, pending),
+        _stream_output(process.stderr, stderr_chunks, pending),
+    )
+    deadline = time.monotonic() + timeout
+    try:
+        while not readers.done():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            await asyncio.wait({readers}, timeout=min(STREAM_FLUSH_INTERVAL, remaining))
+            if pending and on_output:
+                chunk = "".join(pending)
+                pending.clear()
+                await on_output(chunk)
+        await readers
+        returncode = await process.wait()
+    except asyncio.TimeoutError:
+        _kill_process_group(process)
         return f"Command timed out after {tool.timeout}ms"
+    except asyncio.CancelledError:
+        _kill_process_group(process)
+        raise
     except Exception as e:
+        _kill_process_group(process)
         return f"Error executing command: {str(e)}"
+    finally:
+        if not readers.done():
+            readers.cancel()
+            await asyncio.gather(readers, return_exceptions=True)
+
+    output = "".join(stdout_chunks)
+    stderr = "".join(stderr_chunks)
+    if stderr:
+        output += f"\nSTDERR: {stderr}"
+    if returncode != 0:
+        output += f"\nExit code: {returncode}"
+
+    return output if output else "Command executed successfully (no output)"
+
+
+def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill a subprocess started in its own session, along with its children"""
+    if process.returncode is None:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
 
 
 def execute_glob(tool: types.GlobTool, working_dir: str = ".") -> str:
-    """Find files matching a glob pattern"""
+    """Find files matching a glob pattern, most recently modified first"""
     try:
         search_path = tool.path if tool.path else working_dir
-        pattern = os.path.join(search_path, tool.pattern) if not tool.pattern.startswith("**/") else tool.pattern
         
-        matches = glob_module.glob(pattern, recursive=True)
+        # Query the workspace index (newest 50 via a heap) instead of walking the tree
+        indexed = workspace_index.get_index(search_path)
+        result = indexed[0].glob(tool.pattern, indexed[1], limit=50) if indexed else None
+        if result is not None:
+            entries, _ = result
+            base = indexed[1]
+            matches = [os.path.join(search_path, entry.path[len(base) + 1 if base else 0:]) for entry in entries]
+        else:
+            # Not indexed (e.g. inside an ignored directory), so walk the filesystem
+            matches = glob_module.glob(os.path.join(search_path, tool.pattern), recursive=True)
+            matches.sort(key=lambda x: os.path.getmtime(x) if os.path.exists(x) else 0, reverse=True)
         
         if not matches:
             return f"No files found matching pattern: {tool.pattern}"
         
-        # Sort by modification time
-        matches.sort(key=lambda x: os.path.getmtime(x) if os.path.exists(x) else 0, reverse=True)
-        
         # Normalize paths to be relative to working_dir
         working_dir_path = Path(working_dir).resolve()
         normalized_matches = []
@@ -75,55 +157,49 @@ def execute_glob(tool: types.GlobTool, working_dir: str = ".") -> str:
         return f"Error executing glob: {str(e)}"
 
 
-def execute_grep(tool: types.GrepTool, working_dir: str = ".") -> str:
-    """Search for pattern in files"""
+async def execute_grep(tool: types.GrepTool, working_dir: str = ".", on_output: Optional[OutputCallback] = None) -> str:
+    """Search file contents, streaming matching lines (with context) as they are found"""
+    pending: list[str] = []
+    cancel = threading.Event()
+    search = functools.partial(
+        grep_engine.grep,
+        tool.pattern,
+        os.path.join(working_dir, tool.path or "."),
+        include=tool.include,
+        context=tool.context_lines or 0,
+        files_only=tool.output_mode == "files_with_matches",
+        display_root=working_dir,
+        on_block=pending.append,
+        cancel=cancel
+    )
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_tool_executor, search)
     try:
-        search_path = tool.path if tool.path else working_dir
-        
-        # Build rg command
-        cmd = ["rg", tool.pattern, search_path, "--files-with-matches"]
-        
-        if tool.include:
-            cmd.extend(["--glob", tool.include])
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            files = result.stdout.strip().split("\n")
-            
-            # Normalize paths to be relative to working_dir
-            working_dir_path = Path(working_dir).resolve()
-            normalized_files = []
-            for file in files[:50]:  # Limit to first 50 matches
-                try:
-                    file_path = Path(file).resolve()
-                    # Try to make it relative to working_dir
-                    try:
-                        relative_path = file_path.relative_to(working_dir_path)
-                        normalized_files.append(str(relative_path))
-                    except ValueError:
-                        # If it can't be made relative, use the absolute path
-                        normalized_files.append(file)
-                except Exception:
-                    # If there's any issue, just use the original path
-                    normalized_files.append(file)
-            
-            return "\n".join(normalized_files)
-        elif result.returncode == 1:
-            return f"No matches found for pattern: {tool.pattern}"
-        else:
-            return f"Error: {result.stderr}"
-    except FileNotFoundError:
-        # Fallback to Python's re if rg is not available
-        return "Error: ripgrep (rg) not found. Please install ripgrep."
+        while not future.done():
+            await asyncio.wait({future}, timeout=STREAM_FLUSH_INTERVAL)
+            if pending and on_output:
+                # Blocks are appended from the search thread; take the ones seen so far
+                count = len(pending)
+                chunk = "".join(pending[:count])
+                del pending[:count]
+                await on_output(chunk)
+        result = future.result()
+    except asyncio.CancelledError:
+        cancel.set()
+        raise
     except Exception as e:
         return f"Error executing grep: {str(e)}"
 
+    if not result.output:
+        return f"No matches found for pattern: {tool.pattern}"
+    output = result.output.rstrip("\n")
+    if result.truncated:
+        output += (
+            f"\n\n... [Output truncated: showing {result.matches} matching lines in {result.files} files. "
+            "Narrow the search with path, include or a more specific pattern]"
+        )
+    return output
+
 
 def execute_ls(tool: types.LSTool, working_dir: str = ".") -> str:
     """List files in a directory"""
@@ -137,19 +213,21 @@ def execute_ls(tool: types.LSTool, working_dir: str = ".") -> str:
             return f"Not a directory: {tool.path}"
         
         items = []
-        for item in path.iterdir():
-            # Skip ignored patterns
-            if tool.ignore:
-                skip = False
-                for pattern in tool.ignore:
-                    if fnmatch.fnmatch(item.name, pattern):
-                        skip = True
-                        break
-                if skip:
-                    continue
-            
-            item_type = "DIR " if item.is_dir() else "FILE"
-            items.append(f"{item_type} {item.name}")
+        # scandir knows each entry's type from the directory listing, no stat per entry
+        with os.scandir(path) as entries:
+            for item in entries:
+                # Skip ignored patterns
+                if tool.ignore:
+                    skip = False
+                    for pattern in tool.ignore:
+                        if fnmatch.fnmatch(item.name, pattern):
+                            skip = True
+                            break
+                    if skip:
+                        continue
+                
+                item_type = "DIR " if item.is_dir() else "FILE"
+                items.append(f"{item_type} {item.name}")
         
         items.sort()
         return "\n".join(items) if items else "Empty directory"
@@ -493,37 +571,94 @@ async def execute_agent(tool: types.AgentTool) -> str:
         return f"Sub-agent error: {str(e)}"
 
 
-async def execute_tool(tool: types.AgentTools, working_dir: str = ".") -> str:
-    """Execute a tool based on its type using match statement"""
+async def _run_in_thread(handler: Callable[..., str], tool: types.AgentTools, working_dir: str) -> str:
+    """Run a blocking tool handler on the tool thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_tool_executor, handler, tool, working_dir)
+
+
+async def execute_tool(
+    tool: types.AgentTools,
+    working_dir: str = ".",
+    on_output: Optional[OutputCallback] = None,
+    cache: Optional[ToolResultCache] = None
+) -> str:
+    """
+    Execute a tool based on its type using match statement.
+
+    Subprocess tools run as asyncio subprocesses and other blocking handlers run on a
+    thread pool, so awaiting a tool never blocks the event loop. Bash output is passed
+    to `on_output` as it arrives. With a `cache`, unchanged Grep/LS/Read results
+    are reused, and tools that may modify files flush it.
+    """
+    if cache is None or tool.action not in CACHEABLE_TOOLS:
+        try:
+            return await _dispatch_tool(tool, working_dir, on_output)
+        finally:
+            _record_changes(tool, working_dir)
+            if cache is not None:
+                cache.notify(tool)
+    
+    # Read and LS validate with a single stat; Grep stats every file it searches, so off the event loop
+    if tool.action in TREE_TOOLS:
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(_tool_executor, cache.get, tool, working_dir)
+    else:
+        cached = cache.get(tool, working_dir)
+    if cached is not None:
+        return cached
+    
+    if tool.action in TREE_TOOLS:
+        snapshot = await loop.run_in_executor(_tool_executor, cache.snapshot, tool, working_dir)
+    else:
+        snapshot = cache.snapshot(tool, working_dir)
+    result = await _dispatch_tool(tool, working_dir, on_output)
+    cache.put(tool, working_dir, snapshot, result)
+    return result
+
+
+def _record_changes(tool: types.AgentTools, working_dir: str) -> None:
+    """Tell the workspace index about files a tool may have changed"""
+    match tool.action:
+        case "Edit" | "MultiEdit" | "Write":
+            workspace_index.touch(os.path.join(working_dir, tool.file_path))
+        case "NotebookEdit":
+            workspace_index.touch(os.path.join(working_dir, tool.notebook_path))
+        case "Bash":
+            workspace_index.mark_stale()
+
+
+async def _dispatch_tool(tool: types.AgentTools, working_dir: str, on_output: Optional[OutputCallback]) -> str:
+    """Run a tool's handler"""
     match tool.action:
         case "Bash":
-            return execute_bash(tool, working_dir)
+            return await execute_bash(tool, working_dir, on_output)
         case "Glob":
-            return execute_glob(tool, working_dir)
+            return await _run_in_thread(execute_glob, tool, working_dir)
         case "Grep":
-            return execute_grep(tool, working_dir)
+            return await execute_grep(tool, working_dir, on_output)
         case "LS":
-            return execute_ls(tool, working_dir)
+            return await _run_in_thread(execute_ls, tool, working_dir)
         case "Read":
-            return execute_read(tool, working_dir)
+            return await _run_in_thread(execute_read, tool, working_dir)
         case "Edit":
-            return execute_edit(tool, working_dir)
+            return await _run_in_thread(execute_edit, tool, working_dir)
         case "MultiEdit":
-            return execute_multi_edit(tool, working_dir)
+            return await _run_in_thread(execute_multi_edit, tool, working_dir)
         case "Write":
-            return execute_write(tool, working_dir)
+            return await _run_in_thread(execute_write, tool, working_dir)
         case "NotebookRead":
-            return execute_notebook_read(tool, working_dir)
+            return await _run_in_thread(execute_notebook_read, tool, working_dir)
         case "NotebookEdit":
-            return execute_notebook_edit(tool, working_dir)
+            return await _run_in_thread(execute_notebook_edit, tool, working_dir)
         case "WebFetch":
-            return execute_web_fetch(tool, working_dir)
+            return await _run_in_thread(execute_web_fetch, tool, working_dir)
         case "TodoRead":
             return execute_todo_read(tool, working_dir)
         case "TodoWrite":
             return execute_todo_write(tool, working_dir)
         case "WebSearch":
-            return execute_web_search(tool, working_dir)
+            return await _run_in_thread(execute_web_search, tool, working_dir)
         case "ExitPlanMode":
             return execute_exit_plan_mode(tool, working_dir)
         case "Agent":
@@ -532,7 +667,12 @@ async def execute_tool(tool: types.AgentTools, working_dir: str = ".") -> str:
             return f"Unknown tool type: {other}"
 
 
-async def agent_loop(user_message: str, max_iterations: int = 999, working_dir: str = ".") -> str:
+async def agent_loop(
+    user_message: str,
+    max_iterations: int = 999,
+    working_dir: str = ".",
+    context_budget: int = DEFAULT_TOKEN_BUDGET
+) -> str:
     """Main agent loop that calls the BAML agent and executes tools"""
     from agent_runtime import AgentState, AgentCallbacks, AgentRuntime
     import os
@@ -551,9 +691,10 @@ async def agent_loop(user_message: str, max_iterations: int = 999, working_dir:
         on_tool_start=print_tool_start,
         on_tool_result=print_tool_result,
         on_agent_reply=on_reply,
+        on_run_complete=print_run_stats,
     )
     
-    runtime = AgentRuntime(state, callbacks)
+    runtime = AgentRuntime(state, callbacks, ContextCompactor(token_budget=context_budget))
     return await runtime.run_loop(user_message, max_iterations=max_iterations, depth=0)
 
 
@@ -568,7 +709,8 @@ async def print_iteration(iteration: int, depth: int) -> None:
 async def print_tool_start(tool_name: str, params: dict, tool_idx: int, total_tools: int, depth: int) -> None:
     """Print tool execution start"""
     if depth == 0:
-        print(f"\n🔧 Executing tool: {tool_name}")
+        progress = f" ({tool_idx}/{total_tools})" if total_tools > 1 else ""
+        print(f"\n🔧 Executing tool: {tool_name}{progress}")
         if params:
             # Show only essential parameters, not the full dict
             essential_params = {}
@@ -579,15 +721,28 @@ async def print_tool_start(tool_name: str, params: dict, tool_idx: int, total_to
                 print(f"   Parameters: {essential_params}")
 
 
-async def print_tool_result(result: str, depth: int) -> None:
-    """Print tool result"""
-    if depth == 0:
+async def print_tool_result(result: str, depth: int, partial: bool = False) -> None:
+    """Print tool result, or output streamed while the tool is still running"""
+    if depth == 0 and partial:
+        for line in result.rstrip("\n").split("\n"):
+            print(f"   │ {line}")
+    elif depth == 0:
         # Truncate long results for CLI
         if len(result) > 500:
             result = result[:500] + f"\n... [truncated: showing first 500 of {len(result)} characters]"
         print(f"   Result: {result}")
 
 
+async def print_run_stats(stats) -> None:
+    """Print round-trips and timings for the finished run"""
+    print(
+        f"\n⏱️  {stats.iterations} iterations, {stats.tool_calls} tool calls in {stats.wall_seconds:.1f}s "
+        f"(LLM {stats.llm_seconds:.1f}s, tools {stats.tool_seconds:.1f}s)"
+    )
+    print(f"   Context: ~{stats.prompt_tokens:,} tokens, {stats.compacted_messages} tool results compacted")
+    print(f"   Tool cache: {stats.cache_hits}/{stats.cache_hits + stats.cache_misses} hits")
+
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(
@@ -642,6 +797,13 @@ Examples:
         help="Run in TUI mode (beautiful text user interface)"
     )
     
+    parser.add_argument(
+        "--context-budget",
+        type=int,
+        default=DEFAULT_TOKEN_BUDGET,
+        help=f"Estimated token budget for the conversation history; older tool output is compacted above it, 0 disables (default: {DEFAULT_TOKEN_BUDGET})"
+    )
+    
     parser.add_argument(
         "--verbose",
         "-v",
@@ -666,7 +828,7 @@ Examples:
                 sys.exit(1)
             work_dir = str(work_dir)
         
-        run_tui(working_dir=work_dir, initial_query=args.query)
+        run_tui(working_dir=work_dir, initial_query=args.query, context_budget=args.context_budget)
         return
     
     # Set working directory for CLI mode
@@ -718,7 +880,7 @@ Examples:
             print("=" * 60)
             
             # Run the agent with no iteration limit
-            result = asyncio.run(agent_loop(query, max_iterations=999, working_dir=work_dir))
+            result = asyncio.run(agent_loop(query, max_iterations=999, working_dir=work_dir, context_budget=args.context_budget))
             
             print(f"\n{'='*60}")
             print(f"✅ Final result:\n{result}")
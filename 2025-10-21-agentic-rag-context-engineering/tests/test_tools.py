@@ -0,0 +1,84 @@
+"""
+Tests for the tool handlers in main.py and the grep engine
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from baml_client import types
+
+import grep_engine
+from main import execute_bash
+from tool_cache import ToolResultCache
+
+
+def test_bash_returns_very_long_lines(tmp_path):
+    """A single output line far over the pipe reader's 64 KiB line limit comes back whole"""
+    tool = types.BashTool(action="Bash", command="python3 -c \"print('x' * 200_000)\"", description="long line")
+    chunks: list[str] = []
+
+    async def on_output(chunk: str) -> None:
+        chunks.append(chunk)
+
+    result = asyncio.run(execute_bash(tool, str(tmp_path), on_output))
+
+    assert result == "x" * 200_000 + "\n"
+    assert "".join(chunks) == result
+
+
+def test_bash_decodes_multibyte_characters_split_across_reads(tmp_path):
+    tool = types.BashTool(action="Bash", command="python3 -c \"print('é' * 100_000)\"", description="utf-8")
+
+    result = asyncio.run(execute_bash(tool, str(tmp_path)))
+
+    assert result == "é" * 100_000 + "\n"
+
+
+@pytest.mark.parametrize("use_rg", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(grep_engine.RG_PATH is None, reason="ripgrep not installed")),
+])
+def test_grep_single_file_shows_path(tmp_path, use_rg):
+    """Searching one file still prints its path, so both backends give the same block"""
+    (tmp_path / "a.py").write_text("one\nfoo two\nthree\nfoo four\n")
+
+    result = grep_engine.grep("foo", str(tmp_path / "a.py"), context=1, display_root=str(tmp_path), use_rg=use_rg)
+
+    assert result.output == "a.py\n1-one\n2:foo two\n3-three\n4:foo four\n"
+    assert result.files == 1
+    assert result.matches == 2
+
+
+def test_cached_grep_is_validated_against_indexed_files_only(tmp_path):
+    """A Grep cache hit re-stats the files the search reads, not ignored trees like node_modules"""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("foo\n")
+    (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+    vendored = tmp_path / "node_modules" / "pkg" / "index.js"
+    vendored.write_text("foo\n")
+    cache = ToolResultCache()
+    tool = types.GrepTool(action="Grep", pattern="foo")
+    working_dir = str(tmp_path)
+    cache.put(tool, working_dir, cache.snapshot(tool, working_dir), "cached")
+
+    assert str(vendored) not in cache.snapshot(tool, working_dir)
+    vendored.write_text("foo bar\n")
+    assert cache.get(tool, working_dir) == "cached"
+
+    (tmp_path / "src" / "a.py").write_text("foo bar\n")
+    assert cache.get(tool, working_dir) is None
+    assert cache.stats.invalidations == 1
+
+
+def test_glob_is_not_cached(tmp_path):
+    """Glob is answered by the workspace index, so the cache never stores it"""
+    cache = ToolResultCache()
+    tool = types.GlobTool(action="Glob", pattern="*.py")
+    cache.put(tool, str(tmp_path), cache.snapshot(tool, str(tmp_path)), "cached")
+
+    assert cache.get(tool, str(tmp_path)) is None
+
@@ -0,0 +1,161 @@
+"""
+Per-session cache of read-only tool results with filesystem-change invalidation
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import grep_engine
+from baml_client import types
+
+# Tools whose results only depend on the filesystem, so they can be cached. Glob isn't:
+# the workspace index answers it faster than a cache hit could be validated.
+CACHEABLE_TOOLS = frozenset({"Grep", "LS", "Read"})
+
+# Cacheable tools whose results depend on a whole directory tree, so validating them stats many files
+TREE_TOOLS = frozenset({"Grep"})
+
+# Tools that can change the filesystem, so they flush the cache
+MUTATING_TOOLS = frozenset({"Bash", "Edit", "MultiEdit", "Write", "NotebookEdit"})
+
+# Parameters holding a path, normalized to an absolute path in cache keys
+PATH_PARAMS = ("file_path", "path")
+
+# (mtime_ns, size) of every watched path, None for paths that don't exist
+Snapshot = dict[str, Optional[tuple[int, int]]]
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a tool cache"""
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0  # Entries dropped because a watched path changed
+    flushes: int = 0  # Times a mutating tool cleared the cache
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _stat(path: str) -> Optional[tuple[int, int]]:
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _snapshot_files(search_path: str, include: Optional[str]) -> Snapshot:
+    """
+    Stat every file a content search reads.
+
+    The files come from the (refreshed) workspace index with the search's own include
+    filter, so ignored directories such as node_modules are never walked, and an added
+    or removed file changes the snapshot's keys.
+    """
+    snapshot: Snapshot = {search_path: _stat(search_path)}
+    for path in grep_engine.candidate_files(search_path, include):
+        snapshot[path] = _stat(path)
+    return snapshot
+
+
+def _resolve(path: Optional[str], working_dir: str) -> str:
+    """Absolute path for a tool's path parameter, defaulting to the working directory"""
+    return os.path.abspath(os.path.join(working_dir, path or "."))
+
+
+class ToolResultCache:
+    """
+    Caches Grep, LS and Read results for a session.
+
+    Entries are keyed on the tool and its normalized parameters, and remember the
+    mtime/size of every path the result depends on: the file for Read, the directory
+    for LS, and every file Grep would search (from the workspace index) for Grep. A lookup re-stats those paths and drops the entry if anything changed, so
+    external edits are picked up. Any tool that may modify files (Edit, Write, Bash,
+    ...) flushes the whole cache.
+
+    Safe to use from the tool thread pool.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[Snapshot, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(tool: types.AgentTools, working_dir: str) -> str:
+        """Cache key: tool name plus its parameters with paths made absolute"""
+        params = tool.model_dump(exclude={"action"}, exclude_none=True)
+        for name in PATH_PARAMS:
+            if name in params:
+                params[name] = _resolve(params[name], working_dir)
+        return json.dumps([tool.action, _resolve(None, working_dir), params], sort_keys=True, default=str)
+
+    @staticmethod
+    def snapshot(tool: types.AgentTools, working_dir: str) -> Snapshot:
+        """Stat the paths a tool's result depends on"""
+        match tool.action:
+            case "Read":
+                path = _resolve(tool.file_path, working_dir)
+                return {path: _stat(path)}
+            case "LS":
+                path = _resolve(tool.path, working_dir)
+                return {path: _stat(path)}
+            case "Grep":
+                return _snapshot_files(_resolve(tool.path, working_dir), tool.include)
+            case _:
+                return {}
+
+    def get(self, tool: types.AgentTools, working_dir: str) -> Optional[str]:
+        """Cached result for a tool call, or None if not cached or a watched path changed"""
+        if tool.action not in CACHEABLE_TOOLS:
+            return None
+        key = self.key(tool, working_dir)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            snapshot, result = entry
+            if self.snapshot(tool, working_dir) == snapshot:
+                with self._lock:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                return result
+            with self._lock:
+                self._entries.pop(key, None)
+                self.stats.invalidations += 1
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def put(self, tool: types.AgentTools, working_dir: str, snapshot: Snapshot, result: str) -> None:
+        """
+        Cache a tool result.
+
+        The snapshot must be taken before the tool ran, so a change made while it ran
+        invalidates the entry instead of being missed.
+        """
+        if tool.action not in CACHEABLE_TOOLS:
+            return
+        key = self.key(tool, working_dir)
+        with self._lock:
+            self._entries[key] = (snapshot, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def notify(self, tool: types.AgentTools) -> None:
+        """Flush the cache if a tool may have modified the filesystem"""
+        if tool.action in MUTATING_TOOLS:
+            self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._entries:
+                self.stats.flushes += 1
+            self._entries.clear()
@@ -16,7 +16,8 @@ from rich.table import Table  # type: ignore
 from dotenv import load_dotenv  # type: ignore
 
 # Import from shared modules
-from agent_runtime import AgentState, AgentCallbacks, AgentRuntime
+from agent_runtime import AgentState, AgentCallbacks, AgentRuntime, RunStats
+from compaction import DEFAULT_TOKEN_BUDGET, ContextCompactor
 
 
 class StatusBar(Static):
@@ -96,7 +97,7 @@ class AgentLog(RichLog):
         # Only show iteration number, no separators
         self.write(Text(f"\nIteration {iteration}", style="bold yellow"))
     
-    def log_tool(self, tool_name: str, params: dict):
+    def log_tool(self, tool_name: str, params: dict, progress: str = ""):
         # Show only essential parameters in a compact format
         essential_keys = ['file_path', 'pattern', 'command', 'path', 'url', 'prompt', 'description']
         essential_params = {k: v for k, v in params.items() if k in essential_keys and v is not None}
@@ -112,12 +113,12 @@ class AgentLog(RichLog):
             
             self.write(Panel(
                 param_text,
-                title=f"[bold magenta]🔧 {tool_name}[/]",
+                title=f"[bold magenta]🔧 {tool_name}{progress}[/]",
                 border_style="magenta"
             ))
         else:
             # If no essential params, just show the tool name inline
-            self.write(Text(f"🔧 {tool_name}", style="bold magenta"))
+            self.write(Text(f"🔧 {tool_name}{progress}", style="bold magenta"))
     
     def log_result(self, result: str):
         result_length = len(result)
@@ -134,6 +135,10 @@ class AgentLog(RichLog):
             border_style="green"
         ))
     
+    def log_output(self, output: str):
+        # Output streamed while a tool is still running, shown dimmed above its result
+        self.write(Text(output.rstrip("\n"), style="dim"))
+    
     def log_agent_reply(self, message: str):
         self.write(Panel(
             Text(message, style="bold green"),
@@ -213,7 +218,12 @@ class BAMMYApp(App):
         Binding("ctrl+x", "interrupt_agent", "Interrupt", show=True),
     ]
     
-    def __init__(self, working_dir: Optional[str] = None, initial_query: Optional[str] = None):
+    def __init__(
+        self,
+        working_dir: Optional[str] = None,
+        initial_query: Optional[str] = None,
+        context_budget: int = DEFAULT_TOKEN_BUDGET
+    ):
         super().__init__()
         if working_dir:
             os.chdir(working_dir)
@@ -233,9 +243,10 @@ class BAMMYApp(App):
             on_status_update=self.on_status_update,
             on_sub_agent_start=self.on_sub_agent_start,
             on_sub_agent_complete=self.on_sub_agent_complete,
+            on_run_complete=self.on_run_complete,
         )
         
-        self.agent_runtime = AgentRuntime(self.agent_state, self.callbacks)
+        self.agent_runtime = AgentRuntime(self.agent_state, self.callbacks, ContextCompactor(token_budget=context_budget))
         self.current_task: Optional[asyncio.Task] = None
     
     def compose(self) -> ComposeResult:
@@ -328,7 +339,7 @@ class BAMMYApp(App):
         log.write(Panel(
             Text.from_markup(
                 "[bold red]⚠️  Interrupt Requested[/]\n\n"
-                "Stopping agent at next checkpoint..."
+                "Stopping the running tool and the agent..."
             ),
             border_style="red"
         ))
@@ -349,12 +360,17 @@ class BAMMYApp(App):
         if depth > 0:
             log.write(Text(f"{'  ' * depth}  └─ 🔧 {tool_name} ({tool_idx}/{total_tools})", style="dim magenta"))
         else:
-            log.log_tool(tool_name, params)
+            log.log_tool(tool_name, params, f" ({tool_idx}/{total_tools})" if total_tools > 1 else "")
         await asyncio.sleep(0.01)
     
-    async def on_tool_result(self, result: str, depth: int) -> None:
-        """Callback when tool execution completes"""
+    async def on_tool_result(self, result: str, depth: int, partial: bool = False) -> None:
+        """Callback when tool execution completes, or streams output while running"""
         log = self.query_one(AgentLog)
+        if partial:
+            # Sub-agents keep compact output, so only the main agent shows streamed output
+            if depth == 0:
+                log.log_output(result)
+            return
         if depth > 0:
             result_length = len(result)
             if result_length > 80:
@@ -406,6 +422,18 @@ class BAMMYApp(App):
         ))
         await asyncio.sleep(0.01)
     
+    async def on_run_complete(self, stats: RunStats) -> None:
+        """Callback when the agent loop finishes, with round-trips and timings"""
+        log = self.query_one(AgentLog)
+        log.write(Text(
+            f"⏱️  {stats.iterations} iterations, {stats.tool_calls} tool calls in {stats.wall_seconds:.1f}s "
+            f"(LLM {stats.llm_seconds:.1f}s, tools {stats.tool_seconds:.1f}s), "
+            f"context ~{stats.prompt_tokens:,} tokens, {stats.compacted_messages} tool results compacted, "
+            f"tool cache {stats.cache_hits}/{stats.cache_hits + stats.cache_misses} hits",
+            style="dim"
+        ))
+        await asyncio.sleep(0.01)
+    
     async def process_command(self, query: str) -> None:
         """Process a user command"""
         self.is_processing = True
@@ -457,10 +485,14 @@ class BAMMYApp(App):
             self.query_one(TodoPanel).refresh()
 
 
-def run_tui(working_dir: Optional[str] = None, initial_query: Optional[str] = None):
+def run_tui(
+    working_dir: Optional[str] = None,
+    initial_query: Optional[str] = None,
+    context_budget: int = DEFAULT_TOKEN_BUDGET
+):
     """Run the TUI application"""
     load_dotenv()
-    app = BAMMYApp(working_dir=working_dir, initial_query=initial_query)
+    app = BAMMYApp(working_dir=working_dir, initial_query=initial_query, context_budget=context_budget)
     app.run()
 
 
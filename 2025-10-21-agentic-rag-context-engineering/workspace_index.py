@@ -0,0 +1,322 @@
+"""
+Workspace file index for fast glob and newest-first file queries
+"""
+import fnmatch
+import heapq
+import os
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+# Directories never worth indexing (in addition to the root .gitignore)
+DEFAULT_IGNORES = (".git", "node_modules", "__pycache__", ".venv", "venv", ".mypy_cache", ".pytest_cache")
+
+
+@dataclass(slots=True)
+class Entry:
+    """An indexed file or directory"""
+    path: str  # Relative to the index root, "/"-separated
+    mtime_ns: int
+    size: int
+    is_dir: bool
+
+
+def _segment_regex(segment: str) -> str:
+    """Regex for one path segment of a glob pattern"""
+    out = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[" and (end := segment.find("]", i + 2)) != -1:
+            body = segment[i + 1:end].replace("\\", "\\\\")
+            out.append(f"[^{body[1:]}]" if body.startswith("!") else f"[{body}]")
+            i = end
+        else:
+            out.append(re.escape(char))
+        i += 1
+    regex = "".join(out)
+    # Like glob, wildcards don't match hidden names unless the pattern starts with "."
+    if any(char in segment for char in "*?[") and not segment.startswith("."):
+        regex = f"(?!\\.){regex}"
+    return regex
+
+
+@lru_cache(maxsize=256)
+def compile_glob(pattern: str) -> re.Pattern:
+    """
+    Compile a glob pattern to a regex over "/"-separated relative paths.
+
+    Follows `glob.glob(..., recursive=True)`: `**` matches any number of directories,
+    `*` and `?` don't cross "/", and wildcards don't match names starting with ".".
+    """
+    segments = [segment for segment in pattern.strip("/").split("/") if segment not in ("", ".")]
+    parts = []
+    for idx, segment in enumerate(segments):
+        last = idx == len(segments) - 1
+        if segment == "**":
+            # Any number of non-hidden directories (at the end, any non-hidden path)
+            parts.append(r"(?:[^/.][^/]*(?:/[^/.][^/]*)*)?" if last else r"(?:[^/.][^/]*/)*")
+        else:
+            parts.append(_segment_regex(segment) if last else f"{_segment_regex(segment)}/")
+    return re.compile("".join(parts))
+
+
+def literal_prefix(pattern: str) -> str:
+    """Leading directories of a glob pattern that contain no wildcards"""
+    literal = []
+    for segment in pattern.strip("/").split("/")[:-1]:
+        if any(char in segment for char in "*?["):
+            break
+        if segment not in ("", "."):
+            literal.append(segment)
+    return "/".join(literal)
+
+
+class WorkspaceIndex:
+    """
+    An in-memory index of every file and directory under a root.
+
+    Built once with `os.scandir`, then kept up to date incrementally: `refresh()` stats
+    each indexed directory and re-lists only the ones whose mtime changed (files were
+    added, removed or renamed). In-place file edits don't change a directory's mtime,
+    so tools that write files report them with `touch()`, and `mark_stale()` (after
+    a shell command) re-stats everything on the next refresh.
+
+    Skips `DEFAULT_IGNORES` and the patterns in the root `.gitignore` (no negation).
+    Safe to use from several threads.
+    """
+
+    def __init__(self, root: str, ignores: Iterable[str] = DEFAULT_IGNORES):
+        self.root = os.path.abspath(root)
+        self.entries: dict[str, Entry] = {}
+        # Indexed directories: mtime when last listed, and the names of their children
+        self._dirs: dict[str, tuple[int, set[str]]] = {}
+        self._ignores = tuple(ignores) + self._read_gitignore()
+        self._stale = True
+        self._lock = threading.RLock()
+
+    def _read_gitignore(self) -> tuple[str, ...]:
+        try:
+            with open(os.path.join(self.root, ".gitignore"), "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f]
+        except OSError:
+            return ()
+        return tuple(line.strip("/") for line in lines if line and not line.startswith(("#", "!")))
+
+    def is_ignored(self, rel_path: str) -> bool:
+        name = rel_path.rpartition("/")[2]
+        for pattern in self._ignores:
+            if fnmatch.fnmatchcase(rel_path if "/" in pattern else name, pattern):
+                return True
+        return False
+
+    def relative(self, path: str) -> Optional[str]:
+        """A path relative to the index root, or None if it is outside the root"""
+        path = os.path.abspath(path)
+        if path == self.root:
+            return ""
+        if not path.startswith(self.root.rstrip(os.sep) + os.sep):
+            return None
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def _abs(self, rel_path: str) -> str:
+        return os.path.join(self.root, rel_path) if rel_path else self.root
+
+    @staticmethod
+    def _join(rel_dir: str, name: str) -> str:
+        return f"{rel_dir}/{name}" if rel_dir else name
+
+    def _remove(self, rel_path: str) -> None:
+        """Forget a path and, if it was a directory, everything below it"""
+        self.entries.pop(rel_path, None)
+        stack = [rel_path]
+        while stack:
+            rel_dir = stack.pop()
+            _, children = self._dirs.pop(rel_dir, (0, set()))
+            for name in children:
+                child = self._join(rel_dir, name)
+                self.entries.pop(child, None)
+                stack.append(child)
+        parent, _, name = rel_path.rpartition("/")
+        if parent in self._dirs:
+            self._dirs[parent][1].discard(name)
+
+    def _scan(self, rel_dir: str) -> None:
+        """List a directory, stat its children and scan any new subdirectories"""
+        stack = [rel_dir]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                # Take the mtime first, so a change made while listing is seen next refresh
+                dir_mtime = os.stat(self._abs(rel_dir)).st_mtime_ns
+                with os.scandir(self._abs(rel_dir)) as it:
+                    children = list(it)
+            except OSError:
+                self._remove(rel_dir)
+                continue
+
+            previous = self._dirs.get(rel_dir, (0, set()))[1]
+            names = set()
+            for child in children:
+                rel_path = self._join(rel_dir, child.name)
+                if self.is_ignored(rel_path):
+                    continue
+                try:
+                    is_dir = child.is_dir(follow_symlinks=False)
+                    st = child.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                names.add(child.name)
+                self.entries[rel_path] = Entry(rel_path, st.st_mtime_ns, 0 if is_dir else st.st_size, is_dir)
+                if is_dir and rel_path not in self._dirs:
+                    stack.append(rel_path)
+            for name in previous - names:
+                self._remove(self._join(rel_dir, name))
+            self._dirs[rel_dir] = (dir_mtime, names)
+
+    def refresh(self) -> None:
+        """Bring the index up to date, re-listing only directories that changed"""
+        with self._lock:
+            if self._stale:
+                # Re-list every known directory (and the root, on first use)
+                self._dirs = {path: (-1, children) for path, (_, children) in self._dirs.items()} or {"": (-1, set())}
+                self._stale = False
+            for rel_dir in list(self._dirs):
+                if rel_dir not in self._dirs:
+                    continue  # Removed along with a parent
+                try:
+                    current = os.stat(self._abs(rel_dir)).st_mtime_ns
+                except OSError:
+                    self._remove(rel_dir)
+                    continue
+                if current != self._dirs[rel_dir][0]:
+                    self._scan(rel_dir)
+
+    def touch(self, path: str) -> None:
+        """Record that a file was created, modified or deleted"""
+        rel_path = self.relative(path)
+        if not rel_path:
+            return
+        with self._lock:
+            try:
+                st = os.stat(self._abs(rel_path))
+            except OSError:
+                self._remove(rel_path)
+                return
+            parent, _, name = rel_path.rpartition("/")
+            if parent not in self._dirs:
+                self._stale = True  # A new directory tree, picked up on the next refresh
+            elif not self.is_ignored(rel_path):
+                self.entries[rel_path] = Entry(rel_path, st.st_mtime_ns, st.st_size, False)
+                self._dirs[parent][1].add(name)
+
+    def mark_stale(self) -> None:
+        """Re-stat every file on the next refresh (e.g. after a shell command)"""
+        with self._lock:
+            self._stale = True
+
+    def _walk(self, base: str) -> Iterator[Entry]:
+        """Every entry below an indexed directory"""
+        stack = [base]
+        while stack:
+            rel_dir = stack.pop()
+            for name in self._dirs.get(rel_dir, (0, ()))[1]:
+                entry = self.entries[self._join(rel_dir, name)]
+                yield entry
+                if entry.is_dir:
+                    stack.append(entry.path)
+
+    def glob(self, pattern: str, base: str = "", limit: int = 50) -> Optional[tuple[list[Entry], int]]:
+        """
+        Entries under `base` matching a glob pattern, newest first.
+
+        Returns: (the `limit` most recently modified matches, total number of matches),
+        or None if the pattern leaves the index root or points into a directory that
+        isn't indexed (e.g. an ignored one), so the caller can fall back to walking the
+        filesystem
+        """
+        if os.path.isabs(pattern) or ".." in pattern.split("/"):
+            return None
+        self.refresh()
+        regex = compile_glob(pattern)
+        # Only walk below the pattern's literal directories
+        start = "/".join(part for part in (base, literal_prefix(pattern)) if part)
+        offset = len(base) + 1 if base else 0
+        with self._lock:
+            if start not in self._dirs:
+                return None
+            matches = [entry for entry in self._walk(start) if regex.fullmatch(entry.path, offset)]
+        return heapq.nlargest(limit, matches, key=lambda entry: entry.mtime_ns), len(matches)
+
+    def newest(self, base: str = "", limit: int = 50) -> list[Entry]:
+        """The `limit` most recently modified files under `base`"""
+        self.refresh()
+        with self._lock:
+            files = (entry for entry in self._walk(base) if not entry.is_dir)
+            return heapq.nlargest(limit, files, key=lambda entry: entry.mtime_ns)
+
+    def files(self, base: str = "") -> Optional[list[Entry]]:
+        """Every file under `base`, or None if `base` isn't indexed"""
+        self.refresh()
+        with self._lock:
+            if base not in self._dirs:
+                return None
+            return [entry for entry in self._walk(base) if not entry.is_dir]
+
+    def listdir(self, rel_dir: str) -> Optional[list[Entry]]:
+        """A directory's indexed children, or None if the directory isn't indexed"""
+        self.refresh()
+        with self._lock:
+            if rel_dir not in self._dirs:
+                return None
+            return [self.entries[self._join(rel_dir, name)] for name in self._dirs[rel_dir][1]]
+
+
+_indexes: dict[str, WorkspaceIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(path: str) -> Optional[tuple[WorkspaceIndex, str]]:
+    """
+    The index covering a directory, created on first use, and the directory relative to it.
+
+    Reuses the index of any indexed directory containing the path, so one index
+    serves every search within a workspace for the rest of the session.
+
+    Returns: (index, relative directory), or None if the path isn't a directory
+    """
+    path = os.path.abspath(path)
+    if not os.path.isdir(path):
+        return None
+    with _indexes_lock:
+        for index in _indexes.values():
+            rel_path = index.relative(path)
+            if rel_path is not None:
+                return index, rel_path
+        # The new index covers any existing index below it
+        for root in [root for root in _indexes if root.startswith(path.rstrip(os.sep) + os.sep)]:
+            del _indexes[root]
+        index = _indexes[path] = WorkspaceIndex(path)
+        return index, ""
+
+
+def touch(path: str) -> None:
+    """Tell every index containing a path that the file changed"""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.touch(path)
+
+
+def mark_stale() -> None:
+    """Make every index re-stat its files on the next query"""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.mark_stale()
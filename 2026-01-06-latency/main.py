@@ -1,16 +1,52 @@
 """
 Minimal synchronous agent for latency optimization experiments.
-No streaming, no parallelism, no sub-agents - just a simple loop.
+No sub-agents - just a simple loop. With --stream, read-only tools start
+while the model is still writing the rest of its response.
 """
+import argparse
+import json
 import subprocess
 import os
 import glob as glob_module
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
 
 from dotenv import load_dotenv
 from baml_client import types
 from baml_client.sync_client import b
 from baml_py.errors import BamlValidationError
+from pydantic import ValidationError
+
+from tool_cache import ToolResultCache
+import grep_engine
+import workspace_index
+
+# Tools that only read files, so they can run before the rest of the response is parsed
+READ_ONLY_TOOLS = frozenset({"Glob", "Grep", "Read", "LS"})
+
+# Runs read-only tools started while the response is streaming
+tool_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tool")
+
+
+@dataclass
+class TurnTiming:
+    """Latency of one agent iteration, in seconds since the LLM call started"""
+    iteration: int
+    streaming: bool
+    first_tool: float | None  # First complete tool call available (None for a reply)
+    llm: float  # Whole response received
+    turn: float  # Response received and every tool finished
+    tools: int
+    early_tools: int  # Tools started before the whole response was received
+
+    def summary(self) -> str:
+        first_tool = f"{self.first_tool:.2f}s" if self.first_tool is not None else "-"
+        return (
+            f"Timing: first tool {first_tool}, llm {self.llm:.2f}s, turn {self.turn:.2f}s "
+            f"({self.tools} tools, {self.early_tools} started early)"
+        )
 
 
 def execute_bash(tool: types.BashTool, working_dir: str) -> str:
@@ -41,34 +77,38 @@ def execute_glob(tool: types.GlobTool, working_dir: str) -> str:
     """Find files matching a glob pattern"""
     try:
         search_path = tool.path or working_dir
-        pattern = os.path.join(search_path, tool.pattern)
-        matches = glob_module.glob(pattern, recursive=True)
+        # Newest 50 matches from the workspace index, falling back to a filesystem walk
+        indexed = workspace_index.get_index(search_path)
+        result = indexed[0].glob(tool.pattern, indexed[1], limit=50) if indexed else None
+        if result is not None:
+            base = indexed[1]
+            matches = [os.path.join(search_path, entry.path[len(base) + 1 if base else 0:]) for entry in result[0]]
+        else:
+            matches = glob_module.glob(os.path.join(search_path, tool.pattern), recursive=True)
+            matches.sort(key=lambda x: os.path.getmtime(x) if os.path.exists(x) else 0, reverse=True)
         if not matches:
             return f"No files found matching: {tool.pattern}"
-        # Sort by modification time, limit to 50
-        matches.sort(key=lambda x: os.path.getmtime(x) if os.path.exists(x) else 0, reverse=True)
         return "\n".join(matches[:50])
     except Exception as e:
         return f"Error: {e}"
 
 
 def execute_grep(tool: types.GrepTool, working_dir: str) -> str:
-    """Search for pattern in files using ripgrep"""
+    """Search for pattern in files, returning matching lines with context"""
     try:
-        search_path = tool.path or working_dir
-        cmd = ["rg", tool.pattern, search_path, "--files-with-matches"]
-        if tool.include:
-            cmd.extend(["--glob", tool.include])
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode == 0:
-            files = result.stdout.strip().split("\n")
-            return "\n".join(files[:50])
-        elif result.returncode == 1:
+        result = grep_engine.grep(
+            tool.pattern,
+            tool.path or working_dir,
+            include=tool.include,
+            context=tool.context_lines or 0,
+            files_only=bool(tool.files_only)
+        )
+        if not result.output:
             return f"No matches found for: {tool.pattern}"
-        else:
-            return f"Error: {result.stderr}"
-    except FileNotFoundError:
-        return "Error: ripgrep (rg) not found"
+        output = result.output.rstrip("\n")
+        if result.truncated:
+            output += f"\n[truncated after {result.matches} matching lines in {result.files} files]"
+        return output
     except Exception as e:
         return f"Error: {e}"
 
@@ -107,7 +147,9 @@ def execute_ls(tool: types.LSTool, working_dir: str) -> str:
         if not path.is_dir():
             return f"Not a directory: {tool.path}"
         items = []
-        for item in sorted(path.iterdir()):
+        with os.scandir(path) as entries:
+            listing = sorted(entries, key=lambda entry: entry.name)
+        for item in listing:
             prefix = "[DIR] " if item.is_dir() else "[FILE]"
             items.append(f"{prefix} {item.name}")
         return "\n".join(items) if items else "Empty directory"
@@ -145,7 +187,36 @@ def execute_write(tool: types.WriteTool, working_dir: str) -> str:
         return f"Error: {e}"
 
 
-def execute_tool(tool: types.AgentTools, working_dir: str) -> str:
+def execute_tool(tool: types.AgentTools, working_dir: str, cache: ToolResultCache | None = None) -> str:
+    """Execute a tool, reusing unchanged Grep/LS/Read results from the cache"""
+    if cache is None:
+        try:
+            return dispatch_tool(tool, working_dir)
+        finally:
+            record_changes(tool, working_dir)
+    cached = cache.get(tool, working_dir)
+    if cached is not None:
+        return cached
+    snapshot = cache.snapshot(tool, working_dir)
+    try:
+        result = dispatch_tool(tool, working_dir)
+    finally:
+        record_changes(tool, working_dir)
+        cache.notify(tool)
+    cache.put(tool, working_dir, snapshot, result)
+    return result
+
+
+def record_changes(tool: types.AgentTools, working_dir: str) -> None:
+    """Tell the workspace index about files a tool may have changed"""
+    match tool.action:
+        case "Edit" | "Write":
+            workspace_index.touch(os.path.join(working_dir, tool.file_path))
+        case "Bash":
+            workspace_index.mark_stale()
+
+
+def dispatch_tool(tool: types.AgentTools, working_dir: str) -> str:
     """Dispatch tool execution"""
     match tool.action:
         case "Bash":
@@ -166,10 +237,67 @@ def execute_tool(tool: types.AgentTools, working_dir: str) -> str:
             return f"Unknown tool: {tool.action}"
 
 
-def agent_loop(user_message: str, working_dir: str, max_iterations: int = 20) -> str:
+def final_tool(tool) -> types.AgentTools | None:
+    """Convert a complete streamed tool call to its final type, or None if it doesn't validate"""
+    try:
+        return getattr(types, type(tool).__name__).model_validate(tool.model_dump())
+    except (AttributeError, ValidationError):
+        return None
+
+
+def stream_response(
+    messages: list[types.Message],
+    working_dir: str,
+    cache: ToolResultCache | None,
+    started_at: float
+) -> tuple[list[types.AgentTools] | types.ReplyToUser, dict[int, tuple[types.AgentTools, Future]], float | None]:
+    """
+    Stream the LLM response, starting read-only tools as soon as each one is parsed.
+
+    A tool call counts as complete once the model starts the next one, since the
+    last item of a partial array may still be missing fields. Tools after the first
+    one that may modify files (Bash, Edit, Write) wait for the whole response, so
+    they still run in order.
+
+    Returns: (final response, {index: (tool, future)} for tools already started,
+    seconds until the first complete tool call)
+    """
+    stream = b.stream.AgentLoop(messages=messages, working_dir=working_dir)
+    started: dict[int, tuple[types.AgentTools, Future]] = {}
+    first_tool = None
+    seen = 0
+    blocked = False
+    for partial in stream:
+        if not isinstance(partial, list) or len(partial) - 1 <= seen:
+            continue
+        if first_tool is None:
+            first_tool = time.perf_counter() - started_at
+        for idx in range(seen, len(partial) - 1):
+            tool = final_tool(partial[idx])
+            blocked = blocked or tool is None or tool.action not in READ_ONLY_TOOLS
+            if not blocked:
+                print(f"Tool: {tool.action} (started while streaming)")
+                started[idx] = (tool, tool_executor.submit(execute_tool, tool, working_dir, cache))
+        seen = len(partial) - 1
+    response = stream.get_final_response()
+    if first_tool is None and isinstance(response, list) and response:
+        first_tool = time.perf_counter() - started_at
+    return response, started, first_tool
+
+
+def agent_loop(
+    user_message: str,
+    working_dir: str,
+    max_iterations: int = 20,
+    cache: ToolResultCache | None = None,
+    stream: bool = False,
+    timings: list[TurnTiming] | None = None
+) -> str:
     """
     Simple synchronous agent loop.
     Returns the final response message.
+
+    Each iteration's latency is printed and, if given, appended to `timings`.
     """
     messages: list[types.Message] = [
         types.Message(role="user", content=user_message)
@@ -179,8 +307,14 @@ def agent_loop(user_message: str, working_dir: str, max_iterations: int = 20) ->
         print(f"\n--- Iteration {iteration + 1} ---")
 
         # Call the LLM
+        started_at = time.perf_counter()
+        started: dict[int, tuple[types.AgentTools, Future]] = {}
         try:
-            response = b.AgentLoop(messages=messages, working_dir=working_dir)
+            if stream:
+                response, started, first_tool = stream_response(messages, working_dir, cache, started_at)
+            else:
+                response = b.AgentLoop(messages=messages, working_dir=working_dir)
+                first_tool = time.perf_counter() - started_at
         except BamlValidationError as e:
             # If it looks like plain text, treat as reply
             if not e.raw_output.startswith(("{", "[", "```")):
@@ -192,23 +326,44 @@ def agent_loop(user_message: str, working_dir: str, max_iterations: int = 20) ->
             continue
         except Exception as e:
             return f"Error: {e}"
+        llm_seconds = time.perf_counter() - started_at
 
         # Check if done
         if isinstance(response, types.ReplyToUser):
             print(f"Agent: {response.message}")
+            timing = TurnTiming(iteration + 1, stream, None, llm_seconds, llm_seconds, 0, 0)
+            print(timing.summary())
+            if timings is not None:
+                timings.append(timing)
             return response.message
 
-        # Execute tool
-        tool_name = response.action
-        print(f"Tool: {tool_name}")
-
-        result = execute_tool(response, working_dir)
-        print(f"Result: {result[:200]}..." if len(result) > 200 else f"Result: {result}")
+        if not response:
+            messages.append(types.Message(role="assistant", content="Invalid response: no tool calls"))
+            continue
 
-        # Add to history
-        tool_call = f"[Tool: {tool_name}] {response.model_dump_json(exclude={'action'})}"
-        messages.append(types.Message(role="assistant", content=tool_call))
-        messages.append(types.Message(role="assistant", content=f"[Result] {result}"))
+        # Execute tools in order, collecting results of tools started while streaming
+        early_tools = 0
+        for idx, tool in enumerate(response):
+            tool_name = tool.action
+            if idx in started and started[idx][0] == tool:
+                result = started[idx][1].result()
+                early_tools += 1
+            else:
+                print(f"Tool: {tool_name}")
+                result = execute_tool(tool, working_dir, cache)
+            print(f"Result: {result[:200]}..." if len(result) > 200 else f"Result: {result}")
+
+            # Add to history
+            tool_call = f"[Tool: {tool_name}] {tool.model_dump_json(exclude={'action'})}"
+            messages.append(types.Message(role="assistant", content=tool_call))
+            messages.append(types.Message(role="assistant", content=f"[Result] {result}"))
+
+        timing = TurnTiming(
+            iteration + 1, stream, first_tool, llm_seconds, time.perf_counter() - started_at, len(response), early_tools
+        )
+        print(timing.summary())
+        if timings is not None:
+            timings.append(timing)
 
     return "Reached max iterations"
 
@@ -216,11 +371,19 @@ def agent_loop(user_message: str, working_dir: str, max_iterations: int = 20) ->
 def main():
     load_dotenv()
 
+    parser = argparse.ArgumentParser(description="Minimal agent for latency experiments")
+    parser.add_argument("--stream", action="store_true", help="Stream responses and start read-only tools early")
+    parser.add_argument("--timing-log", type=str, help="Append each iteration's timing to this JSONL file")
+    args = parser.parse_args()
+
     working_dir = os.getcwd()
     print(f"Working directory: {working_dir}")
-    print("Simple Agent (type 'quit' to exit)")
+    print(f"Simple Agent{' (streaming)' if args.stream else ''} (type 'quit' to exit)")
     print("-" * 40)
 
+    # Tool results are reused across queries in this session until files change
+    cache = ToolResultCache()
+
     while True:
         try:
             query = input("\n> ").strip()
@@ -229,9 +392,16 @@ def main():
             if query.lower() in ("quit", "exit", "q"):
                 break
 
-            result = agent_loop(query, working_dir)
+            timings: list[TurnTiming] = []
+            result = agent_loop(query, working_dir, cache=cache, stream=args.stream, timings=timings)
+            if args.timing_log:
+                with open(args.timing_log, "a") as f:
+                    for timing in timings:
+                        f.write(json.dumps({"query": query, **asdict(timing)}) + "\n")
             print(f"\n{'='*40}")
             print(f"Final: {result}")
+            stats = cache.stats
+            print(f"Tool cache: {stats.hits}/{stats.hits + stats.misses} hits ({stats.hit_rate:.0%})")
             print('='*40)
 
         except KeyboardInterrupt: